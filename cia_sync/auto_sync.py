@@ -3,7 +3,6 @@ Auto Sync Manager - Gestionnaire de synchronisation automatique ARIA ↔ CIA
 Synchronisation périodique en arrière-plan avec gestion intelligente
 """
 
-import threading
 from datetime import datetime, timedelta
 from typing import Any
 
@@ -31,6 +30,8 @@ class AutoSyncManager:
     - Arrêt propre
     """
 
+    SYNC_JOB = "cia_sync"
+
     def __init__(
         self,
         cia_base_url: str = "http://127.0.0.1:8000",
@@ -46,7 +47,6 @@ class AutoSyncManager:
         self.cia_base_url = cia_base_url
         self.db = DatabaseManager(db_path)
         self.is_running = False
-        self.sync_thread: threading.Thread | None = None
         self.sync_interval_minutes = 60  # Par défaut : 1 heure
         self.last_sync: datetime | None = None
         self.sync_stats: dict[str, Any] = {
@@ -75,11 +75,7 @@ class AutoSyncManager:
         self.sync_interval_minutes = interval_minutes
         self.is_running = True
 
-        # Démarrer le thread de synchronisation
-        self.sync_thread = threading.Thread(
-            target=self._sync_loop, daemon=True, name="AutoSyncThread"
-        )
-        self.sync_thread.start()
+        self._schedule()
 
         logger.info(
             f"✅ Synchronisation automatique démarrée "
@@ -94,65 +90,57 @@ class AutoSyncManager:
         Returns:
             True si arrêté avec succès
         """
+        from core.scheduler import get_scheduler
+
         if not self.is_running:
             logger.warning("Auto sync n'est pas en cours")
             return False
 
         self.is_running = False
-
-        if self.sync_thread and self.sync_thread.is_alive():
-            self.sync_thread.join(timeout=5)
+        get_scheduler().remove_job(self.SYNC_JOB)
 
         logger.info("⏹️ Synchronisation automatique arrêtée")
         return True
 
-    def _sync_loop(self) -> None:
-        """Boucle principale de synchronisation périodique."""
-        logger.info("🔄 Boucle de synchronisation démarrée")
-
-        while self.is_running:
-            try:
-                # Effectuer la synchronisation
-                success = self._perform_sync()
-
-                if success:
-                    self.sync_stats["successful_syncs"] = (
-                        self.sync_stats.get("successful_syncs", 0) + 1
-                    )
-                    logger.info("✅ Synchronisation automatique réussie")
-                else:
-                    self.sync_stats["failed_syncs"] = (
-                        self.sync_stats.get("failed_syncs", 0) + 1
-                    )
-                    logger.warning("⚠️ Synchronisation automatique échouée")
+    def _schedule(self) -> None:
+        """Enregistre (ou met à jour) la tâche dans le planificateur commun."""
+        from core.scheduler import IntervalTrigger, get_scheduler
+
+        scheduler = get_scheduler()
+        scheduler.add_job(
+            self.SYNC_JOB,
+            self._sync_cycle,
+            IntervalTrigger(self.sync_interval_minutes * 60),
+            jitter_seconds=min(60.0, self.sync_interval_minutes * 6.0),
+            run_immediately=self.last_sync is None,
+        )
+        scheduler.start()
 
-                self.sync_stats["total_syncs"] = (
-                    self.sync_stats.get("total_syncs", 0) + 1
-                )
-                self.last_sync = datetime.now()
+    def _sync_cycle(self) -> None:
+        """
+        Cycle de synchronisation périodique (tâche planifiée).
 
-            except Exception as e:
-                self.sync_stats["failed_syncs"] = (
-                    self.sync_stats.get("failed_syncs", 0) + 1
-                )
-                self.sync_stats["last_error"] = str(e)
-                logger.error(f"❌ Erreur dans la boucle de sync: {e}")
-
-            # Attendre l'intervalle avant la prochaine sync
-            sleep_seconds = self.sync_interval_minutes * 60
-            logger.debug(f"⏳ Prochaine sync dans {self.sync_interval_minutes} min")
-            # Attendre avec vérification périodique de is_running
-            # Utiliser wait() par blocs pour économiser CPU
-            wait_event = threading.Event()
-            remaining_seconds = sleep_seconds
-            while remaining_seconds > 0 and self.is_running:
-                wait_time = min(
-                    60, remaining_seconds
-                )  # Vérifier toutes les 60 secondes max
-                wait_event.wait(wait_time)
-                remaining_seconds -= wait_time
-
-        logger.info("🔄 Boucle de synchronisation arrêtée")
+        Un échec est remonté au planificateur, qui réessaie avec une attente
+        exponentielle.
+        """
+        try:
+            success = self._perform_sync()
+        except Exception as e:
+            self.sync_stats["failed_syncs"] = self.sync_stats.get("failed_syncs", 0) + 1
+            self.sync_stats["last_error"] = str(e)
+            raise
+        finally:
+            self.sync_stats["total_syncs"] = self.sync_stats.get("total_syncs", 0) + 1
+            self.last_sync = datetime.now()
+
+        if not success:
+            self.sync_stats["failed_syncs"] = self.sync_stats.get("failed_syncs", 0) + 1
+            raise RuntimeError("Synchronisation automatique CIA échouée")
+
+        self.sync_stats["successful_syncs"] = (
+            self.sync_stats.get("successful_syncs", 0) + 1
+        )
+        logger.info("✅ Synchronisation automatique réussie")
 
     def _perform_sync(self) -> bool:
         """
@@ -327,17 +315,14 @@ class AutoSyncManager:
             return None
 
         try:
+            from prediction_engine.feature_store import get_feature_store
             from prediction_engine.ml_analyzer import ARIAMLAnalyzer
 
             ml_analyzer = ARIAMLAnalyzer()
 
             if level == SyncLevel.SUMMARY:
                 # Résumé simple : probabilité de crise
-                context = {
-                    "stress_level": 0.5,
-                    "fatigue_level": 0.5,
-                    "activity_intensity": 0.5,
-                }
+                context = get_feature_store().get_context()
                 prediction = ml_analyzer.predict_pain_episode(context)
                 return {
                     "predictions_available": True,
@@ -357,11 +342,7 @@ class AutoSyncManager:
             else:  # DETAILED
                 # Détails complets
                 analytics = ml_analyzer.get_analytics_summary()
-                context = {
-                    "stress_level": 0.5,
-                    "fatigue_level": 0.5,
-                    "activity_intensity": 0.5,
-                }
+                context = get_feature_store().get_context()
                 prediction = ml_analyzer.predict_pain_episode(context)
                 return {
                     "predictions_available": True,
@@ -437,6 +418,8 @@ class AutoSyncManager:
             return False
 
         self.sync_interval_minutes = interval_minutes
+        if self.is_running:
+            self._schedule()
         logger.info(f"⏱️ Intervalle de sync mis à jour: {interval_minutes} min")
         return True
 
@@ -537,38 +520,17 @@ class AutoSyncManager:
                     )
                     location = appointment.get("location") or appointment.get("address")
 
-                    # Vérifier si une alerte existe déjà pour ce RDV
-                    existing_alerts = alerts_system.get_alerts(
-                        limit=100,
-                        alert_type=AlertType.MEDICAL_APPOINTMENT,
-                        unread_only=False,
-                    )
+                    # Clés de dédoublonnage (sans identifiant : pas de dédoublonnage)
                     appointment_id = appointment.get("id") or appointment.get(
                         "appointment_id"
                     )
-                    alert_exists = False
+                    general_key = reminder_key = None
                     if appointment_id:
-                        for alert in existing_alerts.get("alerts", []):
-                            alert_data = alert.get("data", {})
-                            if isinstance(alert_data, str):
-                                import json
-
-                                try:
-                                    alert_data = json.loads(alert_data)
-                                except Exception as e:
-                                    # Ignorer les erreurs de parsing JSON pour alert_data
-                                    logger.debug(f"Erreur parsing JSON alert_data: {e}")
-                            if (
-                                isinstance(alert_data, dict)
-                                and alert_data.get("appointment_id") == appointment_id
-                                and alert_data.get("appointment_date")
-                                == appt_date.isoformat()
-                            ):
-                                alert_exists = True
-                                break
+                        general_key = f"{appointment_id}:{appt_date.isoformat()}"
+                        reminder_key = f"{appointment_id}:reminder_24h"
 
                     # Créer alerte générale si RDV dans les 7 prochains jours
-                    if 0 <= days_until <= 7 and not alert_exists:
+                    if 0 <= days_until <= 7:
                         if days_until == 0:
                             severity = AlertSeverity.CRITICAL
                             message = f"Rendez-vous médical AUJOURD'HUI avec {doctor}: {title}"
@@ -587,7 +549,7 @@ class AutoSyncManager:
                         if location:
                             message += f" - {location}"
 
-                        alerts_system.create_alert(
+                        if alerts_system.create_alert(
                             AlertType.MEDICAL_APPOINTMENT,
                             severity,
                             f"RDV Médical - {title}",
@@ -601,50 +563,31 @@ class AutoSyncManager:
                                 "location": location,
                                 "alert_type": "general",
                             },
-                        )
-                        created_alerts += 1
+                            dedup_key=general_key,
+                        ):
+                            created_alerts += 1
 
                     # Créer alerte de rappel 24h avant (entre 23h et 25h avant)
                     if 23 <= hours_until <= 25:
-                        # Vérifier si alerte de rappel existe déjà
-                        reminder_exists = False
-                        for alert in existing_alerts.get("alerts", []):
-                            alert_data = alert.get("data", {})
-                            if isinstance(alert_data, str):
-                                import json
-
-                                try:
-                                    alert_data = json.loads(alert_data)
-                                except Exception as e:
-                                    # Ignorer les erreurs de parsing JSON pour alert_data
-                                    logger.debug(f"Erreur parsing JSON alert_data: {e}")
-                            if (
-                                isinstance(alert_data, dict)
-                                and alert_data.get("appointment_id") == appointment_id
-                                and alert_data.get("alert_type") == "reminder_24h"
-                            ):
-                                reminder_exists = True
-                                break
-
-                        if not reminder_exists:
-                            alerts_system.create_alert(
-                                AlertType.MEDICAL_APPOINTMENT,
-                                AlertSeverity.WARNING,
-                                f"Rappel RDV - {title}",
-                                (
-                                    f"Rappel : Rendez-vous médical DEMAIN à "
-                                    f"{appt_date.strftime('%H:%M')} avec {doctor}: {title}"
-                                )
-                                + (f" - {location}" if location else ""),
-                                {
-                                    "appointment_id": appointment_id,
-                                    "appointment_date": appt_date.isoformat(),
-                                    "hours_until": hours_until,
-                                    "doctor": doctor,
-                                    "location": location,
-                                    "alert_type": "reminder_24h",
-                                },
+                        if alerts_system.create_alert(
+                            AlertType.MEDICAL_APPOINTMENT,
+                            AlertSeverity.WARNING,
+                            f"Rappel RDV - {title}",
+                            (
+                                f"Rappel : Rendez-vous médical DEMAIN à "
+                                f"{appt_date.strftime('%H:%M')} avec {doctor}: {title}"
                             )
+                            + (f" - {location}" if location else ""),
+                            {
+                                "appointment_id": appointment_id,
+                                "appointment_date": appt_date.isoformat(),
+                                "hours_until": hours_until,
+                                "doctor": doctor,
+                                "location": location,
+                                "alert_type": "reminder_24h",
+                            },
+                            dedup_key=reminder_key,
+                        ):
                             created_alerts += 1
                             logger.info(f"✅ Alerte rappel 24h créée pour RDV: {title}")
 
@@ -8,6 +8,7 @@ Module central contenant les abstractions communes :
 - Logging unifié
 - Gestionnaire de cache
 - Exceptions personnalisées
+- Planificateur de tâches de fond
 """
 
 from .alerts import AlertSeverity, AlertType, ARIA_AlertsSystem, get_alerts_system
@@ -17,6 +18,7 @@ from .config import Config
 from .database import DatabaseManager
 from .exceptions import APIError, ARIABaseException, DatabaseError
 from .logging import get_logger, setup_logging
+from .scheduler import CronTrigger, IntervalTrigger, JobScheduler, get_scheduler
 
 __all__ = [
     "ARIA_AlertsSystem",
@@ -33,4 +35,8 @@ __all__ = [
     "ARIABaseException",
     "DatabaseError",
     "APIError",
+    "JobScheduler",
+    "IntervalTrigger",
+    "CronTrigger",
+    "get_scheduler",
 ]
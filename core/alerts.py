@@ -5,6 +5,7 @@ ARKALIA ARIA - Système d'Alertes Automatiques
 Système d'alertes intelligent pour :
 - Patterns détectés (déclencheurs récurrents)
 - Prédictions (crises anticipées)
+- Poussées détectées en temps réel (intensité, fréquence, stress)
 - Corrélations importantes (sommeil-douleur, stress-douleur)
 - Notifications basées sur données santé
 """
@@ -35,6 +36,7 @@ class AlertType(Enum):
     CORRELATION_STRONG = "correlation_strong"
     HEALTH_SYNC = "health_sync"
     MEDICAL_APPOINTMENT = "medical_appointment"
+    FLARE_DETECTED = "flare_detected"
 
 
 class ARIA_AlertsSystem:
@@ -64,10 +66,12 @@ class ARIA_AlertsSystem:
                     title TEXT NOT NULL,
                     message TEXT NOT NULL,
                     data TEXT,
+                    dedup_key TEXT,
                     is_read INTEGER DEFAULT 0,
                     created_at TEXT NOT NULL DEFAULT (DATETIME('now'))
                 )
                 """)
+            self._migrate_dedup_key()
             # Index pour requêtes fréquentes
             try:
                 self.db.execute_update(
@@ -79,6 +83,13 @@ class ARIA_AlertsSystem:
                 self.db.execute_update(
                     "CREATE INDEX IF NOT EXISTS idx_alerts_read ON alerts(is_read)"
                 )
+                # Une seule alerte par clé de dédoublonnage et par type
+                self.db.execute_update(
+                    """
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_dedup
+                    ON alerts(alert_type, dedup_key) WHERE dedup_key IS NOT NULL
+                    """
+                )
             except Exception as e:
                 # Ignorer les erreurs de création d'index (peut déjà exister)
                 logger.debug(f"Index idx_alerts_read peut déjà exister: {e}")
@@ -86,6 +97,33 @@ class ARIA_AlertsSystem:
         except Exception as e:
             logger.error(f"❌ Erreur initialisation table alerts: {e}")
 
+    def _migrate_dedup_key(self) -> None:
+        """
+        Ajoute la colonne ``dedup_key`` aux bases existantes.
+
+        Les anciennes alertes portant un ``alert_key`` dans leurs données
+        reçoivent cette clé (la plus récente seulement, l'index étant unique).
+        """
+        columns = {
+            row["name"] for row in self.db.execute_query("PRAGMA table_info(alerts)")
+        }
+        if "dedup_key" in columns:
+            return
+        self.db.execute_update("ALTER TABLE alerts ADD COLUMN dedup_key TEXT")
+        self.db.execute_update("""
+            UPDATE alerts SET dedup_key = json_extract(data, '$.alert_key')
+            WHERE json_valid(data)
+              AND json_extract(data, '$.alert_key') IS NOT NULL
+              AND id = (
+                  SELECT MAX(other.id) FROM alerts AS other
+                  WHERE other.alert_type = alerts.alert_type
+                    AND json_valid(other.data)
+                    AND json_extract(other.data, '$.alert_key')
+                        = json_extract(alerts.data, '$.alert_key')
+              )
+            """)
+        logger.info("✅ Colonne dedup_key ajoutée à la table alerts")
+
     def create_alert(
         self,
         alert_type: AlertType,
@@ -93,40 +131,86 @@ class ARIA_AlertsSystem:
         title: str,
         message: str,
         data: dict[str, Any] | None = None,
+        dedup_key: str | None = None,
+        cooldown_hours: float | None = None,
     ) -> int:
         """
         Crée une nouvelle alerte.
 
+        Avec ``dedup_key``, une seule alerte existe par type et par clé
+        (index unique) : tant que le délai de carence n'est pas écoulé
+        (indéfiniment si ``cooldown_hours`` est None), l'alerte n'est pas
+        recréée. Passé ce délai, l'alerte existante est réactivée (contenu
+        mis à jour, marquée non lue).
+
         Args:
             alert_type: Type d'alerte
             severity: Niveau de sévérité
             title: Titre de l'alerte
             message: Message détaillé
             data: Données supplémentaires (optionnel)
+            dedup_key: Clé de dédoublonnage (optionnel)
+            cooldown_hours: Délai avant de pouvoir réémettre la même alerte
 
         Returns:
-            ID de l'alerte créée
+            ID de l'alerte créée ou réactivée, 0 si doublon ou en cas d'erreur
         """
         try:
             import json
 
             data_json = json.dumps(data) if data else None
-            self.db.execute_update(
-                """
-                INSERT INTO alerts (alert_type, severity, title, message, data)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    alert_type.value,
-                    severity.value,
-                    title,
-                    message,
-                    data_json,
-                ),
+            params = (
+                alert_type.value,
+                severity.value,
+                title,
+                message,
+                data_json,
+                dedup_key,
             )
+            if dedup_key is None:
+                self.db.execute_update(
+                    """
+                    INSERT INTO alerts (
+                        alert_type, severity, title, message, data, dedup_key
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    params,
+                )
+                # Récupérer l'ID
+                rows = self.db.execute_query("SELECT last_insert_rowid() as id")
+            else:
+                cooldown = (
+                    f"-{cooldown_hours * 3600:.0f} seconds"
+                    if cooldown_hours is not None
+                    else None
+                )
+                changed = self.db.execute_update(
+                    """
+                    INSERT INTO alerts (
+                        alert_type, severity, title, message, data, dedup_key
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(alert_type, dedup_key) WHERE dedup_key IS NOT NULL
+                    DO UPDATE SET
+                        severity = excluded.severity,
+                        title = excluded.title,
+                        message = excluded.message,
+                        data = excluded.data,
+                        is_read = 0,
+                        created_at = DATETIME('now')
+                    WHERE ? IS NOT NULL AND alerts.created_at <= DATETIME('now', ?)
+                    """,
+                    (*params, cooldown, cooldown),
+                )
+                if not changed:
+                    logger.debug(f"Alerte déjà émise ({dedup_key}), ignorée")
+                    return 0
+                rows = self.db.execute_query(
+                    "SELECT id FROM alerts WHERE alert_type = ? AND dedup_key = ?",
+                    (alert_type.value, dedup_key),
+                )
             logger.info(f"✅ Alerte créée: {title}")
-            # Récupérer l'ID
-            rows = self.db.execute_query("SELECT last_insert_rowid() as id")
             return rows[0]["id"] if rows else 0
         except Exception as e:
             logger.error(f"❌ Erreur création alerte: {e}")
@@ -177,14 +261,11 @@ class ARIA_AlertsSystem:
         """
         alerts_created = []
         try:
+            from prediction_engine.feature_store import get_feature_store
             from prediction_engine.ml_analyzer import ARIAMLAnalyzer
 
             ml_analyzer = ARIAMLAnalyzer()
-            context = {
-                "stress_level": 0.5,
-                "fatigue_level": 0.5,
-                "activity_intensity": 0.5,
-            }
+            context = get_feature_store().get_context()
             prediction = ml_analyzer.predict_pain_episode(context)
 
             # Vérifier si risque élevé
@@ -61,6 +61,9 @@ class Config:
         )
         self._config["metrics_fast_mode"] = os.getenv("ARIA_METRICS_FAST", "0") == "1"
 
+        # Configuration du moteur de prédiction (vide = <dossier de la base>/models)
+        self._config["model_dir"] = os.getenv("ARIA_MODEL_DIR", "")
+
         # Configuration des connecteurs santé
         self._config["samsung_health_enabled"] = (
             os.getenv("SAMSUNG_HEALTH_ENABLED", "1") == "1"
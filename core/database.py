@@ -10,6 +10,8 @@ Utilise le pattern Singleton pour éviter les connexions multiples.
 import logging
 import sqlite3
 import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from .exceptions import DatabaseError
@@ -49,6 +51,11 @@ class DatabaseManager:
         self.db_path = Path(db_path).resolve()
         self._connection: sqlite3.Connection | None = None
         self._lock = threading.Lock()
+        # La connexion est partagée entre threads (tâches planifiées, API) :
+        # une seule instruction à la fois
+        self._statement_lock = threading.RLock()
+        # Profondeur des transactions en cours (thread détenteur du verrou)
+        self._transaction_depth = 0
         self._initialized = True
 
         # Créer le répertoire si nécessaire
@@ -83,6 +90,56 @@ class DatabaseManager:
 
         return self._connection
 
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Regroupe plusieurs écritures en une seule transaction.
+
+        Dans le bloc, ``execute_update`` et ``execute_many`` ne valident plus
+        chaque instruction : tout est validé à la sortie, ou annulé si une
+        exception est levée. Le verrou des instructions est tenu pendant tout
+        le bloc, si bien qu'aucun autre thread ne peut valider une écriture
+        partielle. Les transactions imbriquées rejoignent la transaction
+        englobante.
+
+        Yields:
+            Connexion SQLite active
+
+        Raises:
+            DatabaseError: Si la validation échoue
+        """
+        conn = self.get_connection()
+        with self._statement_lock:
+            self._transaction_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    conn.rollback()
+                    logger.warning("↩️ Transaction annulée")
+                raise
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                try:
+                    conn.commit()
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    logger.error(f"Erreur validation transaction: {e}")
+                    raise DatabaseError(
+                        f"Erreur lors de la validation de la transaction: {e}"
+                    ) from e
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """Valide l'instruction courante, sauf au sein d'une transaction."""
+        if not self._transaction_depth:
+            conn.commit()
+
+    def _rollback(self, conn: sqlite3.Connection) -> None:
+        """Annule l'instruction en échec ; une transaction est annulée en bloc."""
+        if not self._transaction_depth:
+            conn.rollback()
+
     def execute_query(self, query: str, params: tuple = ()) -> list[sqlite3.Row]:
         """
         Exécute une requête SELECT et retourne les résultats.
@@ -99,9 +156,10 @@ class DatabaseManager:
         """
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+            with self._statement_lock:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                return cursor.fetchall()
         except sqlite3.Error as e:
             logger.error(f"Erreur requête SELECT: {e}")
             raise DatabaseError(f"Erreur lors de l'exécution de la requête: {e}") from e
@@ -123,12 +181,13 @@ class DatabaseManager:
         """
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+            with self._statement_lock:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                self._commit(conn)
+                return cursor.rowcount
         except sqlite3.Error as e:
-            conn.rollback()
+            self._rollback(conn)
             error_msg = str(e).lower()
             # Ne pas logger comme erreur critique les erreurs de colonnes dupliquées
             # (gérées par la logique de migration)
@@ -154,12 +213,13 @@ class DatabaseManager:
         """
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.executemany(query, params_list)
-            conn.commit()
-            return cursor.rowcount
+            with self._statement_lock:
+                cursor = conn.cursor()
+                cursor.executemany(query, params_list)
+                self._commit(conn)
+                return cursor.rowcount
         except sqlite3.Error as e:
-            conn.rollback()
+            self._rollback(conn)
             logger.error(f"Erreur requête executemany: {e}")
             raise DatabaseError(f"Erreur lors de l'exécution de la requête: {e}") from e
 
@@ -215,10 +275,11 @@ class DatabaseManager:
 
         try:
             conn = self.get_connection()
-            cursor = conn.cursor()
-            # Utiliser des paramètres pour les valeurs (protection contre injection)
-            cursor.execute(query, params)
-            return cursor.fetchone()[0]
+            with self._statement_lock:
+                cursor = conn.cursor()
+                # Utiliser des paramètres pour les valeurs (protection contre injection)
+                cursor.execute(query, params)
+                return cursor.fetchone()[0]
         except sqlite3.Error as e:
             logger.error(f"Erreur requête COUNT: {e}")
             raise DatabaseError(f"Erreur lors du comptage: {e}") from e
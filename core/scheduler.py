@@ -0,0 +1,519 @@
+"""
+ARKALIA ARIA - Planificateur de tâches de fond
+==============================================
+
+Registre unique des tâches périodiques (synchronisations, exports, rapports,
+rattrapages) exécutées sur une seule boucle asyncio :
+
+- déclencheurs par intervalle ou expression cron (5 champs) ;
+- gigue aléatoire pour étaler les exécutions ;
+- nouvel essai avec attente exponentielle après un échec ;
+- concurrence maximale et pas de chevauchement d'une même tâche ;
+- statut par tâche (durées, erreurs, prochaine exécution).
+
+Le planificateur tourne sur un unique thread de fond, avec sa propre boucle
+créée au démarrage. Les tâches synchrones s'exécutent dans un pool de
+threads borné ; aucune boucle n'est recréée d'un cycle à l'autre.
+"""
+
+import asyncio
+import inspect
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from .logging import get_logger
+
+logger = get_logger("scheduler")
+
+JobFunction = Callable[[], Any] | Callable[[], Awaitable[Any]]
+
+
+class IntervalTrigger:
+    """Déclencheur à intervalle fixe."""
+
+    def __init__(self, seconds: float) -> None:
+        """
+        Initialise le déclencheur.
+
+        Args:
+            seconds: Intervalle entre deux exécutions
+        """
+        if seconds <= 0:
+            raise ValueError("L'intervalle doit être positif")
+        self.interval = timedelta(seconds=seconds)
+
+    def next_run(self, after: datetime) -> datetime:
+        """Prochaine exécution après ``after``."""
+        return after + self.interval
+
+    def __str__(self) -> str:
+        return f"every {self.interval.total_seconds():g}s"
+
+
+class CronTrigger:
+    """
+    Déclencheur cron : ``minute heure jour mois jour_semaine``.
+
+    Chaque champ accepte ``*``, une valeur, une plage ``a-b``, un pas ``*/n``
+    ou ``a-b/n`` et des listes séparées par des virgules. Jour de la semaine :
+    0 (ou 7) = dimanche. Comme cron, si le jour du mois et le jour de la
+    semaine sont tous deux restreints, l'un ou l'autre suffit.
+    """
+
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str) -> None:
+        """
+        Initialise le déclencheur.
+
+        Args:
+            expression: Expression cron à 5 champs
+        """
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expression cron invalide: {expression}")
+        self.expression = expression
+        minutes, hours, days, months, weekdays = (
+            self._parse(part, low, high)
+            for part, (low, high) in zip(parts, self.FIELDS, strict=True)
+        )
+        self.minutes, self.hours, self.days, self.months = minutes, hours, days, months
+        self.weekdays = {day % 7 for day in weekdays}
+        self.days_restricted = parts[2] != "*"
+        self.weekdays_restricted = parts[4] != "*"
+
+    @staticmethod
+    def _parse(part: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for item in part.split(","):
+            span, _, step = item.partition("/")
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start, end = (int(bound) for bound in span.split("-", 1))
+            else:
+                start = end = int(span)
+            if not (low <= start <= end <= high):
+                raise ValueError(f"Champ cron hors bornes: {item}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_run(self, after: datetime) -> datetime:
+        """Prochaine minute correspondant à l'expression, après ``after``."""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.months or not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Expression cron sans occurrence: {self.expression}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+Trigger = IntervalTrigger | CronTrigger
+
+
+@dataclass
+class ScheduledJob:
+    """Tâche enregistrée et ses statistiques d'exécution."""
+
+    name: str
+    func: JobFunction
+    trigger: Trigger
+    jitter_seconds: float = 0.0
+    next_run: datetime | None = None
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    skipped: int = 0
+    last_run: datetime | None = None
+    last_status: str | None = None
+    last_error: str | None = None
+    last_duration: float | None = None
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    history: list[dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Statut sérialisable de la tâche."""
+        return {
+            "name": self.name,
+            "trigger": str(self.trigger),
+            "running": self.running,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_duration_seconds": self.last_duration,
+            "avg_duration_seconds": (
+                round(self.total_duration / self.runs, 4) if self.runs else None
+            ),
+            "max_duration_seconds": round(self.max_duration, 4),
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "skipped": self.skipped,
+            "recent_runs": list(self.history),
+        }
+
+
+class JobScheduler:
+    """Planificateur asyncio des tâches de fond ARIA."""
+
+    HISTORY_SIZE = 20
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        backoff_base_seconds: float = 30.0,
+        backoff_max_seconds: float = 3600.0,
+    ) -> None:
+        """
+        Initialise le planificateur.
+
+        Args:
+            max_concurrency: Tâches exécutées simultanément au maximum
+            backoff_base_seconds: Attente avant le premier nouvel essai
+            backoff_max_seconds: Attente maximale entre deux essais
+        """
+        self.max_concurrency = max_concurrency
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._runner: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = False
+        self.mode: str | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Le planificateur est démarré."""
+        return (
+            self._loop is not None and not self._loop.is_closed() and not self._stopping
+        )
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunction,
+        trigger: Trigger,
+        jitter_seconds: float = 0.0,
+        run_immediately: bool = False,
+    ) -> ScheduledJob:
+        """
+        Enregistre (ou remplace) une tâche.
+
+        Args:
+            name: Identifiant unique de la tâche
+            func: Fonction synchrone ou coroutine sans argument
+            trigger: Déclencheur (intervalle ou cron)
+            jitter_seconds: Gigue aléatoire maximale ajoutée à chaque échéance
+            run_immediately: Exécuter dès le démarrage plutôt qu'à la
+                première échéance
+
+        Returns:
+            Tâche enregistrée
+        """
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                job = self._jobs[name] = ScheduledJob(name, func, trigger)
+            # Une tâche remplacée garde ses statistiques
+            job.func, job.trigger, job.jitter_seconds = func, trigger, jitter_seconds
+            if not job.running:
+                job.next_run = (
+                    datetime.now() if run_immediately else self._next_run(job)
+                )
+        self._notify()
+        logger.info(f"🗓️ Tâche planifiée: {name} ({trigger})")
+        return job
+
+    def remove_job(self, name: str) -> bool:
+        """Retire une tâche (une exécution en cours se termine normalement)."""
+        with self._lock:
+            removed = self._jobs.pop(name, None) is not None
+        if removed:
+            self._notify()
+        return removed
+
+    def get_job(self, name: str) -> ScheduledJob | None:
+        """Tâche enregistrée sous ce nom."""
+        return self._jobs.get(name)
+
+    def get_status(self) -> dict[str, Any]:
+        """Statut du planificateur et de chaque tâche."""
+        with self._lock:
+            jobs = [job.to_dict() for job in self._jobs.values()]
+        return {
+            "running": self.is_running,
+            "mode": self.mode,
+            "max_concurrency": self.max_concurrency,
+            "jobs": sorted(jobs, key=lambda job: job["name"]),
+        }
+
+    def start(self, use_running_loop: bool = False) -> bool:
+        """
+        Démarre le planificateur sur son thread de fond.
+
+        Args:
+            use_running_loop: S'attacher à la boucle en cours (boucle de
+                l'application, qui doit vivre aussi longtemps que les tâches)
+                plutôt que de démarrer un thread
+
+        Returns:
+            True si démarré, False si déjà en cours
+        """
+        if self.is_running:
+            return False
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="aria-job"
+        )
+        try:
+            loop = asyncio.get_running_loop() if use_running_loop else None
+        except RuntimeError:
+            loop = None
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            self.mode = "thread"
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_thread, args=(loop, ready), daemon=True,
+                name="ARIASchedulerThread",
+            )
+            self._thread.start()
+            ready.wait(timeout=5.0)
+        else:
+            self._loop = loop
+            self.mode = "loop"
+            self._runner = loop.create_task(self._run())
+        logger.info(f"✅ Planificateur démarré (mode: {self.mode})")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Arrête le planificateur (les tâches restent enregistrées).
+
+        Returns:
+            True si arrêté, False s'il n'était pas démarré
+        """
+        loop = self._loop
+        if loop is None:
+            return False
+        self._stopping = True
+        if not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._loop = None
+        self._runner = None
+        self.mode = None
+        logger.info("⏹️ Planificateur arrêté")
+        return True
+
+    async def run_now(self, name: str) -> dict[str, Any]:
+        """
+        Exécute une tâche immédiatement, sur la boucle du planificateur
+        s'il tourne dans son propre thread.
+
+        Returns:
+            Statut de la tâche après exécution (``skipped`` incrémenté si
+            elle était déjà en cours)
+        """
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                raise KeyError(name)
+            if job.running:
+                job.skipped += 1
+                return job.to_dict()
+            job.running = True
+        loop = self._loop
+        current = asyncio.get_running_loop()
+        if loop is not None and self.is_running and loop is not current:
+            future = asyncio.run_coroutine_threadsafe(self._execute(job), loop)
+            await asyncio.wrap_future(future)
+        else:
+            await self._execute(job)
+        return job.to_dict()
+
+    # --- Boucle interne -----------------------------------------------------
+
+    def _run_thread(
+        self, loop: asyncio.AbstractEventLoop, ready: threading.Event
+    ) -> None:
+        asyncio.set_event_loop(loop)
+        self._runner = loop.create_task(self._run())
+        loop.call_soon(ready.set)
+        try:
+            loop.run_until_complete(self._runner)
+        finally:
+            loop.close()
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _notify(self) -> None:
+        """Réveille la boucle depuis n'importe quel thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass
+
+    async def _run(self) -> None:
+        """Lance les tâches à échéance puis dort jusqu'à la prochaine."""
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            while not self._stopping:
+                delay = self._launch_due_jobs()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._wakeup = None
+            self._semaphore = None
+
+    def _launch_due_jobs(self) -> float:
+        """
+        Lance les tâches à échéance.
+
+        Returns:
+            Secondes jusqu'à la prochaine échéance (au plus une heure, pour
+            suivre les changements d'heure)
+        """
+        now = datetime.now()
+        with self._lock:
+            due = [
+                job
+                for job in self._jobs.values()
+                if not job.running and job.next_run and job.next_run <= now
+            ]
+            for job in due:
+                job.running = True
+            upcoming = [
+                job.next_run
+                for job in self._jobs.values()
+                if not job.running and job.next_run
+            ]
+        for job in due:
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if not upcoming:
+            return 3600.0
+        return min(3600.0, max(0.0, (min(upcoming) - now).total_seconds()))
+
+    async def _execute(self, job: ScheduledJob) -> None:
+        """Exécute une tâche (déjà marquée en cours) et planifie la suivante."""
+        semaphore = self._semaphore or asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            started = time.perf_counter()
+            job.last_run = datetime.now()
+            try:
+                if inspect.iscoroutinefunction(job.func):
+                    await job.func()
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self._executor, job.func)
+                job.last_status = "success"
+                job.last_error = None
+                job.consecutive_failures = 0
+            except asyncio.CancelledError:
+                job.running = False
+                raise
+            except Exception as e:
+                job.last_status = "error"
+                job.last_error = str(e)
+                job.failures += 1
+                job.consecutive_failures += 1
+                logger.error(f"❌ Tâche {job.name} en échec: {e}")
+            duration = time.perf_counter() - started
+
+        job.runs += 1
+        job.last_duration = round(duration, 4)
+        job.total_duration += duration
+        job.max_duration = max(job.max_duration, duration)
+        job.history = [
+            *job.history[-(self.HISTORY_SIZE - 1) :],
+            {
+                "started_at": job.last_run.isoformat(),
+                "duration_seconds": job.last_duration,
+                "status": job.last_status,
+            },
+        ]
+        job.next_run = self._next_run(job)
+        job.running = False
+        self._notify()
+
+    def _next_run(self, job: ScheduledJob) -> datetime:
+        """Prochaine échéance : attente exponentielle après un échec."""
+        now = datetime.now()
+        if job.consecutive_failures:
+            delay = min(
+                self.backoff_base_seconds * 2 ** (job.consecutive_failures - 1),
+                self.backoff_max_seconds,
+            )
+            return now + timedelta(seconds=delay)
+        next_run = job.trigger.next_run(now)
+        if job.jitter_seconds:
+            next_run += timedelta(
+                seconds=random.uniform(0, job.jitter_seconds)  # nosec B311
+            )
+        return next_run
+
+
+# Instance globale (singleton)
+_scheduler: JobScheduler | None = None
+
+
+def get_scheduler() -> JobScheduler:
+    """Récupère ou crée le planificateur global."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler()
+    return _scheduler
@@ -8,14 +8,18 @@ API FastAPI pour les connecteurs santé permettant :
 - Gestion des connecteurs et statuts
 """
 
+import asyncio
+import uuid
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, FastAPI, HTTPException, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 
 from core import BaseAPI, get_logger
 
+from .bulk_import import run_import
 from .config import HealthConnectorConfig
 from .data_models import (
     ActivityData,
@@ -24,10 +28,14 @@ from .data_models import (
     SleepData,
     StressData,
 )
+from .merge import MERGED_KINDS
+from .rollups import RESOLUTIONS
 from .sync_manager import HealthSyncManager
 
 logger = get_logger("health_connectors")
 
+RESOLUTION_PATTERN = f"^({'|'.join(RESOLUTIONS)})$"
+
 
 class SyncRequest(BaseModel):
     """Requête de synchronisation."""
@@ -38,6 +46,24 @@ class SyncRequest(BaseModel):
     connector_name: str | None = Field(
         None, description="Connecteur spécifique (optionnel)"
     )
+    full_resync: bool = Field(
+        False, description="Ignorer les repères et resynchroniser toute la fenêtre"
+    )
+
+
+class ImportRequest(BaseModel):
+    """Requête d'import d'un export santé."""
+
+    path: str = Field(
+        ...,
+        description=(
+            "Dossier Google Takeout / Samsung Health ou export.xml Apple Santé, "
+            "relatif au dossier d'import configuré (import_root)"
+        ),
+    )
+    workers: int | None = Field(
+        None, ge=1, le=32, description="Processus d'analyse (nb de CPU par défaut)"
+    )
 
 
 class SyncResponse(BaseModel):
@@ -60,19 +86,83 @@ class HealthConnectorsAPI(BaseAPI):
     - POST /health/samsung/sync : Synchronisation Samsung Health
     - POST /health/google/sync : Synchronisation Google Fit
     - POST /health/ios/sync : Synchronisation iOS Health
+    - POST /health/sync/all : Synchronisation de tous les connecteurs
+    - GET /health/sync/watermarks : Repères de synchronisation incrémentale
+    - POST /health/import : Import d'un export santé (tâche de fond)
+    - GET /health/import/{job_id} : Avancement d'un import
     - GET /health/data/activity : Données d'activité unifiées
     - GET /health/data/sleep : Données de sommeil unifiées
     - GET /health/data/stress : Données de stress unifiées
     - GET /health/data/health : Données de santé unifiées
+    - GET /health/data/provenance : Provenance des enregistrements fusionnés
     - GET /health/metrics/unified : Métriques unifiées pour dashboard
+
+    Un seul import s'exécute à la fois, sur un chemin situé sous
+    ``import_root`` ; le suivi des imports terminés est conservé
+    ``import_job_ttl_hours`` heures.
+
+    Les endpoints ``/health/data/*`` acceptent ``resolution`` (raw par défaut,
+    5min, hour, day ou auto) : hors raw, ils renvoient des points agrégés et
+    le niveau retenu dans l'en-tête ``X-Resolution``.
     """
 
     def __init__(self) -> None:
         """Initialise l'API des connecteurs santé."""
         super().__init__("/health", ["Health Connectors"])
         self.sync_manager = HealthSyncManager()
+        self.import_jobs: dict[str, dict[str, Any]] = {}
+        self._import_tasks: set[asyncio.Task] = set()
         self._setup_routes()
 
+    def _downsampled(
+        self,
+        kind: str,
+        days_back: int,
+        sources: list[str] | None,
+        resolution: str,
+        response: Response,
+    ) -> list[dict[str, Any]]:
+        """Points agrégés d'un type, niveau retenu dans ``X-Resolution``."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        tier, points = self.sync_manager.store.rollups(
+            kind, start_date, end_date, resolution, sources
+        )
+        response.headers["X-Resolution"] = tier
+        return points
+
+    def _resolve_import_path(self, path: str) -> Path:
+        """
+        Résout le chemin d'un export sous le dossier d'import configuré.
+
+        Raises:
+            HTTPException: 403 hors du dossier d'import, 400 si introuvable
+        """
+        root = Path(self.sync_manager.config.import_root).resolve()
+        resolved = (root / path).resolve()
+        if not resolved.is_relative_to(root):
+            logger.warning(f"⚠️ Import refusé hors de {root}: {path}")
+            raise HTTPException(
+                status_code=403, detail="Chemin hors du dossier d'import autorisé"
+            )
+        if not resolved.exists():
+            raise HTTPException(status_code=400, detail=f"Export introuvable: {path}")
+        return resolved
+
+    def _evict_import_jobs(self) -> None:
+        """Oublie les imports terminés depuis plus de ``import_job_ttl_hours``."""
+        cutoff = (
+            datetime.now()
+            - timedelta(hours=self.sync_manager.config.import_job_ttl_hours)
+        ).isoformat()
+        expired = [
+            job_id
+            for job_id, job in self.import_jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self.import_jobs[job_id]
+
     def _setup_routes(self) -> None:
         """Configure les routes de l'API."""
 
@@ -94,7 +184,7 @@ class HealthConnectorsAPI(BaseAPI):
             """Synchronise les données Samsung Health."""
             try:
                 sync_summary = await self.sync_manager.sync_single_connector(
-                    "samsung_health", request.days_back
+                    "samsung_health", request.days_back, request.full_resync
                 )
 
                 if sync_summary["status"] == "success":
@@ -121,7 +211,7 @@ class HealthConnectorsAPI(BaseAPI):
             """Synchronise les données Google Fit."""
             try:
                 sync_summary = await self.sync_manager.sync_single_connector(
-                    "google_fit", request.days_back
+                    "google_fit", request.days_back, request.full_resync
                 )
 
                 if sync_summary["status"] == "success":
@@ -148,7 +238,7 @@ class HealthConnectorsAPI(BaseAPI):
             """Synchronise les données iOS Health."""
             try:
                 sync_summary = await self.sync_manager.sync_single_connector(
-                    "ios_health", request.days_back
+                    "ios_health", request.days_back, request.full_resync
                 )
 
                 if sync_summary["status"] == "success":
@@ -175,7 +265,7 @@ class HealthConnectorsAPI(BaseAPI):
             """Synchronise tous les connecteurs santé."""
             try:
                 sync_summary = await self.sync_manager.sync_all_connectors(
-                    request.days_back
+                    request.days_back, request.full_resync
                 )
 
                 if sync_summary["status"] in ["success", "partial_success"]:
@@ -197,19 +287,106 @@ class HealthConnectorsAPI(BaseAPI):
                     status_code=500, detail=f"Erreur synchronisation: {str(e)}"
                 ) from e
 
-        @self.router.get("/data/activity", response_model=list[ActivityData])
+        @self.router.get("/sync/watermarks", response_model=list[dict[str, Any]])
+        async def get_sync_watermarks():
+            """Retourne les repères de synchronisation incrémentale."""
+            try:
+                return self.sync_manager.watermarks.list_all()
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500, detail=f"Erreur repères de synchronisation: {str(e)}"
+                ) from e
+
+        @self.router.post("/import", response_model=dict[str, Any])
+        async def start_import(request: ImportRequest):
+            """Lance l'import d'un export santé en tâche de fond."""
+            self._evict_import_jobs()
+            path = self._resolve_import_path(request.path)
+            # Chaque import occupe un pool de processus : un seul à la fois
+            running = [
+                job_id
+                for job_id, job in self.import_jobs.items()
+                if job["status"] == "running"
+            ]
+            if running:
+                raise HTTPException(
+                    status_code=409, detail=f"Import déjà en cours: {running[0]}"
+                )
+            job_id = uuid.uuid4().hex[:12]
+            job: dict[str, Any] = {
+                "job_id": job_id,
+                "path": str(path),
+                "status": "running",
+                "progress": {},
+                "summary": None,
+                "error": None,
+                "started_at": datetime.now().isoformat(),
+                "finished_at": None,
+            }
+            self.import_jobs[job_id] = job
+
+            def update_progress(progress: dict[str, Any]) -> None:
+                job["progress"] = progress
+
+            async def run() -> None:
+                try:
+                    job["summary"] = await asyncio.to_thread(
+                        run_import,
+                        path,
+                        max_workers=request.workers,
+                        progress=update_progress,
+                        store=self.sync_manager.store,
+                    )
+                    job["status"] = "completed"
+                except Exception as e:
+                    logger.error(f"❌ Erreur import {path}: {e}")
+                    job["status"] = "error"
+                    job["error"] = str(e)
+                finally:
+                    job["finished_at"] = datetime.now().isoformat()
+
+            task = asyncio.create_task(run())
+            self._import_tasks.add(task)
+            task.add_done_callback(self._import_tasks.discard)
+            return job
+
+        @self.router.get("/import/{job_id}", response_model=dict[str, Any])
+        async def get_import_status(job_id: str):
+            """Retourne l'avancement d'un import."""
+            self._evict_import_jobs()
+            job = self.import_jobs.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Import introuvable")
+            return job
+
+        @self.router.get(
+            "/data/activity", response_model=list[ActivityData] | list[dict[str, Any]]
+        )
         async def get_unified_activity_data(
+            response: Response,
             days_back: int = Query(
                 30, ge=1, le=365, description="Nombre de jours à récupérer"
-            )
+            ),
+            sources: list[str] | None = Query(
+                None, description="Sources à inclure (toutes par défaut)"
+            ),
+            resolution: str = Query(
+                "raw",
+                pattern=RESOLUTION_PATTERN,
+                description="raw, 5min, hour, day ou auto (niveau le plus fin borné)",
+            ),
         ):
-            """Retourne les données d'activité unifiées."""
+            """Retourne les données d'activité unifiées (données stockées)."""
             try:
+                if resolution != "raw":
+                    return self._downsampled(
+                        "activity", days_back, sources, resolution, response
+                    )
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=days_back)
 
                 activity_data = await self.sync_manager.get_unified_activity_data(
-                    start_date, end_date
+                    start_date, end_date, sources
                 )
                 return activity_data
             except Exception as e:
@@ -217,19 +394,34 @@ class HealthConnectorsAPI(BaseAPI):
                     status_code=500, detail=f"Erreur données activité: {str(e)}"
                 ) from e
 
-        @self.router.get("/data/sleep", response_model=list[SleepData])
+        @self.router.get(
+            "/data/sleep", response_model=list[SleepData] | list[dict[str, Any]]
+        )
         async def get_unified_sleep_data(
+            response: Response,
             days_back: int = Query(
                 30, ge=1, le=365, description="Nombre de jours à récupérer"
-            )
+            ),
+            sources: list[str] | None = Query(
+                None, description="Sources à inclure (toutes par défaut)"
+            ),
+            resolution: str = Query(
+                "raw",
+                pattern=RESOLUTION_PATTERN,
+                description="raw, 5min, hour, day ou auto (niveau le plus fin borné)",
+            ),
         ):
-            """Retourne les données de sommeil unifiées."""
+            """Retourne les données de sommeil unifiées (données stockées)."""
             try:
+                if resolution != "raw":
+                    return self._downsampled(
+                        "sleep", days_back, sources, resolution, response
+                    )
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=days_back)
 
                 sleep_data = await self.sync_manager.get_unified_sleep_data(
-                    start_date, end_date
+                    start_date, end_date, sources
                 )
                 return sleep_data
             except Exception as e:
@@ -237,19 +429,34 @@ class HealthConnectorsAPI(BaseAPI):
                     status_code=500, detail=f"Erreur données sommeil: {str(e)}"
                 ) from e
 
-        @self.router.get("/data/stress", response_model=list[StressData])
+        @self.router.get(
+            "/data/stress", response_model=list[StressData] | list[dict[str, Any]]
+        )
         async def get_unified_stress_data(
+            response: Response,
             days_back: int = Query(
                 30, ge=1, le=365, description="Nombre de jours à récupérer"
-            )
+            ),
+            sources: list[str] | None = Query(
+                None, description="Sources à inclure (toutes par défaut)"
+            ),
+            resolution: str = Query(
+                "raw",
+                pattern=RESOLUTION_PATTERN,
+                description="raw, 5min, hour, day ou auto (niveau le plus fin borné)",
+            ),
         ):
-            """Retourne les données de stress unifiées."""
+            """Retourne les données de stress unifiées (données stockées)."""
             try:
+                if resolution != "raw":
+                    return self._downsampled(
+                        "stress", days_back, sources, resolution, response
+                    )
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=days_back)
 
                 stress_data = await self.sync_manager.get_unified_stress_data(
-                    start_date, end_date
+                    start_date, end_date, sources
                 )
                 return stress_data
             except Exception as e:
@@ -257,45 +464,75 @@ class HealthConnectorsAPI(BaseAPI):
                     status_code=500, detail=f"Erreur données stress: {str(e)}"
                 ) from e
 
-        @self.router.get("/data/health", response_model=list[HealthData])
+        @self.router.get(
+            "/data/health", response_model=list[HealthData] | list[dict[str, Any]]
+        )
         async def get_unified_health_data(
+            response: Response,
             days_back: int = Query(
                 30, ge=1, le=365, description="Nombre de jours à récupérer"
-            )
+            ),
+            sources: list[str] | None = Query(
+                None, description="Sources à inclure (toutes par défaut)"
+            ),
+            resolution: str = Query(
+                "raw",
+                pattern=RESOLUTION_PATTERN,
+                description="raw, 5min, hour, day ou auto (niveau le plus fin borné)",
+            ),
         ):
-            """Retourne les données de santé unifiées."""
+            """Retourne les données de santé unifiées (données stockées)."""
             try:
+                if resolution != "raw":
+                    return self._downsampled(
+                        "health", days_back, sources, resolution, response
+                    )
                 end_date = datetime.now()
                 start_date = end_date - timedelta(days=days_back)
 
-                health_data = []
-                for connector in self.sync_manager.connectors.values():
-                    try:
-                        connector_data = await connector.get_health_data(
-                            start_date, end_date
-                        )
-                        health_data.extend(connector_data)
-                    except Exception as e:
-                        connector.sync_errors.append(f"Erreur données santé: {str(e)}")
-
-                # Trier par timestamp
-                health_data.sort(key=lambda x: x.timestamp)
+                health_data = await self.sync_manager.get_unified_health_data(
+                    start_date, end_date, sources
+                )
                 return health_data
             except Exception as e:
                 raise HTTPException(
                     status_code=500, detail=f"Erreur données santé: {str(e)}"
                 ) from e
 
+        @self.router.get("/data/provenance", response_model=list[dict[str, Any]])
+        async def get_merge_provenance(
+            kind: str = Query(..., description="Type de données (sleep, activity)"),
+            days_back: int = Query(
+                30, ge=1, le=365, description="Nombre de jours à récupérer"
+            ),
+        ):
+            """Retourne la provenance des enregistrements fusionnés entre sources."""
+            if kind not in MERGED_KINDS:
+                raise HTTPException(
+                    status_code=400, detail=f"Type non fusionné: {kind}"
+                )
+            try:
+                end_date = datetime.now()
+                start_date = end_date - timedelta(days=days_back)
+                return self.sync_manager.store.provenance(kind, start_date, end_date)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500, detail=f"Erreur provenance: {str(e)}"
+                ) from e
+
         @self.router.get("/metrics/unified", response_model=dict[str, Any])
         async def get_unified_metrics(
             days_back: int = Query(
                 30, ge=1, le=365, description="Nombre de jours à analyser"
-            )
+            ),
+            sources: list[str] | None = Query(
+                None, description="Sources à inclure (toutes par défaut)"
+            ),
         ):
             """Retourne les métriques unifiées pour le dashboard."""
             try:
-                unified_metrics = await self.sync_manager._generate_unified_metrics(
-                    days_back
+                unified_metrics = await self.sync_manager.compute_unified_metrics(
+                    days_back, sources
                 )
                 return unified_metrics
             except Exception as e:
@@ -0,0 +1,406 @@
+"""
+ARKALIA ARIA - Import d'un export Apple Santé (export.xml)
+==========================================================
+
+Import hors ligne du fichier ``export.xml`` produit par l'app Santé
+(plusieurs Go pour quelques années de données) :
+
+- lecture en flux (``iterparse``) avec libération des éléments traités :
+  la mémoire ne dépend pas de la taille du fichier ;
+- agrégation par jour des enregistrements ``HKQuantityType`` (pas, distance,
+  énergie, exercice, fréquence cardiaque, mesures corporelles) et par nuit
+  des ``HKCategoryTypeIdentifierSleepAnalysis`` ;
+- écriture par lots dans ``HealthDataStore`` ;
+- reprise : l'état de l'import est enregistré régulièrement et un import
+  interrompu reprend après le dernier point de reprise.
+
+L'export regroupe les enregistrements par type et non par date : une journée
+n'est complète qu'en fin de fichier, d'où l'agrégation en mémoire (taille
+proportionnelle au nombre de jours, pas au nombre d'enregistrements). Quand
+plusieurs appareils (iPhone, Apple Watch…) mesurent la même grandeur, seul
+l'appareil avec le total le plus élevé est retenu pour ne pas compter deux
+fois les mêmes pas.
+"""
+
+import json
+import xml.etree.ElementTree as ET  # nosec B405 - fichier local exporté par l'utilisateur
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from core import get_logger
+
+from .data_models import ActivityData, HealthData, SleepData
+from .health_store import HealthDataStore
+
+logger = get_logger("health_connectors")
+
+SLEEP_TYPE = "HKCategoryTypeIdentifierSleepAnalysis"
+
+# Type HealthKit -> (type de données, champ, agrégation journalière)
+QUANTITY_TYPES: dict[str, tuple[str, str, str]] = {
+    "HKQuantityTypeIdentifierStepCount": ("activity", "steps", "sum"),
+    "HKQuantityTypeIdentifierDistanceWalkingRunning": (
+        "activity",
+        "distance_meters",
+        "sum",
+    ),
+    "HKQuantityTypeIdentifierActiveEnergyBurned": ("activity", "calories_burned", "sum"),
+    "HKQuantityTypeIdentifierAppleExerciseTime": ("activity", "active_minutes", "sum"),
+    "HKQuantityTypeIdentifierHeartRate": ("activity", "heart_rate_bpm", "mean"),
+    "HKQuantityTypeIdentifierBodyMass": ("health", "weight_kg", "last"),
+    "HKQuantityTypeIdentifierHeight": ("health", "height_cm", "last"),
+    "HKQuantityTypeIdentifierBodyMassIndex": ("health", "bmi", "last"),
+    "HKQuantityTypeIdentifierBloodPressureSystolic": (
+        "health",
+        "blood_pressure_systolic",
+        "last",
+    ),
+    "HKQuantityTypeIdentifierBloodPressureDiastolic": (
+        "health",
+        "blood_pressure_diastolic",
+        "last",
+    ),
+    "HKQuantityTypeIdentifierBloodGlucose": ("health", "blood_glucose", "last"),
+    "HKQuantityTypeIdentifierBodyTemperature": ("health", "body_temperature", "last"),
+}
+
+# Facteurs de conversion vers l'unité des modèles unifiés, par champ
+UNIT_FACTORS: dict[str, dict[str, float]] = {
+    "distance_meters": {"m": 1.0, "km": 1000.0, "mi": 1609.344, "ft": 0.3048},
+    "calories_burned": {"kcal": 1.0, "Cal": 1.0, "kJ": 0.239006},
+    "weight_kg": {"kg": 1.0, "g": 0.001, "lb": 0.45359237, "st": 6.35029318},
+    "height_cm": {"cm": 1.0, "m": 100.0, "in": 2.54, "ft": 30.48},
+    "bmi": {"count": 1.0},
+    "blood_glucose": {"mmol/L": 1.0, "mg/dL": 1 / 18.0156},
+}
+
+# Phases de sommeil HealthKit -> champ du modèle (None : durée sans phase)
+SLEEP_STAGES: dict[str, str | None] = {
+    "HKCategoryValueSleepAnalysisAsleep": None,
+    "HKCategoryValueSleepAnalysisAsleepUnspecified": None,
+    "HKCategoryValueSleepAnalysisAsleepCore": "light",
+    "HKCategoryValueSleepAnalysisAsleepDeep": "deep",
+    "HKCategoryValueSleepAnalysisAsleepREM": "rem",
+}
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def _local_time(value: str) -> datetime:
+    """Horodatage HealthKit (``2024-01-01 08:00:00 +0100``) en heure locale de mesure."""
+    return datetime.fromisoformat(value[:19])
+
+
+def _convert(field: str, unit: str, value: float) -> float | None:
+    """Convertit une valeur dans l'unité du modèle (None si unité inconnue)."""
+    if field == "body_temperature":
+        return (value - 32) / 1.8 if unit == "degF" else value
+    factors = UNIT_FACTORS.get(field)
+    if factors is None:
+        return value
+    if field == "blood_glucose" and unit.startswith("mmol"):
+        unit = "mmol/L"
+    factor = factors.get(unit)
+    return value * factor if factor is not None else None
+
+
+class AppleHealthImporter:
+    """Importe un fichier ``export.xml`` Apple Santé dans le stockage santé."""
+
+    def __init__(
+        self,
+        db_path: str = "aria_pain.db",
+        store: HealthDataStore | None = None,
+        batch_size: int = 1000,
+        checkpoint_every: int = 200_000,
+        source: str = "ios_health",
+    ) -> None:
+        """
+        Initialise l'importeur.
+
+        Args:
+            db_path: Base ARIA cible
+            store: Stockage cible (celui de ``db_path`` si None), dont la base
+                conserve aussi les points de reprise
+            batch_size: Enregistrements par lot d'écriture
+            checkpoint_every: Enregistrements lus entre deux points de reprise
+            source: Source attribuée aux données importées
+        """
+        self.store = store or HealthDataStore(db_path)
+        self.db = self.store.db
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.source = source
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS health_import_checkpoints (
+                path TEXT PRIMARY KEY,
+                file_size INTEGER NOT NULL,
+                records INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """)
+
+    def import_file(
+        self,
+        path: str | Path,
+        progress: ProgressCallback | None = None,
+        resume: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Importe un export Apple Santé.
+
+        Args:
+            path: Chemin de ``export.xml``
+            progress: Appelée à chaque point de reprise avec l'avancement
+            resume: Reprendre après le dernier point de reprise s'il existe
+
+        Returns:
+            Résumé (enregistrements lus, point de reprise, écrits par type)
+        """
+        path = Path(path).resolve()
+        total_bytes = path.stat().st_size
+        state, skip = self._load_checkpoint(path, total_bytes) if resume else (None, 0)
+        state = state or {"activity": {}, "health": {}, "sleep": {}}
+        if skip:
+            logger.info(f"⏩ Reprise de l'import {path.name} après {skip} enregistrements")
+
+        records = 0
+        with path.open("rb") as handle:
+            context = ET.iterparse(handle, events=("start", "end"))  # nosec B314
+            _, root = next(context)
+            for event, elem in context:
+                if event != "end" or elem.tag != "Record":
+                    continue
+                records += 1
+                if records > skip:
+                    self._accumulate(state, elem)
+                elem.clear()
+                if records % self.checkpoint_every == 0:
+                    # Libère les enregistrements déjà traités sous la racine
+                    root.clear()
+                    if records > skip:
+                        self._save_checkpoint(path, total_bytes, records, state)
+                    if progress:
+                        progress(
+                            {
+                                "records": records,
+                                "bytes_read": handle.tell(),
+                                "total_bytes": total_bytes,
+                            }
+                        )
+
+        if progress:
+            progress(
+                {"records": records, "bytes_read": total_bytes, "total_bytes": total_bytes}
+            )
+        written = self._write(state)
+        self.db.execute_update(
+            "DELETE FROM health_import_checkpoints WHERE path = ?", (str(path),)
+        )
+        logger.info(f"✅ Import Apple Santé terminé: {records} enregistrements, {written}")
+        return {
+            "file": str(path),
+            "records": records,
+            "resumed_from": skip,
+            "written": written,
+        }
+
+    def _accumulate(self, state: dict[str, Any], elem: ET.Element) -> None:
+        """Ajoute un enregistrement aux agrégats journaliers."""
+        record_type = elem.get("type")
+        if record_type == SLEEP_TYPE:
+            self._accumulate_sleep(state["sleep"], elem)
+            return
+        mapping = QUANTITY_TYPES.get(record_type or "")
+        if mapping is None:
+            return
+        kind, field, aggregation = mapping
+        try:
+            value = _convert(field, elem.get("unit", ""), float(elem.get("value", "")))
+        except ValueError:
+            return
+        if value is None:
+            return
+        start = elem.get("startDate", "")
+        day = start[:10]
+        device = elem.get("sourceName", "")
+
+        if kind == "health":
+            latest = state["health"].setdefault(day, {}).get(field)
+            if latest is None or start >= latest[0]:
+                state["health"][day][field] = [start, value]
+            return
+        totals = state["activity"].setdefault(day, {}).setdefault(field, {})
+        if aggregation == "mean":
+            current = totals.setdefault("", [0.0, 0])
+            current[0] += value
+            current[1] += 1
+        else:
+            totals[device] = totals.get(device, 0.0) + value
+
+    @staticmethod
+    def _accumulate_sleep(nights: dict[str, Any], elem: ET.Element) -> None:
+        """Ajoute une phase de sommeil à la nuit correspondante."""
+        value = elem.get("value", "")
+        try:
+            start = _local_time(elem.get("startDate", ""))
+            end = _local_time(elem.get("endDate", ""))
+        except ValueError:
+            return
+        if end <= start:
+            return
+        # Une nuit commencée avant midi appartient à la veille
+        night = (start - timedelta(hours=12)).date().isoformat()
+        session = nights.setdefault(night, {}).setdefault(
+            elem.get("sourceName", ""),
+            {
+                "asleep": 0.0,
+                "in_bed": 0.0,
+                "deep": 0.0,
+                "light": 0.0,
+                "rem": 0.0,
+                "awake": 0,
+                "asleep_bounds": None,
+                "in_bed_bounds": None,
+            },
+        )
+        minutes = (end - start).total_seconds() / 60
+        if value == "HKCategoryValueSleepAnalysisAwake":
+            session["awake"] += 1
+            return
+        if value == "HKCategoryValueSleepAnalysisInBed":
+            phase = "in_bed"
+        elif value in SLEEP_STAGES:
+            phase = "asleep"
+            stage = SLEEP_STAGES[value]
+            if stage:
+                session[stage] += minutes
+        else:
+            return
+        session[phase] += minutes
+        bounds = session[f"{phase}_bounds"]
+        session[f"{phase}_bounds"] = [
+            min(bounds[0], start.isoformat()) if bounds else start.isoformat(),
+            max(bounds[1], end.isoformat()) if bounds else end.isoformat(),
+        ]
+
+    def _build_records(self, state: dict[str, Any]) -> dict[str, list[Any]]:
+        """Construit les modèles unifiés depuis les agrégats."""
+        built: dict[str, list[Any]] = {"activity": [], "health": [], "sleep": []}
+        raw = {"origin": "apple_health_export"}
+
+        for day, fields in sorted(state["activity"].items()):
+            values: dict[str, Any] = {}
+            for field, totals in fields.items():
+                if field == "heart_rate_bpm":
+                    total, count = totals[""]
+                    values[field] = round(total / count)
+                else:
+                    best = max(totals.values())
+                    integer = field in ("steps", "active_minutes")
+                    values[field] = round(best) if integer else round(best, 1)
+            built["activity"].append(
+                self._validate(
+                    ActivityData,
+                    timestamp=datetime.fromisoformat(day),
+                    **values,
+                    source=self.source,
+                    raw_data=raw,
+                )
+            )
+
+        for _day, fields in sorted(state["health"].items()):
+            values = {
+                field: round(value) if field.startswith("blood_pressure") else round(value, 2)
+                for field, (_, value) in fields.items()
+            }
+            latest = max(moment for moment, _ in fields.values())
+            built["health"].append(
+                self._validate(
+                    HealthData,
+                    timestamp=_local_time(latest),
+                    **values,
+                    source=self.source,
+                    raw_data=raw,
+                )
+            )
+
+        for _night, devices in sorted(state["sleep"].items()):
+            session = max(devices.values(), key=lambda s: (s["asleep"], s["in_bed"]))
+            # Sans phases de sommeil (anciens iPhone), la durée au lit est retenue
+            phase = "asleep" if session["asleep"] > 0 else "in_bed"
+            if not session[phase] or session[f"{phase}_bounds"] is None:
+                continue
+            start, end = session[f"{phase}_bounds"]
+            stages = {
+                f"{stage}_sleep_minutes": round(session[stage])
+                for stage in ("deep", "light", "rem")
+                if session[stage]
+            }
+            built["sleep"].append(
+                self._validate(
+                    SleepData,
+                    sleep_start=datetime.fromisoformat(start),
+                    sleep_end=datetime.fromisoformat(end),
+                    duration_minutes=round(session[phase]),
+                    awakenings_count=session["awake"],
+                    **stages,
+                    source=self.source,
+                    raw_data=raw,
+                )
+            )
+        return {kind: [r for r in records if r] for kind, records in built.items()}
+
+    @staticmethod
+    def _validate(model: type[Any], **values: Any) -> Any:
+        """Construit un modèle, ou None si une valeur est hors bornes."""
+        try:
+            return model(**values)
+        except ValidationError as e:
+            logger.warning(f"⚠️ Agrégat Apple Santé ignoré ({model.__name__}): {e}")
+            return None
+
+    def _write(self, state: dict[str, Any]) -> dict[str, int]:
+        """Écrit les agrégats dans le stockage, par lots."""
+        written: dict[str, int] = {}
+        for kind, records in self._build_records(state).items():
+            for i in range(0, len(records), self.batch_size):
+                self.store.upsert(kind, records[i : i + self.batch_size])
+            written[kind] = len(records)
+        return written
+
+    def _load_checkpoint(
+        self, path: Path, file_size: int
+    ) -> tuple[dict[str, Any] | None, int]:
+        """Dernier point de reprise du fichier (ignoré si le fichier a changé)."""
+        rows = self.db.execute_query(
+            "SELECT file_size, records, state FROM health_import_checkpoints WHERE path = ?",
+            (str(path),),
+        )
+        if not rows or rows[0]["file_size"] != file_size:
+            return None, 0
+        return json.loads(rows[0]["state"]), rows[0]["records"]
+
+    def _save_checkpoint(
+        self, path: Path, file_size: int, records: int, state: dict[str, Any]
+    ) -> None:
+        """Enregistre l'avancement et les agrégats en cours."""
+        self.db.execute_update(
+            """
+            INSERT OR REPLACE INTO health_import_checkpoints
+                (path, file_size, records, state, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                str(path),
+                file_size,
+                records,
+                json.dumps(state, separators=(",", ":")),
+                datetime.now().isoformat(),
+            ),
+        )
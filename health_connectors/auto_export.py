@@ -3,18 +3,63 @@ ARKALIA ARIA - Export Automatique
 =================================
 
 Gère les exports automatiques périodiques (hebdomadaires/mensuels).
+
+Les exports sont lus directement dans le stockage santé : agrégats
+quotidiens calculés par SQLite, puis enregistrements bruts lus par lots et
+écrits au fil de l'eau (JSON stocké recopié tel quel), éventuellement
+compressés en gzip. La mémoire utilisée ne dépend pas de la taille de la
+période exportée.
 """
 
+import csv
+import gzip
 import json
-import threading
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from core import get_logger
 
+from .health_store import HealthDataStore
+
 logger = get_logger("auto_export")
 
+# Types exportés : (libellé de section CSV, colonnes CSV -> champ du modèle)
+EXPORT_SECTIONS: dict[str, tuple[str, dict[str, str]]] = {
+    "activity": (
+        "ACTIVITÉ",
+        {
+            "timestamp": "timestamp",
+            "steps": "steps",
+            "heart_rate": "heart_rate_bpm",
+            "calories": "calories_burned",
+            "distance": "distance_meters",
+            "source": "source",
+        },
+    ),
+    "sleep": (
+        "SOMMEIL",
+        {
+            "sleep_start": "sleep_start",
+            "sleep_end": "sleep_end",
+            "duration_minutes": "duration_minutes",
+            "quality_score": "quality_score",
+            "source": "source",
+        },
+    ),
+    "stress": (
+        "STRESS",
+        {
+            "timestamp": "timestamp",
+            "stress_level": "stress_level",
+            "heart_rate_variability": "heart_rate_variability",
+            "source": "source",
+        },
+    ),
+}
+ROLLUP_STATS = ("count", "sum", "mean", "min", "max")
+
 
 class AutoExporter:
     """
@@ -27,12 +72,19 @@ class AutoExporter:
     - Stockage organisé des exports
     """
 
+    # Période -> (nombre de jours, libellé)
+    EXPORT_PERIODS = {"weekly": (7, "hebdomadaire"), "monthly": (30, "mensuel")}
+    JOB_NAMES = {"weekly": "auto_export_weekly", "monthly": "auto_export_monthly"}
+
     def __init__(
         self,
         export_dir: Path | str = "exports",
         weekly_enabled: bool = True,
         monthly_enabled: bool = True,
         export_formats: list[str] | None = None,
+        compress: bool = False,
+        db_path: str = "aria_pain.db",
+        batch_size: int = 1000,
     ) -> None:
         """
         Initialise l'exporteur automatique.
@@ -42,50 +94,67 @@ class AutoExporter:
             weekly_enabled: Activer export hebdomadaire
             monthly_enabled: Activer export mensuel
             export_formats: Formats à exporter (csv, pdf, json). Par défaut: ["csv", "pdf"]
+            compress: Compresser les exports en gzip (``.gz``)
+            db_path: Base de données contenant le stockage santé
+            batch_size: Enregistrements lus par requête lors de l'export
         """
         self.export_dir = Path(export_dir)
         self.export_dir.mkdir(exist_ok=True)
         self.weekly_enabled = weekly_enabled
         self.monthly_enabled = monthly_enabled
         self.export_formats = export_formats or ["csv", "pdf"]
+        self.compress = compress
+        self.db_path = db_path
+        self.batch_size = batch_size
         self.is_running = False
-        self.weekly_thread: threading.Thread | None = None
-        self.monthly_thread: threading.Thread | None = None
+        self._store: HealthDataStore | None = None
+
+    @property
+    def store(self) -> HealthDataStore:
+        """Stockage santé (ouvert au premier export)."""
+        if self._store is None:
+            self._store = HealthDataStore(self.db_path)
+        return self._store
 
     def start_auto_exports(self) -> bool:
         """
         Démarre les exports automatiques (hebdomadaire et mensuel).
 
+        Les exports sont des tâches du planificateur commun
+        (``auto_export_weekly`` et ``auto_export_monthly``).
+
         Returns:
             True si démarré avec succès
         """
+        from core.scheduler import IntervalTrigger, get_scheduler
+
         if self.is_running:
             logger.warning("Exports automatiques déjà en cours")
             return False
 
         self.is_running = True
         started = False
-
-        # Démarrer export hebdomadaire
-        if self.weekly_enabled:
-            self.weekly_thread = threading.Thread(
-                target=self._weekly_export_loop, daemon=True, name="WeeklyExportThread"
+        scheduler = get_scheduler()
+
+        for period, enabled in (
+            ("weekly", self.weekly_enabled),
+            ("monthly", self.monthly_enabled),
+        ):
+            if not enabled:
+                continue
+            days, label = self.EXPORT_PERIODS[period]
+            scheduler.add_job(
+                self.JOB_NAMES[period],
+                partial(self._export_job, period),
+                IntervalTrigger(days * 24 * 3600),
+                jitter_seconds=600.0,
+                run_immediately=True,
             )
-            self.weekly_thread.start()
-            logger.info("✅ Export hebdomadaire automatique démarré")
-            started = True
-
-        # Démarrer export mensuel
-        if self.monthly_enabled:
-            self.monthly_thread = threading.Thread(
-                target=self._monthly_export_loop,
-                daemon=True,
-                name="MonthlyExportThread",
-            )
-            self.monthly_thread.start()
-            logger.info("✅ Export mensuel automatique démarré")
+            logger.info(f"✅ Export {label} automatique démarré")
             started = True
 
+        if started:
+            scheduler.start()
         return started
 
     def stop_auto_exports(self) -> bool:
@@ -95,18 +164,15 @@ class AutoExporter:
         Returns:
             True si arrêté avec succès
         """
+        from core.scheduler import get_scheduler
+
         if not self.is_running:
             return False
 
         self.is_running = False
-
-        # Arrêter export hebdomadaire
-        if self.weekly_thread and self.weekly_thread.is_alive():
-            self.weekly_thread.join(timeout=5.0)
-
-        # Arrêter export mensuel
-        if self.monthly_thread and self.monthly_thread.is_alive():
-            self.monthly_thread.join(timeout=5.0)
+        scheduler = get_scheduler()
+        for job_name in self.JOB_NAMES.values():
+            scheduler.remove_job(job_name)
 
         logger.info("⏹️ Exports automatiques arrêtés")
         return True
@@ -120,400 +186,239 @@ class AutoExporter:
         """Arrête l'export automatique (méthode legacy)."""
         return self.stop_auto_exports()
 
-    def _weekly_export_loop(self) -> None:
-        """Boucle pour exporter hebdomadairement."""
-        logger.info("🔄 Boucle export hebdomadaire démarrée")
-
-        while self.is_running and self.weekly_enabled:
-            try:
-                # Exporter dans tous les formats configurés
-                for format_type in self.export_formats:
-                    try:
-                        self.export_weekly_data(format=format_type)
-                    except Exception as e:
-                        logger.warning(
-                            f"⚠️ Erreur export hebdomadaire {format_type}: {e}"
-                        )
-
-                # Attendre 7 jours
-                wait_event = threading.Event()
-                wait_seconds = 7 * 24 * 3600  # 7 jours
-                remaining_seconds = wait_seconds
-                while remaining_seconds > 0 and self.is_running:
-                    wait_time = min(
-                        3600, remaining_seconds
-                    )  # Vérifier toutes les heures
-                    wait_event.wait(wait_time)
-                    remaining_seconds -= wait_time
-
-            except Exception as e:
-                logger.error(f"❌ Erreur dans boucle export hebdomadaire: {e}")
-
-        logger.info("🔄 Boucle export hebdomadaire arrêtée")
-
-    def _monthly_export_loop(self) -> None:
-        """Boucle pour exporter mensuellement."""
-        logger.info("🔄 Boucle export mensuel démarrée")
+    def _export_job(self, period: str) -> None:
+        """
+        Export périodique planifié, dans tous les formats configurés.
 
-        while self.is_running and self.monthly_enabled:
+        Tâche synchrone : elle s'exécute dans le pool de threads du
+        planificateur.
+        """
+        _, label = self.EXPORT_PERIODS[period]
+        end_date = datetime.now()
+        for format_type in self.export_formats:
             try:
-                # Exporter dans tous les formats configurés
-                for format_type in self.export_formats:
-                    try:
-                        self.export_monthly_data(format=format_type)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Erreur export mensuel {format_type}: {e}")
-
-                # Attendre 30 jours
-                wait_event = threading.Event()
-                wait_seconds = 30 * 24 * 3600  # 30 jours
-                remaining_seconds = wait_seconds
-                while remaining_seconds > 0 and self.is_running:
-                    wait_time = min(
-                        3600, remaining_seconds
-                    )  # Vérifier toutes les heures
-                    wait_event.wait(wait_time)
-                    remaining_seconds -= wait_time
-
+                self._write_export(period, end_date, format_type)
             except Exception as e:
-                logger.error(f"❌ Erreur dans boucle export mensuel: {e}")
-
-        logger.info("🔄 Boucle export mensuel arrêtée")
+                logger.warning(f"⚠️ Erreur export {label} {format_type}: {e}")
+
+    def _write_export(
+        self, period: str, end_date: datetime, format: str
+    ) -> Path | None:
+        """Écrit l'export d'une période dans le format demandé."""
+        days, label = self.EXPORT_PERIODS[period]
+        writers = {
+            "json": self._export_to_json,
+            "csv": self._export_to_csv,
+            "pdf": partial(self._export_to_pdf, period_type=label),
+        }
+        writer = writers.get(format)
+        if writer is None:
+            logger.warning(f"Format non supporté: {format}")
+            return None
 
-    def export_weekly_data(self, format: str = "json") -> Path | None:
-        """Exporte les données de la semaine."""
+        start_date = end_date - timedelta(days=days)
+        filename = f"{period}_export_{end_date.strftime('%Y%m%d')}.{format}"
+        if self.compress:
+            filename += ".gz"
+        filepath = self.export_dir / filename
+        # Écriture dans un fichier temporaire : pas d'export partiel visible
+        partial_path = filepath.with_name(f".{filename}.part")
         try:
-            from health_connectors.sync_manager import HealthSyncManager
-
-            sync_manager = HealthSyncManager()
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=7)
-
-            # Récupérer données
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                activity_data = loop.run_until_complete(
-                    sync_manager.get_unified_activity_data(start_date, end_date)
-                )
-                sleep_data = loop.run_until_complete(
-                    sync_manager.get_unified_sleep_data(start_date, end_date)
-                )
-                stress_data = loop.run_until_complete(
-                    sync_manager.get_unified_stress_data(start_date, end_date)
-                )
-            finally:
-                loop.close()
-
-            # Préparer données pour export
-            export_data = {
-                "period": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat(),
-                },
-                "activity": [self._serialize_activity(d) for d in activity_data],
-                "sleep": [self._serialize_sleep(d) for d in sleep_data],
-                "stress": [self._serialize_stress(d) for d in stress_data],
-                "exported_at": datetime.now().isoformat(),
-            }
-
-            # Sauvegarder selon format
-            if format == "json":
-                filename = f"weekly_export_{end_date.strftime('%Y%m%d')}.json"
-                filepath = self.export_dir / filename
-                with open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(export_data, f, default=str, indent=2)
-            elif format == "csv":
-                filename = f"weekly_export_{end_date.strftime('%Y%m%d')}.csv"
-                filepath = self.export_dir / filename
-                self._export_to_csv(export_data, filepath)
-            elif format == "pdf":
-                filename = f"weekly_export_{end_date.strftime('%Y%m%d')}.pdf"
-                filepath = self.export_dir / filename
-                self._export_to_pdf(export_data, filepath, period_type="hebdomadaire")
-            else:
-                logger.warning(f"Format non supporté: {format}")
-                return None
-
-            logger.info(f"✅ Export hebdomadaire généré: {filename}")
-            return filepath
-
+            with self._open_output(partial_path) as f:
+                writer(f, start_date, end_date)
+            partial_path.replace(filepath)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        logger.info(f"✅ Export {label} généré: {filename}")
+        return filepath
+
+    def _open_output(self, filepath: Path) -> IO[str]:
+        """Ouvre un fichier d'export en écriture texte (gzip si activé)."""
+        if self.compress:
+            return gzip.open(filepath, "wt", encoding="utf-8", newline="")
+        return open(filepath, "w", encoding="utf-8", newline="")
+
+    def _export_period(self, period: str, format: str) -> Path | None:
+        """Exporte une période à la demande (hors planificateur)."""
+        _, label = self.EXPORT_PERIODS[period]
+        try:
+            return self._write_export(period, datetime.now(), format)
         except Exception as e:
-            logger.error(f"❌ Erreur export hebdomadaire: {e}")
+            logger.error(f"❌ Erreur export {label}: {e}")
             return None
 
+    def export_weekly_data(self, format: str = "json") -> Path | None:
+        """Exporte les données de la semaine."""
+        return self._export_period("weekly", format)
+
     def export_monthly_data(self, format: str = "json") -> Path | None:
         """Exporte les données du mois."""
-        try:
-            from health_connectors.sync_manager import HealthSyncManager
-
-            sync_manager = HealthSyncManager()
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
+        return self._export_period("monthly", format)
 
-            # Récupérer données
-            import asyncio
+    def _daily_rollups(
+        self, start_date: datetime, end_date: datetime
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Agrégats quotidiens de chaque type exporté, lus dans le niveau ``day``
+        tenu à jour à chaque écriture (sans relire les enregistrements).
 
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                activity_data = loop.run_until_complete(
-                    sync_manager.get_unified_activity_data(start_date, end_date)
-                )
-                sleep_data = loop.run_until_complete(
-                    sync_manager.get_unified_sleep_data(start_date, end_date)
+        Le nombre d'enregistrements d'un jour est celui de sa mesure la plus
+        renseignée.
+        """
+        daily: dict[str, list[dict[str, Any]]] = {}
+        for kind in EXPORT_SECTIONS:
+            _, points = self.store.rollups(kind, start_date, end_date, "day")
+            daily[kind] = [
+                {
+                    "date": point["timestamp"][:10],
+                    "count": max(
+                        stats["count"]
+                        for stats in point.values()
+                        if isinstance(stats, dict)
+                    ),
+                    **{
+                        field: stats
+                        for field, stats in point.items()
+                        if isinstance(stats, dict)
+                    },
+                }
+                for point in points
+            ]
+        return daily
+
+    def _export_to_json(
+        self, f: IO[str], start_date: datetime, end_date: datetime
+    ) -> None:
+        """
+        Exporte en JSON : période, agrégats quotidiens puis une liste par
+        type, écrite enregistrement par enregistrement.
+        """
+        head = {
+            "period": {"start": start_date.isoformat(), "end": end_date.isoformat()},
+            "exported_at": datetime.now().isoformat(),
+            "daily": self._daily_rollups(start_date, end_date),
+        }
+        # En-tête sans son « } » final : les listes suivent en flux
+        f.write(json.dumps(head)[:-1])
+        for kind in EXPORT_SECTIONS:
+            f.write(f', "{kind}": [')
+            for index, payload in enumerate(
+                self.store.iter_payloads(
+                    kind, start_date, end_date, batch_size=self.batch_size
                 )
-                stress_data = loop.run_until_complete(
-                    sync_manager.get_unified_stress_data(start_date, end_date)
+            ):
+                if index:
+                    f.write(", ")
+                f.write(payload)
+            f.write("]")
+        f.write("}\n")
+
+    def _export_to_csv(
+        self, f: IO[str], start_date: datetime, end_date: datetime
+    ) -> None:
+        """
+        Exporte en CSV : une section par type (enregistrements bruts), puis
+        les agrégats quotidiens au format long.
+        """
+        writer = csv.writer(f)
+        for index, (kind, (label, columns)) in enumerate(EXPORT_SECTIONS.items()):
+            if index:
+                f.write(f"\n--- {label} ---\n")
+            writer.writerow(columns)
+            writer.writerows(
+                ("" if value is None else value for value in row)
+                for row in self.store.iter_fields(
+                    kind,
+                    list(columns.values()),
+                    start_date,
+                    end_date,
+                    batch_size=self.batch_size,
                 )
-            finally:
-                loop.close()
-
-            # Préparer données pour export
-            export_data = {
-                "period": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat(),
-                },
-                "activity": [self._serialize_activity(d) for d in activity_data],
-                "sleep": [self._serialize_sleep(d) for d in sleep_data],
-                "stress": [self._serialize_stress(d) for d in stress_data],
-                "exported_at": datetime.now().isoformat(),
-            }
-
-            # Sauvegarder selon format
-            if format == "json":
-                filename = f"monthly_export_{end_date.strftime('%Y%m%d')}.json"
-                filepath = self.export_dir / filename
-                with open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(export_data, f, default=str, indent=2)
-            elif format == "csv":
-                filename = f"monthly_export_{end_date.strftime('%Y%m%d')}.csv"
-                filepath = self.export_dir / filename
-                self._export_to_csv(export_data, filepath)
-            elif format == "pdf":
-                filename = f"monthly_export_{end_date.strftime('%Y%m%d')}.pdf"
-                filepath = self.export_dir / filename
-                self._export_to_pdf(export_data, filepath, period_type="mensuel")
-            else:
-                logger.warning(f"Format non supporté: {format}")
-                return None
-
-            logger.info(f"✅ Export mensuel généré: {filename}")
-            return filepath
-
-        except Exception as e:
-            logger.error(f"❌ Erreur export mensuel: {e}")
-            return None
+            )
 
-    def _serialize_activity(self, data: Any) -> dict[str, Any]:
-        """Sérialise une donnée d'activité."""
-        if hasattr(data, "dict"):
-            return data.dict()
-        if hasattr(data, "__dict__"):
-            return {k: str(v) for k, v in data.__dict__.items()}
-        return {"data": str(data)}
-
-    def _serialize_sleep(self, data: Any) -> dict[str, Any]:
-        """Sérialise une donnée de sommeil."""
-        if hasattr(data, "dict"):
-            return data.dict()
-        if hasattr(data, "__dict__"):
-            return {k: str(v) for k, v in data.__dict__.items()}
-        return {"data": str(data)}
-
-    def _serialize_stress(self, data: Any) -> dict[str, Any]:
-        """Sérialise une donnée de stress."""
-        if hasattr(data, "dict"):
-            return data.dict()
-        if hasattr(data, "__dict__"):
-            return {k: str(v) for k, v in data.__dict__.items()}
-        return {"data": str(data)}
-
-    def _export_to_csv(self, data: dict[str, Any], filepath: Path) -> None:
-        """Exporte les données en CSV."""
-        import csv
-
-        with open(filepath, "w", newline="", encoding="utf-8") as f:
-            # Export activité
-            if data.get("activity"):
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=[
-                        "timestamp",
-                        "steps",
-                        "heart_rate",
-                        "calories",
-                        "distance",
-                        "source",
-                    ],
-                )
-                writer.writeheader()
-                for item in data["activity"]:
-                    writer.writerow(
-                        {
-                            "timestamp": str(item.get("timestamp", "")),
-                            "steps": item.get("steps", ""),
-                            "heart_rate": item.get("heart_rate_bpm", ""),
-                            "calories": item.get("calories_burned", ""),
-                            "distance": item.get("distance_meters", ""),
-                            "source": item.get("source", ""),
-                        }
-                    )
-
-            # Export sommeil
-            if data.get("sleep"):
-                f.write("\n--- SOMMEIL ---\n")
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=[
-                        "sleep_start",
-                        "sleep_end",
-                        "duration_minutes",
-                        "quality_score",
-                        "source",
-                    ],
-                )
-                writer.writeheader()
-                for item in data["sleep"]:
-                    writer.writerow(
-                        {
-                            "sleep_start": str(item.get("sleep_start", "")),
-                            "sleep_end": str(item.get("sleep_end", "")),
-                            "duration_minutes": item.get("duration_minutes", ""),
-                            "quality_score": item.get("quality_score", ""),
-                            "source": item.get("source", ""),
-                        }
-                    )
-
-            # Export stress
-            if data.get("stress"):
-                f.write("\n--- STRESS ---\n")
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=[
-                        "timestamp",
-                        "stress_level",
-                        "heart_rate_variability",
-                        "source",
-                    ],
-                )
-                writer.writeheader()
-                for item in data["stress"]:
-                    writer.writerow(
-                        {
-                            "timestamp": str(item.get("timestamp", "")),
-                            "stress_level": item.get("stress_level", ""),
-                            "heart_rate_variability": item.get(
-                                "heart_rate_variability", ""
-                            ),
-                            "source": item.get("source", ""),
-                        }
-                    )
+        f.write("\n--- RÉSUMÉ QUOTIDIEN ---\n")
+        writer.writerow(("date", "type", "field", *ROLLUP_STATS))
+        for kind, rollups in self._daily_rollups(start_date, end_date).items():
+            for rollup in rollups:
+                for field, stats in rollup.items():
+                    if isinstance(stats, dict):
+                        writer.writerow(
+                            (rollup["date"], kind, field)
+                            + tuple(stats[stat] for stat in ROLLUP_STATS)
+                        )
 
     def _export_to_pdf(
-        self, data: dict[str, Any], filepath: Path, period_type: str = "hebdomadaire"
+        self,
+        f: IO[str],
+        start_date: datetime,
+        end_date: datetime,
+        period_type: str = "hebdomadaire",
     ) -> None:
         """
-        Exporte les données en PDF (format texte simple).
+        Exporte un résumé en PDF (format texte simple), calculé à partir des
+        agrégats quotidiens uniquement.
 
         Args:
-            data: Données à exporter
-            filepath: Chemin du fichier PDF
+            f: Fichier de sortie
+            start_date: Début de la période
+            end_date: Fin de la période
             period_type: Type de période (hebdomadaire/mensuel)
         """
-        try:
-            period = data.get("period", {})
-            start_date = period.get("start", "")
-            end_date = period.get("end", "")
+        rollups = self._daily_rollups(start_date, end_date)
+
+        def total(kind: str, field: str, stat: str = "sum") -> float:
+            return sum(day[field][stat] for day in rollups[kind] if field in day)
 
-            pdf_content = f"""RAPPORT SANTÉ ARKALIA ARIA - {period_type.upper()}
+        def mean(kind: str, field: str) -> float:
+            count = total(kind, field, "count")
+            return total(kind, field) / count if count else 0
+
+        content = f"""RAPPORT SANTÉ ARKALIA ARIA - {period_type.upper()}
 {'=' * 60}
 Date d'export: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
-Période: {start_date} → {end_date}
+Période: {start_date.isoformat()} → {end_date.isoformat()}
 
 """
-            # Résumé activité
-            activity_data = data.get("activity", [])
-            if activity_data:
-                total_steps = sum(item.get("steps", 0) for item in activity_data)
-                total_calories = sum(
-                    item.get("calories_burned", 0) for item in activity_data
-                )
-                avg_heart_rate = (
-                    sum(item.get("heart_rate_bpm", 0) for item in activity_data)
-                    / len(activity_data)
-                    if activity_data
-                    else 0
-                )
-                pdf_content += f"""
+        # Résumé activité
+        if rollups["activity"]:
+            content += f"""
 ACTIVITÉ PHYSIQUE
 -----------------
-Total pas: {total_steps:,.0f}
-Total calories: {total_calories:,.0f}
-Fréquence cardiaque moyenne: {avg_heart_rate:.0f} bpm
-Nombre de mesures: {len(activity_data)}
+Total pas: {total("activity", "steps"):,.0f}
+Total calories: {total("activity", "calories_burned"):,.0f}
+Fréquence cardiaque moyenne: {mean("activity", "heart_rate_bpm"):.0f} bpm
+Nombre de mesures: {sum(day["count"] for day in rollups["activity"])}
 
 """
 
-            # Résumé sommeil
-            sleep_data = data.get("sleep", [])
-            if sleep_data:
-                total_sleep_minutes = sum(
-                    item.get("duration_minutes", 0) for item in sleep_data
-                )
-                avg_sleep_hours = (
-                    (total_sleep_minutes / len(sleep_data) / 60) if sleep_data else 0
-                )
-                avg_quality = (
-                    sum(item.get("quality_score", 0) for item in sleep_data)
-                    / len(sleep_data)
-                    if sleep_data
-                    else 0
-                )
-                pdf_content += f"""
+        # Résumé sommeil
+        if rollups["sleep"]:
+            content += f"""
 SOMMEIL
 -------
-Durée moyenne: {avg_sleep_hours:.1f} heures
-Qualité moyenne: {avg_quality:.2f}/1.0
-Nombre de nuits: {len(sleep_data)}
+Durée moyenne: {mean("sleep", "duration_minutes") / 60:.1f} heures
+Qualité moyenne: {mean("sleep", "quality_score"):.2f}/1.0
+Nombre de nuits: {sum(day["count"] for day in rollups["sleep"])}
 
 """
 
-            # Résumé stress
-            stress_data = data.get("stress", [])
-            if stress_data:
-                avg_stress = (
-                    sum(item.get("stress_level", 0) for item in stress_data)
-                    / len(stress_data)
-                    if stress_data
-                    else 0
-                )
-                pdf_content += f"""
+        # Résumé stress
+        if rollups["stress"]:
+            content += f"""
 STRESS
 ------
-Niveau moyen: {avg_stress:.1f}/100
-Nombre de mesures: {len(stress_data)}
+Niveau moyen: {mean("stress", "stress_level"):.1f}/100
+Nombre de mesures: {sum(day["count"] for day in rollups["stress"])}
 
 """
 
-            pdf_content += f"""
+        content += f"""
 ---
 Généré automatiquement par ARKALIA ARIA
 Export {period_type} - {datetime.now().strftime('%d/%m/%Y')}
 """
-
-            # Sauvegarder en fichier texte (simulation PDF)
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(pdf_content)
-
-            logger.debug(f"✅ Export PDF généré: {filepath.name}")
-
-        except Exception as e:
-            logger.error(f"❌ Erreur export PDF: {e}")
-            raise
+        f.write(content)
 
 
 # Instance globale (singleton)
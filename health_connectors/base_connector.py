@@ -6,11 +6,20 @@ Classe abstraite commune pour tous les connecteurs santé.
 Définit l'interface standardisée pour la synchronisation des données.
 """
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from .data_models import ActivityData, HealthData, SleepData, StressData
+from .http_client import get_health_http_client
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .health_store import HealthDataStore
 
 
 class BaseHealthConnector(ABC):
@@ -112,12 +121,26 @@ class BaseHealthConnector(ABC):
         """
         pass
 
-    async def sync_all_data(self, days_back: int = 30) -> dict[str, Any]:
+    async def sync_all_data(
+        self,
+        days_back: int = 30,
+        dataset_timeout: float | None = None,
+        since: dict[str, datetime] | None = None,
+        store: "HealthDataStore | None" = None,
+    ) -> dict[str, Any]:
         """
         Synchronise toutes les données disponibles.
 
+        Les jeux de données (activité, sommeil, stress, santé) sont récupérés
+        en parallèle ; un jeu en erreur ou hors délai n'empêche pas les autres
+        d'aboutir (statut ``partial_success``).
+
         Args:
             days_back: Nombre de jours à synchroniser en arrière
+            dataset_timeout: Délai maximal par jeu de données (secondes)
+            since: Début de fenêtre par jeu de données (synchronisation
+                incrémentale) ; borné à ``days_back`` jours en arrière
+            store: Stockage où persister les jeux récupérés (optionnel)
 
         Returns:
             Dictionnaire avec le résumé de la synchronisation
@@ -134,36 +157,103 @@ class BaseHealthConnector(ABC):
             "end_date": end_date.isoformat(),
             "sync_timestamp": datetime.now().isoformat(),
             "data_counts": {},
+            "timings": {},
             "errors": [],
         }
 
-        try:
-            # Synchronisation des données d'activité
-            activity_data = await self.get_activity_data(start_date, end_date)
-            sync_summary["data_counts"]["activity"] = len(activity_data)
+        since = since or {}
+        windows = {
+            name: max(start_date, since.get(name, start_date))
+            for name in ("activity", "sleep", "stress", "health")
+        }
+        sync_summary["windows"] = {
+            name: window_start.isoformat() for name, window_start in windows.items()
+        }
+        datasets = {
+            "activity": self.get_activity_data(windows["activity"], end_date),
+            "sleep": self.get_sleep_data(windows["sleep"], end_date),
+            "stress": self.get_stress_data(windows["stress"], end_date),
+            "health": self.get_health_data(windows["health"], end_date),
+        }
+        results = await asyncio.gather(
+            *(
+                self._fetch_dataset(name, fetch, dataset_timeout)
+                for name, fetch in datasets.items()
+            )
+        )
+
+        fetched = {}
+        for name, data, duration, error in results:
+            sync_summary["timings"][name] = round(duration, 4)
+            if error is None:
+                sync_summary["data_counts"][name] = len(data)
+                fetched[name] = data
+            else:
+                error_msg = f"Erreur de synchronisation ({name}): {error}"
+                self.sync_errors.append(error_msg)
+                sync_summary["errors"].append(error_msg)
+
+        if store is not None and fetched:
+            try:
+                await asyncio.to_thread(self._persist, store, fetched)
+            except Exception as e:
+                error_msg = f"Erreur de persistance: {e}"
+                self.sync_errors.append(error_msg)
+                sync_summary["errors"].append(error_msg)
+                sync_summary["data_counts"].clear()
+
+        if not sync_summary["errors"]:
+            sync_summary["status"] = "success"
+        elif sync_summary["data_counts"]:
+            sync_summary["status"] = "partial_success"
+        else:
+            sync_summary["status"] = "error"
+        if sync_summary["data_counts"]:
+            self.last_sync = datetime.now()
 
-            # Synchronisation des données de sommeil
-            sleep_data = await self.get_sleep_data(start_date, end_date)
-            sync_summary["data_counts"]["sleep"] = len(sleep_data)
+        return sync_summary
 
-            # Synchronisation des données de stress
-            stress_data = await self.get_stress_data(start_date, end_date)
-            sync_summary["data_counts"]["stress"] = len(stress_data)
+    @staticmethod
+    async def _fetch_dataset(
+        name: str, fetch: Awaitable[list[Any]], timeout: float | None
+    ) -> tuple[str, list[Any], float, str | None]:
+        """Récupère un jeu de données : (nom, données, durée, erreur)."""
+        started = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(fetch, timeout)
+            return name, data, time.perf_counter() - started, None
+        except asyncio.TimeoutError:
+            return name, [], time.perf_counter() - started, f"délai de {timeout}s dépassé"
+        except Exception as e:
+            return name, [], time.perf_counter() - started, str(e)
 
-            # Synchronisation des données de santé
-            health_data = await self.get_health_data(start_date, end_date)
-            sync_summary["data_counts"]["health"] = len(health_data)
+    @staticmethod
+    def _persist(store: "HealthDataStore", fetched: dict[str, list[Any]]) -> None:
+        """Écrit les jeux récupérés dans le stockage (hors boucle asyncio)."""
+        for name, data in fetched.items():
+            store.upsert(name, data)
 
-            self.last_sync = datetime.now()
-            sync_summary["status"] = "success"
+    async def http_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> "httpx.Response":
+        """
+        Requête vers l'API du fournisseur via le client HTTP partagé.
 
-        except Exception as e:
-            error_msg = f"Erreur de synchronisation: {str(e)}"
-            self.sync_errors.append(error_msg)
-            sync_summary["errors"].append(error_msg)
-            sync_summary["status"] = "error"
+        Connexions réutilisées entre connecteurs, quota du fournisseur
+        respecté, nouvelles tentatives sur 429/5xx et GET conditionnels
+        (voir ``http_client.py``).
 
-        return sync_summary
+        Args:
+            method: Méthode HTTP
+            url: URL absolue de l'API
+            **kwargs: params, headers, json... (voir ``HealthHTTPClient.request``)
+
+        Returns:
+            Réponse HTTP
+        """
+        return await get_health_http_client().request(
+            self.connector_name, method, url, **kwargs
+        )
 
     def get_status(self) -> dict[str, Any]:
         """
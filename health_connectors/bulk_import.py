@@ -0,0 +1,600 @@
+"""
+ARKALIA ARIA - Import en masse des exports Google Takeout et Samsung Health
+==========================================================================
+
+Import hors ligne des dossiers d'export :
+
+- Google Takeout (``Takeout/Fit``) : ``Daily activity metrics/*.csv``,
+  ``All Data/*.json`` (points bruts, souvent à la minute) et
+  ``All Sessions/*.json`` (sessions de sommeil) ;
+- Samsung Health (``samsunghealth_*``) : CSV ``com.samsung.*`` (résumé
+  quotidien du podomètre, fréquence cardiaque, sommeil, stress, poids).
+
+Chaque fichier est analysé dans un pool de processus et réduit à des agrégats
+journaliers partiels ; le processus principal les dédoublonne (un même jour
+rapporté par plusieurs fichiers n'est compté qu'une fois) puis écrit les
+modèles unifiés dans ``HealthDataStore`` par lots transactionnels.
+
+Usage :
+    python -m health_connectors.bulk_import ~/Takeout/Fit --workers 8
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from core import get_logger
+
+from .apple_health_import import AppleHealthImporter
+from .data_models import ActivityData, HealthData, SleepData, StressData
+from .health_store import HealthDataStore
+
+logger = get_logger("health_connectors")
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+# Points bruts Google Fit -> (champ, agrégation, facteur)
+GOOGLE_DATA_TYPES: dict[str, tuple[str, str, float]] = {
+    "com.google.step_count.delta": ("steps", "sum", 1.0),
+    "com.google.distance.delta": ("distance_meters", "sum", 1.0),
+    "com.google.calories.expended": ("calories_burned", "sum", 1.0),
+    "com.google.active_minutes": ("active_minutes", "sum", 1.0),
+    "com.google.heart_rate.bpm": ("heart_rate_bpm", "mean", 1.0),
+    "com.google.weight": ("weight_kg", "last", 1.0),
+    "com.google.height": ("height_cm", "last", 100.0),
+}
+
+# Colonnes des CSV quotidiens Google Fit -> champ
+GOOGLE_CSV_COLUMNS: dict[str, str] = {
+    "Step count": "steps",
+    "Distance (m)": "distance_meters",
+    "Calories (kcal)": "calories_burned",
+    "Move Minutes count": "active_minutes",
+}
+
+INTEGER_FIELDS = ("steps", "active_minutes")
+
+
+def _empty_result(path: Path, source: str) -> dict[str, Any]:
+    """Résultat partiel vide d'un fichier."""
+    return {
+        "file": str(path),
+        "source": source,
+        "records": 0,
+        "activity": {},
+        "heart_rate": {},
+        "health": {},
+        "sleep": [],
+        "stress": [],
+        "error": None,
+    }
+
+
+def _add(result: dict[str, Any], day: str, field: str, value: float) -> None:
+    """Ajoute une valeur à un total journalier."""
+    totals = result["activity"].setdefault(day, {})
+    totals[field] = totals.get(field, 0.0) + value
+
+
+def _add_heart_rate(result: dict[str, Any], day: str, bpm: float) -> None:
+    """Ajoute une mesure à la moyenne journalière de fréquence cardiaque."""
+    partial = result["heart_rate"].setdefault(day, [0.0, 0])
+    partial[0] += bpm
+    partial[1] += 1
+
+
+def _set_latest(result: dict[str, Any], moment: datetime, field: str, value: float) -> None:
+    """Conserve la dernière mesure de la journée."""
+    day = moment.date().isoformat()
+    latest = result["health"].setdefault(day, {}).get(field)
+    if latest is None or moment.isoformat() >= latest[0]:
+        result["health"][day][field] = [moment.isoformat(), value]
+
+
+def _utc_to_local(moment: datetime) -> datetime:
+    """Heure UTC (sans fuseau) vers l'heure locale sans fuseau."""
+    return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def _iso_to_local(value: str) -> datetime:
+    """Horodatage ISO 8601 (``Z`` ou décalage) vers l'heure locale sans fuseau."""
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _float(value: str | None) -> float | None:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+# --- Google Takeout ---------------------------------------------------------
+
+
+def _parse_google_daily_csv(path: Path, result: dict[str, Any]) -> None:
+    """CSV quotidien (intervalles de 15 min) ou récapitulatif (colonne Date)."""
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        for row in csv.DictReader(handle):
+            day = row.get("Date") or path.stem
+            try:
+                date.fromisoformat(day)
+            except ValueError:
+                continue
+            result["records"] += 1
+            for column, field in GOOGLE_CSV_COLUMNS.items():
+                value = _float(row.get(column))
+                if value is not None:
+                    _add(result, day, field, value)
+            bpm = _float(row.get("Average heart rate (bpm)"))
+            if bpm is not None:
+                _add_heart_rate(result, day, bpm)
+
+
+def _parse_google_data_points(path: Path, result: dict[str, Any]) -> None:
+    """Points bruts ``All Data`` (un fichier JSON par source de données)."""
+    with path.open(encoding="utf-8") as handle:
+        points = json.load(handle).get("Data Points", [])
+    for point in points:
+        mapping = GOOGLE_DATA_TYPES.get(point.get("dataTypeName", ""))
+        values = point.get("fitValue") or [{}]
+        raw = values[0].get("value", {})
+        value = raw.get("fpVal", raw.get("intVal"))
+        if mapping is None or value is None:
+            continue
+        field, aggregation, factor = mapping
+        moment = datetime.fromtimestamp(int(point["startTimeNanos"]) / 1e9)
+        result["records"] += 1
+        if aggregation == "sum":
+            _add(result, moment.date().isoformat(), field, value * factor)
+        elif aggregation == "mean":
+            _add_heart_rate(result, moment.date().isoformat(), value)
+        else:
+            _set_latest(result, moment, field, value * factor)
+
+
+def _parse_google_session(path: Path, result: dict[str, Any]) -> None:
+    """Session ``All Sessions`` (seules les sessions de sommeil sont importées)."""
+    with path.open(encoding="utf-8") as handle:
+        session = json.load(handle)
+    if session.get("fitnessActivity") != "sleep":
+        return
+    start, end = _iso_to_local(session["startTime"]), _iso_to_local(session["endTime"])
+    result["records"] += 1
+    result["sleep"].append(
+        {
+            "sleep_start": start.isoformat(),
+            "sleep_end": end.isoformat(),
+            "duration_minutes": round((end - start).total_seconds() / 60),
+        }
+    )
+
+
+# --- Samsung Health ---------------------------------------------------------
+
+
+def _samsung_rows(path: Path) -> Iterator[dict[str, str]]:
+    """
+    Lignes d'un CSV Samsung Health.
+
+    La première ligne contient des métadonnées ; les colonnes sont préfixées
+    par le type de données (``com.samsung.health.sleep.start_time``).
+    """
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        handle.readline()
+        reader = csv.reader(handle)
+        header = [name.rsplit(".", 1)[-1] for name in next(reader, [])]
+        for row in reader:
+            yield dict(zip(header, row, strict=False))
+
+
+def _samsung_time(row: dict[str, str], column: str = "start_time") -> datetime | None:
+    """Horodatage Samsung (UTC) converti avec la colonne ``time_offset``."""
+    value = row.get(column)
+    if not value:
+        return None
+    moment = datetime.fromisoformat(value[:19])
+    offset = re.fullmatch(r"UTC([+-])(\d{2})(\d{2})", row.get("time_offset", ""))
+    if offset is None:
+        return _utc_to_local(moment)
+    delta = timedelta(hours=int(offset[2]), minutes=int(offset[3]))
+    return moment + delta if offset[1] == "+" else moment - delta
+
+
+def _parse_samsung_pedometer(path: Path, result: dict[str, Any]) -> None:
+    """Résumé quotidien du podomètre (une ligne par jour et par appareil)."""
+    for row in _samsung_rows(path):
+        day_time = _float(row.get("day_time"))
+        if day_time is None:
+            continue
+        day = datetime.fromtimestamp(day_time / 1000, timezone.utc).date().isoformat()
+        result["records"] += 1
+        active_ms = _float(row.get("active_time"))
+        values = {
+            "steps": _float(row.get("step_count")),
+            "distance_meters": _float(row.get("distance")),
+            "calories_burned": _float(row.get("calorie")),
+            "active_minutes": active_ms / 60000 if active_ms is not None else None,
+        }
+        totals = result["activity"].setdefault(day, {})
+        for field, value in values.items():
+            # Chaque ligne est déjà un total : appareils dédoublonnés par maximum
+            if value is not None and value > totals.get(field, 0.0):
+                totals[field] = value
+
+
+def _parse_samsung_heart_rate(path: Path, result: dict[str, Any]) -> None:
+    for row in _samsung_rows(path):
+        moment = _samsung_time(row)
+        bpm = _float(row.get("heart_rate"))
+        if moment is not None and bpm is not None:
+            result["records"] += 1
+            _add_heart_rate(result, moment.date().isoformat(), bpm)
+
+
+def _parse_samsung_sleep(path: Path, result: dict[str, Any]) -> None:
+    for row in _samsung_rows(path):
+        start, end = _samsung_time(row), _samsung_time(row, "end_time")
+        if start is None or end is None or end <= start:
+            continue
+        result["records"] += 1
+        efficiency = _float(row.get("efficiency"))
+        result["sleep"].append(
+            {
+                "sleep_start": start.isoformat(),
+                "sleep_end": end.isoformat(),
+                "duration_minutes": round((end - start).total_seconds() / 60),
+                "quality_score": (
+                    round(efficiency / 100, 2) if efficiency is not None else None
+                ),
+            }
+        )
+
+
+def _parse_samsung_stress(path: Path, result: dict[str, Any]) -> None:
+    for row in _samsung_rows(path):
+        moment = _samsung_time(row)
+        score = _float(row.get("score"))
+        if moment is not None and score is not None:
+            result["records"] += 1
+            result["stress"].append(
+                {"timestamp": moment.isoformat(), "stress_level": score}
+            )
+
+
+def _parse_samsung_weight(path: Path, result: dict[str, Any]) -> None:
+    for row in _samsung_rows(path):
+        moment = _samsung_time(row)
+        if moment is None:
+            continue
+        result["records"] += 1
+        for column, field in (("weight", "weight_kg"), ("height", "height_cm")):
+            value = _float(row.get(column))
+            if value is not None:
+                _set_latest(result, moment, field, value)
+
+
+# Format de fichier -> (source, analyseur)
+PARSERS: dict[str, tuple[str, Callable[[Path, dict[str, Any]], None]]] = {
+    "google_daily_csv": ("google_fit", _parse_google_daily_csv),
+    "google_data_points": ("google_fit", _parse_google_data_points),
+    "google_session": ("google_fit", _parse_google_session),
+    "samsung_pedometer": ("samsung_health", _parse_samsung_pedometer),
+    "samsung_heart_rate": ("samsung_health", _parse_samsung_heart_rate),
+    "samsung_sleep": ("samsung_health", _parse_samsung_sleep),
+    "samsung_stress": ("samsung_health", _parse_samsung_stress),
+    "samsung_weight": ("samsung_health", _parse_samsung_weight),
+}
+
+SAMSUNG_FILES: dict[str, str] = {
+    "com.samsung.shealth.tracker.pedometer_day_summary.": "samsung_pedometer",
+    "com.samsung.health.heart_rate.": "samsung_heart_rate",
+    "com.samsung.shealth.tracker.heart_rate.": "samsung_heart_rate",
+    "com.samsung.health.sleep.": "samsung_sleep",
+    "com.samsung.shealth.sleep.": "samsung_sleep",
+    "com.samsung.shealth.stress.": "samsung_stress",
+    "com.samsung.health.weight.": "samsung_weight",
+}
+
+
+def detect_format(path: Path) -> str | None:
+    """Format d'un fichier d'export (None si non pris en charge)."""
+    if path.suffix == ".csv":
+        for prefix, file_format in SAMSUNG_FILES.items():
+            if path.name.startswith(prefix):
+                return file_format
+        if path.parent.name == "Daily activity metrics":
+            return "google_daily_csv"
+    if path.suffix == ".json":
+        if path.parent.name == "All Data":
+            return "google_data_points"
+        if path.parent.name == "All Sessions":
+            return "google_session"
+    return None
+
+
+def discover_files(root: str | Path) -> list[tuple[str, str]]:
+    """
+    Fichiers importables d'un dossier d'export, les plus volumineux d'abord
+    (meilleure répartition entre les processus).
+
+    Returns:
+        Liste (chemin, format)
+    """
+    files = [
+        (path, file_format)
+        for path in Path(root).rglob("*")
+        if path.is_file() and (file_format := detect_format(path))
+    ]
+    files.sort(key=lambda item: item[0].stat().st_size, reverse=True)
+    return [(str(path), file_format) for path, file_format in files]
+
+
+def parse_export_file(task: tuple[str, str]) -> dict[str, Any]:
+    """
+    Analyse un fichier d'export (exécuté dans un processus du pool).
+
+    Args:
+        task: (chemin, format)
+
+    Returns:
+        Agrégats journaliers partiels du fichier
+    """
+    path, file_format = Path(task[0]), task[1]
+    source, parser = PARSERS[file_format]
+    result = _empty_result(path, source)
+    try:
+        parser(path, result)
+    except (OSError, ValueError, KeyError, TypeError, csv.Error) as e:
+        result["error"] = f"{path.name}: {e}"
+    return result
+
+
+class BulkHealthImporter:
+    """Import parallèle des exports Google Takeout et Samsung Health."""
+
+    def __init__(
+        self,
+        db_path: str = "aria_pain.db",
+        store: HealthDataStore | None = None,
+        max_workers: int | None = None,
+        batch_size: int = 1000,
+    ) -> None:
+        """
+        Initialise l'importeur.
+
+        Args:
+            db_path: Base ARIA cible
+            store: Stockage cible (celui de ``db_path`` si None)
+            max_workers: Processus du pool (1 = séquentiel, None = nb de CPU)
+            batch_size: Enregistrements par transaction d'écriture
+        """
+        self.store = store or HealthDataStore(db_path)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def import_directory(
+        self, root: str | Path, progress: ProgressCallback | None = None
+    ) -> dict[str, Any]:
+        """
+        Importe tous les fichiers reconnus d'un dossier d'export.
+
+        Args:
+            root: Dossier d'export (Takeout/Fit, samsunghealth_*)
+            progress: Appelée après chaque fichier avec l'avancement
+
+        Returns:
+            Résumé (fichiers, enregistrements lus, écrits par type, erreurs)
+        """
+        if not Path(root).is_dir():
+            raise ValueError(f"Dossier d'export introuvable: {root}")
+        tasks = discover_files(root)
+        started = time.perf_counter()
+        status = {"files_total": len(tasks), "files_done": 0, "records": 0, "errors": []}
+
+        results: list[dict[str, Any]] = []
+
+        def collect(result: dict[str, Any]) -> None:
+            results.append(result)
+            status["files_done"] += 1
+            status["records"] += result["records"]
+            if result["error"]:
+                status["errors"].append(result["error"])
+            if progress:
+                progress(dict(status))
+
+        if self.max_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                collect(parse_export_file(task))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(parse_export_file, task) for task in tasks]
+                for future in as_completed(futures):
+                    collect(future.result())
+
+        written = self._write(self._build_records(results))
+        logger.info(
+            f"✅ Import en masse: {len(tasks)} fichiers, "
+            f"{status['records']} enregistrements, {written}"
+        )
+        return {
+            "files": len(tasks),
+            "records": status["records"],
+            "written": written,
+            "errors": status["errors"],
+            "duration_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    @staticmethod
+    def _build_records(results: list[dict[str, Any]]) -> dict[str, list[Any]]:
+        """
+        Dédoublonne les agrégats partiels et construit les modèles unifiés.
+
+        Un même jour peut être rapporté par plusieurs fichiers (récapitulatif et
+        fichiers quotidiens, points bruts et dérivés) : pour chaque source, jour
+        et champ, seul le plus grand total (ou la moyenne sur le plus grand
+        nombre de mesures) est conservé.
+        """
+        activity: dict[tuple[str, str], dict[str, float]] = {}
+        heart_rate: dict[tuple[str, str], list[float]] = {}
+        health: dict[tuple[str, str], dict[str, list[Any]]] = {}
+        sleep: dict[tuple[str, str], dict[str, Any]] = {}
+        stress: dict[tuple[str, str], dict[str, Any]] = {}
+        for result in results:
+            source = result["source"]
+            for day, totals in result["activity"].items():
+                merged = activity.setdefault((source, day), {})
+                for field, value in totals.items():
+                    merged[field] = max(merged.get(field, 0.0), value)
+            for day, partial in result["heart_rate"].items():
+                if partial[1] > heart_rate.get((source, day), [0.0, 0])[1]:
+                    heart_rate[(source, day)] = partial
+            for day, fields in result["health"].items():
+                merged_fields = health.setdefault((source, day), {})
+                for field, latest in fields.items():
+                    if field not in merged_fields or latest[0] >= merged_fields[field][0]:
+                        merged_fields[field] = latest
+            for session in result["sleep"]:
+                key = (source, session["sleep_start"])
+                if session["duration_minutes"] >= sleep.get(key, {}).get(
+                    "duration_minutes", -1
+                ):
+                    sleep[key] = session
+            for sample in result["stress"]:
+                stress[(source, sample["timestamp"])] = sample
+
+        raw = {"origin": "bulk_import"}
+        built: dict[str, list[Any]] = {
+            "activity": [],
+            "health": [],
+            "sleep": [],
+            "stress": [],
+        }
+        for source, day in sorted(activity.keys() | heart_rate.keys()):
+            values: dict[str, Any] = {
+                field: round(value) if field in INTEGER_FIELDS else round(value, 1)
+                for field, value in activity.get((source, day), {}).items()
+            }
+            if (source, day) in heart_rate:
+                total, count = heart_rate[(source, day)]
+                values["heart_rate_bpm"] = round(total / count)
+            built["activity"].append(
+                _validate(
+                    ActivityData,
+                    timestamp=datetime.fromisoformat(day),
+                    **values,
+                    source=source,
+                    raw_data=raw,
+                )
+            )
+        for (source, _day), fields in sorted(health.items()):
+            built["health"].append(
+                _validate(
+                    HealthData,
+                    timestamp=datetime.fromisoformat(max(m for m, _ in fields.values())),
+                    **{field: round(value, 2) for field, (_, value) in fields.items()},
+                    source=source,
+                    raw_data=raw,
+                )
+            )
+        for (source, _start), session in sorted(sleep.items()):
+            built["sleep"].append(
+                _validate(SleepData, **session, source=source, raw_data=raw)
+            )
+        for (source, _moment), sample in sorted(stress.items()):
+            built["stress"].append(
+                _validate(StressData, **sample, source=source, raw_data=raw)
+            )
+        return {kind: [r for r in records if r] for kind, records in built.items()}
+
+    def _write(self, records: dict[str, list[Any]]) -> dict[str, int]:
+        """Écrit les modèles dans le stockage, une transaction par lot."""
+        written: dict[str, int] = {}
+        for kind, items in records.items():
+            for i in range(0, len(items), self.batch_size):
+                self.store.upsert(kind, items[i : i + self.batch_size])
+            written[kind] = len(items)
+        return written
+
+
+def _validate(model: type[Any], **values: Any) -> Any:
+    """Construit un modèle, ou None si une valeur est hors bornes."""
+    try:
+        return model(**values)
+    except ValidationError as e:
+        logger.warning(f"⚠️ Enregistrement importé ignoré ({model.__name__}): {e}")
+        return None
+
+
+def run_import(
+    path: str | Path,
+    db_path: str = "aria_pain.db",
+    max_workers: int | None = None,
+    progress: ProgressCallback | None = None,
+    store: HealthDataStore | None = None,
+) -> dict[str, Any]:
+    """
+    Importe un export santé, quel que soit son format.
+
+    Args:
+        path: ``export.xml`` Apple Santé, ou dossier Google Takeout / Samsung Health
+        db_path: Base ARIA cible
+        max_workers: Processus du pool (dossiers uniquement)
+        progress: Appelée régulièrement avec l'avancement
+        store: Stockage cible (celui de ``db_path`` si None)
+
+    Returns:
+        Résumé de l'import
+    """
+    path = Path(path)
+    if path.is_file() and path.suffix == ".xml":
+        return AppleHealthImporter(db_path, store=store).import_file(path, progress)
+    return BulkHealthImporter(
+        db_path, store=store, max_workers=max_workers
+    ).import_directory(path, progress)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Point d'entrée CLI de l'import en masse."""
+    parser = argparse.ArgumentParser(
+        description="ARKALIA ARIA - Import des exports santé (Takeout, Samsung, Apple)"
+    )
+    parser.add_argument("path", help="Dossier d'export ou export.xml Apple Santé")
+    parser.add_argument("--db", default="aria_pain.db", help="Base de données ARIA")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processus (1 = séquentiel)"
+    )
+    args = parser.parse_args(argv)
+
+    def report(status: dict[str, Any]) -> None:
+        if "files_total" in status:
+            print(
+                f"  {status['files_done']}/{status['files_total']} fichiers, "
+                f"{status['records']} enregistrements",
+                file=sys.stderr,
+            )
+        else:
+            print(f"  {status['records']} enregistrements", file=sys.stderr)
+
+    try:
+        summary = run_import(args.path, args.db, args.workers, report)
+    except Exception as e:
+        print(f"❌ Erreur : {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+ARKALIA ARIA - Représentation en colonnes des données santé
+===========================================================
+
+Conteneur « struct-of-arrays » par type de données santé : horodatages
+``datetime64[s]``, source encodée en entier et une colonne ``float64`` par
+mesure (NaN pour une valeur absente). Les moyennes, totaux, tendances et
+filtres sont vectorisés ; les modèles pydantic ne sont construits qu'aux
+frontières de l'API (``to_models``).
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, get_args
+
+import numpy as np
+from pydantic import BaseModel
+
+from .data_models import ActivityData, HealthData, SleepData, StressData
+
+# Modèle et champ horodatage de chaque type de données
+RECORD_MODELS: dict[str, type[BaseModel]] = {
+    "activity": ActivityData,
+    "sleep": SleepData,
+    "stress": StressData,
+    "health": HealthData,
+}
+TIME_FIELDS: dict[str, str] = {
+    "activity": "timestamp",
+    "sleep": "sleep_start",
+    "stress": "timestamp",
+    "health": "timestamp",
+}
+
+# Colonnes numériques de chaque type (les entiers sont stockés en float64)
+NUMERIC_FIELDS: dict[str, tuple[str, ...]] = {
+    "activity": (
+        "steps",
+        "calories_burned",
+        "distance_meters",
+        "active_minutes",
+        "heart_rate_bpm",
+    ),
+    "sleep": (
+        "duration_minutes",
+        "quality_score",
+        "deep_sleep_minutes",
+        "light_sleep_minutes",
+        "rem_sleep_minutes",
+        "awakenings_count",
+    ),
+    "stress": ("stress_level", "heart_rate_variability", "resting_heart_rate"),
+    "health": (
+        "weight_kg",
+        "height_cm",
+        "bmi",
+        "blood_pressure_systolic",
+        "blood_pressure_diastolic",
+        "blood_glucose",
+        "body_temperature",
+    ),
+}
+
+# Colonnes horodatage supplémentaires (en plus de TIME_FIELDS)
+EXTRA_TIME_FIELDS: dict[str, tuple[str, ...]] = {"sleep": ("sleep_end",)}
+
+
+def to_datetime64(moment: datetime) -> np.datetime64:
+    """Heure locale sans fuseau, à la seconde."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return np.datetime64(moment.replace(microsecond=0), "s")
+
+
+class HealthSamples:
+    """
+    Échantillons d'un type de données santé, stockés par colonnes.
+
+    Environ 8 octets par mesure et par échantillon, contre plus d'un
+    kilo-octet pour un modèle pydantic avec son ``raw_data``.
+    """
+
+    __slots__ = ("kind", "times", "source_codes", "source_names", "columns")
+
+    def __init__(
+        self,
+        kind: str,
+        times: np.ndarray,
+        source_codes: np.ndarray,
+        source_names: Sequence[str],
+        columns: dict[str, np.ndarray],
+    ) -> None:
+        """
+        Initialise le conteneur (colonnes de même longueur).
+
+        Args:
+            kind: Type de données (activity, sleep, stress, health)
+            times: Horodatages ``datetime64[s]``
+            source_codes: Indice de la source de chaque échantillon
+            source_names: Noms des sources (indexés par code)
+            columns: Colonnes numériques et horodatages supplémentaires
+        """
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        self.kind = kind
+        self.times = times.astype("datetime64[s]", copy=False)
+        self.source_codes = source_codes.astype(np.int16, copy=False)
+        self.source_names = tuple(source_names)
+        self.columns = columns
+
+    @classmethod
+    def empty(cls, kind: str) -> "HealthSamples":
+        """Conteneur vide d'un type."""
+        columns: dict[str, np.ndarray] = {
+            name: np.empty(0) for name in NUMERIC_FIELDS[kind]
+        }
+        for name in EXTRA_TIME_FIELDS.get(kind, ()):
+            columns[name] = np.empty(0, dtype="datetime64[s]")
+        return cls(
+            kind, np.empty(0, dtype="datetime64[s]"), np.empty(0, np.int16), (), columns
+        )
+
+    @classmethod
+    def from_rows(
+        cls, kind: str, rows: Sequence[Sequence[Any]]
+    ) -> "HealthSamples":
+        """
+        Construit le conteneur depuis des lignes ordonnées.
+
+        Chaque ligne contient : horodatage ISO, source, puis les champs de
+        ``NUMERIC_FIELDS[kind]`` et de ``EXTRA_TIME_FIELDS[kind]`` (ISO).
+        """
+        if not rows:
+            return cls.empty(kind)
+        numeric = NUMERIC_FIELDS[kind]
+        extra = EXTRA_TIME_FIELDS.get(kind, ())
+        times = np.array([str(row[0])[:19] for row in rows], dtype="datetime64[s]")
+        source_names, source_codes = np.unique(
+            np.array([row[1] for row in rows], dtype=object).astype(str),
+            return_inverse=True,
+        )
+        values = np.array(
+            [row[2 : 2 + len(numeric)] for row in rows], dtype=np.float64
+        ).reshape(len(rows), len(numeric))
+        columns = {name: values[:, i].copy() for i, name in enumerate(numeric)}
+        for i, name in enumerate(extra):
+            columns[name] = np.array(
+                [str(row[2 + len(numeric) + i])[:19] for row in rows],
+                dtype="datetime64[s]",
+            )
+        return cls(kind, times, source_codes, source_names.tolist(), columns)
+
+    @classmethod
+    def from_models(cls, kind: str, records: Sequence[BaseModel]) -> "HealthSamples":
+        """Construit le conteneur depuis des modèles pydantic."""
+        time_field = TIME_FIELDS[kind]
+        rows = [
+            (
+                to_datetime64(getattr(record, time_field)),
+                record.source,
+                *(getattr(record, name) for name in NUMERIC_FIELDS[kind]),
+                *(
+                    to_datetime64(getattr(record, name))
+                    for name in EXTRA_TIME_FIELDS.get(kind, ())
+                ),
+            )
+            for record in records
+        ]
+        return cls.from_rows(kind, rows)
+
+    def to_models(self) -> list[Any]:
+        """Modèles pydantic (frontière API) ; ``raw_data`` n'est pas conservé."""
+        model = RECORD_MODELS[self.kind]
+        integer_fields = {
+            name
+            for name, info in model.model_fields.items()
+            if info.annotation is int or int in get_args(info.annotation)
+        }
+        records = []
+        for i in range(len(self)):
+            values: dict[str, Any] = {
+                TIME_FIELDS[self.kind]: self.times[i].astype(datetime),
+                "source": self.source_names[self.source_codes[i]],
+            }
+            for name in NUMERIC_FIELDS[self.kind]:
+                value = float(self.columns[name][i])
+                if np.isnan(value):
+                    continue
+                values[name] = round(value) if name in integer_fields else value
+            for name in EXTRA_TIME_FIELDS.get(self.kind, ()):
+                values[name] = self.columns[name][i].astype(datetime)
+            records.append(model(**values))
+        return records
+
+    def __len__(self) -> int:
+        return int(self.times.size)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les colonnes."""
+        return (
+            self.times.nbytes
+            + self.source_codes.nbytes
+            + sum(column.nbytes for column in self.columns.values())
+        )
+
+    @property
+    def sources(self) -> list[str]:
+        """Sources présentes dans les échantillons."""
+        return [self.source_names[code] for code in np.unique(self.source_codes)]
+
+    def take(self, index: np.ndarray) -> "HealthSamples":
+        """Sous-ensemble (masque booléen ou indices)."""
+        return HealthSamples(
+            self.kind,
+            self.times[index],
+            self.source_codes[index],
+            self.source_names,
+            {name: column[index] for name, column in self.columns.items()},
+        )
+
+    def sorted(self) -> "HealthSamples":
+        """Échantillons triés par horodatage (tri stable)."""
+        return self.take(np.argsort(self.times, kind="stable"))
+
+    def filter(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        sources: Sequence[str] | None = None,
+    ) -> "HealthSamples":
+        """
+        Échantillons dans l'intervalle [start, end] et des sources données.
+
+        Args:
+            start: Début (inclus)
+            end: Fin (incluse)
+            sources: Sources à conserver (toutes si None)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.times >= to_datetime64(start)
+        if end is not None:
+            mask &= self.times <= to_datetime64(end)
+        if sources:
+            wanted = [
+                code for code, name in enumerate(self.source_names) if name in sources
+            ]
+            mask &= np.isin(self.source_codes, wanted)
+        return self.take(mask)
+
+    def total(self, field: str) -> float:
+        """Somme d'une colonne (valeurs absentes ignorées)."""
+        return float(np.nansum(self.columns[field])) if len(self) else 0.0
+
+    def mean(self, field: str, decimals: int | None = None) -> float | None:
+        """Moyenne d'une colonne, None si aucune valeur."""
+        column = self.columns[field]
+        present = column[~np.isnan(column)]
+        if present.size == 0:
+            return None
+        value = float(present.mean())
+        return round(value, decimals) if decimals is not None else value
+
+    def trend(
+        self, field: str, min_points: int = 7, threshold: float = 0.05
+    ) -> str | None:
+        """
+        Tendance d'une colonne : moyenne de la seconde moitié (chronologique)
+        comparée à la première, avec une marge relative ``threshold``.
+
+        Returns:
+            "increasing", "decreasing", "stable" ou None (moins de
+            ``min_points`` échantillons)
+        """
+        if len(self) < min_points:
+            return None
+        values = self.columns[field][np.argsort(self.times, kind="stable")]
+        mid_point = values.size // 2
+        avg_first = float(np.nanmean(values[:mid_point]))
+        avg_second = float(np.nanmean(values[mid_point:]))
+        margin = avg_first * threshold
+        if avg_second > avg_first + margin:
+            return "increasing"
+        if avg_second < avg_first - margin:
+            return "decreasing"
+        return "stable"
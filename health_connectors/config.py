@@ -47,6 +47,41 @@ class HealthConnectorConfig(BaseSettings):
     max_days_back: int = 30
     auto_sync_enabled: bool = True
     batch_size: int = 100
+    sync_max_concurrency: int = 4
+    connector_timeout_seconds: float = 120.0
+    dataset_timeout_seconds: float = 60.0
+    sync_overlap_hours: int = 6
+
+    # Client HTTP partagé des API fournisseurs (pool, quotas, nouvelles tentatives)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_timeout_seconds: float = 30.0
+    http_max_retries: int = 3
+    http_backoff_seconds: float = 0.5
+    http_backoff_max_seconds: float = 60.0
+    provider_rate_limits: dict[str, float] = {
+        "samsung_health": 5.0,
+        "google_fit": 10.0,
+        "ios_health": 5.0,
+    }
+    provider_rate_burst: int = 10
+
+    # Fusion des enregistrements multi-sources (priority, quality, none)
+    source_priority: list[str] = ["ios_health", "samsung_health", "google_fit"]
+    merge_strategy: str = "priority"
+
+    # Rétention en jours des données brutes et des agrégats (None : illimitée)
+    rollup_retention_days: dict[str, int | None] = {
+        "raw": None,
+        "5min": 90,
+        "hour": 730,
+        "day": None,
+    }
+
+    # Imports d'exports santé (POST /health/import) : dossier autorisé et
+    # durée de conservation du suivi des imports terminés
+    import_root: str = "imports"
+    import_job_ttl_hours: float = 24.0
 
     # Configuration de sécurité
     encryption_key: str | None = None
@@ -64,6 +99,7 @@ class HealthConnectorConfig(BaseSettings):
 
     # Configuration des notifications
     notification_enabled: bool = True
+    health_alert_cooldown_hours: int = 168
     email_smtp_host: str | None = None
     email_smtp_port: int = 587
     email_username: str | None = None
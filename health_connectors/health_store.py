@@ -0,0 +1,751 @@
+"""
+ARKALIA ARIA - Stockage des données santé synchronisées
+=======================================================
+
+Les données récupérées par les connecteurs sont persistées dans la base ARIA
+(une ligne par enregistrement, clé type/source/horodatage, upsert idempotent).
+Les lectures (endpoints ``/health/data/*``, métriques unifiées, exports) sont
+des requêtes indexées par intervalle de temps, sans appel aux connecteurs, et
+mises en cache par version des données. Les sessions de sommeil et journées
+d'activité rapportées par plusieurs sources sont fusionnées à l'écriture
+(voir ``merge.py``) : seul le résultat est stocké, avec sa provenance. Les
+agrégats 5 minutes / heure / jour (voir ``rollups.py``) sont tenus à jour à
+chaque écriture pour servir les longues périodes avec un nombre de points
+borné.
+"""
+
+import json
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+from pydantic import BaseModel
+
+from core import DatabaseManager
+from core.cache import CacheManager
+from core.logging import get_logger
+
+from .columnar import (
+    EXTRA_TIME_FIELDS,
+    NUMERIC_FIELDS,
+    RECORD_MODELS,
+    TIME_FIELDS,
+    HealthSamples,
+)
+from .merge import (
+    DEFAULT_SOURCE_PRIORITY,
+    MERGE_STRATEGIES,
+    MERGED_KINDS,
+    Provenance,
+    merge_records,
+    record_key,
+)
+from .rollups import (
+    DEFAULT_MAX_POINTS,
+    DEFAULT_RETENTION_DAYS,
+    ROLLUP_TIERS,
+    bucket_start,
+    bucket_starts,
+    retention_cutoff,
+    select_resolution,
+)
+
+logger = get_logger("health_store")
+
+
+def _to_local_naive(moment: datetime) -> datetime:
+    """Heure locale sans fuseau (format de stockage des horodatages)."""
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+class HealthDataStore:
+    """
+    Données santé persistées, interrogées par intervalle de temps.
+
+    La version des données (compteur incrémenté à chaque écriture) sert de
+    clé de cache : tant qu'aucune synchronisation n'écrit, les lectures
+    répétées sont servies depuis le cache.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "aria_pain.db",
+        source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+        merge_strategy: str = "priority",
+        retention_days: Mapping[str, int | None] | None = None,
+    ) -> None:
+        """
+        Initialise le stockage.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+            source_priority: Sources par ordre de priorité pour la fusion
+            merge_strategy: Stratégie de fusion (priority, quality, none)
+            retention_days: Rétention en jours par niveau (raw, 5min, hour,
+                day ; None : illimitée)
+
+        Raises:
+            ValueError: Si la stratégie de fusion est inconnue
+        """
+        if merge_strategy not in MERGE_STRATEGIES:
+            raise ValueError(
+                f"Stratégie de fusion inconnue: {merge_strategy} "
+                f"(attendu : {', '.join(MERGE_STRATEGIES)})"
+            )
+        self.db = DatabaseManager(db_path)
+        self.source_priority = tuple(source_priority)
+        self.merge_strategy = merge_strategy
+        self.retention_days = {**DEFAULT_RETENTION_DAYS, **(retention_days or {})}
+        self.cache = CacheManager(default_ttl=300, max_size=200)
+        self._init_tables()
+
+    def _init_tables(self) -> None:
+        """Crée les tables et index du stockage."""
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS health_records (
+                kind TEXT NOT NULL,
+                source TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                provenance TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (kind, source, timestamp)
+            )
+            """)
+        columns = [
+            row[1] for row in self.db.execute_query("PRAGMA table_info(health_records)")
+        ]
+        if "provenance" not in columns:
+            self.db.execute_update("ALTER TABLE health_records ADD COLUMN provenance TEXT")
+        self.db.execute_update(
+            "CREATE INDEX IF NOT EXISTS idx_health_records_kind_time "
+            "ON health_records (kind, timestamp)"
+        )
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS health_store_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+            """)
+        self.db.execute_update(
+            "INSERT OR IGNORE INTO health_store_meta (id, version) VALUES (1, 0)"
+        )
+        rollups_exist = self.db.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name = 'health_rollups'"
+        )
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS health_rollups (
+                kind TEXT NOT NULL,
+                tier TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                source TEXT NOT NULL,
+                field TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                min REAL NOT NULL,
+                max REAL NOT NULL,
+                PRIMARY KEY (kind, tier, bucket, source, field)
+            )
+            """)
+        if not rollups_exist:
+            self.rebuild_rollups()
+
+    def data_version(self) -> int:
+        """Version courante des données (incrémentée à chaque écriture)."""
+        return int(
+            self.db.execute_query("SELECT version FROM health_store_meta WHERE id = 1")[
+                0
+            ]["version"]
+        )
+
+    def upsert(self, kind: str, records: Iterable[BaseModel]) -> int:
+        """
+        Insère ou remplace des enregistrements (idempotent).
+
+        Pour les types fusionnés, les enregistrements stockés qui peuvent
+        chevaucher les nouveaux sont relus et fusionnés avec eux ; seul le
+        résultat est réécrit.
+
+        Lecture, réécriture, agrégats et version forment une seule
+        transaction : en cas d'échec, les données stockées sont intactes.
+
+        Args:
+            kind: Type de données (activity, sleep, stress, health)
+            records: Modèles de données du type
+
+        Returns:
+            Nombre d'enregistrements écrits
+        """
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        records = list(records)
+        if not records:
+            return 0
+
+        with self.db.transaction():
+            replaced: list[tuple[str, str]] = []
+            if self.merge_strategy != "none" and kind in MERGED_KINDS:
+                merged, replaced = self._merge_with_stored(kind, records)
+            else:
+                merged = [(record, None) for record in records]
+
+            now = datetime.now().isoformat()
+            rows = [
+                (
+                    kind,
+                    record.source,
+                    self._record_time(kind, record),
+                    record.model_dump_json(),
+                    # Provenance conservée seulement pour un vrai regroupement
+                    json.dumps(provenance) if len(provenance or ()) > 1 else None,
+                    now,
+                )
+                for record, provenance in merged
+            ]
+            if replaced:
+                self.db.execute_many(
+                    "DELETE FROM health_records "
+                    "WHERE kind = ? AND source = ? AND timestamp = ?",
+                    [(kind, source, timestamp) for source, timestamp in replaced],
+                )
+            self.db.execute_many(
+                """
+                INSERT OR REPLACE INTO health_records
+                    (kind, source, timestamp, payload, provenance, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self._update_rollups(
+                kind,
+                [row[2] for row in rows] + [timestamp for _, timestamp in replaced],
+            )
+            self.db.execute_update(
+                "UPDATE health_store_meta SET version = version + 1 WHERE id = 1"
+            )
+        logger.debug(
+            f"💾 {len(rows)} enregistrements {kind} persistés "
+            f"({len(records)} reçus, {len(replaced)} fusionnés)"
+        )
+        return len(rows)
+
+    @staticmethod
+    def _record_time(kind: str, record: BaseModel) -> str:
+        return _to_local_naive(getattr(record, TIME_FIELDS[kind])).isoformat()
+
+    def _update_rollups(self, kind: str, timestamps: Sequence[str]) -> None:
+        """
+        Recalcule les agrégats des intervalles contenant ``timestamps``.
+
+        Chaque niveau est recalculé sur les seuls intervalles touchés, depuis
+        le niveau inférieur s'il est encore conservé sur tout l'intervalle,
+        sinon depuis les données brutes ; un intervalle dont aucune source
+        n'est plus conservée (rétention) garde ses agrégats.
+        """
+        raw_cutoff = retention_cutoff("raw", self.retention_days)
+        lower = "raw"
+        for tier in ROLLUP_TIERS:
+            buckets = bucket_starts(timestamps, tier)
+            if raw_cutoff is not None:
+                floor = bucket_start(raw_cutoff, tier).isoformat()
+                buckets = [bucket for bucket in buckets if bucket >= floor]
+            if buckets:
+                self.db.execute_update(
+                    "DELETE FROM health_rollups WHERE kind = ? AND tier = ? "
+                    "AND bucket IN (SELECT value FROM json_each(?))",
+                    (kind, tier, json.dumps(buckets)),
+                )
+                lower_cutoff = retention_cutoff(lower, self.retention_days)
+                floor = (
+                    bucket_start(lower_cutoff, tier).isoformat()
+                    if lower_cutoff is not None
+                    else ""
+                )
+                from_lower = [bucket for bucket in buckets if bucket >= floor]
+                from_raw = [bucket for bucket in buckets if bucket < floor]
+                self._compute_rollups(kind, tier, lower, from_lower)
+                self._compute_rollups(kind, tier, "raw", from_raw)
+            lower = tier
+
+    def _compute_rollups(
+        self, kind: str, tier: str, source_tier: str, buckets: list[str]
+    ) -> None:
+        """
+        Agrège les intervalles ``buckets`` d'un niveau depuis ``source_tier``.
+
+        La liste des intervalles pilote la jointure (``CROSS JOIN``) : chacun
+        est lu par l'index, sans parcourir le reste du type.
+        """
+        if not buckets:
+            return
+        step = ROLLUP_TIERS[tier][1]
+        if source_tier == "raw":
+            fields = ", ".join(f"'{name}'" for name in NUMERIC_FIELDS[kind])
+            aggregates = (
+                "r.source, j.key, COUNT(*), SUM(j.value), MIN(j.value), MAX(j.value)"
+            )
+            source_rows = f"""
+                FROM json_each(?) AS b
+                CROSS JOIN health_records AS r ON r.kind = ?
+                    AND r.timestamp >= b.value
+                    AND r.timestamp < strftime('%Y-%m-%dT%H:%M:%S', b.value, ?)
+                JOIN json_each(r.payload) AS j
+                WHERE j.key IN ({fields}) AND j.type IN ('integer', 'real')
+                GROUP BY b.value, r.source, j.key
+            """
+            params: tuple[Any, ...] = (kind, tier, json.dumps(buckets), kind, step)
+        else:
+            aggregates = (
+                "x.source, x.field, SUM(x.count), SUM(x.sum), MIN(x.min), MAX(x.max)"
+            )
+            source_rows = """
+                FROM json_each(?) AS b
+                CROSS JOIN health_rollups AS x ON x.kind = ? AND x.tier = ?
+                    AND x.bucket >= b.value
+                    AND x.bucket < strftime('%Y-%m-%dT%H:%M:%S', b.value, ?)
+                GROUP BY b.value, x.source, x.field
+            """
+            params = (kind, tier, json.dumps(buckets), kind, source_tier, step)
+        # OR REPLACE : deux écritures simultanées peuvent recalculer le même
+        # intervalle, toujours depuis les données courantes
+        self.db.execute_update(
+            "INSERT OR REPLACE INTO health_rollups "
+            "(kind, tier, bucket, source, field, count, sum, min, max) "
+            f"SELECT ?, ?, b.value, {aggregates} {source_rows}",
+            params,
+        )
+
+    def _merge_with_stored(
+        self, kind: str, records: list[BaseModel]
+    ) -> tuple[list[tuple[BaseModel, Provenance]], list[tuple[str, str]]]:
+        """
+        Fusionne de nouveaux enregistrements avec ceux déjà stockés.
+
+        Returns:
+            (enregistrements fusionnés avec provenance, clés stockées à supprimer)
+        """
+        moments = [_to_local_naive(getattr(r, TIME_FIELDS[kind])) for r in records]
+        if kind == "sleep":
+            # Une nuit dure moins de 24 h : une session stockée qui chevauche
+            # une nouvelle a commencé au plus un jour avant elle
+            low = min(moments) - timedelta(days=1)
+            high = max(_to_local_naive(r.sleep_end) for r in records)
+        else:
+            low = min(moments).replace(hour=0, minute=0, second=0, microsecond=0)
+            high = max(moments).replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ) + timedelta(days=1)
+        rows = self.db.execute_query(
+            """
+            SELECT source, timestamp, payload, provenance FROM health_records
+            WHERE kind = ? AND timestamp >= ? AND timestamp < ?
+            """,
+            (kind, low.isoformat(), high.isoformat()),
+        )
+
+        model = RECORD_MODELS[kind]
+        incoming = {(r.source, self._record_time(kind, r)) for r in records}
+        combined: list[BaseModel] = []
+        provenance: list[Provenance] = []
+        for row in rows:
+            # Un enregistrement resynchronisé remplace sa version stockée
+            if (row["source"], row["timestamp"]) in incoming:
+                continue
+            stored = model.model_validate_json(row["payload"])
+            combined.append(stored)
+            provenance.append(
+                json.loads(row["provenance"])
+                if row["provenance"]
+                else [{"source": stored.source, "key": record_key(kind, stored)}]
+            )
+        for record in records:
+            combined.append(record)
+            provenance.append([{"source": record.source, "key": record_key(kind, record)}])
+
+        merged = merge_records(
+            kind, combined, provenance, self.source_priority, self.merge_strategy
+        )
+        return merged, [(row["source"], row["timestamp"]) for row in rows]
+
+    def provenance(
+        self, kind: str, start_date: datetime, end_date: datetime
+    ) -> list[dict[str, Any]]:
+        """
+        Provenance des enregistrements fusionnés d'un intervalle.
+
+        Returns:
+            Pour chaque enregistrement : source retenue, horodatage et
+            enregistrements regroupés (source, début de session ou jour)
+        """
+        _, where, params = self._range_filter(kind, start_date, end_date, None)
+        rows = self.db.execute_query(
+            f"SELECT source, timestamp, provenance FROM health_records WHERE {where} "
+            "AND json_array_length(provenance) > 1 ORDER BY timestamp",
+            params,
+        )
+        return [
+            {
+                "source": row["source"],
+                "timestamp": row["timestamp"],
+                "merged_from": json.loads(row["provenance"]),
+            }
+            for row in rows
+        ]
+
+    def query(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+    ) -> list[Any]:
+        """
+        Enregistrements d'un type sur un intervalle, triés par horodatage.
+
+        Les bornes sont arrondies à la minute (début vers le bas, fin vers le
+        haut) pour que des lectures rapprochées partagent la même entrée de
+        cache.
+
+        Args:
+            kind: Type de données
+            start_date: Début de l'intervalle
+            end_date: Fin de l'intervalle
+            sources: Sources à inclure (toutes si None)
+
+        Returns:
+            Modèles de données du type
+        """
+        model = RECORD_MODELS.get(kind)
+        if model is None:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        cache_key, where, params = self._range_filter(
+            kind, start_date, end_date, sources
+        )
+        cached = self.cache.get(f"models:{cache_key}")
+        if cached is not None:
+            return list(cached)
+
+        rows = self.db.execute_query(
+            f"SELECT payload FROM health_records WHERE {where} ORDER BY timestamp",
+            params,
+        )
+        records = [model.model_validate_json(row["payload"]) for row in rows]
+        self.cache.set(f"models:{cache_key}", records)
+        return list(records)
+
+    def query_samples(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+    ) -> HealthSamples:
+        """
+        Enregistrements d'un type sur un intervalle, en colonnes.
+
+        Les mesures sont extraites par SQLite (``json_extract``) sans
+        construire de modèle pydantic ; à utiliser pour les agrégations.
+
+        Args:
+            kind: Type de données
+            start_date: Début de l'intervalle
+            end_date: Fin de l'intervalle
+            sources: Sources à inclure (toutes si None)
+
+        Returns:
+            Échantillons triés par horodatage
+        """
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        cache_key, where, params = self._range_filter(
+            kind, start_date, end_date, sources
+        )
+        cached = self.cache.get(f"samples:{cache_key}")
+        if cached is not None:
+            return cached
+
+        fields = [
+            f"json_extract(payload, '$.{name}')"
+            for name in (*NUMERIC_FIELDS[kind], *EXTRA_TIME_FIELDS.get(kind, ()))
+        ]
+        rows = self.db.execute_query(
+            f"SELECT timestamp, source, {', '.join(fields)} FROM health_records "
+            f"WHERE {where} ORDER BY timestamp",
+            params,
+        )
+        samples = HealthSamples.from_rows(kind, [tuple(row) for row in rows])
+        self.cache.set(f"samples:{cache_key}", samples)
+        return samples
+
+    def iter_payloads(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[str]:
+        """
+        JSON stocké des enregistrements d'un intervalle, par lots.
+
+        Aucun modèle n'est construit et au plus ``batch_size`` lignes sont en
+        mémoire : à utiliser pour les exports volumineux.
+        """
+        for row in self._iter_rows(
+            kind, "payload", start_date, end_date, sources, batch_size
+        ):
+            yield row["payload"]
+
+    def iter_fields(
+        self,
+        kind: str,
+        fields: Sequence[str],
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[tuple[Any, ...]]:
+        """
+        Champs des enregistrements d'un intervalle, extraits par SQLite.
+
+        Returns:
+            Tuples (horodatage, source, *champs), par lots de ``batch_size``
+        """
+        columns = ", ".join(f"json_extract(payload, '$.{name}')" for name in fields)
+        for row in self._iter_rows(
+            kind, columns, start_date, end_date, sources, batch_size
+        ):
+            yield tuple(row)[2:]
+
+    def _iter_rows(
+        self,
+        kind: str,
+        columns: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None,
+        batch_size: int,
+    ) -> Iterator[Any]:
+        """Lignes d'un intervalle, paginées sur la clé (horodatage, source)."""
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        _, where, params = self._range_filter(kind, start_date, end_date, sources)
+        last: tuple[str, str] | None = None
+        while True:
+            page_where, page_params = where, params
+            if last is not None:
+                # La borne basse devient le dernier horodatage lu : chaque page
+                # reprend sur l'index au lieu de rebalayer depuis le début
+                page_where += " AND (timestamp > ? OR source > ?)"
+                page_params = (params[0], last[0], *params[2:], *last)
+            rows = self.db.execute_query(
+                f"SELECT timestamp, source, {columns} FROM health_records "
+                f"WHERE {page_where} ORDER BY timestamp, source LIMIT ?",
+                (*page_params, batch_size),
+            )
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1]["timestamp"], rows[-1]["source"])
+
+    def daily_rollups(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Agrégats quotidiens d'un type, calculés par SQLite en une requête.
+
+        Returns:
+            Par jour : ``date``, ``count`` et, pour chaque mesure, nombre de
+            valeurs, somme, moyenne, minimum et maximum
+        """
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        cache_key, where, params = self._range_filter(
+            kind, start_date, end_date, sources
+        )
+        cached = self.cache.get(f"daily:{cache_key}")
+        if cached is not None:
+            return list(cached)
+
+        fields = NUMERIC_FIELDS[kind]
+        extracted = ", ".join(
+            f"json_extract(payload, '$.{name}') AS {name}" for name in fields
+        )
+        aggregates = ", ".join(
+            f"COUNT({name}), SUM({name}), AVG({name}), MIN({name}), MAX({name})"
+            for name in fields
+        )
+        rows = self.db.execute_query(
+            f"SELECT day, COUNT(*), {aggregates} FROM ("
+            f"SELECT substr(timestamp, 1, 10) AS day, {extracted} "
+            f"FROM health_records WHERE {where}) GROUP BY day ORDER BY day",
+            params,
+        )
+        rollups = []
+        for row in rows:
+            values = tuple(row)
+            rollup: dict[str, Any] = {"date": values[0], "count": values[1]}
+            for index, name in enumerate(fields):
+                count, total, mean, low, high = values[2 + 5 * index : 7 + 5 * index]
+                if count:
+                    rollup[name] = {
+                        "count": count,
+                        "sum": total,
+                        "mean": round(mean, 3),
+                        "min": low,
+                        "max": high,
+                    }
+            rollups.append(rollup)
+        self.cache.set(f"daily:{cache_key}", rollups)
+        return list(rollups)
+
+    def rollups(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        resolution: str = "auto",
+        sources: list[str] | None = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+    ) -> tuple[str, list[dict[str, Any]]]:
+        """
+        Série agrégée d'un type sur un intervalle, toutes sources confondues.
+
+        Args:
+            kind: Type de données
+            start_date: Début de l'intervalle
+            end_date: Fin de l'intervalle
+            resolution: Niveau (5min, hour, day) ou auto pour le niveau le
+                plus fin couvrant l'intervalle en ``max_points`` points au plus
+            sources: Sources à inclure (toutes si None)
+            max_points: Nombre de points visé en résolution automatique
+
+        Returns:
+            (niveau retenu, points triés) ; chaque point a un ``timestamp``
+            (début de l'intervalle) et, par mesure, nombre de valeurs,
+            somme, moyenne, minimum et maximum
+        """
+        if kind not in RECORD_MODELS:
+            raise ValueError(f"Type de données inconnu: {kind}")
+        if resolution == "auto":
+            resolution = select_resolution(
+                _to_local_naive(start_date),
+                _to_local_naive(end_date),
+                self.retention_days,
+                max_points,
+            )
+        if resolution not in ROLLUP_TIERS:
+            raise ValueError(f"Résolution inconnue: {resolution}")
+
+        # L'intervalle partiel du début est inclus en entier
+        start = bucket_start(_to_local_naive(start_date), resolution)
+        cache_key, _, params = self._range_filter(kind, start, end_date, sources)
+        cached = self.cache.get(f"rollups:{resolution}:{cache_key}")
+        if cached is not None:
+            return resolution, list(cached)
+
+        where = "kind = ? AND tier = ? AND bucket >= ? AND bucket < ?"
+        if sources:
+            where += f" AND source IN ({', '.join('?' * len(sources))})"
+        rows = self.db.execute_query(
+            "SELECT bucket, field, SUM(count), SUM(sum), MIN(min), MAX(max) "
+            f"FROM health_rollups WHERE {where} "
+            "GROUP BY bucket, field ORDER BY bucket",
+            (kind, resolution, *params[1:]),
+        )
+        points: list[dict[str, Any]] = []
+        for bucket, name, count, total, low, high in (tuple(row) for row in rows):
+            if not points or points[-1]["timestamp"] != bucket:
+                points.append({"timestamp": bucket})
+            points[-1][name] = {
+                "count": count,
+                "sum": total,
+                "mean": round(total / count, 3),
+                "min": low,
+                "max": high,
+            }
+        self.cache.set(f"rollups:{resolution}:{cache_key}", points)
+        return resolution, list(points)
+
+    def rebuild_rollups(self, kind: str | None = None) -> None:
+        """Recalcule tous les agrégats (d'un type ou de tous) depuis les données."""
+        for name in [kind] if kind else RECORD_MODELS:
+            self.db.execute_update("DELETE FROM health_rollups WHERE kind = ?", (name,))
+            timestamps = [
+                row["timestamp"]
+                for row in self.db.execute_query(
+                    "SELECT timestamp FROM health_records WHERE kind = ?", (name,)
+                )
+            ]
+            if timestamps:
+                self._update_rollups(name, timestamps)
+                logger.info(
+                    f"📊 Agrégats {name} recalculés "
+                    f"({len(timestamps)} enregistrements)"
+                )
+
+    def apply_retention(self, now: datetime | None = None) -> dict[str, int]:
+        """
+        Supprime les données et agrégats plus anciens que leur rétention.
+
+        Returns:
+            Nombre de lignes supprimées par niveau
+        """
+        deleted: dict[str, int] = {}
+        for tier in ("raw", *ROLLUP_TIERS):
+            cutoff = retention_cutoff(tier, self.retention_days, now)
+            if cutoff is None:
+                continue
+            if tier == "raw":
+                deleted[tier] = self.db.execute_update(
+                    "DELETE FROM health_records WHERE timestamp < ?",
+                    (cutoff.isoformat(),),
+                )
+            else:
+                deleted[tier] = self.db.execute_update(
+                    "DELETE FROM health_rollups WHERE tier = ? AND bucket < ?",
+                    (tier, bucket_start(cutoff, tier).isoformat()),
+                )
+        if any(deleted.values()):
+            self.db.execute_update(
+                "UPDATE health_store_meta SET version = version + 1 WHERE id = 1"
+            )
+            logger.info(f"🧹 Rétention appliquée: {deleted}")
+        return deleted
+
+    def _range_filter(
+        self,
+        kind: str,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None,
+    ) -> tuple[str, str, tuple[Any, ...]]:
+        """Clé de cache, clause WHERE et paramètres d'une requête par intervalle."""
+        start = _to_local_naive(start_date).replace(second=0, microsecond=0)
+        end = _to_local_naive(end_date).replace(second=0, microsecond=0) + timedelta(
+            minutes=1
+        )
+        source_key = ",".join(sorted(sources)) if sources else "*"
+        cache_key = (
+            f"{kind}:{self.data_version()}:{start.isoformat()}:"
+            f"{end.isoformat()}:{source_key}"
+        )
+        where = "kind = ? AND timestamp >= ? AND timestamp < ?"
+        params: list[Any] = [kind, start.isoformat(), end.isoformat()]
+        if sources:
+            where += f" AND source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        return cache_key, where, tuple(params)
+
+    def count(self, kind: str | None = None) -> int:
+        """Nombre d'enregistrements stockés (d'un type ou au total)."""
+        if kind is None:
+            return self.db.get_count("health_records")
+        return self.db.get_count("health_records", "kind = ?", (kind,))
@@ -0,0 +1,311 @@
+"""
+ARKALIA ARIA - Client HTTP partagé des connecteurs santé
+========================================================
+
+Couche HTTP commune des API fournisseurs (Samsung Health, Google Fit,
+Apple) :
+
+- un ``httpx.AsyncClient`` par boucle asyncio, partagé par tous les
+  connecteurs : connexions maintenues ouvertes et réutilisées (keep-alive),
+  HTTP/2 si le paquet ``h2`` est installé ;
+- un seau à jetons par fournisseur (requêtes par seconde, rafale) : les
+  requêtes d'un fournisseur s'espacent sans se sérialiser ni ralentir les
+  autres fournisseurs ;
+- nouvelles tentatives avec attente exponentielle sur 429, 5xx et erreurs
+  de transport, en respectant ``Retry-After`` ;
+- GET conditionnels : ``ETag`` / ``Last-Modified`` d'une réponse précédente
+  sont renvoyés et un 304 est servi depuis le cache.
+"""
+
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+from core.logging import get_logger
+
+from .config import HealthConnectorConfig
+
+logger = get_logger("health_http")
+
+# Codes réessayés : quota dépassé et erreurs serveur transitoires
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class TokenBucket:
+    """
+    Seau à jetons : ``rate`` requêtes par seconde, rafales de ``capacity``.
+
+    Un appel réserve son jeton sous un verrou (sans attente) puis patiente
+    hors du verrou : des requêtes concurrentes s'échelonnent sans s'attendre
+    mutuellement, quelle que soit la boucle asyncio qui les émet.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """
+        Initialise le seau (plein).
+
+        Args:
+            rate: Jetons ajoutés par seconde
+            capacity: Nombre maximal de jetons (taille de rafale)
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Le débit et la capacité doivent être positifs")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Réserve un jeton ; retourne l'attente avant de l'utiliser (secondes)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        """Attend qu'un jeton soit disponible."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HealthHTTPClient:
+    """
+    Client HTTP asynchrone partagé par les connecteurs santé.
+
+    Les requêtes sont attribuées à un fournisseur (nom du connecteur) pour
+    le quota et les statistiques.
+    """
+
+    def __init__(
+        self,
+        config: HealthConnectorConfig | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache_size: int = 256,
+    ) -> None:
+        """
+        Initialise le client.
+
+        Args:
+            config: Configuration (pool, délais, quotas par fournisseur)
+            transport: Transport httpx (tests ; réseau par défaut)
+            cache_size: Nombre de réponses conservées pour les GET conditionnels
+        """
+        self.config = config or HealthConnectorConfig()
+        self.transport = transport
+        self.http2 = HTTP2_AVAILABLE
+        self.cache_size = cache_size
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._buckets: dict[str, TokenBucket | None] = {}
+        self._cache: OrderedDict[str, httpx.Response] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        """Client de la boucle courante (un pool de connexions par boucle)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.config.http_max_connections,
+                    max_keepalive_connections=(
+                        self.config.http_max_keepalive_connections
+                    ),
+                ),
+                timeout=self.config.http_timeout_seconds,
+                transport=self.transport,
+            )
+            self._clients[loop] = client
+        return client
+
+    def bucket(self, provider: str) -> TokenBucket | None:
+        """Seau à jetons d'un fournisseur (None : pas de quota configuré)."""
+        with self._lock:
+            if provider not in self._buckets:
+                rate = self.config.provider_rate_limits.get(provider)
+                self._buckets[provider] = (
+                    TokenBucket(rate, self.config.provider_rate_burst) if rate else None
+                )
+            return self._buckets[provider]
+
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        conditional: bool = True,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Envoie une requête en respectant le quota du fournisseur.
+
+        Args:
+            provider: Fournisseur (nom du connecteur)
+            method: Méthode HTTP
+            url: URL absolue
+            conditional: Pour un GET, revalider une réponse déjà reçue
+            **kwargs: Arguments de ``httpx.AsyncClient.build_request``
+                (params, headers, json, content...)
+
+        Returns:
+            Réponse finale ; un 304 est remplacé par la réponse en cache
+
+        Raises:
+            httpx.TransportError: Si le transport échoue après tous les essais
+        """
+        client = self._client()
+        request = client.build_request(method, url, **kwargs)
+        cache_key = str(request.url)
+        cached = None
+        if conditional and request.method == "GET":
+            with self._lock:
+                cached = self._cache.get(cache_key)
+            if cached is not None:
+                if "ETag" in cached.headers:
+                    request.headers["If-None-Match"] = cached.headers["ETag"]
+                if "Last-Modified" in cached.headers:
+                    request.headers["If-Modified-Since"] = cached.headers[
+                        "Last-Modified"
+                    ]
+
+        response = await self._send(provider, client, request)
+
+        if cached is not None and response.status_code == 304:
+            self._count(provider, "not_modified")
+            # Contenu déjà décodé : les en-têtes d'encodage ne s'appliquent plus
+            headers = [
+                (name, value)
+                for name, value in cached.headers.items()
+                if name.lower() not in _TRANSFER_HEADERS
+            ]
+            return httpx.Response(
+                cached.status_code,
+                headers=headers,
+                content=cached.content,
+                request=request,
+            )
+        if (
+            conditional
+            and request.method == "GET"
+            and response.status_code == 200
+            and ("ETag" in response.headers or "Last-Modified" in response.headers)
+        ):
+            with self._lock:
+                self._cache[cache_key] = response
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return response
+
+    async def get(self, provider: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Raccourci pour une requête GET (conditionnelle par défaut)."""
+        return await self.request(provider, "GET", url, **kwargs)
+
+    async def _send(
+        self, provider: str, client: httpx.AsyncClient, request: httpx.Request
+    ) -> httpx.Response:
+        """Envoie une requête, avec nouvelles tentatives sur 429/5xx."""
+        bucket = self.bucket(provider)
+        max_retries = self.config.http_max_retries
+        attempt = 0
+        while True:
+            if bucket is not None:
+                await bucket.acquire()
+            self._count(provider, "requests")
+            try:
+                response = await client.send(request)
+            except httpx.TransportError as e:
+                self._count(provider, "errors")
+                if attempt == max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+                reason = str(e) or type(e).__name__
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt == max_retries
+                ):
+                    return response
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                reason = f"HTTP {response.status_code}"
+            attempt += 1
+            self._count(provider, "retries")
+            logger.warning(
+                f"🔁 {provider} {request.method} {request.url.path}: {reason}, "
+                f"nouvel essai dans {delay:.2f}s ({attempt}/{max_retries})"
+            )
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        """Attente avant un nouvel essai : ``Retry-After`` sinon exponentielle."""
+        limit = self.config.http_backoff_max_seconds
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), limit)
+            except ValueError:
+                try:
+                    moment = parsedate_to_datetime(retry_after)
+                    wait = (moment - datetime.now(timezone.utc)).total_seconds()
+                    return min(max(wait, 0.0), limit)
+                except (TypeError, ValueError):
+                    pass
+        base = self.config.http_backoff_seconds
+        return min(base * 2**attempt + random.uniform(0, base), limit)  # nosec B311
+
+    def _count(self, provider: str, counter: str) -> None:
+        with self._lock:
+            counters = self.stats.setdefault(
+                provider,
+                {"requests": 0, "retries": 0, "errors": 0, "not_modified": 0},
+            )
+            counters[counter] += 1
+
+    def get_status(self) -> dict[str, Any]:
+        """Statut du client : HTTP/2, quotas et compteurs par fournisseur."""
+        with self._lock:
+            return {
+                "http2": self.http2,
+                "rate_limits": dict(self.config.provider_rate_limits),
+                "cached_responses": len(self._cache),
+                "providers": {name: dict(c) for name, c in self.stats.items()},
+            }
+
+    async def aclose(self) -> None:
+        """Ferme le pool de connexions de la boucle courante."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# Instance globale (singleton)
+_http_client: HealthHTTPClient | None = None
+
+
+def get_health_http_client() -> HealthHTTPClient:
+    """Récupère ou crée le client HTTP partagé des connecteurs."""
+    global _http_client
+    if _http_client is None:
+        _http_client = HealthHTTPClient()
+    return _http_client
@@ -9,13 +9,16 @@ Connecteur pour iOS Health permettant la synchronisation des données :
 - Données de santé (glycémie, tension si disponibles)
 """
 
-import json
+import asyncio
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any
 
+from .apple_health_import import AppleHealthImporter, ProgressCallback
 from .base_connector import BaseHealthConnector
 from .data_models import ActivityData, HealthData, SleepData, StressData
+from .record_writer import DailyRecordWriter
 
 
 class IOSHealthConnector(BaseHealthConnector):
@@ -31,6 +34,7 @@ class IOSHealthConnector(BaseHealthConnector):
         super().__init__("ios_health")
         self.data_dir = Path("dacc/ios_health_data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.writer = DailyRecordWriter(self.data_dir)
 
     async def connect(self) -> bool:
         """
@@ -55,6 +59,26 @@ class IOSHealthConnector(BaseHealthConnector):
         """Ferme la connexion avec iOS Health."""
         self.is_connected = False
 
+    async def import_export_file(
+        self,
+        export_path: str | Path,
+        db_path: str = "aria_pain.db",
+        progress: ProgressCallback | None = None,
+    ) -> dict[str, Any]:
+        """
+        Importe un export Apple Santé (``export.xml``) hors ligne.
+
+        Args:
+            export_path: Chemin du fichier exporté depuis l'app Santé
+            db_path: Base ARIA cible
+            progress: Appelée régulièrement avec l'avancement
+
+        Returns:
+            Résumé de l'import
+        """
+        importer = AppleHealthImporter(db_path, source=self.connector_name)
+        return await asyncio.to_thread(importer.import_file, export_path, progress)
+
     async def get_activity_data(
         self, start_date: datetime, end_date: datetime
     ) -> list[ActivityData]:
@@ -99,11 +123,12 @@ class IOSHealthConnector(BaseHealthConnector):
             )
             activity_data.append(activity)
 
-            # Sauvegarde des données
-            await self._save_activity_data(activity)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_activity_data(activity)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return activity_data
 
     async def get_sleep_data(
@@ -155,11 +180,12 @@ class IOSHealthConnector(BaseHealthConnector):
             )
             sleep_data.append(sleep)
 
-            # Sauvegarde des données
-            await self._save_sleep_data(sleep)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_sleep_data(sleep)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return sleep_data
 
     async def get_stress_data(
@@ -204,11 +230,12 @@ class IOSHealthConnector(BaseHealthConnector):
                 )
                 stress_data.append(stress)
 
-                # Sauvegarde des données
-                await self._save_stress_data(stress)
+                # Mise en tampon (écrite en un lot en fin de récupération)
+                self._save_stress_data(stress)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return stress_data
 
     async def get_health_data(
@@ -257,11 +284,12 @@ class IOSHealthConnector(BaseHealthConnector):
             )
             health_data.append(health)
 
-            # Sauvegarde des données
-            await self._save_health_data(health)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_health_data(health)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return health_data
 
     # Méthodes utilitaires pour générer des données réalistes
@@ -318,26 +346,18 @@ class IOSHealthConnector(BaseHealthConnector):
         return round(random.uniform(36.1, 37.2), 1)  # nosec B311
 
     # Méthodes de sauvegarde des données
-    async def _save_activity_data(self, activity: ActivityData) -> None:
+    def _save_activity_data(self, activity: ActivityData) -> None:
         """Sauvegarde les données d'activité."""
-        file_path = self.data_dir / f"activity_{activity.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(activity.dict(), f, default=str, indent=2)
+        self.writer.add("activity", activity.timestamp.date(), activity)
 
-    async def _save_sleep_data(self, sleep: SleepData) -> None:
+    def _save_sleep_data(self, sleep: SleepData) -> None:
         """Sauvegarde les données de sommeil."""
-        file_path = self.data_dir / f"sleep_{sleep.sleep_start.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(sleep.dict(), f, default=str, indent=2)
+        self.writer.add("sleep", sleep.sleep_start.date(), sleep)
 
-    async def _save_stress_data(self, stress: StressData) -> None:
+    def _save_stress_data(self, stress: StressData) -> None:
         """Sauvegarde les données de stress."""
-        file_path = self.data_dir / f"stress_{stress.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(stress.dict(), f, default=str, indent=2)
+        self.writer.add("stress", stress.timestamp.date(), stress)
 
-    async def _save_health_data(self, health: HealthData) -> None:
+    def _save_health_data(self, health: HealthData) -> None:
         """Sauvegarde les données de santé."""
-        file_path = self.data_dir / f"health_{health.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(health.dict(), f, default=str, indent=2)
+        self.writer.add("health", health.timestamp.date(), health)
@@ -0,0 +1,186 @@
+"""
+ARKALIA ARIA - Fusion des enregistrements santé multi-sources
+=============================================================
+
+Quand plusieurs connecteurs rapportent la même nuit ou la même journée,
+les enregistrements se chevauchent et les métriques les compteraient deux
+fois. La fusion :
+
+- regroupe les sessions de sommeil qui se chevauchent (index d'intervalles :
+  tri par début puis maximum cumulé des fins, O(n log n)) et n'en garde
+  qu'une par groupe ;
+- ne garde, pour chaque jour d'activité, que les enregistrements de la
+  source prioritaire présente ce jour-là.
+
+La sélection (plutôt qu'une moyenne) rend la fusion associative : fusionner
+un enregistrement déjà fusionné avec de nouvelles données donne le même
+résultat que tout fusionner d'un coup, ce qui permet de ne stocker que le
+résultat. La provenance (sources et enregistrements regroupés) est conservée.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from .columnar import TIME_FIELDS, to_datetime64
+from .data_models import ActivityData, SleepData
+
+# Types fusionnés (les autres sont conservés tels quels)
+MERGED_KINDS = ("sleep", "activity")
+
+# Stratégies de choix au sein d'un groupe
+MERGE_STRATEGIES = ("priority", "quality", "none")
+
+# Priorité par défaut : capteurs portés en continu d'abord
+DEFAULT_SOURCE_PRIORITY = ("ios_health", "samsung_health", "google_fit")
+
+Provenance = list[dict[str, str]]
+
+
+def record_key(kind: str, record: BaseModel) -> str:
+    """Clé de provenance d'un enregistrement (début de session ou jour)."""
+    moment = to_datetime64(getattr(record, TIME_FIELDS[kind]))
+    return str(moment.astype("datetime64[D]")) if kind == "activity" else str(moment)
+
+
+def source_ranks(sources: Sequence[str], source_priority: Sequence[str]) -> np.ndarray:
+    """
+    Rang de chaque source (0 = prioritaire).
+
+    Les sources absentes de ``source_priority`` viennent ensuite, par ordre
+    alphabétique : deux sources distinctes n'ont jamais le même rang.
+    """
+    unknown = sorted(set(sources) - set(source_priority))
+    ranks = {name: i for i, name in enumerate(source_priority)}
+    ranks.update({name: len(source_priority) + i for i, name in enumerate(unknown)})
+    return np.array([ranks[name] for name in sources], dtype=np.int64)
+
+
+def _union(provenances: Sequence[Provenance]) -> Provenance:
+    """Union (sans doublon, triée) de listes de provenance."""
+    entries = {(p["source"], p["key"]) for provenance in provenances for p in provenance}
+    return [{"source": source, "key": key} for source, key in sorted(entries)]
+
+
+def merge_sleep_sessions(
+    records: Sequence[SleepData],
+    provenance: Sequence[Provenance],
+    source_priority: Sequence[str],
+    strategy: str = "priority",
+) -> list[tuple[SleepData, Provenance]]:
+    """
+    Fusionne les sessions de sommeil qui se chevauchent.
+
+    Args:
+        records: Sessions (toutes sources confondues)
+        provenance: Provenance de chaque session
+        source_priority: Sources par ordre de priorité
+        strategy: ``priority`` (source prioritaire puis session la plus
+            longue) ou ``quality`` (meilleur score de qualité puis priorité)
+
+    Returns:
+        Une session par groupe, avec la provenance du groupe, par début croissant
+    """
+    if not records:
+        return []
+    starts = np.array([to_datetime64(r.sleep_start) for r in records]).astype(np.int64)
+    ends = np.array([to_datetime64(r.sleep_end) for r in records]).astype(np.int64)
+    order = np.argsort(starts, kind="stable")
+
+    # Nouveau groupe quand la session commence après toutes les fins précédentes
+    running_end = np.maximum.accumulate(ends[order])
+    new_group = np.ones(len(records), dtype=bool)
+    new_group[1:] = starts[order][1:] >= running_end[:-1]
+    groups = np.cumsum(new_group) - 1
+
+    ranks = source_ranks([r.source for r in records], source_priority)[order]
+    durations = np.array([r.duration_minutes for r in records], dtype=np.float64)[order]
+    qualities = np.array(
+        [-1.0 if r.quality_score is None else r.quality_score for r in records]
+    )[order]
+    if strategy == "quality":
+        keys = (ranks, -qualities, groups)
+    else:
+        keys = (-durations, ranks, groups)
+    best = np.lexsort(keys)
+    first = np.ones(best.size, dtype=bool)
+    first[1:] = groups[best][1:] != groups[best][:-1]
+    winners = order[best[first]]
+
+    members: list[list[int]] = [[] for _ in range(int(groups[-1]) + 1)]
+    for position, group in enumerate(groups):
+        members[group].append(int(order[position]))
+    return [
+        (records[winner], _union([provenance[i] for i in members[group]]))
+        for group, winner in enumerate(winners)
+    ]
+
+
+def merge_daily_activity(
+    records: Sequence[ActivityData],
+    provenance: Sequence[Provenance],
+    source_priority: Sequence[str],
+) -> list[tuple[ActivityData, Provenance]]:
+    """
+    Ne garde, pour chaque jour, que l'activité de la source prioritaire.
+
+    Args:
+        records: Enregistrements d'activité (toutes sources confondues)
+        provenance: Provenance de chaque enregistrement
+        source_priority: Sources par ordre de priorité
+
+    Returns:
+        Enregistrements conservés avec la provenance de leur jour
+    """
+    if not records:
+        return []
+    days = np.array(
+        [to_datetime64(r.timestamp).astype("datetime64[D]") for r in records]
+    )
+    unique_days, inverse = np.unique(days, return_inverse=True)
+    ranks = source_ranks([r.source for r in records], source_priority)
+    best_rank = np.full(unique_days.size, np.iinfo(np.int64).max)
+    np.minimum.at(best_rank, inverse, ranks)
+    keep = np.flatnonzero(ranks == best_rank[inverse])
+
+    day_provenance: list[list[Provenance]] = [[] for _ in range(unique_days.size)]
+    for i, day in enumerate(inverse):
+        day_provenance[day].append(provenance[i])
+    merged_days = [_union(entries) for entries in day_provenance]
+    return [(records[i], merged_days[inverse[i]]) for i in keep]
+
+
+def merge_records(
+    kind: str,
+    records: Sequence[Any],
+    provenance: Sequence[Provenance] | None,
+    source_priority: Sequence[str],
+    strategy: str = "priority",
+) -> list[tuple[Any, Provenance]]:
+    """
+    Fusionne des enregistrements d'un type (sans effet hors ``MERGED_KINDS``).
+
+    Args:
+        kind: Type de données
+        records: Enregistrements
+        provenance: Provenance existante de chaque enregistrement (celle de
+            l'enregistrement lui-même si None)
+        source_priority: Sources par ordre de priorité
+        strategy: Voir ``MERGE_STRATEGIES``
+
+    Returns:
+        Paires (enregistrement conservé, provenance)
+    """
+    if strategy not in MERGE_STRATEGIES:
+        raise ValueError(f"Stratégie de fusion inconnue: {strategy}")
+    if provenance is None:
+        provenance = [
+            [{"source": r.source, "key": record_key(kind, r)}] for r in records
+        ]
+    if strategy == "none" or kind not in MERGED_KINDS:
+        return list(zip(records, provenance, strict=True))
+    if kind == "sleep":
+        return merge_sleep_sessions(records, provenance, source_priority, strategy)
+    return merge_daily_activity(records, provenance, source_priority)
@@ -0,0 +1,96 @@
+"""
+ARKALIA ARIA - Écriture groupée des données connecteurs
+=======================================================
+
+Les connecteurs accumulent leurs enregistrements pendant une synchronisation
+puis les écrivent en un seul lot, dans un thread, hors de la boucle asyncio.
+La disposition sur disque est inchangée (un fichier JSON par métrique et par
+jour, ``<type>_<date>.json``) mais l'encodage est compact.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+# Encodage compact (pas d'indentation ni d'espaces)
+JSON_SEPARATORS = (",", ":")
+
+
+class DailyRecordWriter:
+    """
+    Tampon d'écriture des enregistrements quotidiens d'un connecteur.
+
+    Un seul enregistrement est conservé par (type, jour) : le dernier ajouté,
+    comme le faisait l'écriture directe qui écrasait le fichier du jour.
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        """
+        Initialise le tampon.
+
+        Args:
+            data_dir: Dossier des fichiers du connecteur
+        """
+        self.data_dir = data_dir
+        self._pending: dict[tuple[str, date], dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, kind: str, day: date, record: BaseModel) -> None:
+        """
+        Ajoute un enregistrement au lot courant (sans écriture disque).
+
+        Args:
+            kind: Type de données (activity, sleep, stress, health)
+            day: Jour de l'enregistrement
+            record: Modèle de données à sauvegarder
+        """
+        self._pending[(kind, day)] = record.dict()
+
+    async def flush(self) -> int:
+        """
+        Écrit le lot courant dans un thread.
+
+        Returns:
+            Nombre de fichiers écrits
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        return await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: dict[tuple[str, date], dict[str, Any]]) -> int:
+        """
+        Écrit chaque fichier du lot (remplacement atomique).
+
+        Chaque écriture passe par un fichier temporaire propre : deux
+        synchronisations simultanées sur le même jour ne partagent pas de
+        chemin, la dernière à remplacer le fichier l'emporte.
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        for (kind, day), record in batch.items():
+            file_path = self.data_dir / f"{kind}_{day}.json"
+            tmp_file = tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.data_dir,
+                prefix=f"{file_path.name}.",
+                suffix=".tmp",
+                delete=False,
+            )
+            tmp_path = Path(tmp_file.name)
+            try:
+                with tmp_file as f:
+                    json.dump(record, f, default=str, separators=JSON_SEPARATORS)
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        return len(batch)
@@ -5,8 +5,8 @@ ARKALIA ARIA - Générateur de Rapports Automatiques
 Génère des rapports périodiques (hebdomadaires/mensuels) automatiquement.
 """
 
+import asyncio
 import json
-import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -19,6 +19,9 @@ logger = get_logger("health_reports")
 class HealthReportGenerator:
     """Générateur de rapports de santé automatiques."""
 
+    WEEKLY_JOB = "weekly_report"
+    PERIOD_LABELS = {"weekly": "hebdomadaire", "monthly": "mensuel"}
+
     def __init__(self, reports_dir: Path | str = "reports") -> None:
         """
         Initialise le générateur de rapports.
@@ -29,174 +32,110 @@ class HealthReportGenerator:
         self.reports_dir = Path(reports_dir)
         self.reports_dir.mkdir(exist_ok=True)
         self.is_running = False
-        self.report_thread: threading.Thread | None = None
 
     def start_weekly_reports(self) -> bool:
-        """Démarre la génération de rapports hebdomadaires automatiques."""
+        """
+        Démarre la génération de rapports hebdomadaires automatiques.
+
+        La génération est une tâche du planificateur commun
+        (``weekly_report``).
+        """
+        from core.scheduler import IntervalTrigger, get_scheduler
+
         if self.is_running:
             return False
 
         self.is_running = True
-        self.report_thread = threading.Thread(
-            target=self._weekly_report_loop, daemon=True
+        scheduler = get_scheduler()
+        scheduler.add_job(
+            self.WEEKLY_JOB,
+            self._weekly_report_job,
+            IntervalTrigger(7 * 24 * 3600),
+            jitter_seconds=600.0,
+            run_immediately=True,
         )
-        self.report_thread.start()
+        scheduler.start()
         logger.info("✅ Génération rapports hebdomadaires démarrée")
         return True
 
     def stop_weekly_reports(self) -> bool:
         """Arrête la génération de rapports automatiques."""
+        from core.scheduler import get_scheduler
+
         if not self.is_running:
             return False
 
         self.is_running = False
-        if self.report_thread and self.report_thread.is_alive():
-            self.report_thread.join(timeout=5.0)
+        get_scheduler().remove_job(self.WEEKLY_JOB)
         logger.info("⏹️ Génération rapports hebdomadaires arrêtée")
         return True
 
-    def _weekly_report_loop(self) -> None:
-        """Boucle pour générer des rapports hebdomadaires."""
-        logger.info("🔄 Boucle rapports hebdomadaires démarrée")
-
-        while self.is_running:
-            try:
-                # Générer rapport hebdomadaire
-                self.generate_weekly_report()
-
-                # Attendre 7 jours
-                wait_event = threading.Event()
-                wait_seconds = 7 * 24 * 3600  # 7 jours
-                remaining_seconds = wait_seconds
-                while remaining_seconds > 0 and self.is_running:
-                    wait_time = min(
-                        3600, remaining_seconds
-                    )  # Vérifier toutes les heures
-                    wait_event.wait(wait_time)
-                    remaining_seconds -= wait_time
+    async def _weekly_report_job(self) -> None:
+        """Rapport hebdomadaire planifié (les erreurs remontent au planificateur)."""
+        report = await self._build_report("weekly", days=7)
+        await asyncio.to_thread(self._save_report, report)
 
-            except Exception as e:
-                logger.error(f"❌ Erreur dans boucle rapports: {e}")
+    async def _build_report(self, period_type: str, days: int) -> dict[str, Any]:
+        """Construit le rapport d'une période à partir des données unifiées."""
+        from health_connectors.sync_manager import HealthSyncManager
 
-        logger.info("🔄 Boucle rapports hebdomadaires arrêtée")
+        sync_manager = HealthSyncManager()
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
 
-    def generate_weekly_report(self) -> dict[str, Any]:
-        """Génère un rapport hebdomadaire."""
+        activity_data = await sync_manager.get_unified_activity_data(
+            start_date, end_date
+        )
+        sleep_data = await sync_manager.get_unified_sleep_data(start_date, end_date)
+        stress_data = await sync_manager.get_unified_stress_data(start_date, end_date)
+        metrics = await sync_manager._generate_unified_metrics(days_back=days)
+
+        return {
+            "period": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "type": period_type,
+            },
+            "summary": {
+                "total_activity_days": len(activity_data),
+                "total_sleep_days": len(sleep_data),
+                "total_stress_days": len(stress_data),
+            },
+            "metrics": metrics,
+            "generated_at": datetime.now().isoformat(),
+        }
+
+    def _save_report(self, report: dict[str, Any]) -> Path:
+        """Sauvegarde un rapport en JSON."""
+        end_date = datetime.fromisoformat(report["period"]["end"])
+        period_type = report["period"]["type"]
+        filename = f"{period_type}_report_{end_date.strftime('%Y%m%d')}.json"
+        filepath = self.reports_dir / filename
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(report, f, default=str, indent=2)
+
+        label = self.PERIOD_LABELS[period_type]
+        logger.info(f"✅ Rapport {label} généré: {filename}")
+        return filepath
+
+    def _generate_report(self, period_type: str, days: int) -> dict[str, Any]:
+        """Génère un rapport à la demande (hors planificateur)."""
         try:
-            from health_connectors.sync_manager import HealthSyncManager
-
-            sync_manager = HealthSyncManager()
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=7)
-
-            # Récupérer données
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                activity_data = loop.run_until_complete(
-                    sync_manager.get_unified_activity_data(start_date, end_date)
-                )
-                sleep_data = loop.run_until_complete(
-                    sync_manager.get_unified_sleep_data(start_date, end_date)
-                )
-                stress_data = loop.run_until_complete(
-                    sync_manager.get_unified_stress_data(start_date, end_date)
-                )
-                metrics = loop.run_until_complete(
-                    sync_manager._generate_unified_metrics(days_back=7)
-                )
-            finally:
-                loop.close()
-
-            # Créer rapport
-            report = {
-                "period": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat(),
-                    "type": "weekly",
-                },
-                "summary": {
-                    "total_activity_days": len(activity_data),
-                    "total_sleep_days": len(sleep_data),
-                    "total_stress_days": len(stress_data),
-                },
-                "metrics": metrics,
-                "generated_at": datetime.now().isoformat(),
-            }
-
-            # Sauvegarder rapport
-            filename = f"weekly_report_{end_date.strftime('%Y%m%d')}.json"
-            filepath = self.reports_dir / filename
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(report, f, default=str, indent=2)
-
-            logger.info(f"✅ Rapport hebdomadaire généré: {filename}")
+            report = asyncio.run(self._build_report(period_type, days))
+            self._save_report(report)
             return report
-
         except Exception as e:
-            logger.error(f"❌ Erreur génération rapport hebdomadaire: {e}")
+            label = self.PERIOD_LABELS[period_type]
+            logger.error(f"❌ Erreur génération rapport {label}: {e}")
             return {}
 
+    def generate_weekly_report(self) -> dict[str, Any]:
+        """Génère un rapport hebdomadaire."""
+        return self._generate_report("weekly", days=7)
+
     def generate_monthly_report(self) -> dict[str, Any]:
         """Génère un rapport mensuel."""
-        try:
-            from health_connectors.sync_manager import HealthSyncManager
-
-            sync_manager = HealthSyncManager()
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
-
-            # Récupérer données
-            import asyncio
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                activity_data = loop.run_until_complete(
-                    sync_manager.get_unified_activity_data(start_date, end_date)
-                )
-                sleep_data = loop.run_until_complete(
-                    sync_manager.get_unified_sleep_data(start_date, end_date)
-                )
-                stress_data = loop.run_until_complete(
-                    sync_manager.get_unified_stress_data(start_date, end_date)
-                )
-                metrics = loop.run_until_complete(
-                    sync_manager._generate_unified_metrics(days_back=30)
-                )
-            finally:
-                loop.close()
-
-            # Créer rapport
-            report = {
-                "period": {
-                    "start": start_date.isoformat(),
-                    "end": end_date.isoformat(),
-                    "type": "monthly",
-                },
-                "summary": {
-                    "total_activity_days": len(activity_data),
-                    "total_sleep_days": len(sleep_data),
-                    "total_stress_days": len(stress_data),
-                },
-                "metrics": metrics,
-                "generated_at": datetime.now().isoformat(),
-            }
-
-            # Sauvegarder rapport
-            filename = f"monthly_report_{end_date.strftime('%Y%m%d')}.json"
-            filepath = self.reports_dir / filename
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(report, f, default=str, indent=2)
-
-            logger.info(f"✅ Rapport mensuel généré: {filename}")
-            return report
-
-        except Exception as e:
-            logger.error(f"❌ Erreur génération rapport mensuel: {e}")
-            return {}
+        return self._generate_report("monthly", days=30)
 
 
 # Instance globale (singleton)
@@ -0,0 +1,108 @@
+"""
+ARKALIA ARIA - Agrégats multi-résolution des séries santé
+=========================================================
+
+Les mesures à haute fréquence (fréquence cardiaque, HRV, stress à la minute
+ou à la seconde) sont résumées en trois niveaux d'agrégats : 5 minutes,
+heure et jour. Chaque agrégat conserve, par source et par mesure, le nombre
+de valeurs, leur somme, le minimum et le maximum (la moyenne s'en déduit et
+les niveaux se combinent sans relire les données brutes).
+
+Les agrégats sont tenus à jour à l'écriture (voir ``HealthDataStore.upsert``) :
+seuls les intervalles touchés sont recalculés, le niveau 5 minutes depuis les
+enregistrements bruts, l'heure depuis les 5 minutes et le jour depuis l'heure.
+Chaque niveau a sa propre durée de rétention ; une lecture choisit le niveau
+le moins coûteux qui couvre l'intervalle demandé avec un nombre de points
+borné.
+"""
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+
+# Niveaux d'agrégats, du plus fin au plus grossier : largeur des intervalles
+# et modificateur SQLite correspondant
+ROLLUP_TIERS: dict[str, tuple[timedelta, str]] = {
+    "5min": (timedelta(minutes=5), "+5 minutes"),
+    "hour": (timedelta(hours=1), "+1 hours"),
+    "day": (timedelta(days=1), "+1 days"),
+}
+
+# Résolutions acceptées en lecture (raw : enregistrements bruts)
+RESOLUTIONS = ("raw", "auto", *ROLLUP_TIERS)
+
+# Rétention par défaut en jours (None : conservé indéfiniment). Les données
+# brutes restent la référence (fusion, exports) et ne sont pas purgées.
+DEFAULT_RETENTION_DAYS: dict[str, int | None] = {
+    "raw": None,
+    "5min": 90,
+    "hour": 730,
+    "day": None,
+}
+
+# Nombre de points visé par une lecture en résolution automatique
+DEFAULT_MAX_POINTS = 500
+
+
+def bucket_start(moment: datetime, tier: str) -> datetime:
+    """Début de l'intervalle d'un niveau contenant ``moment``."""
+    if tier == "5min":
+        return moment.replace(
+            minute=moment.minute - moment.minute % 5, second=0, microsecond=0
+        )
+    if tier == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if tier == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Niveau d'agrégat inconnu: {tier}")
+
+
+def bucket_starts(timestamps: Iterable[str], tier: str) -> list[str]:
+    """
+    Débuts (ISO, triés, sans doublon) des intervalles touchés.
+
+    Calculés sur le texte des horodatages stockés (``AAAA-MM-JJTHH:MM:SS``)
+    plutôt qu'en les convertissant un à un : appelé à chaque écriture.
+    """
+    minutes = {timestamp[:16] for timestamp in timestamps}
+    if tier == "5min":
+        starts = {f"{m[:14]}{int(m[14:]) - int(m[14:]) % 5:02d}:00" for m in minutes}
+    elif tier == "hour":
+        starts = {f"{m[:13]}:00:00" for m in minutes}
+    elif tier == "day":
+        starts = {f"{m[:10]}T00:00:00" for m in minutes}
+    else:
+        raise ValueError(f"Niveau d'agrégat inconnu: {tier}")
+    return sorted(starts)
+
+
+def retention_cutoff(
+    tier: str, retention_days: Mapping[str, int | None], now: datetime | None = None
+) -> datetime | None:
+    """Date avant laquelle un niveau n'est plus conservé (None : illimité)."""
+    days = retention_days.get(tier)
+    if days is None:
+        return None
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+def select_resolution(
+    start_date: datetime,
+    end_date: datetime,
+    retention_days: Mapping[str, int | None] = DEFAULT_RETENTION_DAYS,
+    max_points: int = DEFAULT_MAX_POINTS,
+    now: datetime | None = None,
+) -> str:
+    """
+    Niveau le plus fin qui couvre l'intervalle en au plus ``max_points`` points.
+
+    Un niveau dont la rétention ne remonte pas jusqu'au début de l'intervalle
+    est écarté ; à défaut, le niveau journalier est retenu.
+    """
+    span = end_date - start_date
+    for tier, (width, _) in ROLLUP_TIERS.items():
+        cutoff = retention_cutoff(tier, retention_days, now)
+        if cutoff is not None and start_date < cutoff:
+            continue
+        if span / width <= max_points:
+            return tier
+    return "day"
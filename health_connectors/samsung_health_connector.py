@@ -9,13 +9,13 @@ Connecteur pour Samsung Health permettant la synchronisation des données :
 - Données de santé générales
 """
 
-import json
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from .base_connector import BaseHealthConnector
 from .data_models import ActivityData, HealthData, SleepData, StressData
+from .record_writer import DailyRecordWriter
 
 
 class SamsungHealthConnector(BaseHealthConnector):
@@ -31,6 +31,7 @@ class SamsungHealthConnector(BaseHealthConnector):
         super().__init__("samsung_health")
         self.data_dir = Path("dacc/samsung_health_data")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.writer = DailyRecordWriter(self.data_dir)
 
     async def connect(self) -> bool:
         """
@@ -95,11 +96,12 @@ class SamsungHealthConnector(BaseHealthConnector):
             )
             activity_data.append(activity)
 
-            # Sauvegarde des données
-            await self._save_activity_data(activity)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_activity_data(activity)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return activity_data
 
     async def get_sleep_data(
@@ -149,11 +151,12 @@ class SamsungHealthConnector(BaseHealthConnector):
             )
             sleep_data.append(sleep)
 
-            # Sauvegarde des données
-            await self._save_sleep_data(sleep)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_sleep_data(sleep)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return sleep_data
 
     async def get_stress_data(
@@ -194,11 +197,12 @@ class SamsungHealthConnector(BaseHealthConnector):
                 )
                 stress_data.append(stress)
 
-                # Sauvegarde des données
-                await self._save_stress_data(stress)
+                # Mise en tampon (écrite en un lot en fin de récupération)
+                self._save_stress_data(stress)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return stress_data
 
     async def get_health_data(
@@ -243,11 +247,12 @@ class SamsungHealthConnector(BaseHealthConnector):
             )
             health_data.append(health)
 
-            # Sauvegarde des données
-            await self._save_health_data(health)
+            # Mise en tampon (écrite en un lot en fin de récupération)
+            self._save_health_data(health)
 
             current_date += timedelta(days=1)
 
+        await self.writer.flush()
         return health_data
 
     # Méthodes utilitaires pour générer des données réalistes
@@ -296,26 +301,18 @@ class SamsungHealthConnector(BaseHealthConnector):
         return random.randint(70, 90)  # nosec B311
 
     # Méthodes de sauvegarde des données
-    async def _save_activity_data(self, activity: ActivityData) -> None:
+    def _save_activity_data(self, activity: ActivityData) -> None:
         """Sauvegarde les données d'activité."""
-        file_path = self.data_dir / f"activity_{activity.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(activity.dict(), f, default=str, indent=2)
+        self.writer.add("activity", activity.timestamp.date(), activity)
 
-    async def _save_sleep_data(self, sleep: SleepData) -> None:
+    def _save_sleep_data(self, sleep: SleepData) -> None:
         """Sauvegarde les données de sommeil."""
-        file_path = self.data_dir / f"sleep_{sleep.sleep_start.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(sleep.dict(), f, default=str, indent=2)
+        self.writer.add("sleep", sleep.sleep_start.date(), sleep)
 
-    async def _save_stress_data(self, stress: StressData) -> None:
+    def _save_stress_data(self, stress: StressData) -> None:
         """Sauvegarde les données de stress."""
-        file_path = self.data_dir / f"stress_{stress.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(stress.dict(), f, default=str, indent=2)
+        self.writer.add("stress", stress.timestamp.date(), stress)
 
-    async def _save_health_data(self, health: HealthData) -> None:
+    def _save_health_data(self, health: HealthData) -> None:
         """Sauvegarde les données de santé."""
-        file_path = self.data_dir / f"health_{health.timestamp.date()}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(health.dict(), f, default=str, indent=2)
+        self.writer.add("health", health.timestamp.date(), health)
@@ -6,25 +6,35 @@ Gestionnaire central pour orchestrer la synchronisation de tous les connecteurs
 Assure la cohérence et l'unification des données entre Samsung Health, Google Fit et iOS Health.
 """
 
+import asyncio
 import os
-import threading
+import time
+from collections.abc import Awaitable, Callable, Sequence
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from pydantic import BaseModel
+
+from core.cache import CacheManager
 from core.logging import get_logger
 
 from .base_connector import BaseHealthConnector
+from .columnar import HealthSamples
 from .config import HealthConnectorConfig
 from .data_models import (
     ActivityData,
+    HealthData,
     HealthSyncStatus,
     SleepData,
     StressData,
 )
 from .google_fit_connector import GoogleFitConnector
+from .health_store import HealthDataStore
+from .http_client import get_health_http_client
 from .ios_health_connector import IOSHealthConnector
 from .samsung_health_connector import SamsungHealthConnector
+from .sync_watermarks import SyncWatermarkStore
 
 logger = get_logger("health_sync")
 
@@ -39,12 +49,20 @@ class HealthSyncManager:
     - iOS Health (iPad)
     """
 
-    def __init__(self, config: HealthConnectorConfig | None = None) -> None:
+    # Nom de la tâche de synchronisation automatique dans le planificateur
+    AUTO_SYNC_JOB = "health_sync"
+    # Purge quotidienne des données et agrégats hors rétention
+    RETENTION_JOB = "health_retention"
+
+    def __init__(
+        self, config: HealthConnectorConfig | None = None, db_path: str = "aria_pain.db"
+    ) -> None:
         """
         Initialise le gestionnaire de synchronisation.
 
         Args:
             config: Configuration des connecteurs (optionnel)
+            db_path: Base ARIA (repères de synchronisation incrémentale)
         """
         self.config = config or HealthConnectorConfig(
             samsung_health_enabled=True,
@@ -58,10 +76,17 @@ class HealthSyncManager:
         self.sync_history: list[dict[str, Any]] = []
         self.unified_data_dir = Path("dacc/unified_health_data")
         self.unified_data_dir.mkdir(parents=True, exist_ok=True)
+        self.watermarks = SyncWatermarkStore(db_path)
+        self.store = HealthDataStore(
+            db_path,
+            self.config.source_priority,
+            self.config.merge_strategy,
+            self.config.rollup_retention_days,
+        )
+        self.metrics_cache = CacheManager(default_ttl=300, max_size=100)
 
         # Synchronisation automatique
         self.is_running = False
-        self.sync_thread: threading.Thread | None = None
         self.last_sync: datetime | None = None
 
         # Initialiser les connecteurs selon la configuration
@@ -78,39 +103,126 @@ class HealthSyncManager:
         if self.config.apple_healthkit_enabled:
             self.connectors["ios_health"] = IOSHealthConnector()
 
+    async def _gather_connectors(
+        self,
+        operation: Callable[[BaseHealthConnector], Awaitable[Any]],
+        timeout: float | None,
+    ) -> dict[str, tuple[Any, float, Exception | None]]:
+        """
+        Exécute une opération sur tous les connecteurs en parallèle.
+
+        La concurrence est bornée par ``sync_max_concurrency`` et chaque
+        connecteur a son propre délai : une erreur ou un dépassement de délai
+        n'affecte que le connecteur concerné.
+
+        Returns:
+            Dict nom -> (résultat ou None, durée en secondes, erreur ou None)
+        """
+        # Sémaphore créé par appel : la boucle de sync auto change de boucle
+        semaphore = asyncio.Semaphore(max(1, self.config.sync_max_concurrency))
+
+        async def run(
+            connector: BaseHealthConnector,
+        ) -> tuple[Any, float, Exception | None]:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(operation(connector), timeout)
+                    return result, time.perf_counter() - started, None
+                except asyncio.TimeoutError:
+                    return (
+                        None,
+                        time.perf_counter() - started,
+                        TimeoutError(f"délai de {timeout}s dépassé"),
+                    )
+                except Exception as e:
+                    return None, time.perf_counter() - started, e
+
+        names = list(self.connectors)
+        results = await asyncio.gather(
+            *(run(self.connectors[name]) for name in names)
+        )
+        return dict(zip(names, results, strict=True))
+
+    def _sync_windows(
+        self, connector_name: str, full_resync: bool
+    ) -> dict[str, datetime] | None:
+        """
+        Débuts de fenêtre incrémentale d'un connecteur (repère - recouvrement).
+
+        Returns:
+            Dict jeu de données -> début, None pour une resynchronisation complète
+        """
+        if full_resync:
+            return None
+        overlap = timedelta(hours=self.config.sync_overlap_hours)
+        return {
+            dataset: watermark - overlap
+            for dataset, watermark in self.watermarks.get(connector_name).items()
+        }
+
+    def _advance_watermarks(
+        self, connector_name: str, connector_summary: dict[str, Any]
+    ) -> None:
+        """Avance les repères des jeux de données synchronisés sans erreur."""
+        end_date = datetime.fromisoformat(connector_summary["end_date"])
+        self.watermarks.advance(
+            connector_name,
+            {dataset: end_date for dataset in connector_summary["data_counts"]},
+        )
+
     async def connect_all(self) -> dict[str, bool]:
         """
-        Établit la connexion avec tous les connecteurs activés.
+        Établit la connexion avec tous les connecteurs activés (en parallèle).
 
         Returns:
             Dictionnaire avec le statut de connexion de chaque connecteur
         """
+        results = await self._gather_connectors(
+            lambda connector: connector.connect(),
+            self.config.connector_timeout_seconds,
+        )
         connection_results = {}
-
-        for name, connector in self.connectors.items():
-            try:
-                result = await connector.connect()
-                connection_results[name] = result
-            except Exception as e:
-                connection_results[name] = False
-                connector.sync_errors.append(f"Erreur de connexion: {str(e)}")
-
+        for name, (result, _, error) in results.items():
+            connection_results[name] = bool(result) if error is None else False
+            if error is not None:
+                self.connectors[name].sync_errors.append(
+                    f"Erreur de connexion: {str(error)}"
+                )
         return connection_results
 
     async def disconnect_all(self) -> None:
-        """Ferme la connexion avec tous les connecteurs."""
-        for connector in self.connectors.values():
-            try:
-                await connector.disconnect()
-            except Exception as e:
-                connector.sync_errors.append(f"Erreur de déconnexion: {str(e)}")
+        """Ferme la connexion avec tous les connecteurs et leur pool HTTP."""
+        results = await self._gather_connectors(
+            lambda connector: connector.disconnect(),
+            self.config.connector_timeout_seconds,
+        )
+        for name, (_, _, error) in results.items():
+            if error is not None:
+                self.connectors[name].sync_errors.append(
+                    f"Erreur de déconnexion: {str(error)}"
+                )
+        # Connexions HTTP partagées ouvertes sur cette boucle
+        await get_health_http_client().aclose()
 
-    async def sync_all_connectors(self, days_back: int | None = None) -> dict[str, Any]:
+    async def sync_all_connectors(
+        self, days_back: int | None = None, full_resync: bool = False
+    ) -> dict[str, Any]:
         """
         Synchronise toutes les données de tous les connecteurs.
 
+        Les connecteurs sont synchronisés en parallèle (concurrence bornée,
+        délai par connecteur et par jeu de données) : la durée totale est
+        celle du connecteur le plus lent. Les durées sont reportées dans
+        ``timings``.
+
+        La synchronisation est incrémentale : chaque jeu de données ne
+        récupère que l'intervalle depuis son repère (moins
+        ``sync_overlap_hours``), dans la limite de ``days_back`` jours.
+
         Args:
             days_back: Nombre de jours à synchroniser (utilise la config si None)
+            full_resync: Ignorer les repères et resynchroniser toute la fenêtre
 
         Returns:
             Résumé de la synchronisation complète
@@ -121,23 +233,45 @@ class HealthSyncManager:
         sync_summary: dict[str, Any] = {
             "sync_start": sync_start.isoformat(),
             "days_back": days_back,
+            "full_resync": full_resync,
             "connectors": {},
             "unified_metrics": {},
+            "timings": {"connectors": {}},
             "errors": [],
             "status": "success",
         }
 
-        # Synchroniser chaque connecteur
-        for name, connector in self.connectors.items():
-            try:
-                connector_summary = await connector.sync_all_data(days_back)
+        # Synchroniser les connecteurs en parallèle
+        windows = {name: self._sync_windows(name, full_resync) for name in self.connectors}
+        results = await self._gather_connectors(
+            lambda connector: connector.sync_all_data(
+                days_back,
+                self.config.dataset_timeout_seconds,
+                since=windows[connector.connector_name],
+                store=self.store,
+            ),
+            self.config.connector_timeout_seconds,
+        )
+        for name, (connector_summary, duration, error) in results.items():
+            sync_summary["timings"]["connectors"][name] = round(duration, 4)
+            if error is None:
                 sync_summary["connectors"][name] = connector_summary
-            except Exception as e:
-                error_msg = f"Erreur synchronisation {name}: {str(e)}"
+                self._advance_watermarks(name, connector_summary)
+                sync_summary["errors"].extend(
+                    f"{name}: {message}" for message in connector_summary["errors"]
+                )
+            else:
+                error_msg = f"Erreur synchronisation {name}: {str(error)}"
+                sync_summary["connectors"][name] = {
+                    "connector": name,
+                    "status": "error",
+                    "errors": [error_msg],
+                }
                 sync_summary["errors"].append(error_msg)
-                connector.sync_errors.append(error_msg)
+                self.connectors[name].sync_errors.append(error_msg)
 
         # Générer les métriques unifiées
+        metrics_start = time.perf_counter()
         try:
             unified_metrics = await self._generate_unified_metrics(days_back)
             sync_summary["unified_metrics"] = unified_metrics
@@ -153,9 +287,17 @@ class HealthSyncManager:
         except Exception as e:
             error_msg = f"Erreur génération métriques unifiées: {str(e)}"
             sync_summary["errors"].append(error_msg)
+        sync_summary["timings"]["unified_metrics"] = round(
+            time.perf_counter() - metrics_start, 4
+        )
+
+        # Mettre à jour les features horaires avec les nouvelles données santé
+        await asyncio.to_thread(self._refresh_feature_store, days_back)
+        await self._update_flare_detector(days_back)
 
         sync_summary["sync_end"] = datetime.now().isoformat()
         sync_summary["duration_seconds"] = (datetime.now() - sync_start).total_seconds()
+        sync_summary["timings"]["total"] = round(sync_summary["duration_seconds"], 4)
 
         if sync_summary["errors"]:
             sync_summary["status"] = "partial_success"
@@ -167,14 +309,18 @@ class HealthSyncManager:
         return sync_summary
 
     async def sync_single_connector(
-        self, connector_name: str, days_back: int | None = None
+        self,
+        connector_name: str,
+        days_back: int | None = None,
+        full_resync: bool = False,
     ) -> dict[str, Any]:
         """
-        Synchronise un seul connecteur.
+        Synchronise un seul connecteur (incrémental, voir ``sync_all_connectors``).
 
         Args:
             connector_name: Nom du connecteur à synchroniser
             days_back: Nombre de jours à synchroniser
+            full_resync: Ignorer les repères et resynchroniser toute la fenêtre
 
         Returns:
             Résumé de la synchronisation du connecteur
@@ -189,15 +335,31 @@ class HealthSyncManager:
         days_back = days_back or self.config.max_days_back
 
         try:
-            sync_summary = await connector.sync_all_data(days_back)
+            sync_summary = await asyncio.wait_for(
+                connector.sync_all_data(
+                    days_back,
+                    self.config.dataset_timeout_seconds,
+                    since=self._sync_windows(connector_name, full_resync),
+                    store=self.store,
+                ),
+                self.config.connector_timeout_seconds,
+            )
             sync_summary["connector_name"] = connector_name
-            sync_summary["status"] = "success"
+            self._advance_watermarks(connector_name, sync_summary)
 
             # Mettre à jour les métriques unifiées
             await self._update_unified_metrics_for_connector(connector_name)
 
             return sync_summary
 
+        except asyncio.TimeoutError:
+            return {
+                "status": "error",
+                "connector_name": connector_name,
+                "error": (
+                    f"délai de {self.config.connector_timeout_seconds}s dépassé"
+                ),
+            }
         except Exception as e:
             return {
                 "status": "error",
@@ -228,103 +390,132 @@ class HealthSyncManager:
         return status_dict
 
     async def get_unified_activity_data(
-        self, start_date: datetime, end_date: datetime
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
     ) -> list[ActivityData]:
         """
-        Récupère les données d'activité unifiées de tous les connecteurs.
+        Récupère les données d'activité unifiées (stockage, triées par horodatage).
+
+        Lecture seule : aucun appel aux connecteurs ni écriture.
 
         Args:
             start_date: Date de début
             end_date: Date de fin
+            sources: Sources à inclure (toutes si None)
 
         Returns:
             Liste des données d'activité unifiées
         """
-        all_activity_data = []
-
-        for connector in self.connectors.values():
-            try:
-                connector_data = await connector.get_activity_data(start_date, end_date)
-                all_activity_data.extend(connector_data)
-            except Exception as e:
-                connector.sync_errors.append(f"Erreur données activité: {str(e)}")
-
-        # Trier par timestamp
-        all_activity_data.sort(key=lambda x: x.timestamp)
-
-        return all_activity_data
+        return self.store.query("activity", start_date, end_date, sources)
 
     async def get_unified_sleep_data(
-        self, start_date: datetime, end_date: datetime
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
     ) -> list[SleepData]:
         """
-        Récupère les données de sommeil unifiées de tous les connecteurs.
+        Récupère les données de sommeil unifiées (triées par début de sommeil).
 
         Args:
             start_date: Date de début
             end_date: Date de fin
+            sources: Sources à inclure (toutes si None)
 
         Returns:
             Liste des données de sommeil unifiées
         """
-        all_sleep_data = []
-
-        for connector in self.connectors.values():
-            try:
-                connector_data = await connector.get_sleep_data(start_date, end_date)
-                all_sleep_data.extend(connector_data)
-            except Exception as e:
-                connector.sync_errors.append(f"Erreur données sommeil: {str(e)}")
-
-        # Trier par date de début de sommeil
-        all_sleep_data.sort(key=lambda x: x.sleep_start)
-
-        return all_sleep_data
+        return self.store.query("sleep", start_date, end_date, sources)
 
     async def get_unified_stress_data(
-        self, start_date: datetime, end_date: datetime
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
     ) -> list[StressData]:
         """
-        Récupère les données de stress unifiées de tous les connecteurs.
+        Récupère les données de stress unifiées (triées par horodatage).
 
         Args:
             start_date: Date de début
             end_date: Date de fin
+            sources: Sources à inclure (toutes si None)
 
         Returns:
             Liste des données de stress unifiées
         """
-        all_stress_data = []
-
-        for connector in self.connectors.values():
-            try:
-                connector_data = await connector.get_stress_data(start_date, end_date)
-                all_stress_data.extend(connector_data)
-            except Exception as e:
-                connector.sync_errors.append(f"Erreur données stress: {str(e)}")
+        return self.store.query("stress", start_date, end_date, sources)
+
+    async def get_unified_health_data(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        sources: list[str] | None = None,
+    ) -> list[HealthData]:
+        """
+        Récupère les données de santé unifiées (triées par horodatage).
 
-        # Trier par timestamp
-        all_stress_data.sort(key=lambda x: x.timestamp)
+        Args:
+            start_date: Date de début
+            end_date: Date de fin
+            sources: Sources à inclure (toutes si None)
 
-        return all_stress_data
+        Returns:
+            Liste des données de santé unifiées
+        """
+        return self.store.query("health", start_date, end_date, sources)
 
     async def _generate_unified_metrics(self, days_back: int) -> dict[str, Any]:
         """
-        Génère les métriques unifiées pour le dashboard.
+        Génère et sauvegarde les métriques unifiées (après synchronisation).
+
+        Args:
+            days_back: Nombre de jours à analyser
+
+        Returns:
+            Métriques unifiées
+        """
+        unified_metrics = await self.compute_unified_metrics(days_back)
+
+        # Sauvegarder les métriques unifiées
+        await self._save_unified_metrics(unified_metrics)
+
+        return unified_metrics
+
+    async def compute_unified_metrics(
+        self, days_back: int, sources: list[str] | None = None
+    ) -> dict[str, Any]:
+        """
+        Calcule les métriques unifiées pour le dashboard depuis le stockage.
+
+        Lecture seule, mise en cache par version des données (et par minute,
+        la fenêtre glissant avec le temps).
 
         Args:
             days_back: Nombre de jours à analyser
+            sources: Sources à inclure (toutes si None)
 
         Returns:
             Métriques unifiées
         """
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
+        cache_key = (
+            f"unified_metrics:{self.store.data_version()}:{days_back}:"
+            f"{','.join(sorted(sources)) if sources else '*'}:"
+            f"{end_date.strftime('%Y%m%d%H%M')}"
+        )
+        cached = self.metrics_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        # Récupérer toutes les données unifiées
-        activity_data = await self.get_unified_activity_data(start_date, end_date)
-        sleep_data = await self.get_unified_sleep_data(start_date, end_date)
-        stress_data = await self.get_unified_stress_data(start_date, end_date)
+        # Données unifiées en colonnes (agrégations vectorisées)
+        activity = self.store.query_samples("activity", start_date, end_date, sources)
+        sleep = self.store.query_samples("sleep", start_date, end_date, sources)
+        stress = self.store.query_samples("stress", start_date, end_date, sources)
+        avg_duration_minutes = self._calculate_average_sleep_duration(sleep)
 
         # Calculer les métriques unifiées
         unified_metrics = {
@@ -334,49 +525,37 @@ class HealthSyncManager:
                 "days": days_back,
             },
             "activity": {
-                "total_steps": sum(d.steps or 0 for d in activity_data),
-                "total_calories": sum(d.calories_burned or 0 for d in activity_data),
-                "total_distance": sum(d.distance_meters or 0 for d in activity_data),
-                "avg_heart_rate": self._calculate_average_heart_rate(activity_data),
+                "total_steps": round(activity.total("steps")),
+                "total_calories": activity.total("calories_burned"),
+                "total_distance": activity.total("distance_meters"),
+                "avg_heart_rate": self._calculate_average_heart_rate(activity),
                 "avg_daily_steps": (
-                    sum(d.steps or 0 for d in activity_data) / days_back
-                    if days_back > 0
-                    else 0
+                    activity.total("steps") / days_back if days_back > 0 else 0
                 ),
-                "data_points": len(activity_data),
+                "data_points": len(activity),
             },
             "sleep": {
-                "avg_duration_minutes": self._calculate_average_sleep_duration(
-                    sleep_data
-                ),
+                "avg_duration_minutes": avg_duration_minutes,
                 "avg_duration_hours": (
-                    (avg_dur_min / 60.0)
-                    if (
-                        avg_dur_min := self._calculate_average_sleep_duration(
-                            sleep_data
-                        )
-                    )
-                    else None
+                    avg_duration_minutes / 60.0 if avg_duration_minutes else None
                 ),
-                "avg_quality_score": self._calculate_average_sleep_quality(sleep_data),
-                "total_awakenings": sum(d.awakenings_count or 0 for d in sleep_data),
-                "data_points": len(sleep_data),
-                "trend": self._calculate_sleep_trend(sleep_data),
+                "avg_quality_score": self._calculate_average_sleep_quality(sleep),
+                "total_awakenings": round(sleep.total("awakenings_count")),
+                "data_points": len(sleep),
+                "trend": self._calculate_sleep_trend(sleep),
             },
             "stress": {
-                "avg_stress_level": self._calculate_average_stress_level(stress_data),
-                "avg_hrv": self._calculate_average_hrv(stress_data),
-                "data_points": len(stress_data),
-                "trend": self._calculate_stress_trend(stress_data),
+                "avg_stress_level": self._calculate_average_stress_level(stress),
+                "avg_hrv": self._calculate_average_hrv(stress),
+                "data_points": len(stress),
+                "trend": self._calculate_stress_trend(stress),
             },
-            "sources": list(
-                {d.source for d in activity_data + sleep_data + stress_data}
+            "sources": sorted(
+                {*activity.sources, *sleep.sources, *stress.sources}
             ),
         }
 
-        # Sauvegarder les métriques unifiées
-        await self._save_unified_metrics(unified_metrics)
-
+        self.metrics_cache.set(cache_key, unified_metrics)
         return unified_metrics
 
     async def _update_unified_metrics_for_connector(self, connector_name: str) -> None:
@@ -384,113 +563,76 @@ class HealthSyncManager:
         # Implémentation simplifiée - pourrait être optimisée
         await self._generate_unified_metrics(self.config.max_days_back)
 
-    # Méthodes utilitaires pour les calculs
+    # Méthodes utilitaires pour les calculs (vectorisées sur HealthSamples)
+    @staticmethod
+    def _as_samples(
+        kind: str, data: HealthSamples | Sequence[BaseModel]
+    ) -> HealthSamples:
+        """Convertit une liste de modèles en colonnes (sans copie si déjà fait)."""
+        if isinstance(data, HealthSamples):
+            return data
+        return HealthSamples.from_models(kind, data)
+
     def _calculate_average_heart_rate(
-        self, activity_data: list[ActivityData]
+        self, activity_data: HealthSamples | Sequence[ActivityData]
     ) -> float | None:
         """Calcule la fréquence cardiaque moyenne."""
-        heart_rates = [
-            d.heart_rate_bpm for d in activity_data if d.heart_rate_bpm is not None
-        ]
-        return round(sum(heart_rates) / len(heart_rates), 1) if heart_rates else None
+        return self._as_samples("activity", activity_data).mean("heart_rate_bpm", 1)
 
     def _calculate_average_sleep_duration(
-        self, sleep_data: list[SleepData]
+        self, sleep_data: HealthSamples | Sequence[SleepData]
     ) -> float | None:
         """Calcule la durée moyenne de sommeil."""
-        durations = [d.duration_minutes for d in sleep_data]
-        return round(sum(durations) / len(durations), 1) if durations else None
+        return self._as_samples("sleep", sleep_data).mean("duration_minutes", 1)
 
     def _calculate_average_sleep_quality(
-        self, sleep_data: list[SleepData]
+        self, sleep_data: HealthSamples | Sequence[SleepData]
     ) -> float | None:
         """Calcule la qualité moyenne de sommeil."""
-        qualities = [d.quality_score for d in sleep_data if d.quality_score is not None]
-        return round(sum(qualities) / len(qualities), 2) if qualities else None
+        return self._as_samples("sleep", sleep_data).mean("quality_score", 2)
 
     def _calculate_average_stress_level(
-        self, stress_data: list[StressData]
+        self, stress_data: HealthSamples | Sequence[StressData]
     ) -> float | None:
         """Calcule le niveau de stress moyen."""
-        stress_levels = [d.stress_level for d in stress_data]
-        return (
-            round(sum(stress_levels) / len(stress_levels), 1) if stress_levels else None
-        )
+        return self._as_samples("stress", stress_data).mean("stress_level", 1)
 
-    def _calculate_average_hrv(self, stress_data: list[StressData]) -> float | None:
+    def _calculate_average_hrv(
+        self, stress_data: HealthSamples | Sequence[StressData]
+    ) -> float | None:
         """Calcule la variabilité cardiaque moyenne."""
-        hrv_values = [
-            d.heart_rate_variability
-            for d in stress_data
-            if d.heart_rate_variability is not None
-        ]
-        return round(sum(hrv_values) / len(hrv_values), 1) if hrv_values else None
+        return self._as_samples("stress", stress_data).mean("heart_rate_variability", 1)
 
-    def _calculate_sleep_trend(self, sleep_data: list[SleepData]) -> str | None:
+    def _calculate_sleep_trend(
+        self, sleep_data: HealthSamples | Sequence[SleepData]
+    ) -> str | None:
         """
         Calcule la tendance du sommeil (increasing, decreasing, stable).
 
+        Durée moyenne de la seconde moitié chronologique comparée à la
+        première (seuil de 5 %, au moins 7 nuits).
+
         Args:
-            sleep_data: Liste des données de sommeil
+            sleep_data: Données de sommeil (colonnes ou modèles)
 
         Returns:
             "increasing", "decreasing", "stable" ou None
         """
-        if len(sleep_data) < 7:  # Besoin d'au moins 7 jours pour une tendance
-            return None
-
-        # Trier par date (utiliser sleep_start)
-        sorted_data = sorted(sleep_data, key=lambda x: x.sleep_start)
-
-        # Diviser en deux périodes
-        mid_point = len(sorted_data) // 2
-        first_half = sorted_data[:mid_point]
-        second_half = sorted_data[mid_point:]
-
-        avg_first = sum(d.duration_minutes for d in first_half) / len(first_half)
-        avg_second = sum(d.duration_minutes for d in second_half) / len(second_half)
+        return self._as_samples("sleep", sleep_data).trend("duration_minutes")
 
-        # Seuil de 5% pour considérer une tendance
-        threshold = avg_first * 0.05
-        if avg_second > avg_first + threshold:
-            return "increasing"
-        elif avg_second < avg_first - threshold:
-            return "decreasing"
-        else:
-            return "stable"
-
-    def _calculate_stress_trend(self, stress_data: list[StressData]) -> str | None:
+    def _calculate_stress_trend(
+        self, stress_data: HealthSamples | Sequence[StressData]
+    ) -> str | None:
         """
         Calcule la tendance du stress (increasing, decreasing, stable).
 
         Args:
-            stress_data: Liste des données de stress
+            stress_data: Données de stress (colonnes ou modèles)
 
         Returns:
             "increasing", "decreasing", "stable" ou None
         """
-        if len(stress_data) < 7:  # Besoin d'au moins 7 jours pour une tendance
-            return None
-
-        # Trier par date
-        sorted_data = sorted(stress_data, key=lambda x: x.timestamp or datetime.min)
-
-        # Diviser en deux périodes
-        mid_point = len(sorted_data) // 2
-        first_half = sorted_data[:mid_point]
-        second_half = sorted_data[mid_point:]
-
-        avg_first = sum(d.stress_level for d in first_half) / len(first_half)
-        avg_second = sum(d.stress_level for d in second_half) / len(second_half)
-
-        # Seuil de 5% pour considérer une tendance
-        threshold = avg_first * 0.05
-        if avg_second > avg_first + threshold:
-            return "increasing"
-        elif avg_second < avg_first - threshold:
-            return "decreasing"
-        else:
-            return "stable"
+        return self._as_samples("stress", stress_data).trend("stress_level")
 
     # Méthodes de sauvegarde
     async def _save_sync_history(self, sync_summary: dict[str, Any]) -> None:
@@ -519,12 +661,16 @@ class HealthSyncManager:
         """
         Démarre la synchronisation automatique périodique.
 
-        Démarre aussi les exports automatiques si configuré.
+        La synchronisation est une tâche du planificateur commun
+        (``health_sync``), comme la purge quotidienne hors rétention
+        (``health_retention``). Démarre aussi les exports automatiques si
+        configuré.
 
         Returns:
             True si le démarrage a réussi, False si déjà en cours
         """
         from core import get_logger
+        from core.scheduler import CronTrigger, IntervalTrigger, get_scheduler
 
         logger = get_logger("health_sync")
 
@@ -535,8 +681,18 @@ class HealthSyncManager:
             return False
 
         self.is_running = True
-        self.sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
-        self.sync_thread.start()
+        scheduler = get_scheduler()
+        scheduler.add_job(
+            self.AUTO_SYNC_JOB,
+            self._auto_sync_cycle,
+            IntervalTrigger(self.config.sync_interval_hours * 3600),
+            jitter_seconds=300.0,
+            run_immediately=True,
+        )
+        scheduler.add_job(
+            self.RETENTION_JOB, self.store.apply_retention, CronTrigger("30 3 * * *")
+        )
+        scheduler.start()
 
         # Démarrer exports automatiques si activé
         try:
@@ -561,6 +717,7 @@ class HealthSyncManager:
             True si l'arrêt a réussi
         """
         from core import get_logger
+        from core.scheduler import get_scheduler
 
         logger = get_logger("health_sync")
 
@@ -568,8 +725,8 @@ class HealthSyncManager:
             return False
 
         self.is_running = False
-        if self.sync_thread and self.sync_thread.is_alive():
-            self.sync_thread.join(timeout=5.0)
+        get_scheduler().remove_job(self.AUTO_SYNC_JOB)
+        get_scheduler().remove_job(self.RETENTION_JOB)
 
         # Arrêter exports automatiques
         try:
@@ -584,68 +741,35 @@ class HealthSyncManager:
 
         return True
 
-    def _sync_loop(self) -> None:
-        """Boucle principale de synchronisation automatique."""
+    async def _auto_sync_cycle(self) -> None:
+        """Cycle de synchronisation automatique (tâche planifiée)."""
         from core import get_logger
 
         logger = get_logger("health_sync")
-        logger.info("🔄 Synchronisation santé automatique démarrée")
 
-        while self.is_running:
-            try:
-                # Vérifier si sync intelligente (seulement nouvelles données)
-                if self._should_sync():
-                    import asyncio
-
-                    # Exécuter sync asynchrone dans un thread
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        loop.run_until_complete(self.sync_all_connectors())
-                        self.last_sync = datetime.now()
-                        logger.info("✅ Synchronisation santé automatique réussie")
-
-                        # Corrélations automatiques après sync (seulement si activé)
-                        # Désactivé par défaut pour éviter surcharge CPU
-                        if os.getenv("ARIA_AUTO_CORRELATIONS_ENABLED", "0").lower() in (
-                            "1",
-                            "true",
-                        ):
-                            try:
-                                self._trigger_correlations()
-                            except Exception as e:
-                                logger.warning(
-                                    f"⚠️ Erreur corrélations automatiques: {e}"
-                                )
-
-                        # Créer alertes basées sur données santé
-                        try:
-                            metrics = loop.run_until_complete(
-                                self._generate_unified_metrics(days_back=7)
-                            )
-                            self._create_health_alerts(metrics)
-                        except Exception as e:
-                            logger.warning(f"⚠️ Erreur création alertes santé: {e}")
-
-                    finally:
-                        loop.close()
-                else:
-                    logger.debug("⏭️ Pas de nouvelles données, sync ignorée")
+        # Sync intelligente : rien à faire si une sync récente a déjà eu lieu
+        if not self._should_sync():
+            logger.debug("⏭️ Pas de nouvelles données, sync ignorée")
+            return
 
-            except Exception as e:
-                logger.error(f"❌ Erreur dans la boucle de sync santé: {e}")
+        await self.sync_all_connectors()
+        self.last_sync = datetime.now()
+        logger.info("✅ Synchronisation santé automatique réussie")
 
-            # Attendre l'intervalle avant la prochaine sync
-            # Utiliser wait() directement au lieu de boucle pour économiser CPU
-            wait_event = threading.Event()
-            wait_seconds = self.config.sync_interval_hours * 3600
-            # Attendre par blocs de 60 secondes pour permettre l'arrêt rapide
-            while wait_seconds > 0 and self.is_running:
-                wait_time = min(60, wait_seconds)  # Vérifier toutes les 60 secondes max
-                wait_event.wait(wait_time)
-                wait_seconds -= wait_time
+        # Corrélations automatiques après sync (seulement si activé)
+        # Désactivé par défaut pour éviter surcharge CPU
+        if os.getenv("ARIA_AUTO_CORRELATIONS_ENABLED", "0").lower() in ("1", "true"):
+            try:
+                await asyncio.to_thread(self._trigger_correlations)
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur corrélations automatiques: {e}")
 
-        logger.info("🔄 Synchronisation santé automatique arrêtée")
+        # Créer alertes basées sur données santé
+        try:
+            metrics = await self._generate_unified_metrics(days_back=7)
+            self._create_health_alerts(metrics)
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur création alertes santé: {e}")
 
     def _should_sync(self) -> bool:
         """
@@ -661,6 +785,38 @@ class HealthSyncManager:
         time_since_last_sync = datetime.now() - self.last_sync
         return time_since_last_sync >= timedelta(hours=self.config.sync_interval_hours)
 
+    def _refresh_feature_store(self, days_back: int) -> None:
+        """
+        Recalcule les features horaires couvertes par la synchronisation.
+
+        Travail synchrone (SQLite, fichiers) : appelé via ``asyncio.to_thread``.
+        """
+        try:
+            from prediction_engine.feature_store import get_feature_store
+
+            get_feature_store().refresh(since=datetime.now() - timedelta(days=days_back))
+        except ImportError:
+            logger.debug("Feature store indisponible")
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur mise à jour features après sync: {e}")
+
+    async def _update_flare_detector(self, days_back: int) -> None:
+        """Transmet les nouvelles mesures de stress au détecteur de poussées."""
+        try:
+            from prediction_engine.flare_detector import get_flare_detector
+
+            detector = get_flare_detector()
+            end_date = datetime.now()
+            start_date = detector.last_observation("stress") or (
+                end_date - timedelta(days=days_back)
+            )
+            stress_data = await self.get_unified_stress_data(start_date, end_date)
+            detector.observe_stress([(d.timestamp, d.stress_level) for d in stress_data])
+        except ImportError:
+            logger.debug("Détecteur de poussées indisponible")
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur détection de poussée après sync: {e}")
+
     def _trigger_correlations(self) -> None:
         """Déclenche l'analyse de corrélations après sync."""
         try:
@@ -687,7 +843,8 @@ class HealthSyncManager:
         - Activité physique insuffisante
         - Qualité de sommeil faible
 
-        Évite les doublons en vérifiant les alertes existantes.
+        Les doublons sont écartés par la clé de dédoublonnage des alertes
+        (réémises après ``health_alert_cooldown_hours``).
         """
         from core import get_logger
 
@@ -697,27 +854,7 @@ class HealthSyncManager:
 
             alerts_system = ARIA_AlertsSystem()
 
-            # Récupérer les alertes existantes pour éviter les doublons
-            existing_alerts = alerts_system.get_alerts(
-                limit=100, alert_type=AlertType.HEALTH_SYNC, unread_only=False
-            )
-            existing_alert_keys = set()
-            for alert in existing_alerts.get("alerts", []):
-                alert_data = alert.get("data", {})
-                if isinstance(alert_data, str):
-                    import json
-
-                    try:
-                        alert_data = json.loads(alert_data)
-                    except Exception as e:
-                        # Ignorer les erreurs de parsing JSON et continuer
-                        logger.debug(f"Erreur parsing JSON alert_data: {e}")
-                        continue
-                if isinstance(alert_data, dict):
-                    alert_key = alert_data.get("alert_key")
-                    if alert_key:
-                        existing_alert_keys.add(alert_key)
-
+            cooldown_hours = self.config.health_alert_cooldown_hours
             created_count = 0
 
             # Vérifier sommeil insuffisant
@@ -729,39 +866,41 @@ class HealthSyncManager:
 
             if sleep_duration_hours and sleep_duration_hours < 6:
                 alert_key = f"sleep_insufficient_{int(sleep_duration_hours)}"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.WARNING,
-                        "Sommeil Insuffisant",
-                        f"Votre durée moyenne de sommeil est de {sleep_duration_hours:.1f}h, "
-                        f"ce qui est inférieur à la recommandation (7-9h).",
-                        {
-                            "alert_key": alert_key,
-                            "sleep_duration_hours": sleep_duration_hours,
-                            "recommended_min": 7,
-                            "threshold": 6,
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.WARNING,
+                    "Sommeil Insuffisant",
+                    f"Votre durée moyenne de sommeil est de {sleep_duration_hours:.1f}h, "
+                    f"ce qui est inférieur à la recommandation (7-9h).",
+                    {
+                        "alert_key": alert_key,
+                        "sleep_duration_hours": sleep_duration_hours,
+                        "recommended_min": 7,
+                        "threshold": 6,
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             # Vérifier qualité de sommeil faible
             sleep_quality = sleep_metrics.get("avg_quality_score")
             if sleep_quality is not None and sleep_quality < 3.0:  # Sur échelle 1-5
                 alert_key = f"sleep_quality_low_{int(sleep_quality * 10)}"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.INFO,
-                        "Qualité de Sommeil Faible",
-                        f"Votre qualité de sommeil moyenne est de {sleep_quality:.1f}/5, "
-                        f"ce qui est faible. Essayez d'améliorer votre hygiène de sommeil.",
-                        {
-                            "alert_key": alert_key,
-                            "sleep_quality": sleep_quality,
-                            "threshold": 3.0,
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.INFO,
+                    "Qualité de Sommeil Faible",
+                    f"Votre qualité de sommeil moyenne est de {sleep_quality:.1f}/5, "
+                    f"ce qui est faible. Essayez d'améliorer votre hygiène de sommeil.",
+                    {
+                        "alert_key": alert_key,
+                        "sleep_quality": sleep_quality,
+                        "threshold": 3.0,
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             # Vérifier stress élevé
@@ -769,19 +908,20 @@ class HealthSyncManager:
             stress_level = stress_metrics.get("avg_stress_level")
             if stress_level and stress_level > 70:
                 alert_key = f"stress_high_{int(stress_level)}"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.WARNING,
-                        "Niveau de Stress Élevé",
-                        f"Votre niveau de stress moyen est de {stress_level:.1f}/100, "
-                        f"ce qui est élevé. Considérez des techniques de relaxation.",
-                        {
-                            "alert_key": alert_key,
-                            "stress_level": stress_level,
-                            "threshold": 70,
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.WARNING,
+                    "Niveau de Stress Élevé",
+                    f"Votre niveau de stress moyen est de {stress_level:.1f}/100, "
+                    f"ce qui est élevé. Considérez des techniques de relaxation.",
+                    {
+                        "alert_key": alert_key,
+                        "stress_level": stress_level,
+                        "threshold": 70,
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             # Vérifier fréquence cardiaque anormale
@@ -790,35 +930,37 @@ class HealthSyncManager:
             if heart_rate:
                 if heart_rate > 100:
                     alert_key = f"heart_rate_high_{int(heart_rate)}"
-                    if alert_key not in existing_alert_keys:
-                        alerts_system.create_alert(
-                            AlertType.HEALTH_SYNC,
-                            AlertSeverity.WARNING,
-                            "Fréquence Cardiaque Élevée",
-                            f"Votre fréquence cardiaque moyenne est de {heart_rate:.0f} bpm, "
-                            f"ce qui est élevé. Consultez un médecin si cela persiste.",
-                            {
-                                "alert_key": alert_key,
-                                "heart_rate": heart_rate,
-                                "threshold": 100,
-                            },
-                        )
+                    if alerts_system.create_alert(
+                        AlertType.HEALTH_SYNC,
+                        AlertSeverity.WARNING,
+                        "Fréquence Cardiaque Élevée",
+                        f"Votre fréquence cardiaque moyenne est de {heart_rate:.0f} bpm, "
+                        f"ce qui est élevé. Consultez un médecin si cela persiste.",
+                        {
+                            "alert_key": alert_key,
+                            "heart_rate": heart_rate,
+                            "threshold": 100,
+                        },
+                        dedup_key=alert_key,
+                        cooldown_hours=cooldown_hours,
+                    ):
                         created_count += 1
                 elif heart_rate < 50:
                     alert_key = f"heart_rate_low_{int(heart_rate)}"
-                    if alert_key not in existing_alert_keys:
-                        alerts_system.create_alert(
-                            AlertType.HEALTH_SYNC,
-                            AlertSeverity.INFO,
-                            "Fréquence Cardiaque Basse",
-                            f"Votre fréquence cardiaque moyenne est de {heart_rate:.0f} bpm. "
-                            f"Si vous êtes sportif, c'est normal. Sinon, consultez un médecin.",
-                            {
-                                "alert_key": alert_key,
-                                "heart_rate": heart_rate,
-                                "threshold": 50,
-                            },
-                        )
+                    if alerts_system.create_alert(
+                        AlertType.HEALTH_SYNC,
+                        AlertSeverity.INFO,
+                        "Fréquence Cardiaque Basse",
+                        f"Votre fréquence cardiaque moyenne est de {heart_rate:.0f} bpm. "
+                        f"Si vous êtes sportif, c'est normal. Sinon, consultez un médecin.",
+                        {
+                            "alert_key": alert_key,
+                            "heart_rate": heart_rate,
+                            "threshold": 50,
+                        },
+                        dedup_key=alert_key,
+                        cooldown_hours=cooldown_hours,
+                    ):
                         created_count += 1
 
             # Vérifier tendances (sommeil en baisse, stress en hausse)
@@ -829,56 +971,59 @@ class HealthSyncManager:
                 and sleep_duration_hours < 7
             ):
                 alert_key = "sleep_trend_decreasing"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.WARNING,
-                        "Tendance Sommeil en Baisse",
-                        f"Votre durée de sommeil est en baisse et actuellement à "
-                        f"{sleep_duration_hours:.1f}h. Essayez d'améliorer votre hygiène de sommeil.",
-                        {
-                            "alert_key": alert_key,
-                            "sleep_duration_hours": sleep_duration_hours,
-                            "trend": "decreasing",
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.WARNING,
+                    "Tendance Sommeil en Baisse",
+                    f"Votre durée de sommeil est en baisse et actuellement à "
+                    f"{sleep_duration_hours:.1f}h. Essayez d'améliorer votre hygiène de sommeil.",
+                    {
+                        "alert_key": alert_key,
+                        "sleep_duration_hours": sleep_duration_hours,
+                        "trend": "decreasing",
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             stress_trend = stress_metrics.get("trend")
             if stress_trend == "increasing" and stress_level and stress_level > 60:
                 alert_key = "stress_trend_increasing"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.WARNING,
-                        "Tendance Stress en Hausse",
-                        f"Votre niveau de stress est en hausse et actuellement à "
-                        f"{stress_level:.1f}/100. Prenez du temps pour vous détendre.",
-                        {
-                            "alert_key": alert_key,
-                            "stress_level": stress_level,
-                            "trend": "increasing",
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.WARNING,
+                    "Tendance Stress en Hausse",
+                    f"Votre niveau de stress est en hausse et actuellement à "
+                    f"{stress_level:.1f}/100. Prenez du temps pour vous détendre.",
+                    {
+                        "alert_key": alert_key,
+                        "stress_level": stress_level,
+                        "trend": "increasing",
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             # Vérifier activité physique insuffisante
             daily_steps = activity_metrics.get("avg_daily_steps")
             if daily_steps and daily_steps < 5000:
                 alert_key = f"activity_low_{int(daily_steps / 1000)}k"
-                if alert_key not in existing_alert_keys:
-                    alerts_system.create_alert(
-                        AlertType.HEALTH_SYNC,
-                        AlertSeverity.INFO,
-                        "Activité Physique Insuffisante",
-                        f"Votre nombre moyen de pas quotidiens est de {daily_steps:.0f}, "
-                        f"ce qui est inférieur à la recommandation (10 000 pas/jour).",
-                        {
-                            "alert_key": alert_key,
-                            "daily_steps": daily_steps,
-                            "recommended": 10000,
-                        },
-                    )
+                if alerts_system.create_alert(
+                    AlertType.HEALTH_SYNC,
+                    AlertSeverity.INFO,
+                    "Activité Physique Insuffisante",
+                    f"Votre nombre moyen de pas quotidiens est de {daily_steps:.0f}, "
+                    f"ce qui est inférieur à la recommandation (10 000 pas/jour).",
+                    {
+                        "alert_key": alert_key,
+                        "daily_steps": daily_steps,
+                        "recommended": 10000,
+                    },
+                    dedup_key=alert_key,
+                    cooldown_hours=cooldown_hours,
+                ):
                     created_count += 1
 
             if created_count > 0:
@@ -0,0 +1,97 @@
+"""
+ARKALIA ARIA - Repères de synchronisation santé
+===============================================
+
+Repères hauts (« watermarks ») par connecteur et par jeu de données :
+horodatage jusqu'auquel les données ont été synchronisées avec succès.
+Les synchronisations suivantes ne récupèrent que l'intervalle depuis le
+repère (avec un recouvrement pour les données arrivées en retard).
+"""
+
+from datetime import datetime
+from typing import Any
+
+from core import DatabaseManager
+
+
+class SyncWatermarkStore:
+    """Persistance des repères de synchronisation dans la base ARIA."""
+
+    def __init__(self, db_path: str = "aria_pain.db") -> None:
+        """
+        Initialise le stockage des repères.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+        """
+        self.db = DatabaseManager(db_path)
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS health_sync_watermarks (
+                connector TEXT NOT NULL,
+                dataset TEXT NOT NULL,
+                watermark TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (connector, dataset)
+            )
+            """)
+
+    def get(self, connector: str) -> dict[str, datetime]:
+        """
+        Repères d'un connecteur.
+
+        Returns:
+            Dict jeu de données -> horodatage du repère
+        """
+        rows = self.db.execute_query(
+            "SELECT dataset, watermark FROM health_sync_watermarks WHERE connector = ?",
+            (connector,),
+        )
+        return {row["dataset"]: datetime.fromisoformat(row["watermark"]) for row in rows}
+
+    def advance(self, connector: str, watermarks: dict[str, datetime]) -> None:
+        """
+        Avance les repères d'un connecteur (jamais de recul).
+
+        Args:
+            connector: Nom du connecteur
+            watermarks: Dict jeu de données -> nouvel horodatage
+        """
+        if not watermarks:
+            return
+        now = datetime.now().isoformat()
+        self.db.execute_many(
+            """
+            INSERT INTO health_sync_watermarks (connector, dataset, watermark, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (connector, dataset) DO UPDATE SET
+                watermark = MAX(watermark, excluded.watermark),
+                updated_at = excluded.updated_at
+            """,
+            [
+                (connector, dataset, moment.isoformat(), now)
+                for dataset, moment in watermarks.items()
+            ],
+        )
+
+    def reset(self, connector: str | None = None) -> int:
+        """
+        Supprime les repères (d'un connecteur ou de tous).
+
+        Returns:
+            Nombre de repères supprimés
+        """
+        if connector is None:
+            return self.db.execute_update("DELETE FROM health_sync_watermarks")
+        return self.db.execute_update(
+            "DELETE FROM health_sync_watermarks WHERE connector = ?", (connector,)
+        )
+
+    def list_all(self) -> list[dict[str, Any]]:
+        """Tous les repères (pour le statut)."""
+        return [
+            dict(row)
+            for row in self.db.execute_query(
+                "SELECT connector, dataset, watermark, updated_at "
+                "FROM health_sync_watermarks ORDER BY connector, dataset"
+            )
+        ]
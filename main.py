@@ -3,16 +3,19 @@ ARKALIA ARIA - Research Intelligence Assistant
 Point d'entrée principal pour le laboratoire de recherche santé personnel
 """
 
+import asyncio
 import logging
 import os
 import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Ajouter le répertoire courant au Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 # Imports des modules
@@ -21,10 +24,12 @@ from audio_voice.api import router as audio_router
 from cia_compatibility.api import router as cia_compat_router
 from cia_sync.api import router as sync_router
 from cia_sync.bbia_api import router as bbia_router
+from core.scheduler import get_scheduler
 from devops_automation.api import ARIA_DevOpsAPI
 from health_connectors.api import HealthConnectorsAPI
 from metrics_collector.api import ARIA_MetricsAPI
 from pain_tracking.api import router as pain_router
+from pattern_analysis.api import close_emotion_analyzer
 from pattern_analysis.api import router as pattern_router
 from prediction_engine.api import router as prediction_router
 from research_tools.api import router as research_router
@@ -34,8 +39,21 @@ logger = logging.getLogger(__name__)
 
 # watch_integration supprimé - doublon de health_connectors
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Cycle de vie : arrête les tâches de fond, persiste les données en attente."""
+    yield
+    # Arrêt propre des tâches planifiées (exports, synchronisations) plutôt
+    # qu'une interruption du thread à la sortie du processus
+    await asyncio.to_thread(get_scheduler().stop)
+    close_emotion_analyzer()
+    logger.info("✅ Historique émotionnel persisté avant arrêt")
+
+
 # Application FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="ARKALIA ARIA",
     description="Research Intelligence Assistant - Laboratoire de recherche santé personnel",
     version="1.0.0",
@@ -160,6 +178,20 @@ else:
         "ℹ️ Synchronisation automatique santé désactivée (ARIA_HEALTH_AUTO_SYNC_ENABLED=false)"
     )
 
+# Activation du suivi de précision des prédictions si configuré
+if os.getenv("ARIA_ACCURACY_BACKFILL_ENABLED", "0").lower() in ("1", "true"):
+    try:
+        from prediction_engine.accuracy_tracker import get_accuracy_tracker
+
+        backfill_interval = int(os.getenv("ARIA_ACCURACY_BACKFILL_MINUTES", "30"))
+        if get_accuracy_tracker().start(interval_minutes=backfill_interval):
+            logger.info(
+                f"✅ Suivi de précision des prédictions activé "
+                f"(intervalle: {backfill_interval} min)"
+            )
+    except Exception as e:
+        logger.warning(f"⚠️ Suivi de précision désactivé: {e}")
+
 # Activation automatique des rapports si configurée
 if os.getenv("ARIA_AUTO_REPORTS_ENABLED", "0").lower() in ("1", "true"):
     try:
@@ -220,6 +252,21 @@ async def health_check():
     }
 
 
+@app.get("/api/jobs")
+async def jobs_status():
+    """Statut des tâches de fond planifiées (durées, erreurs, échéances)"""
+    return get_scheduler().get_status()
+
+
+@app.post("/api/jobs/{name}/run")
+async def run_job(name: str):
+    """Exécute immédiatement une tâche planifiée"""
+    try:
+        return await get_scheduler().run_now(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Tâche inconnue: {name}") from e
+
+
 def main() -> None:
     """Point d'entrée CLI par défaut pour démarrer l'API ARIA."""
     uvicorn.run(
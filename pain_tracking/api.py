@@ -4,6 +4,7 @@ Pain Tracking API - Module de suivi de la douleur ARIA
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 from typing import Any, TypedDict
 
@@ -24,6 +25,33 @@ logger = api.logger
 db = api.db
 
 
+async def _on_entry_created(timestamp: str, intensity: int) -> None:
+    """
+    Met à jour les features horaires et le détecteur de poussées.
+
+    Le recalcul (SQLite et fichiers santé, au plus ``MAX_REFRESH_DAYS`` jours
+    en arrière pour une entrée saisie a posteriori) s'exécute dans un thread
+    pour ne pas bloquer la boucle des requêtes.
+    """
+    await asyncio.to_thread(_update_predictions, timestamp, intensity)
+
+
+def _update_predictions(timestamp: str, intensity: int) -> None:
+    """Mise à jour synchrone des features et du détecteur (hors boucle)."""
+    try:
+        from prediction_engine.feature_store import get_feature_store
+        from prediction_engine.flare_detector import get_flare_detector
+    except ImportError as e:
+        logger.debug(f"Moteur de prédiction indisponible: {e}")
+        return
+
+    get_feature_store().notify_pain_entry(timestamp)
+    try:
+        get_flare_detector().observe_pain_entry(timestamp, intensity)
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur détection de poussée: {e}")
+
+
 def _init_tables() -> None:
     """Initialise les tables de la base de données."""
     try:
@@ -283,6 +311,7 @@ async def pain_tracking_status() -> dict:
             "export_csv",
             "export_psy_html",
             "suggestions",
+            "similar_episodes",
         ],
     }
 
@@ -314,6 +343,7 @@ async def create_quick_entry(entry: QuickEntry) -> PainEntryOut:
                 status_code=500, detail="Erreur lors de la création de l'entrée"
             )
 
+        await _on_entry_created(ts, int(entry.intensity))
         logger.info(f"✅ Entrée rapide créée: intensité {entry.intensity}")
         return PainEntryOut(**dict(rows[0]))
     except HTTPException:
@@ -372,6 +402,7 @@ async def create_pain_entry(entry: PainEntryIn) -> PainEntryOut:
                 status_code=500, detail="Erreur lors de la création de l'entrée"
             )
 
+        await _on_entry_created(ts, int(entry.intensity))
         logger.info(f"✅ Entrée détaillée créée: intensité {entry.intensity}")
         return PainEntryOut(**dict(rows[0]))
     except HTTPException:
@@ -454,6 +485,32 @@ async def list_recent(limit: int = 20) -> list[PainEntryOut]:
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}") from e
 
 
+@router.get("/entries/{entry_id}/similar")
+async def list_similar_entries(
+    entry_id: int,
+    k: int = Query(10, ge=1, le=100, description="Nombre d'épisodes similaires"),
+) -> dict[str, Any]:
+    """
+    Épisodes passés les plus similaires et actions qui ont aidé.
+
+    Similarité cosinus sur l'encodage de chaque entrée (intensité,
+    déclencheurs, activité, lieu, moment, sommeil et stress précédents).
+    """
+    _init_tables()
+    try:
+        from pain_tracking.similarity_index import get_similarity_index
+
+        result = get_similarity_index().find_similar(entry_id, k)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Entrée non trouvée")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erreur recherche épisodes similaires: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}") from e
+
+
 @router.get("/export/psy-report")
 async def export_psy_report() -> dict[str, Any]:
     """Export HTML prêt à imprimer pour psychologue.
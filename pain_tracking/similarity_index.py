@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Similarity Index - Recherche d'épisodes de douleur similaires
+Chaque entrée est encodée en vecteur de taille fixe (intensité, déclencheurs
+hachés, activité, lieu, heure, jour, sommeil et stress précédents) dans une
+matrice NumPy contiguë mise à jour incrémentalement ; la recherche des
+voisins est un produit matrice-vecteur (similarité cosinus)
+"""
+
+import math
+import re
+import threading
+import zlib
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from core import DatabaseManager
+from core.logging import get_logger
+from pattern_analysis.emotion_lexicon import normalize_text
+
+logger = get_logger("similarity_index")
+
+# Champs texte hachés, chacun dans son propre bloc de composantes
+HASHED_FIELDS = ["physical_trigger", "mental_trigger", "activity", "location"]
+HASH_BUCKETS = 16
+
+# Poids relatifs des blocs dans la similarité
+INTENSITY_WEIGHT = 2.0
+TIME_WEIGHT = 0.5
+FIELD_WEIGHT = 1.0
+HEALTH_WEIGHT = 1.0
+
+# Efficacité à partir de laquelle une action est considérée comme ayant aidé
+EFFECTIVE_THRESHOLD = 6
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_HEALTH_OFFSET = 1 + 4 + len(HASHED_FIELDS) * HASH_BUCKETS
+VECTOR_SIZE = _HEALTH_OFFSET + 2
+
+
+def _hour_key(timestamp: str) -> str:
+    """Clé ``hourly_features`` (heure pleine) d'un horodatage ISO."""
+    return f"{timestamp[:13]}:00:00".replace(" ", "T")
+
+
+def encode_entry(
+    entry: dict[str, Any], health: dict[str, Any] | None = None
+) -> np.ndarray:
+    """
+    Encode une entrée de douleur en vecteur normalisé (norme 1).
+
+    Args:
+        entry: Ligne ``pain_entries`` (timestamp, intensity, champs texte)
+        health: Features horaires (``stress_ewma``, ``last_sleep_quality``)
+
+    Returns:
+        Vecteur float32 de taille ``VECTOR_SIZE``
+    """
+    vector = np.zeros(VECTOR_SIZE, dtype=np.float32)
+    vector[0] = INTENSITY_WEIGHT * float(entry.get("intensity") or 0) / 10
+
+    try:
+        moment = datetime.fromisoformat(str(entry.get("timestamp")).replace("Z", ""))
+        hour_angle = 2 * math.pi * (moment.hour + moment.minute / 60) / 24
+        day_angle = 2 * math.pi * moment.weekday() / 7
+        vector[1:5] = TIME_WEIGHT * np.array(
+            [
+                math.sin(hour_angle),
+                math.cos(hour_angle),
+                math.sin(day_angle),
+                math.cos(day_angle),
+            ]
+        )
+    except ValueError:
+        pass
+
+    for block, field in enumerate(HASHED_FIELDS):
+        text = entry.get(field)
+        if not text or not isinstance(text, str):
+            continue
+        tokens = _TOKEN_PATTERN.findall(normalize_text(text))
+        if not tokens:
+            continue
+        offset = 5 + block * HASH_BUCKETS
+        weight = FIELD_WEIGHT / math.sqrt(len(tokens))
+        for token in tokens:
+            vector[offset + zlib.crc32(token.encode()) % HASH_BUCKETS] += weight
+
+    # Écart au niveau neutre (0.5) : une donnée absente ne rapproche rien
+    if health:
+        if health.get("stress_ewma") is not None:
+            vector[_HEALTH_OFFSET] = HEALTH_WEIGHT * (float(health["stress_ewma"]) - 0.5)
+        if health.get("last_sleep_quality") is not None:
+            vector[_HEALTH_OFFSET + 1] = HEALTH_WEIGHT * (
+                float(health["last_sleep_quality"]) - 0.5
+            )
+
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class EpisodeSimilarityIndex:
+    """
+    Index des épisodes de douleur pour la recherche des plus proches voisins.
+
+    Les vecteurs sont stockés dans une matrice contiguë dont la capacité
+    double au besoin ; chaque rafraîchissement n'encode que les entrées
+    d'id supérieur au dernier indexé. Une suppression (nombre d'entrées
+    inférieur à celui indexé) déclenche une reconstruction.
+    """
+
+    def __init__(self, db_path: str = "aria_pain.db", initial_capacity: int = 1024):
+        """
+        Initialise l'index (vide, rempli au premier rafraîchissement).
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+            initial_capacity: Nombre de lignes préallouées
+        """
+        self.db = DatabaseManager(db_path)
+        self._lock = threading.Lock()
+        self._initial_capacity = initial_capacity
+        self._reset()
+
+    def _reset(self) -> None:
+        self.vectors = np.zeros((self._initial_capacity, VECTOR_SIZE), dtype=np.float32)
+        self.ids = np.zeros(self._initial_capacity, dtype=np.int64)
+        self.size = 0
+        self._rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.ids):
+            return
+        capacity = max(needed, 2 * len(self.ids))
+        vectors = np.zeros((capacity, VECTOR_SIZE), dtype=np.float32)
+        vectors[: self.size] = self.vectors[: self.size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[: self.size] = self.ids[: self.size]
+        self.vectors, self.ids = vectors, ids
+
+    def _load_health(self, hours: list[str]) -> dict[str, dict[str, Any]]:
+        """Features horaires des heures données (feature store)."""
+        if not hours or not self.db.table_exists("hourly_features"):
+            return {}
+        rows = self.db.execute_query(
+            """
+            SELECT hour, stress_ewma, last_sleep_quality FROM hourly_features
+            WHERE hour BETWEEN ? AND ?
+            """,
+            (min(hours), max(hours)),
+        )
+        return {row["hour"]: dict(row) for row in rows}
+
+    def refresh(self) -> int:
+        """
+        Indexe les nouvelles entrées.
+
+        Returns:
+            Nombre d'entrées ajoutées
+        """
+        with self._lock:
+            if not self.db.table_exists("pain_entries"):
+                self._reset()
+                return 0
+
+            last_id = int(self.ids[self.size - 1]) if self.size else 0
+            if self.size:
+                indexed = self.db.execute_query(
+                    "SELECT COUNT(*) AS n FROM pain_entries WHERE id <= ?", (last_id,)
+                )[0]["n"]
+                if indexed != self.size:
+                    logger.info("🔄 Entrées supprimées : reconstruction de l'index")
+                    self._reset()
+                    last_id = 0
+
+            rows = [
+                dict(row)
+                for row in self.db.execute_query(
+                    f"""
+                    SELECT id, timestamp, intensity, {", ".join(HASHED_FIELDS)}
+                    FROM pain_entries WHERE id > ? ORDER BY id
+                    """,
+                    (last_id,),
+                )
+            ]
+            if not rows:
+                return 0
+
+            health = self._load_health(
+                [_hour_key(str(row["timestamp"])) for row in rows if row["timestamp"]]
+            )
+            self._ensure_capacity(len(rows))
+            for offset, row in enumerate(rows):
+                position = self.size + offset
+                self.vectors[position] = encode_entry(
+                    row, health.get(_hour_key(str(row["timestamp"])))
+                )
+                self.ids[position] = row["id"]
+                self._rows[row["id"]] = position
+            self.size += len(rows)
+            logger.debug(f"🧭 {len(rows)} épisodes indexés ({self.size} au total)")
+            return len(rows)
+
+    def search(self, entry_id: int, k: int = 10) -> list[tuple[int, float]] | None:
+        """
+        Plus proches voisins d'une entrée indexée.
+
+        Args:
+            entry_id: Id de l'entrée de référence
+            k: Nombre de voisins
+
+        Returns:
+            Liste (id, similarité cosinus) décroissante, None si l'entrée est
+            inconnue
+        """
+        self.refresh()
+        with self._lock:
+            row = self._rows.get(entry_id)
+            if row is None:
+                return None
+            scores = self.vectors[: self.size] @ self.vectors[row]
+            scores[row] = -np.inf
+            k = min(k, self.size - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+    def find_similar(self, entry_id: int, k: int = 10) -> dict[str, Any] | None:
+        """
+        Épisodes similaires et actions qui ont aidé chez ces voisins.
+
+        Args:
+            entry_id: Id de l'entrée de référence
+            k: Nombre de voisins
+
+        Returns:
+            Voisins (entrée + similarité) et actions agrégées, None si
+            l'entrée n'existe pas
+        """
+        neighbors = self.search(entry_id, k)
+        if neighbors is None:
+            return None
+
+        similarity = dict(neighbors)
+        entries: list[dict[str, Any]] = []
+        if neighbors:
+            placeholders = ", ".join("?" * len(neighbors))
+            rows = self.db.execute_query(
+                f"SELECT * FROM pain_entries WHERE id IN ({placeholders})",
+                tuple(similarity),
+            )
+            entries = sorted(
+                (
+                    {**dict(row), "similarity": round(similarity[row["id"]], 4)}
+                    for row in rows
+                ),
+                key=lambda entry: entry["similarity"],
+                reverse=True,
+            )
+
+        actions: dict[str, dict[str, Any]] = {}
+        for entry in entries:
+            action = (entry.get("action_taken") or "").strip()
+            if not action:
+                continue
+            stats = actions.setdefault(
+                action,
+                {
+                    "action": action,
+                    "count": 0,
+                    "rated": 0,
+                    "effective": 0,
+                    "effectiveness_sum": 0.0,
+                    "similarity_sum": 0.0,
+                },
+            )
+            stats["count"] += 1
+            stats["similarity_sum"] += entry["similarity"]
+            if entry.get("effectiveness") is not None:
+                stats["rated"] += 1
+                stats["effectiveness_sum"] += entry["effectiveness"]
+                if entry["effectiveness"] >= EFFECTIVE_THRESHOLD:
+                    stats["effective"] += 1
+
+        helpful = [
+            {
+                "action": stats["action"],
+                "count": stats["count"],
+                "mean_effectiveness": (
+                    round(stats["effectiveness_sum"] / stats["rated"], 2)
+                    if stats["rated"]
+                    else None
+                ),
+                "success_rate": (
+                    round(stats["effective"] / stats["rated"], 2)
+                    if stats["rated"]
+                    else None
+                ),
+                "mean_similarity": round(stats["similarity_sum"] / stats["count"], 4),
+            }
+            for stats in actions.values()
+        ]
+        helpful.sort(
+            key=lambda a: (a["mean_effectiveness"] or -1, a["count"]), reverse=True
+        )
+
+        return {
+            "entry_id": entry_id,
+            "indexed_episodes": self.size,
+            "similar_entries": entries,
+            "actions_that_worked": [
+                action for action in helpful if (action["success_rate"] or 0) > 0
+            ],
+            "actions": helpful,
+        }
+
+
+# Instance globale (singleton)
+_similarity_index: EpisodeSimilarityIndex | None = None
+
+
+def get_similarity_index() -> EpisodeSimilarityIndex:
+    """Récupère ou crée l'instance globale de l'index de similarité."""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = EpisodeSimilarityIndex()
+    return _similarity_index
@@ -3,17 +3,29 @@ Pattern Analysis API - Module d'analyse de patterns ARIA
 IA locale pour découvrir des corrélations dans les données de santé
 """
 
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query
 
+from core.config import config
+
+from .association_miner import TriggerAssociationMiner
 from .correlation_analyzer import CorrelationAnalyzer
+from .emotion_analyzer import ARIAREmotionAnalyzer
+from .temporal_structure import TemporalStructureAnalyzer
 
 router = APIRouter()
 
-# Instance globale de l'analyseur (singleton pattern)
+# Instances globales (singleton pattern)
 _analyzer: CorrelationAnalyzer | None = None
+_association_miner: TriggerAssociationMiner | None = None
+_emotion_analyzer: ARIAREmotionAnalyzer | None = None
+_temporal_analyzer: TemporalStructureAnalyzer | None = None
+
+# Taille maximale d'un lot de classification émotionnelle
+MAX_CLASSIFY_ENTRIES = 50000
 
 
 def get_analyzer() -> CorrelationAnalyzer:
@@ -24,6 +36,36 @@ def get_analyzer() -> CorrelationAnalyzer:
     return _analyzer
 
 
+def get_association_miner() -> TriggerAssociationMiner:
+    """Récupère ou crée l'instance du mineur d'associations."""
+    global _association_miner
+    if _association_miner is None:
+        _association_miner = TriggerAssociationMiner()
+    return _association_miner
+
+
+def get_emotion_analyzer() -> ARIAREmotionAnalyzer:
+    """Récupère ou crée l'analyseur émotionnel (historique persisté en base)."""
+    global _emotion_analyzer
+    if _emotion_analyzer is None:
+        _emotion_analyzer = ARIAREmotionAnalyzer(db_path=str(config.get_db_path()))
+    return _emotion_analyzer
+
+
+def close_emotion_analyzer() -> None:
+    """Persiste l'historique émotionnel en attente (arrêt de l'application)."""
+    if _emotion_analyzer is not None:
+        _emotion_analyzer.close()
+
+
+def get_temporal_analyzer() -> TemporalStructureAnalyzer:
+    """Récupère ou crée l'instance de l'analyseur de structure temporelle."""
+    global _temporal_analyzer
+    if _temporal_analyzer is None:
+        _temporal_analyzer = TemporalStructureAnalyzer()
+    return _temporal_analyzer
+
+
 @router.get("/status")
 async def pattern_analysis_status() -> dict:
     """Statut du module pattern analysis"""
@@ -39,6 +81,10 @@ async def pattern_analysis_status() -> dict:
             "sleep_pain_correlation",
             "stress_pain_correlation",
             "recurrent_triggers",
+            "trigger_associations",
+            "emotion_classification",
+            "periodicity_detection",
+            "change_point_detection",
         ],
     }
 
@@ -169,6 +215,177 @@ async def get_recurrent_triggers(
         ) from e
 
 
+@router.get("/triggers/associations")
+async def get_trigger_associations(
+    min_support: float = Query(0.05, gt=0, le=1, description="Support minimal"),
+    min_confidence: float = Query(0.5, ge=0, le=1, description="Confiance minimale"),
+    min_lift: float = Query(1.0, ge=0, description="Lift minimal"),
+    max_size: int = Query(3, ge=2, le=5, description="Taille maximale des combinaisons"),
+    days: int | None = Query(
+        None, ge=1, le=3650, description="Limiter aux N derniers jours"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="Nombre maximal de règles"),
+) -> dict:
+    """
+    Combinaisons fréquentes de déclencheurs (règles d'association).
+
+    Combine déclencheur physique, déclencheur mental, activité, tranche
+    horaire et personnes présentes. Retourne :
+    - Itemsets fréquents avec leur support
+    - Règles X → Y avec support, confiance et lift
+    """
+    try:
+        miner = get_association_miner()
+        return miner.mine(
+            min_support=min_support,
+            min_confidence=min_confidence,
+            min_lift=min_lift,
+            max_size=max_size,
+            days_back=days,
+            max_rules=limit,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}"
+        ) from e
+
+
+@router.post("/triggers/associations/refresh")
+async def refresh_trigger_associations(full: bool = Query(False)) -> dict:
+    """
+    Rafraîchit l'encodage des épisodes pour la fouille d'associations.
+
+    Par défaut seuls les nouveaux épisodes sont encodés ; ``full=true``
+    force une reconstruction complète.
+    """
+    try:
+        miner = get_association_miner()
+        return miner.refresh(full=full)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors du rafraîchissement: {str(e)}"
+        ) from e
+
+
+@router.get("/temporal/periodicity")
+async def get_periodicity(
+    days: int | None = Query(
+        None, ge=2, le=3650, description="Limiter aux N derniers jours"
+    ),
+    top: int = Query(5, ge=1, le=50, description="Nombre de pics retournés"),
+) -> dict:
+    """
+    Cycles de la série horaire d'intensité (autocorrélation FFT et spectre).
+
+    Retourne la force des cycles journalier, hebdomadaire et menstruel
+    (21-35 jours) ainsi que les principaux pics d'autocorrélation et
+    spectraux. Résultat en cache par version des données.
+    """
+    try:
+        return get_temporal_analyzer().detect_periodicity(days_back=days, top=top)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}"
+        ) from e
+
+
+@router.get("/temporal/change-points")
+async def get_change_points(
+    days: int | None = Query(
+        None, ge=2, le=3650, description="Limiter aux N derniers jours"
+    ),
+    penalty_scale: float = Query(
+        1.0, gt=0, le=100, description="Multiplicateur de pénalité (PELT)"
+    ),
+    min_segment_days: int = Query(
+        3, ge=1, le=365, description="Jours avec entrées minimum par segment"
+    ),
+) -> dict:
+    """
+    Changements de régime de l'intensité journalière (PELT).
+
+    Retourne les segments (intensité moyenne, épisodes par jour) et les
+    ruptures entre segments. Résultat en cache par version des données.
+    """
+    try:
+        return get_temporal_analyzer().detect_change_points(
+            days_back=days,
+            penalty_scale=penalty_scale,
+            min_segment_days=min_segment_days,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}"
+        ) from e
+
+
+@router.post("/emotions/classify")
+async def classify_emotions(data: dict[str, Any]) -> dict:
+    """
+    Classe émotionnellement un lot d'entrées de douleur.
+
+    Body attendu :
+    {
+        "entries": [...],  # Optionnel : entrées à classer
+        "days_back": 365,  # Sinon : historique pain_entries (None = tout)
+        "limit": 10000,  # Optionnel, défaut 10000
+        "include_results": true  # Optionnel : détail par entrée
+    }
+    """
+    try:
+        entries = data.get("entries")
+        limit = min(int(data.get("limit", 10000)), MAX_CLASSIFY_ENTRIES)
+        if entries is None:
+            days_back = data.get("days_back")
+            query = """
+                SELECT id, timestamp, intensity, physical_trigger,
+                       mental_trigger, activity, emotions
+                FROM pain_entries
+            """
+            params: tuple[Any, ...] = ()
+            if days_back is not None:
+                query += " WHERE timestamp >= ?"
+                params = (
+                    (datetime.now() - timedelta(days=int(days_back))).isoformat(),
+                )
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            rows = get_analyzer().db.execute_query(query, params + (limit,))
+            entries = [dict(row) for row in rows]
+        elif not isinstance(entries, list) or not all(
+            isinstance(entry, dict) for entry in entries
+        ):
+            raise HTTPException(
+                status_code=400, detail="'entries' doit être une liste d'objets"
+            )
+        else:
+            entries = entries[:limit]
+
+        started = time.perf_counter()
+        results = get_emotion_analyzer().classify_entries(entries)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        distribution: dict[str, int] = {}
+        for result in results:
+            emotion = result["detected_emotion"]
+            distribution[emotion] = distribution.get(emotion, 0) + 1
+
+        response: dict[str, Any] = {
+            "total_entries": len(results),
+            "emotion_distribution": distribution,
+            "duration_ms": round(duration_ms, 2),
+            "timestamp": datetime.now().isoformat(),
+        }
+        if data.get("include_results", True):
+            response["results"] = results
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors de la classification: {str(e)}"
+        ) from e
+
+
 @router.post("/analyze")
 async def analyze_patterns(data: dict[str, Any]) -> dict:
     """
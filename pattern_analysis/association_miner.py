@@ -0,0 +1,364 @@
+"""
+Association Miner - Fouille de combinaisons de déclencheurs ARIA
+Détecte les combinaisons fréquentes (déclencheur physique × mental × activité ×
+tranche horaire × personnes présentes) avec support, confiance et lift.
+"""
+
+import math
+import threading
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Any
+
+from core import DatabaseManager, get_logger
+
+logger = get_logger("association_miner")
+
+# Dimensions encodées comme items (colonne pain_entries -> nom de dimension)
+ITEM_DIMENSIONS: dict[str, str] = {
+    "physical_trigger": "physical",
+    "mental_trigger": "mental",
+    "activity": "activity",
+    "who_present": "who_present",
+}
+
+# Tranches horaires (heure de début incluse, heure de fin exclue)
+HOUR_BANDS: list[tuple[int, int, str]] = [
+    (0, 6, "nuit"),
+    (6, 12, "matin"),
+    (12, 18, "apres_midi"),
+    (18, 24, "soir"),
+]
+
+
+def _hour_band(timestamp: str) -> str | None:
+    """Retourne la tranche horaire d'un timestamp ISO."""
+    try:
+        hour = int(timestamp.split("T")[1][:2]) if "T" in timestamp else None
+    except (IndexError, ValueError):
+        return None
+    if hour is None:
+        return None
+    for start, end, label in HOUR_BANDS:
+        if start <= hour < end:
+            return label
+    return None
+
+
+def _positions_to_bitset(positions: list[int], length: int) -> int:
+    """Construit un bitset (entier) à partir de positions de bits."""
+    buffer = bytearray((length + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class TriggerAssociationMiner:
+    """
+    Fouille d'itemsets fréquents sur les épisodes de douleur.
+
+    Chaque épisode est encodé en items ``dimension:valeur``. Pour chaque item,
+    on maintient un bitset vertical (entier Python, bit i = épisode i) : le
+    support d'un itemset est le popcount de l'intersection de ses bitsets
+    (algorithme Eclat). L'encodage est rafraîchi de façon incrémentale à
+    partir du dernier id traité.
+    """
+
+    def __init__(self, db_path: str = "aria_pain.db") -> None:
+        """
+        Initialise le mineur d'associations.
+
+        Args:
+            db_path: Chemin vers la base de données de douleur
+        """
+        self.db = DatabaseManager(db_path)
+        self._lock = threading.Lock()
+        self._reset_state()
+        logger.info("🔗 Trigger Association Miner initialisé")
+
+    def _reset_state(self) -> None:
+        """Réinitialise l'encodage des épisodes."""
+        self._item_bitsets: dict[str, int] = {}
+        self._episode_epochs: list[float] = []
+        self._last_entry_id = 0
+        self._episode_count = 0
+        self._last_refresh: datetime | None = None
+
+    @staticmethod
+    def _episode_items(entry: dict[str, Any]) -> set[str]:
+        """Extrait les items d'un épisode."""
+        items: set[str] = set()
+        for column, dimension in ITEM_DIMENSIONS.items():
+            raw_value = entry.get(column)
+            if not raw_value:
+                continue
+            # who_present peut contenir plusieurs personnes séparées par des virgules
+            values = raw_value.split(",") if column == "who_present" else [raw_value]
+            for value in values:
+                normalized = value.strip().lower()
+                if normalized:
+                    items.add(f"{dimension}:{normalized}")
+
+        band = _hour_band(entry.get("timestamp") or "")
+        if band:
+            items.add(f"hour_band:{band}")
+        return items
+
+    def refresh(self, full: bool = False) -> dict[str, Any]:
+        """
+        Met à jour l'encodage avec les nouveaux épisodes.
+
+        Un rafraîchissement complet est forcé si des entrées ont été
+        supprimées depuis le dernier passage (compteur incohérent).
+
+        Args:
+            full: Forcer la reconstruction complète
+
+        Returns:
+            Résumé du rafraîchissement
+        """
+        with self._lock:
+            try:
+                stats = self.db.execute_query(
+                    "SELECT COUNT(*) AS count, MAX(id) AS max_id FROM pain_entries"
+                )
+            except Exception as e:
+                logger.error(f"Erreur lecture pain_entries: {e}")
+                return {"mode": "error", "new_episodes": 0, "total_episodes": 0}
+
+            total = stats[0]["count"] if stats else 0
+            max_id = (stats[0]["max_id"] if stats else None) or 0
+            expected = self._episode_count + self._count_new_rows(max_id)
+            if (
+                full
+                or self._last_refresh is None
+                or total != expected
+                or max_id < self._last_entry_id
+            ):
+                self._reset_state()
+                mode = "full"
+            else:
+                mode = "incremental"
+
+            rows = self.db.execute_query(
+                """
+                SELECT id, timestamp, physical_trigger, mental_trigger,
+                       activity, who_present
+                FROM pain_entries
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (self._last_entry_id,),
+            )
+
+            # Positions des nouveaux épisodes par item, converties en un seul
+            # bitset par item (évite un OR sur grand entier par épisode)
+            base = self._episode_count
+            new_positions: dict[str, list[int]] = {}
+            for offset, row in enumerate(rows):
+                entry = dict(row)
+                for item in self._episode_items(entry):
+                    new_positions.setdefault(item, []).append(offset)
+                self._episode_epochs.append(self._to_epoch(entry.get("timestamp")))
+                self._last_entry_id = entry["id"]
+
+            for item, positions in new_positions.items():
+                segment = _positions_to_bitset(positions, len(rows))
+                self._item_bitsets[item] = self._item_bitsets.get(item, 0) | (
+                    segment << base
+                )
+            self._episode_count += len(rows)
+
+            self._last_refresh = datetime.now()
+            logger.debug(f"Associations rafraîchies ({mode}): +{len(rows)} épisodes")
+            return {
+                "mode": mode,
+                "new_episodes": len(rows),
+                "total_episodes": self._episode_count,
+                "distinct_items": len(self._item_bitsets),
+            }
+
+    def _count_new_rows(self, max_id: int) -> int:
+        """Compte les entrées ajoutées depuis le dernier id traité."""
+        if max_id <= self._last_entry_id:
+            return 0
+        rows = self.db.execute_query(
+            "SELECT COUNT(*) AS count FROM pain_entries WHERE id > ?",
+            (self._last_entry_id,),
+        )
+        return rows[0]["count"] if rows else 0
+
+    @staticmethod
+    def _to_epoch(timestamp: str | None) -> float:
+        """Convertit un timestamp ISO en epoch (0.0 si invalide)."""
+        if not timestamp:
+            return 0.0
+        try:
+            return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return 0.0
+
+    def _window_mask(self, days_back: int | None) -> tuple[int, int]:
+        """Construit le bitset des épisodes dans la fenêtre demandée."""
+        if days_back is None:
+            return (1 << self._episode_count) - 1, self._episode_count
+
+        cutoff = (datetime.now() - timedelta(days=days_back)).timestamp()
+        positions = [i for i, epoch in enumerate(self._episode_epochs) if epoch >= cutoff]
+        return _positions_to_bitset(positions, self._episode_count), len(positions)
+
+    def mine(
+        self,
+        min_support: float = 0.05,
+        min_confidence: float = 0.5,
+        min_lift: float = 1.0,
+        max_size: int = 3,
+        days_back: int | None = None,
+        max_rules: int = 50,
+    ) -> dict[str, Any]:
+        """
+        Calcule les itemsets fréquents et les règles d'association.
+
+        Args:
+            min_support: Support minimal (fraction des épisodes)
+            min_confidence: Confiance minimale des règles
+            min_lift: Lift minimal des règles
+            max_size: Taille maximale des itemsets
+            days_back: Limiter aux N derniers jours (None = tout l'historique)
+            max_rules: Nombre maximal de règles retournées
+
+        Returns:
+            Dict avec itemsets fréquents et règles triées par lift
+        """
+        refresh_info = self.refresh()
+
+        with self._lock:
+            mask, n_episodes = self._window_mask(days_back)
+            if n_episodes == 0:
+                return {
+                    "total_episodes": 0,
+                    "itemsets": [],
+                    "rules": [],
+                    "refresh": refresh_info,
+                    "message": "Aucune donnée disponible",
+                }
+
+            min_count = max(1, math.ceil(min_support * n_episodes))
+
+            # Items fréquents (niveau 1), restreints à la fenêtre
+            frequent: list[tuple[tuple[str, ...], int]] = []
+            level: list[tuple[tuple[str, ...], int]] = []
+            for item in sorted(self._item_bitsets):
+                bits = self._item_bitsets[item] & mask
+                if bits.bit_count() >= min_count:
+                    level.append(((item,), bits))
+
+            supports: dict[tuple[str, ...], int] = {}
+            size = 1
+            while level:
+                for itemset, bits in level:
+                    count = bits.bit_count()
+                    supports[itemset] = count
+                    frequent.append((itemset, count))
+                if size >= max_size:
+                    break
+                level = self._next_level(level, min_count)
+                size += 1
+
+        rules = self._build_rules(
+            supports, n_episodes, min_confidence, min_lift, max_rules
+        )
+
+        itemsets = [
+            {
+                "items": [self._describe_item(i) for i in itemset],
+                "count": count,
+                "support": round(count / n_episodes, 4),
+            }
+            for itemset, count in sorted(
+                (f for f in frequent if len(f[0]) >= 2),
+                key=lambda f: f[1],
+                reverse=True,
+            )
+        ]
+
+        return {
+            "total_episodes": n_episodes,
+            "parameters": {
+                "min_support": min_support,
+                "min_confidence": min_confidence,
+                "min_lift": min_lift,
+                "max_size": max_size,
+                "days_back": days_back,
+            },
+            "itemsets": itemsets[:max_rules],
+            "rules": rules,
+            "refresh": refresh_info,
+            "last_refresh": (
+                self._last_refresh.isoformat() if self._last_refresh else None
+            ),
+        }
+
+    @staticmethod
+    def _next_level(
+        level: list[tuple[tuple[str, ...], int]], min_count: int
+    ) -> list[tuple[tuple[str, ...], int]]:
+        """Génère les candidats de taille k+1 par jointure de préfixes (Eclat)."""
+        next_level: list[tuple[tuple[str, ...], int]] = []
+        for i, (left, left_bits) in enumerate(level):
+            left_dimension = left[-1].split(":", 1)[0]
+            for right, right_bits in level[i + 1 :]:
+                if left[:-1] != right[:-1]:
+                    break
+                # Un épisode n'a qu'une valeur par dimension (sauf who_present)
+                right_dimension = right[-1].split(":", 1)[0]
+                if left_dimension == right_dimension != "who_present":
+                    continue
+                bits = left_bits & right_bits
+                if bits.bit_count() >= min_count:
+                    next_level.append((left + (right[-1],), bits))
+        return next_level
+
+    def _build_rules(
+        self,
+        supports: dict[tuple[str, ...], int],
+        n_episodes: int,
+        min_confidence: float,
+        min_lift: float,
+        max_rules: int,
+    ) -> list[dict[str, Any]]:
+        """Dérive les règles X → Y des itemsets fréquents."""
+        rules: list[dict[str, Any]] = []
+        for itemset, count in supports.items():
+            if len(itemset) < 2:
+                continue
+            for size in range(1, len(itemset)):
+                for antecedent in combinations(itemset, size):
+                    consequent = tuple(i for i in itemset if i not in antecedent)
+                    antecedent_count = supports.get(antecedent)
+                    consequent_count = supports.get(consequent)
+                    if not antecedent_count or not consequent_count:
+                        continue
+                    confidence = count / antecedent_count
+                    lift = confidence / (consequent_count / n_episodes)
+                    if confidence < min_confidence or lift < min_lift:
+                        continue
+                    rules.append(
+                        {
+                            "antecedent": [self._describe_item(i) for i in antecedent],
+                            "consequent": [self._describe_item(i) for i in consequent],
+                            "count": count,
+                            "support": round(count / n_episodes, 4),
+                            "confidence": round(confidence, 4),
+                            "lift": round(lift, 4),
+                        }
+                    )
+
+        rules.sort(key=lambda r: (r["lift"], r["confidence"], r["count"]), reverse=True)
+        return rules[:max_rules]
+
+    @staticmethod
+    def _describe_item(item: str) -> dict[str, str]:
+        """Convertit un item encodé en dict lisible."""
+        dimension, value = item.split(":", 1)
+        return {"dimension": dimension, "value": value}
@@ -6,9 +6,11 @@ Adapté de BBIA Emotions pour l'analyse des patterns de douleur
 """
 
 from datetime import datetime, timedelta
-from typing import TypedDict
+from typing import Any, TypedDict
 
 from core.logging import get_logger
+from pattern_analysis.emotion_history import EmotionHistory
+from pattern_analysis.emotion_lexicon import EmotionLexicon, get_default_lexicon
 
 logger = get_logger("emotion_analyzer")
 
@@ -23,10 +25,23 @@ class EmotionInfo(TypedDict):
 class ARIAREmotionAnalyzer:
     """Module d'analyse émotionnelle pour ARIA - adapté de BBIA"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        history_capacity: int = 10000,
+        db_path: str | None = None,
+        lexicon: EmotionLexicon | None = None,
+    ):
+        """
+        Initialise l'analyseur émotionnel.
+
+        Args:
+            history_capacity: Nombre maximal de transitions conservées
+            db_path: Base SQLite pour persister l'historique (None = mémoire seule)
+            lexicon: Lexique émotionnel compilé (lexique par défaut si None)
+        """
         self.current_emotion = "neutral"
         self.emotion_intensity = 0.5  # 0.0 à 1.0
-        self.emotion_history = []
+        self.lexicon = lexicon or get_default_lexicon()
 
         # Émotions adaptées pour l'analyse de douleur
         self.emotions: dict[str, EmotionInfo] = {
@@ -80,64 +95,42 @@ class ARIAREmotionAnalyzer:
             },
         }
 
+        # Historique borné (tampon circulaire indexé par epoch)
+        self.history = EmotionHistory(
+            list(self.emotions.keys()), capacity=history_capacity, db_path=db_path
+        )
+
         logger.info("🧠 ARIA Emotion Analyzer initialisé")
         logger.info(f"   • Émotion actuelle : {self.current_emotion}")
         logger.info(f"   • Intensité : {self.emotion_intensity}")
         logger.info(f"   • Émotions disponibles : {len(self.emotions)}")
 
+    @property
+    def emotion_history(self) -> list[dict[str, Any]]:
+        """Historique complet matérialisé (ordre chronologique)"""
+        return self.history.tail(0)
+
+    @emotion_history.setter
+    def emotion_history(self, entries: list[dict[str, Any]]) -> None:
+        """Remplace l'historique (les émotions inconnues sont ignorées)"""
+        self.history.clear()
+        for entry in entries:
+            timestamp = entry.get("timestamp")
+            self.history.append(
+                entry.get("emotion", ""),
+                float(entry.get("intensity", 0.0)),
+                previous=entry.get("previous"),
+                timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+            )
+
     def analyze_pain_context(self, pain_data: dict) -> dict:
         """Analyse le contexte émotionnel d'une entrée de douleur"""
-        intensity = pain_data.get("intensity", 0)
-        trigger = pain_data.get("physical_trigger", "")
-        mental_trigger = pain_data.get("mental_trigger", "")
-        activity = pain_data.get("activity", "")
-
-        # Analyse basée sur les déclencheurs
-        emotion_scores: dict[str, float] = {}
-
-        # Analyse des déclencheurs physiques
-        if "marche" in trigger.lower():
-            emotion_scores["fatigued"] = 0.6
-            emotion_scores["stressed"] = 0.4
-        elif "position" in trigger.lower():
-            emotion_scores["frustrated"] = 0.7
-            emotion_scores["overwhelmed"] = 0.3
-        elif "effort" in trigger.lower():
-            emotion_scores["fatigued"] = 0.8
-            emotion_scores["stressed"] = 0.5
-
-        # Analyse des déclencheurs mentaux
-        if "stress" in mental_trigger.lower():
-            emotion_scores["stressed"] = 0.9
-            emotion_scores["anxious"] = 0.7
-        elif "anxiété" in mental_trigger.lower():
-            emotion_scores["anxious"] = 0.9
-            emotion_scores["overwhelmed"] = 0.6
-        elif "fatigue" in mental_trigger.lower():
-            emotion_scores["fatigued"] = 0.8
-            emotion_scores["overwhelmed"] = 0.4
-
-        # Analyse de l'activité
-        if "travail" in activity.lower() or "mac" in activity.lower():
-            emotion_scores["focused"] = 0.6
-            emotion_scores["stressed"] = 0.5
-        elif "repos" in activity.lower():
-            emotion_scores["relaxed"] = 0.7
-
-        # Calcul de l'émotion dominante
-        if emotion_scores:
-            dominant_emotion = max(emotion_scores.items(), key=lambda x: x[1])
-            self.set_emotion(dominant_emotion[0], dominant_emotion[1])
-        else:
-            # Émotion par défaut basée sur l'intensité
-            if intensity >= 8:
-                self.set_emotion("overwhelmed", 0.9)
-            elif intensity >= 6:
-                self.set_emotion("stressed", 0.7)
-            elif intensity >= 4:
-                self.set_emotion("anxious", 0.5)
-            else:
-                self.set_emotion("neutral", 0.3)
+        # Analyse basée sur les déclencheurs (lexique compilé)
+        emotion_scores = self.lexicon.score(pain_data)
+        emotion, emotion_intensity = self._resolve_emotion(
+            emotion_scores, pain_data.get("intensity", 0)
+        )
+        self.set_emotion(emotion, emotion_intensity)
 
         return {
             "detected_emotion": self.current_emotion,
@@ -148,6 +141,51 @@ class ARIAREmotionAnalyzer:
             "timestamp": datetime.now().isoformat(),
         }
 
+    @staticmethod
+    def _resolve_emotion(
+        emotion_scores: dict[str, float], intensity: float
+    ) -> tuple[str, float]:
+        """Détermine l'émotion dominante et son intensité"""
+        if emotion_scores:
+            return max(emotion_scores.items(), key=lambda x: x[1])
+
+        # Émotion par défaut basée sur l'intensité
+        if intensity >= 8:
+            return "overwhelmed", 0.9
+        if intensity >= 6:
+            return "stressed", 0.7
+        if intensity >= 4:
+            return "anxious", 0.5
+        return "neutral", 0.3
+
+    def classify_entries(self, entries: list[dict]) -> list[dict]:
+        """
+        Classe un lot d'entrées de douleur sans modifier l'état courant.
+
+        Args:
+            entries: Entrées de douleur (format pain_entries)
+
+        Returns:
+            Liste de classifications dans l'ordre des entrées
+        """
+        results = []
+        for entry, emotion_scores in zip(
+            entries, self.lexicon.score_many(entries), strict=True
+        ):
+            emotion, emotion_intensity = self._resolve_emotion(
+                emotion_scores, entry.get("intensity") or 0
+            )
+            results.append(
+                {
+                    "entry_id": entry.get("id"),
+                    "timestamp": entry.get("timestamp"),
+                    "detected_emotion": emotion,
+                    "emotion_intensity": emotion_intensity,
+                    "emotion_scores": emotion_scores,
+                }
+            )
+        return results
+
     def set_emotion(self, emotion: str, intensity: float = 0.5) -> bool:
         """Change l'émotion analysée"""
         if emotion not in self.emotions:
@@ -159,27 +197,17 @@ class ARIAREmotionAnalyzer:
         self.emotion_intensity = max(0.0, min(1.0, intensity))
 
         # Enregistrer dans l'historique
-        self.emotion_history.append(
-            {
-                "emotion": emotion,
-                "intensity": self.emotion_intensity,
-                "timestamp": datetime.now().isoformat(),
-                "previous": old_emotion,
-            }
-        )
+        self.history.append(emotion, self.emotion_intensity, previous=old_emotion)
 
         return True
 
     def get_emotion_patterns(self, days: int = 7) -> dict:
         """Analyse les patterns émotionnels sur une période"""
         cutoff_date = datetime.now() - timedelta(days=days)
-        recent_emotions = [
-            entry
-            for entry in self.emotion_history
-            if datetime.fromisoformat(entry["timestamp"]) > cutoff_date
-        ]
+        # Fenêtre obtenue par recherche dichotomique sur les epochs
+        recent_window = self.history.window(cutoff_date)
 
-        if not recent_emotions:
+        if not recent_window:
             return {
                 "total_entries": 0,
                 "dominant_emotion": "neutral",
@@ -188,20 +216,16 @@ class ARIAREmotionAnalyzer:
             }
 
         # Calcul des patterns
-        emotion_counts: dict[str, int] = {}
-        stress_levels: list[float] = []
-
-        for entry in recent_emotions:
-            emotion = entry["emotion"]
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-            stress_value = float(self.emotions[emotion]["stress_level"])
-            stress_levels.append(stress_value)
+        emotion_counts = self.history.emotion_counts(recent_window)
 
         # Émotion dominante
         dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0]
 
         # Tendance de stress
-        avg_stress: float = sum(stress_levels) / len(stress_levels)
+        avg_stress: float = sum(
+            float(self.emotions[emotion]["stress_level"]) * count
+            for emotion, count in emotion_counts.items()
+        ) / len(recent_window)
         if avg_stress > 0.7:
             stress_trend = "élevé"
         elif avg_stress > 0.4:
@@ -213,7 +237,7 @@ class ARIAREmotionAnalyzer:
         recommendations = self._generate_recommendations(dominant_emotion, avg_stress)
 
         return {
-            "total_entries": len(recent_emotions),
+            "total_entries": len(recent_window),
             "dominant_emotion": dominant_emotion,
             "emotion_distribution": emotion_counts,
             "average_stress": avg_stress,
@@ -329,28 +353,27 @@ class ARIAREmotionAnalyzer:
 
     def get_emotion_history(self, limit: int = 10) -> list[dict]:
         """Retourne l'historique des émotions"""
-        return self.emotion_history[-limit:] if limit > 0 else self.emotion_history
+        return self.history.tail(limit)
 
     def get_emotion_stats(self) -> dict:
         """Retourne les statistiques des émotions"""
-        emotion_counts: dict[str, int] = {}
-        for entry in self.emotion_history:
-            emotion = entry["emotion"]
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-
         return {
             "current_emotion": self.current_emotion,
             "current_intensity": self.emotion_intensity,
-            "total_transitions": len(self.emotion_history),
-            "emotion_counts": emotion_counts,
+            "total_transitions": len(self.history),
+            "emotion_counts": self.history.emotion_counts(),
             "available_emotions": list(self.emotions.keys()),
         }
 
+    def close(self) -> None:
+        """Persiste l'historique en attente (arrêt de l'application)."""
+        self.history.close()
+
     def reset_emotions(self):
         """Remet l'analyseur en état neutre"""
         logger.info("🔄 Remise à zéro de l'analyseur émotionnel")
         self.set_emotion("neutral", 0.5)
-        self.emotion_history.clear()
+        self.history.clear()
 
 
 def main():
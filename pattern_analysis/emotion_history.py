@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Emotion History - Historique émotionnel borné et indexé dans le temps
+Tampon circulaire (tableaux parallèles epoch / émotion / intensité) avec
+persistance SQLite optionnelle par lots
+"""
+
+import threading
+from array import array
+from datetime import datetime
+from typing import Any
+
+from core import DatabaseManager
+from core.logging import get_logger
+
+logger = get_logger("emotion_history")
+
+
+class EmotionHistory:
+    """
+    Historique émotionnel à capacité fixe.
+
+    Les transitions sont stockées dans des tableaux parallèles compacts
+    (``array``) gérés comme un tampon circulaire : la mémoire reste constante
+    et les requêtes par fenêtre temporelle se font par recherche dichotomique
+    sur les epochs (ordonnés chronologiquement).
+    """
+
+    def __init__(
+        self,
+        emotion_names: list[str],
+        capacity: int = 10000,
+        db_path: str | None = None,
+        flush_batch_size: int = 100,
+    ) -> None:
+        """
+        Initialise l'historique.
+
+        Args:
+            emotion_names: Noms des émotions (l'index sert d'identifiant)
+            capacity: Nombre maximal de transitions conservées en mémoire
+            db_path: Base SQLite pour la persistance (None = mémoire seule)
+            flush_batch_size: Nombre de transitions en attente avant écriture
+        """
+        if capacity < 1:
+            raise ValueError("La capacité de l'historique doit être >= 1")
+
+        self.capacity = capacity
+        self.flush_batch_size = max(1, flush_batch_size)
+        self._names = list(emotion_names)
+        self._ids = {name: index for index, name in enumerate(self._names)}
+        self._lock = threading.RLock()
+
+        self._epochs = array("d", bytes(8 * capacity))
+        self._emotions = array("B", bytes(capacity))
+        self._previous = array("B", bytes(capacity))
+        self._intensities = array("f", bytes(4 * capacity))
+        self._start = 0
+        self._size = 0
+
+        self._pending: list[tuple[float, str, float, str]] = []
+        self.db = DatabaseManager(db_path) if db_path else None
+        if self.db is not None:
+            self._init_table()
+            self._load()
+
+    def _init_table(self) -> None:
+        """Crée la table de persistance si nécessaire."""
+        assert self.db is not None  # nosec B101
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS emotion_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                epoch REAL NOT NULL,
+                emotion TEXT NOT NULL,
+                intensity REAL NOT NULL,
+                previous TEXT
+            )
+            """)
+        self.db.execute_update(
+            "CREATE INDEX IF NOT EXISTS idx_emotion_history_epoch "
+            "ON emotion_history(epoch)"
+        )
+
+    def _load(self) -> None:
+        """Recharge les dernières transitions persistées."""
+        assert self.db is not None  # nosec B101
+        try:
+            rows = self.db.execute_query(
+                """
+                SELECT epoch, emotion, intensity, previous FROM (
+                    SELECT * FROM emotion_history ORDER BY epoch DESC, id DESC LIMIT ?
+                ) ORDER BY epoch ASC
+                """,
+                (self.capacity,),
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Historique émotionnel non rechargé: {e}")
+            return
+
+        for row in rows:
+            self._append(
+                row["epoch"], row["emotion"], row["intensity"], row["previous"]
+            )
+        if rows:
+            logger.info(f"🧠 {len(rows)} transitions émotionnelles rechargées")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _physical(self, logical_index: int) -> int:
+        """Convertit un index logique (0 = plus ancien) en index physique."""
+        return (self._start + logical_index) % self.capacity
+
+    def _append(
+        self, epoch: float, emotion: str, intensity: float, previous: str | None
+    ) -> bool:
+        """Ajoute une transition au tampon circulaire (sans persistance)."""
+        emotion_id = self._ids.get(emotion)
+        if emotion_id is None:
+            return False
+        previous_id = self._ids.get(previous or "", emotion_id)
+
+        if self._size < self.capacity:
+            index = self._physical(self._size)
+            self._size += 1
+        else:
+            # Tampon plein : écraser la transition la plus ancienne
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._epochs[index] = epoch
+        self._emotions[index] = emotion_id
+        self._previous[index] = previous_id
+        self._intensities[index] = intensity
+        return True
+
+    def append(
+        self,
+        emotion: str,
+        intensity: float,
+        previous: str | None = None,
+        timestamp: datetime | None = None,
+    ) -> bool:
+        """
+        Enregistre une transition émotionnelle.
+
+        Args:
+            emotion: Émotion atteinte
+            intensity: Intensité (0.0 à 1.0)
+            previous: Émotion précédente
+            timestamp: Horodatage (maintenant par défaut)
+
+        Returns:
+            True si la transition a été enregistrée
+        """
+        epoch = (timestamp or datetime.now()).timestamp()
+        with self._lock:
+            if not self._append(epoch, emotion, intensity, previous):
+                return False
+            if self.db is not None:
+                self._pending.append((epoch, emotion, intensity, previous or emotion))
+                if len(self._pending) >= self.flush_batch_size:
+                    self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        Écrit les transitions en attente en une seule transaction.
+
+        Returns:
+            Nombre de transitions écrites
+        """
+        with self._lock:
+            if self.db is None or not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            try:
+                self.db.execute_many(
+                    """
+                    INSERT INTO emotion_history (epoch, emotion, intensity, previous)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    pending,
+                )
+            except Exception as e:
+                logger.error(f"Erreur persistance historique émotionnel: {e}")
+                self._pending = pending + self._pending
+                return 0
+            return len(pending)
+
+    def close(self) -> int:
+        """
+        Écrit les transitions encore en attente (à appeler à l'arrêt).
+
+        Returns:
+            Nombre de transitions écrites
+        """
+        written = self.flush()
+        if self._pending:
+            logger.warning(
+                f"⚠️ {len(self._pending)} transitions émotionnelles "
+                "non persistées"
+            )
+        return written
+
+    def clear(self) -> None:
+        """Vide l'historique (mémoire et persistance)."""
+        with self._lock:
+            self._start = 0
+            self._size = 0
+            self._pending.clear()
+            if self.db is not None:
+                try:
+                    self.db.execute_update("DELETE FROM emotion_history")
+                except Exception as e:
+                    logger.error(f"Erreur suppression historique émotionnel: {e}")
+
+    def _bisect_left(self, epoch: float) -> int:
+        """Premier index logique dont l'epoch est >= epoch."""
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if self._epochs[self._physical(mid)] < epoch:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def window(self, since: datetime, until: datetime | None = None) -> range:
+        """
+        Retourne la plage d'index logiques couvrant [since, until].
+
+        Args:
+            since: Début de la fenêtre (inclus)
+            until: Fin de la fenêtre (incluse, maintenant par défaut)
+
+        Returns:
+            Plage d'index logiques (O(log n))
+        """
+        with self._lock:
+            start = self._bisect_left(since.timestamp())
+            if until is None:
+                return range(start, self._size)
+            end = self._bisect_left(until.timestamp() + 1e-6)
+            return range(start, end)
+
+    def emotion_counts(self, indices: range | None = None) -> dict[str, int]:
+        """Compte les émotions sur une plage d'index logiques."""
+        with self._lock:
+            indices = indices if indices is not None else range(self._size)
+            counts = [0] * len(self._names)
+            for logical in indices:
+                counts[self._emotions[self._physical(logical)]] += 1
+            return {
+                self._names[emotion_id]: count
+                for emotion_id, count in enumerate(counts)
+                if count
+            }
+
+    def entry(self, logical_index: int) -> dict[str, Any]:
+        """Matérialise une transition sous forme de dict."""
+        index = self._physical(logical_index)
+        return {
+            "emotion": self._names[self._emotions[index]],
+            "intensity": round(float(self._intensities[index]), 4),
+            "timestamp": datetime.fromtimestamp(self._epochs[index]).isoformat(),
+            "previous": self._names[self._previous[index]],
+        }
+
+    def tail(self, limit: int) -> list[dict[str, Any]]:
+        """Retourne les ``limit`` dernières transitions (toutes si limit <= 0)."""
+        with self._lock:
+            start = max(0, self._size - limit) if limit > 0 else 0
+            return [self.entry(i) for i in range(start, self._size)]
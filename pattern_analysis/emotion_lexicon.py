@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Emotion Lexicon - Lexique émotionnel compilé
+Associe des mots-clés (français + anglais) à des poids par émotion et les
+compile en une seule expression régulière par champ d'entrée de douleur
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from core.logging import get_logger
+
+logger = get_logger("emotion_lexicon")
+
+LexiconGroup = dict[str, Any]
+
+# Lexique par défaut : champ de pain_entries -> groupes de synonymes
+DEFAULT_LEXICON: dict[str, list[LexiconGroup]] = {
+    "physical_trigger": [
+        {
+            "terms": ["marche", "marcher", "promenade", "walk", "walking"],
+            "emotions": {"fatigued": 0.6, "stressed": 0.4},
+        },
+        {
+            "terms": [
+                "position",
+                "assis",
+                "debout",
+                "posture",
+                "sitting",
+                "standing",
+            ],
+            "emotions": {"frustrated": 0.7, "overwhelmed": 0.3},
+        },
+        {
+            "terms": ["effort", "porter", "soulever", "sport", "lifting", "exercise"],
+            "emotions": {"fatigued": 0.8, "stressed": 0.5},
+        },
+    ],
+    "mental_trigger": [
+        {
+            "terms": ["stress", "tension", "pression", "pressure"],
+            "emotions": {"stressed": 0.9, "anxious": 0.7},
+        },
+        {
+            "terms": ["anxiété", "anxieux", "angoisse", "inquiet", "anxiety", "worry"],
+            "emotions": {"anxious": 0.9, "overwhelmed": 0.6},
+        },
+        {
+            "terms": ["fatigue", "épuisement", "épuisé", "tired", "exhausted"],
+            "emotions": {"fatigued": 0.8, "overwhelmed": 0.4},
+        },
+        {
+            "terms": ["frustration", "frustré", "colère", "irritation", "anger"],
+            "emotions": {"frustrated": 0.8, "stressed": 0.5},
+        },
+        {
+            "terms": ["surcharge", "débordé", "submergé", "overwhelmed", "overload"],
+            "emotions": {"overwhelmed": 0.9, "stressed": 0.6},
+        },
+    ],
+    "activity": [
+        {
+            "terms": ["travail", "bureau", "mac", "ordinateur", "work", "computer"],
+            "emotions": {"focused": 0.6, "stressed": 0.5},
+        },
+        {
+            "terms": ["repos", "sieste", "détente", "rest", "relax"],
+            "emotions": {"relaxed": 0.7},
+        },
+        {
+            "terms": ["méditation", "lecture", "meditation", "reading"],
+            "emotions": {"relaxed": 0.6, "focused": 0.4},
+        },
+    ],
+    "emotions": [
+        {"terms": ["stressé", "stressed"], "emotions": {"stressed": 0.8}},
+        {"terms": ["anxieux", "anxieuse", "anxious"], "emotions": {"anxious": 0.8}},
+        {"terms": ["fatigué", "épuisé", "tired"], "emotions": {"fatigued": 0.8}},
+        {"terms": ["frustré", "énervé", "frustrated"], "emotions": {"frustrated": 0.8}},
+        {"terms": ["calme", "serein", "détendu", "calm"], "emotions": {"relaxed": 0.8}},
+        {"terms": ["concentré", "focused"], "emotions": {"focused": 0.7}},
+        {"terms": ["débordé", "submergé"], "emotions": {"overwhelmed": 0.8}},
+    ],
+}
+
+
+def normalize_text(text: str) -> str:
+    """Met en minuscules et retire les accents (``anxiété`` -> ``anxiete``)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class EmotionLexicon:
+    """
+    Lexique émotionnel compilé.
+
+    Pour chaque champ, tous les mots-clés sont compilés une seule fois en une
+    alternance régulière (termes les plus longs en premier, ancrés en début de
+    mot) : un texte est parcouru en une passe, quel que soit le nombre de
+    mots-clés. Les poids de toutes les correspondances sont combinés par
+    maximum par émotion.
+    """
+
+    def __init__(
+        self,
+        lexicon: dict[str, list[LexiconGroup]] | None = None,
+        cache_size: int = 4096,
+    ) -> None:
+        """
+        Compile le lexique.
+
+        Args:
+            lexicon: Lexique champ -> groupes ``{"terms", "emotions"}``
+                (lexique par défaut si None)
+            cache_size: Nombre de textes distincts mémorisés par champ
+        """
+        self.lexicon = lexicon if lexicon is not None else DEFAULT_LEXICON
+        self._patterns: dict[str, re.Pattern[str]] = {}
+        self._weights: dict[str, dict[str, dict[str, float]]] = {}
+
+        for field, groups in self.lexicon.items():
+            weights: dict[str, dict[str, float]] = {}
+            for group in groups:
+                for term in group.get("terms", []):
+                    key = normalize_text(term).strip()
+                    if not key:
+                        continue
+                    merged = weights.setdefault(key, {})
+                    for emotion, weight in group.get("emotions", {}).items():
+                        merged[emotion] = max(merged.get(emotion, 0.0), float(weight))
+            if not weights:
+                continue
+            alternation = "|".join(
+                re.escape(term) for term in sorted(weights, key=len, reverse=True)
+            )
+            self._patterns[field] = re.compile(rf"\b(?:{alternation})")
+            self._weights[field] = weights
+
+        # Les déclencheurs se répètent beaucoup : mémoriser les textes déjà vus
+        self._match_text = lru_cache(maxsize=cache_size)(self._match_text_uncached)
+
+        logger.debug(
+            f"Lexique émotionnel compilé: {sum(len(w) for w in self._weights.values())} "
+            f"termes sur {len(self._patterns)} champs"
+        )
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "EmotionLexicon":
+        """Charge un lexique depuis un fichier JSON."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def fields(self) -> list[str]:
+        """Champs analysés par le lexique."""
+        return list(self._patterns)
+
+    def _match_text_uncached(self, field: str, text: str) -> tuple[tuple[str, float], ...]:
+        """Retourne les poids (émotion, poids) déclenchés par un texte."""
+        pattern = self._patterns.get(field)
+        if pattern is None:
+            return ()
+        weights = self._weights[field]
+        scores: dict[str, float] = {}
+        for match in pattern.finditer(normalize_text(text)):
+            for emotion, weight in weights[match.group(0)].items():
+                if weight > scores.get(emotion, 0.0):
+                    scores[emotion] = weight
+        return tuple(scores.items())
+
+    def score(self, entry: dict[str, Any]) -> dict[str, float]:
+        """
+        Calcule les scores émotionnels d'une entrée de douleur.
+
+        Args:
+            entry: Entrée (champs texte physical_trigger, mental_trigger, ...)
+
+        Returns:
+            Dict émotion -> score (vide si aucun mot-clé trouvé)
+        """
+        scores: dict[str, float] = {}
+        for field in self._patterns:
+            text = entry.get(field)
+            if not text or not isinstance(text, str):
+                continue
+            for emotion, weight in self._match_text(field, text):
+                if weight > scores.get(emotion, 0.0):
+                    scores[emotion] = weight
+        return scores
+
+    def score_many(self, entries: list[dict[str, Any]]) -> list[dict[str, float]]:
+        """Calcule les scores émotionnels d'un lot d'entrées."""
+        return [self.score(entry) for entry in entries]
+
+
+_default_lexicon: EmotionLexicon | None = None
+
+
+def get_default_lexicon() -> EmotionLexicon:
+    """Récupère ou compile le lexique par défaut (partagé)."""
+    global _default_lexicon
+    if _default_lexicon is None:
+        _default_lexicon = EmotionLexicon()
+    return _default_lexicon
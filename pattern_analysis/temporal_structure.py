@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Temporal Structure - Périodicité et ruptures de l'historique de douleur
+Série horaire d'intensité (NumPy) : autocorrélation par FFT et périodogramme
+pour les cycles (journalier, hebdomadaire, menstruel), PELT sur la série
+journalière pour les changements de régime. Résultats en cache par version
+des données
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+
+from core import DatabaseManager
+from core.cache import CacheManager
+from core.logging import get_logger
+
+logger = get_logger("temporal_structure")
+
+# Cycles recherchés : nom -> (période min, période max) en heures
+NAMED_CYCLES: dict[str, tuple[int, int]] = {
+    "daily": (22, 26),
+    "weekly": (160, 176),
+    "menstrual": (21 * 24, 35 * 24),
+}
+
+# Nombre minimal d'heures couvertes pour une analyse de périodicité
+MIN_SERIES_HOURS = 48
+
+
+class TemporalStructureAnalyzer:
+    """
+    Analyse la structure temporelle des entrées de douleur.
+
+    Les entrées sont agrégées en une série horaire (intensité moyenne, 0
+    sans épisode) puis analysées par des opérations vectorisées : une seule
+    FFT pour l'autocorrélation et le spectre, sommes cumulées pour le coût
+    des segments de PELT.
+    """
+
+    def __init__(self, db_path: str = "aria_pain.db") -> None:
+        """
+        Initialise l'analyseur.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+        """
+        self.db = DatabaseManager(db_path)
+        self.cache = CacheManager(default_ttl=3600, max_size=100)
+
+    def data_version(self) -> str:
+        """Version des entrées de douleur (nombre et bornes des ids)."""
+        if not self.db.table_exists("pain_entries"):
+            return "empty"
+        row = self.db.execute_query(
+            "SELECT COUNT(*) AS n, MIN(id) AS min_id, MAX(id) AS max_id "
+            "FROM pain_entries"
+        )[0]
+        return f"{row['n']}:{row['min_id']}:{row['max_id']}"
+
+    def _load_entries(self, days_back: int | None) -> tuple[np.ndarray, np.ndarray]:
+        """Horodatages (datetime64[s], heure locale) et intensités triés."""
+        if not self.db.table_exists("pain_entries"):
+            return np.empty(0, dtype="datetime64[s]"), np.empty(0)
+        query = (
+            "SELECT timestamp, intensity FROM pain_entries "
+            "WHERE intensity IS NOT NULL AND timestamp IS NOT NULL"
+        )
+        params: tuple[Any, ...] = ()
+        if days_back is not None:
+            query += " AND timestamp >= ?"
+            params = ((datetime.now() - timedelta(days=days_back)).isoformat(),)
+        rows = self.db.execute_query(query + " ORDER BY timestamp", params)
+
+        # Heure murale : secondes seules, sans fraction ni fuseau
+        times = np.array(
+            [str(row["timestamp"])[:19] for row in rows], dtype="datetime64[s]"
+        )
+        values = np.array([float(row["intensity"]) for row in rows], dtype=np.float64)
+        return times, values
+
+    def hourly_series(
+        self, days_back: int | None = None
+    ) -> tuple[np.datetime64 | None, np.ndarray]:
+        """
+        Série horaire de l'intensité moyenne (0 pour les heures sans épisode).
+
+        Returns:
+            (première heure, valeurs)
+        """
+        times, values = self._load_entries(days_back)
+        if times.size == 0:
+            return None, np.empty(0)
+        hours = times.astype("datetime64[h]")
+        start = hours.min()
+        index = (hours - start).astype(np.int64)
+        counts = np.bincount(index)
+        sums = np.bincount(index, weights=values)
+        series = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        return start, series
+
+    def daily_series(
+        self, days_back: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Intensité moyenne et nombre d'épisodes par jour avec au moins une entrée.
+
+        Returns:
+            (jours datetime64[D], moyennes, comptes)
+        """
+        times, values = self._load_entries(days_back)
+        if times.size == 0:
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0), np.empty(0)
+        days, inverse, counts = np.unique(
+            times.astype("datetime64[D]"), return_inverse=True, return_counts=True
+        )
+        means = np.bincount(inverse, weights=values) / counts
+        return days, means, counts
+
+    def detect_periodicity(
+        self, days_back: int | None = None, top: int = 5
+    ) -> dict[str, Any]:
+        """
+        Détecte les cycles de la série horaire.
+
+        Args:
+            days_back: Limiter aux N derniers jours (None = tout l'historique)
+            top: Nombre de pics d'autocorrélation et de spectre retournés
+
+        Returns:
+            Force de chaque cycle nommé (autocorrélation au meilleur décalage
+            de sa plage), pics d'autocorrélation et pics spectraux
+        """
+        version = self.data_version()
+        cache_key = f"periodicity_{version}_{days_back}_{top}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        start, series = self.hourly_series(days_back)
+        n = series.size
+        if n < MIN_SERIES_HOURS:
+            return {
+                "hours_analyzed": int(n),
+                "cycles": {},
+                "autocorrelation_peaks": [],
+                "spectrum_peaks": [],
+                "message": "Données insuffisantes pour l'analyse de périodicité",
+            }
+
+        centered = series - series.mean()
+        size = 1 << (2 * n - 1).bit_length()
+        spectrum = np.fft.rfft(centered, size)
+        power = spectrum.real**2 + spectrum.imag**2
+        acf = np.fft.irfft(power, size)[:n]
+        acf = acf / acf[0] if acf[0] > 0 else np.zeros(n)
+        significance = 1.96 / math.sqrt(n)
+
+        cycles: dict[str, Any] = {}
+        for name, (low, high) in NAMED_CYCLES.items():
+            if high >= n // 2:
+                cycles[name] = {"analyzable": False}
+                continue
+            lag = low + int(np.argmax(acf[low : high + 1]))
+            strength = float(acf[lag])
+            cycles[name] = {
+                "analyzable": True,
+                "period_hours": lag,
+                "period_days": round(lag / 24, 2),
+                "strength": round(strength, 4),
+                "significant": strength > significance,
+            }
+
+        # Maxima locaux de l'autocorrélation au-delà du seuil de significativité
+        inner = acf[1:-1]
+        peaks = (
+            np.flatnonzero(
+                (inner > acf[:-2]) & (inner >= acf[2:]) & (inner > significance)
+            )
+            + 1
+        )
+        peaks = peaks[peaks >= 2]
+        best = peaks[np.argsort(acf[peaks])[::-1][:top]]
+
+        # Périodogramme de la série non complétée (fréquences en cycles/heure)
+        periodogram = np.abs(np.fft.rfft(centered)) ** 2
+        frequencies = np.fft.rfftfreq(n, d=1.0)
+        valid = np.flatnonzero((frequencies > 0) & (frequencies <= 0.5))
+        strongest = valid[np.argsort(periodogram[valid])[::-1][:top]]
+        total_power = float(periodogram[valid].sum()) or 1.0
+
+        result = {
+            "hours_analyzed": int(n),
+            "start": str(start),
+            "significance_threshold": round(significance, 4),
+            "cycles": cycles,
+            "autocorrelation_peaks": [
+                {
+                    "lag_hours": int(lag),
+                    "lag_days": round(int(lag) / 24, 2),
+                    "autocorrelation": round(float(acf[lag]), 4),
+                }
+                for lag in best
+            ],
+            "spectrum_peaks": [
+                {
+                    "period_hours": round(1 / float(frequencies[i]), 2),
+                    "power_share": round(float(periodogram[i]) / total_power, 4),
+                }
+                for i in strongest
+            ],
+            "data_version": version,
+        }
+        self.cache.set(cache_key, result)
+        return result
+
+    @staticmethod
+    def pelt(values: np.ndarray, penalty: float, min_size: int = 2) -> list[int]:
+        """
+        Changements de moyenne par PELT (coût gaussien, variance commune).
+
+        Args:
+            values: Série à segmenter
+            penalty: Pénalité par changement
+            min_size: Longueur minimale d'un segment
+
+        Returns:
+            Indices de début des nouveaux segments (triés)
+        """
+        n = values.size
+        if n < 2 * min_size:
+            return []
+        s1 = np.concatenate(([0.0], np.cumsum(values)))
+        s2 = np.concatenate(([0.0], np.cumsum(values * values)))
+
+        def segment_cost(starts: np.ndarray, end: int) -> np.ndarray:
+            length = end - starts
+            total = s1[end] - s1[starts]
+            return (s2[end] - s2[starts]) - total * total / length
+
+        best = np.full(n + 1, np.inf)
+        best[0] = -penalty
+        previous = np.zeros(n + 1, dtype=np.int64)
+        candidates = np.empty(0, dtype=np.int64)
+
+        for end in range(min_size, n + 1):
+            new_start = end - min_size
+            if np.isfinite(best[new_start]):
+                candidates = np.append(candidates, new_start)
+            costs = best[candidates] + segment_cost(candidates, end)
+            i = int(np.argmin(costs))
+            best[end] = costs[i] + penalty
+            previous[end] = candidates[i]
+            # Élagage PELT : un début qui ne peut plus devenir optimal est retiré
+            candidates = candidates[costs <= best[end]]
+
+        change_points = []
+        end = n
+        while end > 0:
+            start = int(previous[end])
+            if start > 0:
+                change_points.append(start)
+            end = start
+        return sorted(change_points)
+
+    def detect_change_points(
+        self,
+        days_back: int | None = None,
+        penalty_scale: float = 1.0,
+        min_segment_days: int = 3,
+    ) -> dict[str, Any]:
+        """
+        Détecte les changements de régime de l'intensité journalière.
+
+        La pénalité par défaut est de type BIC (``2 σ² log n``), σ étant
+        estimé de façon robuste (MAD des différences successives).
+
+        Args:
+            days_back: Limiter aux N derniers jours (None = tout l'historique)
+            penalty_scale: Multiplicateur de la pénalité (plus grand = moins de
+                ruptures)
+            min_segment_days: Nombre minimal de jours avec entrées par segment
+
+        Returns:
+            Segments (période, intensité moyenne, épisodes/jour) et ruptures
+        """
+        version = self.data_version()
+        cache_key = (
+            f"change_points_{version}_{days_back}_{penalty_scale}_{min_segment_days}"
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        days, means, counts = self.daily_series(days_back)
+        n = means.size
+        if n < 2 * min_segment_days:
+            return {
+                "days_analyzed": int(n),
+                "segments": [],
+                "change_points": [],
+                "message": "Données insuffisantes pour la détection de ruptures",
+            }
+
+        diffs = np.diff(means)
+        sigma = float(np.median(np.abs(diffs - np.median(diffs)))) * 1.4826 / math.sqrt(2)
+        if sigma <= 1e-9:
+            sigma = float(means.std())
+        penalty = penalty_scale * 2 * max(sigma, 1e-3) ** 2 * math.log(n)
+        starts = self.pelt(means, penalty, min_segment_days)
+
+        bounds = [0, *starts, n]
+        segments = []
+        for lo, hi in zip(bounds[:-1], bounds[1:], strict=True):
+            span_days = int((days[hi - 1] - days[lo]).astype(np.int64)) + 1
+            segments.append(
+                {
+                    "start": str(days[lo]),
+                    "end": str(days[hi - 1]),
+                    "days_with_entries": hi - lo,
+                    "mean_intensity": round(float(means[lo:hi].mean()), 2),
+                    "episodes_per_day": round(float(counts[lo:hi].sum()) / span_days, 2),
+                }
+            )
+
+        change_points = [
+            {
+                "date": segments[i + 1]["start"],
+                "before_mean": segments[i]["mean_intensity"],
+                "after_mean": segments[i + 1]["mean_intensity"],
+                "delta": round(
+                    segments[i + 1]["mean_intensity"] - segments[i]["mean_intensity"], 2
+                ),
+            }
+            for i in range(len(segments) - 1)
+        ]
+
+        result = {
+            "days_analyzed": int(n),
+            "penalty": round(penalty, 4),
+            "segments": segments,
+            "change_points": change_points,
+            "data_version": version,
+        }
+        self.cache.set(cache_key, result)
+        return result
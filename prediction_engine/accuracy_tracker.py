@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Accuracy Tracker - Suivi de la précision des prédictions
+Compare chaque prédiction aux entrées de douleur réellement saisies dans sa
+fenêtre d'horizon (jointure SQL par lot, reprise depuis un watermark) et
+expose des statistiques de calibration
+"""
+
+import threading
+from datetime import datetime
+from typing import Any
+
+from core import DatabaseManager
+from core.logging import get_logger
+from prediction_engine.ml_analyzer import (
+    PREDICTION_COLUMNS,
+    PREDICTION_HORIZON_HOURS,
+    add_missing_columns,
+)
+from prediction_engine.risk_model import HIGH_PAIN_THRESHOLD
+
+logger = get_logger("accuracy_tracker")
+
+JOB_NAME = "prediction_accuracy"
+
+# Début de fenêtre en jour julien. Les anciennes lignes (CURRENT_TIMESTAMP,
+# sans "T") sont en UTC : les ramener en heure locale comme pain_entries.
+_PREDICTED_AT_JD = """
+    CASE WHEN instr(p.predicted_at, 'T') > 0
+         THEN julianday(p.predicted_at)
+         ELSE julianday(p.predicted_at, 'localtime')
+    END
+"""
+
+_BATCH_QUERY = f"""
+    WITH batch AS (
+        SELECT id, predicted_intensity, risk_probability,
+               strftime('%Y-%m-%dT%H:%M:%f', start_jd) AS window_start,
+               strftime('%Y-%m-%dT%H:%M:%f', end_jd) AS window_end
+        FROM (
+            SELECT p.id, p.predicted_intensity, p.risk_probability,
+                   {_PREDICTED_AT_JD} AS start_jd,
+                   {_PREDICTED_AT_JD}
+                       + COALESCE(p.horizon_hours, {PREDICTION_HORIZON_HOURS}) / 24.0
+                       AS end_jd
+            FROM pain_predictions p
+            WHERE p.id > ?
+        )
+        WHERE end_jd <= julianday(?)
+        ORDER BY id
+        LIMIT ?
+    )
+    SELECT b.id, b.predicted_intensity, b.risk_probability,
+           COUNT(e.id) AS episodes, MAX(e.intensity) AS actual_intensity
+    FROM batch b
+    LEFT JOIN pain_entries e
+        ON e.timestamp > b.window_start AND e.timestamp <= b.window_end
+    GROUP BY b.id
+    ORDER BY b.id
+"""
+
+
+class PredictionAccuracyTracker:
+    """
+    Renseigne ``actual_outcome``, ``accuracy`` et l'erreur des prédictions.
+
+    Seules les prédictions dont la fenêtre d'horizon est close sont évaluées,
+    par lots, avec une seule requête (jointure fenêtrée sur l'index
+    ``pain_entries(timestamp)``) par lot. Le watermark (dernier id évalué)
+    est persisté : chaque passage ne traite que les nouvelles prédictions.
+    """
+
+    BACKFILL_JOB = "accuracy_backfill"
+
+    def __init__(self, db_path: str = "aria_pain.db"):
+        """
+        Initialise le suivi de précision.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+        """
+        self.db = DatabaseManager(db_path)
+        self._lock = threading.Lock()
+        self.is_running = False
+        self.interval_minutes = 30
+        self.last_run: datetime | None = None
+        self.last_result: dict[str, Any] | None = None
+        self._init_table()
+        logger.info("🎯 Prediction Accuracy Tracker initialisé")
+
+    def _init_table(self) -> None:
+        """Crée la table des watermarks et complète pain_predictions."""
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS ml_job_watermarks (
+                job TEXT PRIMARY KEY,
+                watermark INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """)
+        if self.db.table_exists("pain_predictions"):
+            add_missing_columns(self.db, "pain_predictions", PREDICTION_COLUMNS)
+
+    def get_watermark(self) -> int:
+        """Dernier id de prédiction évalué."""
+        rows = self.db.execute_query(
+            "SELECT watermark FROM ml_job_watermarks WHERE job = ?", (JOB_NAME,)
+        )
+        return int(rows[0]["watermark"]) if rows else 0
+
+    def _set_watermark(self, watermark: int) -> None:
+        self.db.execute_update(
+            """
+            INSERT OR REPLACE INTO ml_job_watermarks (job, watermark, updated_at)
+            VALUES (?, ?, ?)
+            """,
+            (JOB_NAME, watermark, datetime.now().isoformat()),
+        )
+
+    def reset(self) -> None:
+        """Remet le watermark à zéro (réévaluation complète au prochain passage)."""
+        self._set_watermark(0)
+
+    def backfill(self, batch_size: int = 500, max_batches: int = 20) -> dict[str, Any]:
+        """
+        Évalue les prédictions dont l'horizon est écoulé.
+
+        Args:
+            batch_size: Nombre de prédictions par requête
+            max_batches: Nombre maximal de lots par passage
+
+        Returns:
+            Résumé du passage (prédictions évaluées, watermark)
+        """
+        with self._lock:
+            if not (
+                self.db.table_exists("pain_predictions")
+                and self.db.table_exists("pain_entries")
+            ):
+                return {"evaluated": 0, "watermark": 0, "message": "Tables absentes"}
+            add_missing_columns(self.db, "pain_predictions", PREDICTION_COLUMNS)
+
+            watermark = self.get_watermark()
+            evaluated = 0
+            now = datetime.now().isoformat()
+
+            for _ in range(max_batches):
+                rows = self.db.execute_query(_BATCH_QUERY, (watermark, now, batch_size))
+                if not rows:
+                    break
+
+                updates = []
+                for row in rows:
+                    observed = float(row["actual_intensity"] or 0)
+                    error = abs(float(row["predicted_intensity"]) - observed)
+                    updates.append(
+                        (
+                            "episode" if row["episodes"] else "no_episode",
+                            round(max(0.0, 1.0 - error / 10), 4),
+                            row["actual_intensity"],
+                            error,
+                            now,
+                            row["id"],
+                        )
+                    )
+                self.db.execute_many(
+                    """
+                    UPDATE pain_predictions
+                    SET actual_outcome = ?, accuracy = ?, actual_intensity = ?,
+                        absolute_error = ?, evaluated_at = ?
+                    WHERE id = ?
+                    """,
+                    updates,
+                )
+                watermark = rows[-1]["id"]
+                self._set_watermark(watermark)
+                evaluated += len(rows)
+                if len(rows) < batch_size:
+                    break
+
+            self.last_run = datetime.now()
+            self.last_result = {"evaluated": evaluated, "watermark": watermark}
+            if evaluated:
+                logger.info(f"🎯 {evaluated} prédictions évaluées (watermark {watermark})")
+            return self.last_result
+
+    def get_calibration(self, bins: int = 10) -> dict[str, Any]:
+        """
+        Statistiques de précision et de calibration des prédictions évaluées.
+
+        Args:
+            bins: Nombre de classes de probabilité pour la courbe de fiabilité
+
+        Returns:
+            Erreurs globales, score de Brier, fiabilité par classe de
+            probabilité et intensité observée par intensité prédite
+        """
+        if not self.db.table_exists("pain_predictions"):
+            return {"evaluated_predictions": 0}
+
+        summary = self.db.execute_query("""
+            SELECT COUNT(*) AS n,
+                   AVG(accuracy) AS mean_accuracy,
+                   AVG(absolute_error) AS mae,
+                   AVG(absolute_error * absolute_error) AS mse,
+                   AVG(predicted_intensity - COALESCE(actual_intensity, 0)) AS bias,
+                   AVG(CASE WHEN actual_outcome = 'episode' THEN 1.0 ELSE 0.0 END)
+                       AS episode_rate
+            FROM pain_predictions
+            WHERE evaluated_at IS NOT NULL
+            """)[0]
+
+        threshold = HIGH_PAIN_THRESHOLD
+        reliability_rows = self.db.execute_query(
+            """
+            SELECT MIN(CAST(risk_probability * ? AS INTEGER), ? - 1) AS bin,
+                   COUNT(*) AS n,
+                   AVG(risk_probability) AS mean_predicted,
+                   AVG(CASE WHEN COALESCE(actual_intensity, 0) >= ? THEN 1.0
+                            ELSE 0.0 END) AS observed_rate,
+                   SUM((risk_probability
+                        - (CASE WHEN COALESCE(actual_intensity, 0) >= ? THEN 1.0
+                                ELSE 0.0 END))
+                       * (risk_probability
+                        - (CASE WHEN COALESCE(actual_intensity, 0) >= ? THEN 1.0
+                                ELSE 0.0 END))) AS squared_error
+            FROM pain_predictions
+            WHERE evaluated_at IS NOT NULL AND risk_probability IS NOT NULL
+            GROUP BY bin
+            ORDER BY bin
+            """,
+            (bins, bins, threshold, threshold, threshold),
+        )
+        intensity_rows = self.db.execute_query("""
+            SELECT predicted_intensity, COUNT(*) AS n,
+                   AVG(COALESCE(actual_intensity, 0)) AS mean_observed
+            FROM pain_predictions
+            WHERE evaluated_at IS NOT NULL
+            GROUP BY predicted_intensity
+            ORDER BY predicted_intensity
+            """)
+
+        scored = sum(row["n"] for row in reliability_rows)
+        n = summary["n"] or 0
+        return {
+            "evaluated_predictions": n,
+            "mean_accuracy": round(summary["mean_accuracy"] or 0.0, 4),
+            "mae": round(summary["mae"] or 0.0, 4),
+            "rmse": round((summary["mse"] or 0.0) ** 0.5, 4),
+            "bias": round(summary["bias"] or 0.0, 4),
+            "episode_rate": round(summary["episode_rate"] or 0.0, 4),
+            "brier_score": (
+                round(sum(row["squared_error"] for row in reliability_rows) / scored, 4)
+                if scored
+                else None
+            ),
+            "reliability": [
+                {
+                    "bin_start": round(row["bin"] / bins, 4),
+                    "bin_end": round((row["bin"] + 1) / bins, 4),
+                    "count": row["n"],
+                    "mean_predicted": round(row["mean_predicted"], 4),
+                    "observed_rate": round(row["observed_rate"], 4),
+                }
+                for row in reliability_rows
+            ],
+            "intensity_calibration": [
+                {
+                    "predicted_intensity": row["predicted_intensity"],
+                    "count": row["n"],
+                    "mean_observed": round(row["mean_observed"], 2),
+                }
+                for row in intensity_rows
+            ],
+            "watermark": self.get_watermark(),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    def start(self, interval_minutes: int = 30) -> bool:
+        """
+        Démarre le rattrapage périodique en arrière-plan.
+
+        Args:
+            interval_minutes: Intervalle entre deux passages (en minutes)
+
+        Returns:
+            True si démarré avec succès
+        """
+        if self.is_running:
+            logger.warning("Suivi de précision déjà en cours")
+            return False
+
+        from core.scheduler import IntervalTrigger, get_scheduler
+
+        self.interval_minutes = interval_minutes
+        self.is_running = True
+        scheduler = get_scheduler()
+        scheduler.add_job(
+            self.BACKFILL_JOB,
+            self.backfill,
+            IntervalTrigger(interval_minutes * 60),
+            run_immediately=True,
+        )
+        scheduler.start()
+        logger.info(
+            f"✅ Suivi de précision démarré (intervalle: {interval_minutes} min)"
+        )
+        return True
+
+    def stop(self) -> bool:
+        """Arrête le rattrapage périodique."""
+        from core.scheduler import get_scheduler
+
+        if not self.is_running:
+            return False
+        self.is_running = False
+        get_scheduler().remove_job(self.BACKFILL_JOB)
+        logger.info("⏹️ Suivi de précision arrêté")
+        return True
+
+
+# Instance globale (singleton)
+_accuracy_tracker: PredictionAccuracyTracker | None = None
+
+
+def get_accuracy_tracker() -> PredictionAccuracyTracker:
+    """Récupère ou crée l'instance globale du suivi de précision."""
+    global _accuracy_tracker
+    if _accuracy_tracker is None:
+        _accuracy_tracker = PredictionAccuracyTracker()
+    return _accuracy_tracker
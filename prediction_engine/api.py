@@ -12,7 +12,10 @@ from core.cache import CacheManager
 from core.config import Config
 from core.logging import get_logger
 from pattern_analysis.correlation_analyzer import CorrelationAnalyzer
-from prediction_engine.ml_analyzer import ARIAMLAnalyzer
+from prediction_engine.accuracy_tracker import get_accuracy_tracker
+from prediction_engine.feature_store import get_feature_store
+from prediction_engine.flare_detector import get_flare_detector
+from prediction_engine.ml_analyzer import ARIAMLAnalyzer, risk_level_from_intensity
 
 router = APIRouter()
 logger = get_logger("prediction_engine")
@@ -62,6 +65,10 @@ async def prediction_engine_status() -> dict:
                 "ml_learning",
                 "pattern_based_prediction",
                 "correlation_based_alerts",
+                "trained_risk_model",
+                "batch_risk_curve",
+                "accuracy_tracking",
+                "flare_detection",
             ],
             "analytics": analytics,
         }
@@ -98,12 +105,8 @@ async def get_current_predictions(
 
         ml_analyzer = get_ml_analyzer()
 
-        # Contexte actuel (simplifié - à améliorer avec données santé réelles)
-        context = {
-            "stress_level": 0.5,  # Par défaut, à remplacer par données réelles
-            "fatigue_level": 0.5,
-            "activity_intensity": 0.5,
-        }
+        # Contexte actuel : une ligne du feature store horaire
+        context = get_feature_store().get_context()
 
         # Prédiction basée sur ML
         prediction = ml_analyzer.predict_pain_episode(context)
@@ -143,15 +146,7 @@ async def get_current_predictions(
                 prediction["correlation_factors"] = {"error": str(e)}
 
         # Déterminer le niveau de risque
-        intensity = prediction.get("predicted_intensity", 0)
-        if intensity >= 8:
-            risk_level = "high"
-        elif intensity >= 6:
-            risk_level = "medium"
-        elif intensity >= 4:
-            risk_level = "low"
-        else:
-            risk_level = "very_low"
+        risk_level = risk_level_from_intensity(prediction.get("predicted_intensity", 0))
 
         result = {
             "risk_level": risk_level,
@@ -212,6 +207,46 @@ async def predict_pain_episode(context: dict[str, Any]) -> dict:
         ) from e
 
 
+@router.post("/predict/batch")
+async def predict_batch(data: dict[str, Any]) -> dict:
+    """
+    Prédit un lot de contextes ou une courbe de risque horaire.
+
+    Body attendu :
+    {
+        "contexts": [  # Optionnel : contextes explicites
+            {"stress_level": 0.8, "fatigue_level": 0.6,
+             "activity_intensity": 0.4, "timestamp": "2025-01-01T14:00:00"}
+        ],
+        "horizon_hours": 24,  # Sinon : courbe horaire (défaut 24 heures)
+        "context": {"stress_level": 0.5},  # Contexte de base pour l'horizon
+        "start": "2025-01-01T08:00:00"  # Optionnel : début de l'horizon
+    }
+    """
+    try:
+        contexts = data.get("contexts")
+        if contexts is not None and not isinstance(contexts, list):
+            raise HTTPException(
+                status_code=400, detail="'contexts' doit être une liste"
+            )
+        start = data.get("start")
+        ml_analyzer = get_ml_analyzer()
+        return ml_analyzer.predict_batch(
+            contexts=contexts,
+            horizon_hours=int(data.get("horizon_hours", 24)),
+            base_context=data.get("context"),
+            start=datetime.fromisoformat(start) if start else None,
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Erreur lors de la prédiction: {str(e)}"
+        ) from e
+
+
 @router.get("/analytics")
 async def get_analytics() -> dict:
     """Retourne les analytics du moteur de prédiction."""
@@ -236,33 +271,85 @@ async def get_analytics() -> dict:
         ) from e
 
 
+@router.get("/accuracy")
+async def get_prediction_accuracy(
+    bins: int = Query(10, ge=2, le=50, description="Classes de probabilité")
+) -> dict:
+    """
+    Précision et calibration des prédictions passées.
+
+    Retourne MAE, RMSE, biais, score de Brier, courbe de fiabilité et
+    intensité observée par intensité prédite.
+    """
+    try:
+        return get_accuracy_tracker().get_calibration(bins=bins)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du calcul de la précision: {str(e)}",
+        ) from e
+
+
+@router.post("/accuracy/backfill")
+async def backfill_prediction_accuracy(
+    reset: bool = Query(False, description="Réévaluer depuis le début")
+) -> dict:
+    """Évalue les prédictions dont l'horizon est écoulé (incrémental)."""
+    try:
+        tracker = get_accuracy_tracker()
+        if reset:
+            tracker.reset()
+        result = tracker.backfill()
+        _cache.invalidate_pattern("prediction_analytics")
+        return result
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'évaluation des prédictions: {str(e)}",
+        ) from e
+
+
+@router.get("/flares")
+async def get_flare_status() -> dict:
+    """État du détecteur de poussées en ligne (EWMA/CUSUM par flux)."""
+    try:
+        return get_flare_detector().get_status()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la lecture du détecteur de poussées: {str(e)}",
+        ) from e
+
+
 @router.post("/train")
 async def train_model(data: dict[str, Any]) -> dict:
     """
-    Entraîne le modèle ML avec de nouvelles données.
+    Entraîne une nouvelle version du modèle de risque de douleur.
+
+    Body attendu :
+    {
+        "days_back": 365,  # Optionnel : limiter l'historique (défaut : tout)
+        "alpha": 1.0  # Optionnel : régularisation L2
+    }
 
-    Note: Pour l'instant, le modèle s'améliore automatiquement
-    avec chaque nouvelle entrée de douleur. Cet endpoint permet
-    de forcer une réanalyse des patterns.
+    Le modèle est sauvegardé sur disque (artefact versionné) puis utilisé
+    par toutes les prédictions suivantes, sans ré-entraînement par requête.
     """
     try:
         ml_analyzer = get_ml_analyzer()
-        days = data.get("days_back", 14)
-
-        # Réanalyser les patterns pour "entraîner"
-        patterns = ml_analyzer.analyze_pain_patterns(days=days)
+        days = data.get("days_back")
+        result = ml_analyzer.train_risk_model(
+            days_back=int(days) if days is not None else None,
+            alpha=float(data.get("alpha", 1.0)),
+        )
 
         # Invalider le cache après entraînement
-        _cache.invalidate_pattern("prediction_")
-        _cache.invalidate_pattern("predictions_")
+        if result.get("model_updated"):
+            _cache.invalidate_pattern("prediction_")
+            _cache.invalidate_pattern("predictions_")
 
-        return {
-            "message": "Analyse des patterns effectuée",
-            "model_updated": True,
-            "patterns_detected": len(patterns.get("patterns", [])),
-            "confidence": patterns.get("confidence", 0.0),
-            "analysis_period": f"{days} jours",
-        }
+        result["analysis_period"] = f"{days} jours" if days else "historique complet"
+        return result
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Erreur lors de l'entraînement: {str(e)}"
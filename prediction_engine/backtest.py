@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Backtest - Évaluation temporelle des prédicteurs de douleur
+Rejoue l'historique ``pain_entries`` en validation croisée à origine
+glissante (fenêtre d'entraînement croissante, fold de test suivant) et
+évalue chaque prédicteur enregistré en parallèle (pool de processus) :
+MAE, score de Brier, calibration et temps d'exécution par fold
+
+Usage :
+    python -m prediction_engine.backtest --folds 5
+    python -m prediction_engine.backtest --synthetic-days 1095 --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from core import DatabaseManager
+from core.logging import get_logger
+from prediction_engine.risk_model import (
+    FEATURE_NAMES,
+    HEALTH_SUBDIRS,
+    HIGH_PAIN_THRESHOLD,
+    MIN_TRAINING_SAMPLES,
+    PainRiskModel,
+    RiskFeatureExtractor,
+)
+
+logger = get_logger("backtest")
+
+# Un prédicteur reçoit (X_train, y_train) et retourne une fonction
+# X_test -> (intensités prédites, probabilités de douleur forte)
+PredictFn = Callable[[np.ndarray], tuple[np.ndarray, np.ndarray]]
+Predictor = Callable[[np.ndarray, np.ndarray], PredictFn]
+
+PREDICTORS: dict[str, Predictor] = {}
+
+
+def register_predictor(name: str, predictor: Predictor) -> None:
+    """
+    Enregistre un prédicteur évaluable par le backtest.
+
+    Le prédicteur lui-même est transmis aux processus du pool (sérialisé par
+    référence) : il doit être défini au niveau d'un module importable, mais
+    pas forcément enregistré dans ce module (démarrage ``spawn``).
+    """
+    PREDICTORS[name] = predictor
+
+
+def _heuristic_predictor(X_train: np.ndarray, y_train: np.ndarray) -> PredictFn:
+    """Heuristique actuelle d'``ARIAMLAnalyzer`` (sans ajustement de patterns)."""
+
+    def predict(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        intensity = np.clip(
+            np.floor(3 + 3 * X[:, 0] + 2 * X[:, 1] + 2 * X[:, 2]), 0, 10
+        )
+        return intensity, (intensity >= HIGH_PAIN_THRESHOLD).astype(np.float64)
+
+    return predict
+
+
+def _risk_model_predictor(X_train: np.ndarray, y_train: np.ndarray) -> PredictFn:
+    """Modèle ridge/logistique entraîné sur la fenêtre du fold."""
+    return PainRiskModel.fit(X_train, y_train).predict_many
+
+
+def _baseline_predictor(X_train: np.ndarray, y_train: np.ndarray) -> PredictFn:
+    """Référence naïve : moyenne et taux de douleur forte de l'entraînement."""
+    mean = float(y_train.mean())
+    rate = float((y_train >= HIGH_PAIN_THRESHOLD).mean())
+
+    def predict(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return np.full(X.shape[0], mean), np.full(X.shape[0], rate)
+
+    return predict
+
+
+register_predictor("heuristic", _heuristic_predictor)
+register_predictor("risk_model", _risk_model_predictor)
+register_predictor("baseline_mean", _baseline_predictor)
+
+
+def rolling_origin_splits(
+    epochs: np.ndarray, n_folds: int = 5, initial_fraction: float = 0.5
+) -> list[tuple[int, int]]:
+    """
+    Découpe une série triée en folds à origine glissante.
+
+    La première moitié (``initial_fraction``) de la période sert
+    d'entraînement initial ; le reste est découpé en ``n_folds`` périodes de
+    test de même durée. Le fold ``k`` s'entraîne sur tout ce qui précède sa
+    période de test.
+
+    Args:
+        epochs: Horodatages triés (secondes)
+        n_folds: Nombre de folds
+        initial_fraction: Part de la période réservée à l'entraînement initial
+
+    Returns:
+        Liste de (fin d'entraînement, fin de test) en indices
+    """
+    if n_folds < 1:
+        raise ValueError("n_folds doit être >= 1")
+    if not 0 < initial_fraction < 1:
+        raise ValueError("initial_fraction doit être dans ]0, 1[")
+    if len(epochs) == 0:
+        return []
+
+    first, last = float(epochs[0]), float(epochs[-1])
+    origin = first + (last - first) * initial_fraction
+    cutoffs = np.linspace(origin, last, n_folds + 1)
+    bounds = np.searchsorted(epochs, cutoffs, side="right")
+    bounds[-1] = len(epochs)
+
+    return [
+        (int(train_end), int(test_end))
+        for train_end, test_end in zip(bounds[:-1], bounds[1:], strict=True)
+        if test_end > train_end and train_end >= MIN_TRAINING_SAMPLES
+    ]
+
+
+def calibration_table(
+    risk: np.ndarray, labels: np.ndarray, bins: int = 10
+) -> list[dict[str, Any]]:
+    """Fiabilité par classe de probabilité prédite (classes non vides)."""
+    index = np.minimum((risk * bins).astype(int), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    predicted = np.bincount(index, weights=risk, minlength=bins)
+    observed = np.bincount(index, weights=labels, minlength=bins)
+    return [
+        {
+            "bin_start": round(b / bins, 4),
+            "bin_end": round((b + 1) / bins, 4),
+            "count": int(counts[b]),
+            "mean_predicted": round(float(predicted[b] / counts[b]), 4),
+            "observed_rate": round(float(observed[b] / counts[b]), 4),
+        }
+        for b in np.flatnonzero(counts)
+    ]
+
+
+def evaluate_fold(
+    task: tuple[str, Predictor, np.ndarray, np.ndarray, int, int, int, int],
+) -> dict[str, Any]:
+    """
+    Entraîne et évalue un prédicteur sur un fold (exécuté dans le pool).
+
+    Args:
+        task: (nom, prédicteur, X, y, fold, fin d'entraînement, fin de test,
+            classes de calibration)
+
+    Returns:
+        Métriques du fold
+    """
+    name, predictor, X, y, fold, train_end, test_end, bins = task
+    started = time.perf_counter()
+    predict = predictor(X[:train_end], y[:train_end])
+    intensity, risk = predict(X[train_end:test_end])
+    runtime = time.perf_counter() - started
+
+    observed = y[train_end:test_end]
+    labels = (observed >= HIGH_PAIN_THRESHOLD).astype(np.float64)
+    risk = np.clip(risk, 0.0, 1.0)
+    return {
+        "predictor": name,
+        "fold": fold,
+        "n_train": train_end,
+        "n_test": test_end - train_end,
+        "mae": round(float(np.mean(np.abs(intensity - observed))), 4),
+        "brier": round(float(np.mean((risk - labels) ** 2)), 4),
+        "calibration": calibration_table(risk, labels, bins),
+        "runtime_seconds": round(runtime, 4),
+    }
+
+
+def run_backtest(
+    epochs: np.ndarray,
+    X: np.ndarray,
+    y: np.ndarray,
+    predictors: list[str] | None = None,
+    n_folds: int = 5,
+    max_workers: int | None = None,
+    bins: int = 10,
+) -> dict[str, Any]:
+    """
+    Évalue les prédicteurs sur tous les folds.
+
+    Args:
+        epochs: Horodatages triés des entrées
+        X: Features (ordre de ``FEATURE_NAMES``)
+        y: Intensités observées
+        predictors: Prédicteurs à évaluer (tous si None)
+        n_folds: Nombre de folds à origine glissante
+        max_workers: Processus du pool (1 = séquentiel, None = nb de CPU)
+        bins: Classes de probabilité pour la calibration
+
+    Returns:
+        Résultats par prédicteur (folds et moyennes)
+    """
+    names = predictors or list(PREDICTORS)
+    unknown = [name for name in names if name not in PREDICTORS]
+    if unknown:
+        raise ValueError(f"Prédicteurs inconnus: {', '.join(unknown)}")
+
+    splits = rolling_origin_splits(epochs, n_folds)
+    tasks = [
+        (name, PREDICTORS[name], X, y, fold, train_end, test_end, bins)
+        for name in names
+        for fold, (train_end, test_end) in enumerate(splits)
+    ]
+
+    started = time.perf_counter()
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [evaluate_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(evaluate_fold, tasks))
+    elapsed = time.perf_counter() - started
+
+    report: dict[str, Any] = {}
+    for name in names:
+        folds = [result for result in results if result["predictor"] == name]
+        report[name] = {
+            "folds": folds,
+            "mean_mae": (
+                round(float(np.mean([f["mae"] for f in folds])), 4) if folds else None
+            ),
+            "mean_brier": (
+                round(float(np.mean([f["brier"] for f in folds])), 4) if folds else None
+            ),
+            "total_runtime_seconds": round(sum(f["runtime_seconds"] for f in folds), 4),
+        }
+
+    logger.info(
+        f"📊 Backtest: {len(names)} prédicteurs x {len(splits)} folds "
+        f"sur {len(y)} entrées en {elapsed:.2f}s"
+    )
+    return {
+        "n_samples": int(len(y)),
+        "n_folds": len(splits),
+        "elapsed_seconds": round(elapsed, 4),
+        "predictors": report,
+    }
+
+
+def generate_synthetic_history(
+    days: int = 365, entries_per_day: float = 4.0, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Génère un historique synthétique (vectorisé) pour tester à grande échelle.
+
+    L'intensité dépend du stress, de la fatigue, de l'activité, de l'heure
+    et du week-end, plus un bruit gaussien.
+
+    Returns:
+        (epochs triés, X, y)
+    """
+    rng = np.random.default_rng(seed)
+    n = max(MIN_TRAINING_SAMPLES, int(days * entries_per_day))
+    start = datetime(2020, 1, 1).timestamp()
+    epochs = np.sort(start + rng.random(n) * days * 86400)
+
+    local = epochs.astype("datetime64[s]")
+    hours = (local - local.astype("datetime64[D]")).astype(np.float64) / 3600
+    weekday = (local.astype("datetime64[D]").astype(np.int64) + 3) % 7
+    angle = 2 * np.pi * hours / 24
+
+    factors = rng.random((n, 3))
+    X = np.column_stack(
+        [factors, np.sin(angle), np.cos(angle), (weekday >= 5).astype(np.float64)]
+    )
+    y = np.clip(
+        np.rint(
+            1.5
+            + 4 * factors[:, 0]
+            + 2.5 * factors[:, 1]
+            + 1.5 * factors[:, 2]
+            - 0.8 * X[:, 4]
+            - 0.5 * X[:, 5]
+            + rng.normal(0, 1, n)
+        ),
+        0,
+        10,
+    )
+    return epochs, X, y
+
+
+def _data_version(db: DatabaseManager, health_data_dir: Path) -> str:
+    """Version des données (entrées de douleur + fichiers santé)."""
+    row = db.execute_query(
+        "SELECT COUNT(*) AS n, MIN(id) AS min_id, MAX(id) AS max_id FROM pain_entries"
+    )[0]
+    health_files = [
+        path
+        for subdir in HEALTH_SUBDIRS
+        if (health_data_dir / subdir).exists()
+        for path in (health_data_dir / subdir).glob("*_*.json")
+    ]
+    latest = max((path.stat().st_mtime for path in health_files), default=0)
+    return (
+        f"{row['n']}:{row['min_id']}:{row['max_id']}:{len(health_files)}:{latest:.0f}"
+    )
+
+
+def load_history(
+    db_path: str = "aria_pain.db",
+    health_data_dir: str = "dacc",
+    cache_dir: str | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Charge l'historique réel sous forme de features.
+
+    Les features sont mises en cache (``.npz``) par version de données :
+    un backtest répété sur des données inchangées ne relit pas la base.
+
+    Returns:
+        (epochs triés, X, y)
+    """
+    extractor = RiskFeatureExtractor(db_path, health_data_dir)
+    if not extractor.db.table_exists("pain_entries"):
+        empty = np.empty(0)
+        return empty, np.empty((0, len(FEATURE_NAMES))), empty
+
+    cache_file: Path | None = None
+    if cache_dir:
+        version = _data_version(extractor.db, Path(health_data_dir))
+        digest = hashlib.sha256(f"{db_path}|{version}".encode()).hexdigest()[:16]
+        cache_file = Path(cache_dir) / f"backtest_features_{digest}.npz"
+        if cache_file.exists():
+            with np.load(cache_file) as cached:
+                return cached["epochs"], cached["X"], cached["y"]
+
+    epochs, X, y, _ = extractor.extract_series()
+    order = np.argsort(epochs, kind="stable")
+    epochs, X, y = epochs[order], X[order], y[order]
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_file, epochs=epochs, X=X, y=y)
+    return epochs, X, y
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Point d'entrée CLI du backtest."""
+    parser = argparse.ArgumentParser(
+        description="ARKALIA ARIA - Backtest des prédicteurs de douleur"
+    )
+    parser.add_argument("--db", default="aria_pain.db", help="Base de données ARIA")
+    parser.add_argument("--health-dir", default="dacc", help="Données santé")
+    parser.add_argument(
+        "--cache-dir", default=".aria_cache", help="Cache des features (vide = aucun)"
+    )
+    parser.add_argument("--folds", type=int, default=5, help="Nombre de folds")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processus (1 = séquentiel)"
+    )
+    parser.add_argument(
+        "--predictors",
+        nargs="+",
+        default=None,
+        help=f"Prédicteurs à évaluer ({', '.join(PREDICTORS)})",
+    )
+    parser.add_argument(
+        "--synthetic-days",
+        type=int,
+        default=0,
+        help="Utiliser N jours de données synthétiques au lieu de la base",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Graine (synthétique)")
+    parser.add_argument("--output", help="Fichier JSON du rapport complet")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.synthetic_days:
+            epochs, X, y = generate_synthetic_history(
+                args.synthetic_days, seed=args.seed
+            )
+        else:
+            epochs, X, y = load_history(args.db, args.health_dir, args.cache_dir or None)
+        report = run_backtest(
+            epochs, X, y, args.predictors, n_folds=args.folds, max_workers=args.workers
+        )
+    except Exception as e:
+        print(f"❌ Erreur : {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"📊 {report['n_samples']} entrées, {report['n_folds']} folds")
+    for name, result in report["predictors"].items():
+        print(
+            f"  {name:<15} MAE={result['mean_mae']}  Brier={result['mean_brier']}  "
+            f"({result['total_runtime_seconds']}s)"
+        )
+        for fold in result["folds"]:
+            print(
+                f"    fold {fold['fold']}: train={fold['n_train']} "
+                f"test={fold['n_test']} MAE={fold['mae']} Brier={fold['brier']} "
+                f"{fold['runtime_seconds']}s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Feature Store - Features horaires matérialisées
+Agrège une fois par heure les entrées de douleur et les métriques santé
+(moyennes glissantes, sommeil de la nuit précédente, EWMA du stress, moment
+de la semaine) dans la table ``hourly_features`` : une prédiction lit une
+seule ligne au lieu de recalculer les agrégats
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from core import DatabaseManager
+from core.logging import get_logger
+from prediction_engine.risk_model import HEALTH_SUBDIRS
+
+logger = get_logger("feature_store")
+
+HOUR_FORMAT = "%Y-%m-%dT%H:00:00"
+INITIAL_BACKFILL_DAYS = 30
+# Profondeur maximale d'un recalcul déclenché par une donnée ancienne
+MAX_REFRESH_DAYS = 365
+STRESS_EWMA_HALF_LIFE_HOURS = 12.0
+SLEEP_MAX_AGE_HOURS = 36
+ACTIVITY_WINDOW_HOURS = 24
+DEFAULT_FACTOR = 0.5
+
+FEATURE_COLUMNS = [
+    "stress_ewma",
+    "stress_observed_at",
+    "fatigue_level",
+    "last_sleep_hours",
+    "last_sleep_quality",
+    "activity_intensity",
+    "pain_count_24h",
+    "pain_mean_24h",
+    "pain_max_24h",
+    "pain_mean_7d",
+    "hour_of_week",
+]
+
+
+def floor_hour(moment: datetime) -> datetime:
+    """Ramène un instant au début de son heure."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _parse_timestamp(value: Any) -> datetime | None:
+    """Parse un horodatage ISO (``T`` ou espace) en heure locale naïve."""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+class HourlyFeatureStore:
+    """
+    Table de features horaires mise à jour incrémentalement.
+
+    La ligne de l'heure ``H`` décrit l'état connu à la fin de cette heure
+    (fenêtres glissantes se terminant à ``H + 1h``). Chaque rafraîchissement
+    ne recalcule que les heures depuis la dernière ligne matérialisée (ou
+    depuis la donnée modifiée la plus ancienne) ; l'EWMA du stress repart de
+    la ligne précédente.
+    """
+
+    def __init__(self, db_path: str = "aria_pain.db", health_data_dir: str = "dacc"):
+        """
+        Initialise le feature store.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+            health_data_dir: Répertoire des données santé synchronisées
+        """
+        self.db = DatabaseManager(db_path)
+        self.health_data_dir = Path(health_data_dir)
+        self._lock = threading.Lock()
+        self.last_refresh: datetime | None = None
+        self._init_table()
+        logger.info("🧮 Feature store horaire initialisé")
+
+    def _init_table(self) -> None:
+        """Crée la table des features horaires."""
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS hourly_features (
+                hour TEXT PRIMARY KEY,
+                stress_ewma REAL,
+                stress_observed_at TEXT,
+                fatigue_level REAL,
+                last_sleep_hours REAL,
+                last_sleep_quality REAL,
+                activity_intensity REAL,
+                pain_count_24h INTEGER NOT NULL DEFAULT 0,
+                pain_mean_24h REAL,
+                pain_max_24h INTEGER,
+                pain_mean_7d REAL,
+                hour_of_week INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """)
+
+    def _last_hour(self) -> datetime | None:
+        rows = self.db.execute_query("SELECT MAX(hour) AS hour FROM hourly_features")
+        return _parse_timestamp(rows[0]["hour"]) if rows else None
+
+    def _load_pain_entries(
+        self, start: datetime, end: datetime
+    ) -> tuple[list[float], list[float]]:
+        """Horodatages (epoch) et intensités des entrées dans [start, end[."""
+        if not self.db.table_exists("pain_entries"):
+            return [], []
+        rows = self.db.execute_query(
+            """
+            SELECT timestamp, intensity FROM pain_entries
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp
+            """,
+            (start.isoformat(), end.isoformat()),
+        )
+        epochs: list[float] = []
+        intensities: list[float] = []
+        for row in rows:
+            moment = _parse_timestamp(row["timestamp"])
+            if moment is None or row["intensity"] is None:
+                continue
+            epochs.append(moment.timestamp())
+            intensities.append(float(row["intensity"]))
+        return epochs, intensities
+
+    def _load_health_readings(
+        self, start: datetime, end: datetime
+    ) -> dict[str, list[tuple[float, dict[str, Any]]]]:
+        """
+        Lit les fichiers santé journaliers des jours couverts par [start, end].
+
+        Seuls les fichiers des dates utiles sont ouverts (nom
+        ``<type>_<AAAA-MM-JJ>.json``).
+
+        Returns:
+            Dict type -> liste triée (epoch, données) ; le sommeil est daté
+            par sa fin
+        """
+        readings: dict[str, list[tuple[float, dict[str, Any]]]] = {
+            "stress": [],
+            "sleep": [],
+            "activity": [],
+        }
+        days = [
+            (start.date() + timedelta(days=offset)).isoformat()
+            for offset in range((end.date() - start.date()).days + 1)
+        ]
+        for subdir in HEALTH_SUBDIRS:
+            data_dir = self.health_data_dir / subdir
+            if not data_dir.exists():
+                continue
+            for day in days:
+                for kind, items in readings.items():
+                    json_file = data_dir / f"{kind}_{day}.json"
+                    if not json_file.exists():
+                        continue
+                    try:
+                        with open(json_file, encoding="utf-8") as f:
+                            data = json.load(f)
+                    except Exception as e:
+                        logger.debug(f"Erreur lecture {json_file}: {e}")
+                        continue
+                    stamp = data.get("sleep_end" if kind == "sleep" else "timestamp")
+                    moment = _parse_timestamp(stamp) or _parse_timestamp(day)
+                    if moment is not None:
+                        items.append((moment.timestamp(), data))
+
+        for items in readings.values():
+            items.sort(key=lambda item: item[0])
+        return readings
+
+    def refresh(
+        self, since: datetime | None = None, until: datetime | None = None
+    ) -> dict[str, Any]:
+        """
+        Matérialise les heures manquantes ou modifiées.
+
+        Args:
+            since: Instant de la donnée modifiée la plus ancienne (ex.
+                entrée saisie a posteriori), borné à ``MAX_REFRESH_DAYS``
+                avant ``until`` ; None = reprise depuis la dernière heure
+                matérialisée
+            until: Dernière heure à matérialiser (heure courante si None)
+
+        Returns:
+            Résumé (heures recalculées, bornes)
+        """
+        with self._lock:
+            end = floor_hour(until or datetime.now())
+            last = self._last_hour()
+            # La dernière ligne peut avoir été calculée en cours d'heure
+            start = (
+                min(last, end)
+                if last is not None
+                else end - timedelta(days=INITIAL_BACKFILL_DAYS)
+            )
+            if since is not None:
+                oldest = end - timedelta(days=MAX_REFRESH_DAYS)
+                start = min(start, max(floor_hour(since), oldest))
+
+            window_end = end + timedelta(hours=1)
+            pain_epochs, pain_values = self._load_pain_entries(
+                start - timedelta(days=7), window_end
+            )
+            pain_prefix = [0.0]
+            for value in pain_values:
+                pain_prefix.append(pain_prefix[-1] + value)
+            health = self._load_health_readings(
+                start - timedelta(hours=SLEEP_MAX_AGE_HOURS), window_end
+            )
+
+            seed = self.db.execute_query(
+                "SELECT stress_ewma, stress_observed_at FROM hourly_features "
+                "WHERE hour = ?",
+                ((start - timedelta(hours=1)).strftime(HOUR_FORMAT),),
+            )
+            ewma = seed[0]["stress_ewma"] if seed else None
+            observed = (
+                _parse_timestamp(seed[0]["stress_observed_at"]) if seed else None
+            )
+            observed_epoch = observed.timestamp() if observed else None
+
+            stress = [
+                (epoch, min(1.0, float(data["stress_level"]) / 100))
+                for epoch, data in health["stress"]
+                if data.get("stress_level") is not None
+            ]
+            stress_epochs = [epoch for epoch, _ in stress]
+            # Ignorer les mesures déjà intégrées dans l'EWMA de départ
+            stress_index = (
+                bisect_right(stress_epochs, observed_epoch)
+                if observed_epoch is not None
+                else 0
+            )
+            sleep_epochs = [epoch for epoch, _ in health["sleep"]]
+            activity = [
+                (epoch, min(1.0, float(data["steps"]) / 15000))
+                for epoch, data in health["activity"]
+                if data.get("steps") is not None
+            ]
+            activity_epochs = [epoch for epoch, _ in activity]
+            decay_seconds = STRESS_EWMA_HALF_LIFE_HOURS * 3600 / math.log(2)
+
+            now_iso = datetime.now().isoformat()
+            rows = []
+            hour = start
+            while hour <= end:
+                hour_end = (hour + timedelta(hours=1)).timestamp()
+
+                # EWMA du stress pondérée par le temps écoulé entre mesures
+                while (
+                    stress_index < len(stress) and stress[stress_index][0] < hour_end
+                ):
+                    epoch, value = stress[stress_index]
+                    if ewma is None or observed_epoch is None:
+                        ewma = value
+                    else:
+                        weight = 1.0 - math.exp(
+                            -max(0.0, epoch - observed_epoch) / decay_seconds
+                        )
+                        ewma += weight * (value - ewma)
+                    observed_epoch = epoch
+                    stress_index += 1
+
+                # Sommeil terminé le plus récemment (dans la limite d'âge)
+                sleep_quality = sleep_hours = None
+                sleep_index = bisect_left(sleep_epochs, hour_end) - 1
+                if (
+                    sleep_index >= 0
+                    and hour_end - sleep_epochs[sleep_index]
+                    <= SLEEP_MAX_AGE_HOURS * 3600
+                ):
+                    sleep = health["sleep"][sleep_index][1]
+                    if sleep.get("quality_score") is not None:
+                        sleep_quality = min(1.0, float(sleep["quality_score"]))
+                    if sleep.get("duration_minutes") is not None:
+                        sleep_hours = round(float(sleep["duration_minutes"]) / 60, 2)
+
+                activity_values = [
+                    value
+                    for _, value in activity[
+                        bisect_left(
+                            activity_epochs, hour_end - ACTIVITY_WINDOW_HOURS * 3600
+                        ) : bisect_left(activity_epochs, hour_end)
+                    ]
+                ]
+
+                lo_24h = bisect_left(pain_epochs, hour_end - 86400)
+                lo_7d = bisect_left(pain_epochs, hour_end - 7 * 86400)
+                hi = bisect_left(pain_epochs, hour_end)
+                count_24h = hi - lo_24h
+                count_7d = hi - lo_7d
+
+                rows.append(
+                    (
+                        hour.strftime(HOUR_FORMAT),
+                        round(ewma, 4) if ewma is not None else None,
+                        (
+                            datetime.fromtimestamp(observed_epoch).isoformat()
+                            if observed_epoch is not None
+                            else None
+                        ),
+                        round(1.0 - sleep_quality, 4) if sleep_quality is not None else None,
+                        sleep_hours,
+                        sleep_quality,
+                        (
+                            round(sum(activity_values) / len(activity_values), 4)
+                            if activity_values
+                            else None
+                        ),
+                        count_24h,
+                        (
+                            round((pain_prefix[hi] - pain_prefix[lo_24h]) / count_24h, 2)
+                            if count_24h
+                            else None
+                        ),
+                        int(max(pain_values[lo_24h:hi])) if count_24h else None,
+                        (
+                            round((pain_prefix[hi] - pain_prefix[lo_7d]) / count_7d, 2)
+                            if count_7d
+                            else None
+                        ),
+                        hour.weekday() * 24 + hour.hour,
+                        now_iso,
+                    )
+                )
+                hour += timedelta(hours=1)
+
+            if rows:
+                columns = ", ".join(["hour", *FEATURE_COLUMNS, "updated_at"])
+                placeholders = ", ".join("?" * (len(FEATURE_COLUMNS) + 2))
+                self.db.execute_many(
+                    f"INSERT OR REPLACE INTO hourly_features ({columns}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+
+            self.last_refresh = datetime.now()
+            logger.debug(f"🧮 {len(rows)} heures de features matérialisées")
+            return {
+                "hours_refreshed": len(rows),
+                "from": start.strftime(HOUR_FORMAT),
+                "to": end.strftime(HOUR_FORMAT),
+            }
+
+    def get_features(self, at: datetime | None = None) -> dict[str, Any] | None:
+        """
+        Ligne de features de l'heure demandée (matérialisée si absente).
+
+        Args:
+            at: Instant voulu (maintenant si None)
+
+        Returns:
+            Ligne brute ou None si l'instant est dans le futur
+        """
+        moment = at or datetime.now()
+        hour = floor_hour(moment).strftime(HOUR_FORMAT)
+        rows = self.db.execute_query(
+            "SELECT * FROM hourly_features WHERE hour = ?", (hour,)
+        )
+        if not rows:
+            if moment > datetime.now():
+                return None
+            self.refresh(since=moment if at is not None else None)
+            rows = self.db.execute_query(
+                "SELECT * FROM hourly_features WHERE hour = ?", (hour,)
+            )
+        return dict(rows[0]) if rows else None
+
+    def get_context(self, at: datetime | None = None) -> dict[str, Any]:
+        """
+        Contexte de prédiction (facteurs 0-1) lu depuis une seule ligne.
+
+        Les facteurs sans donnée observée valent 0.5 (neutre).
+
+        Args:
+            at: Instant voulu (maintenant si None)
+
+        Returns:
+            Contexte compatible avec ``ARIAMLAnalyzer.predict_pain_episode``
+        """
+        features = self.get_features(at) or {}
+
+        def factor(name: str) -> float:
+            value = features.get(name)
+            return float(value) if value is not None else DEFAULT_FACTOR
+
+        return {
+            "stress_level": factor("stress_ewma"),
+            "fatigue_level": factor("fatigue_level"),
+            "activity_intensity": factor("activity_intensity"),
+            "feature_hour": features.get("hour"),
+            "pain_count_24h": features.get("pain_count_24h", 0),
+            "pain_mean_24h": features.get("pain_mean_24h"),
+            "pain_mean_7d": features.get("pain_mean_7d"),
+            "last_sleep_hours": features.get("last_sleep_hours"),
+            "hour_of_week": features.get("hour_of_week"),
+        }
+
+    def notify_pain_entry(self, timestamp: str | None) -> None:
+        """Met à jour les heures touchées par une nouvelle entrée de douleur."""
+        try:
+            self.refresh(since=_parse_timestamp(timestamp))
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur mise à jour features après saisie: {e}")
+
+
+# Instance globale (singleton)
+_feature_store: HourlyFeatureStore | None = None
+_feature_store_lock = threading.Lock()
+
+
+def get_feature_store() -> HourlyFeatureStore:
+    """Récupère ou crée l'instance globale du feature store (thread-safe)."""
+    global _feature_store
+    if _feature_store is None:
+        with _feature_store_lock:
+            if _feature_store is None:
+                _feature_store = HourlyFeatureStore()
+    return _feature_store
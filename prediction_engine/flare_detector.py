@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Flare Detector - Détection en ligne des poussées de douleur
+Chaque flux (intensité des entrées, fréquence des épisodes, stress santé)
+garde un état O(1) : ligne de base EWMA (moyenne et variance) et CUSUM
+unilatéral sur l'écart normalisé. Une poussée est signalée dès que le
+CUSUM dépasse son seuil, à chaque saisie ou synchronisation, sans
+relire l'historique. L'état est persisté en base
+"""
+
+import json
+import math
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from core import DatabaseManager
+from core.alerts import AlertSeverity, AlertType, ARIA_AlertsSystem
+from core.logging import get_logger
+
+logger = get_logger("flare_detector")
+
+
+@dataclass(frozen=True)
+class StreamConfig:
+    """Paramètres de détection d'un flux."""
+
+    label: str
+    alpha: float = 0.1  # Lissage de la ligne de base EWMA
+    slack: float = 0.5  # Tolérance k du CUSUM (en écarts-types)
+    threshold: float = 4.0  # Seuil h du CUSUM (en écarts-types)
+    min_sigma: float = 1.0  # Écart-type plancher
+    warmup: int = 5  # Observations avant la première détection
+
+
+STREAMS: dict[str, StreamConfig] = {
+    "intensity": StreamConfig("Intensité de la douleur"),
+    # -log(écart entre épisodes en heures) : augmente quand les crises se rapprochent
+    "frequency": StreamConfig("Fréquence des épisodes", min_sigma=0.5),
+    "stress": StreamConfig("Niveau de stress", min_sigma=5.0),
+}
+
+
+@dataclass
+class StreamState:
+    """État en ligne d'un flux (taille constante)."""
+
+    count: int = 0
+    mean: float = 0.0
+    variance: float = 0.0
+    cusum: float = 0.0
+    in_flare: bool = False
+    flare_started_at: str | None = None
+    flares_detected: int = 0
+    last_timestamp: str | None = None
+    last_value: float | None = None
+
+    def update(self, value: float, config: StreamConfig) -> str | None:
+        """
+        Intègre une observation.
+
+        La ligne de base n'apprend pas pendant une poussée (sinon elle
+        absorberait la poussée qu'elle doit détecter).
+
+        Returns:
+            "started", "ended" ou None
+        """
+        event = None
+        if self.count >= config.warmup:
+            sigma = max(math.sqrt(self.variance), config.min_sigma)
+            deviation = (value - self.mean) / sigma
+            self.cusum = max(0.0, self.cusum + deviation - config.slack)
+            if not self.in_flare and self.cusum > config.threshold:
+                self.in_flare = True
+                self.flares_detected += 1
+                event = "started"
+            elif self.in_flare and self.cusum == 0.0:
+                self.in_flare = False
+                self.flare_started_at = None
+                event = "ended"
+
+        if not self.in_flare:
+            if self.count == 0:
+                self.mean = value
+            else:
+                delta = value - self.mean
+                self.mean += config.alpha * delta
+                self.variance = (1 - config.alpha) * (
+                    self.variance + config.alpha * delta * delta
+                )
+        self.count += 1
+        return event
+
+
+class FlareDetector:
+    """
+    Détecteur de poussées alimenté à chaque entrée de douleur et synchro santé.
+
+    Les observations antérieures à la dernière observation d'un flux (saisies
+    a posteriori, mesures déjà vues) sont ignorées : le détecteur ne rejoue
+    jamais l'historique.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "aria_pain.db",
+        alerts_system: ARIA_AlertsSystem | None = None,
+    ) -> None:
+        """
+        Initialise le détecteur et recharge l'état persisté.
+
+        Args:
+            db_path: Chemin vers la base de données ARIA
+            alerts_system: Système d'alertes (créé sur la même base si None)
+        """
+        self.db = DatabaseManager(db_path)
+        self.alerts = alerts_system or ARIA_AlertsSystem(db_path)
+        self._lock = threading.Lock()
+        self._init_table()
+        self.states: dict[str, StreamState] = {name: StreamState() for name in STREAMS}
+        for row in self.db.execute_query(
+            "SELECT stream, state FROM flare_detector_state"
+        ):
+            if row["stream"] in self.states:
+                try:
+                    self.states[row["stream"]] = StreamState(**json.loads(row["state"]))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"⚠️ État {row['stream']} illisible, réinitialisé: {e}")
+
+    def _init_table(self) -> None:
+        """Crée la table d'état des flux."""
+        self.db.execute_update("""
+            CREATE TABLE IF NOT EXISTS flare_detector_state (
+                stream TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """)
+
+    def _save(self, streams: list[str]) -> None:
+        now = datetime.now().isoformat()
+        self.db.execute_many(
+            """
+            INSERT OR REPLACE INTO flare_detector_state (stream, state, updated_at)
+            VALUES (?, ?, ?)
+            """,
+            [(name, json.dumps(asdict(self.states[name])), now) for name in streams],
+        )
+
+    def _observe(
+        self, stream: str, value: float, moment: datetime
+    ) -> dict[str, Any] | None:
+        """Met à jour un flux ; retourne l'événement de poussée éventuel."""
+        state = self.states[stream]
+        event = state.update(value, STREAMS[stream])
+        state.last_timestamp = moment.isoformat()
+        state.last_value = value
+        if event == "started":
+            state.flare_started_at = moment.isoformat()
+        if event is None:
+            return None
+        return {
+            "stream": stream,
+            "event": event,
+            "timestamp": moment.isoformat(),
+            "value": round(value, 4),
+            "baseline": round(state.mean, 4),
+            "cusum": round(state.cusum, 4),
+        }
+
+    def _is_new(self, stream: str, moment: datetime) -> bool:
+        last = self.states[stream].last_timestamp
+        return last is None or moment > datetime.fromisoformat(last)
+
+    def observe_pain_entry(self, timestamp: str, intensity: float) -> list[dict[str, Any]]:
+        """
+        Intègre une nouvelle entrée de douleur (intensité et fréquence).
+
+        Args:
+            timestamp: Horodatage ISO de l'entrée
+            intensity: Intensité 0-10
+
+        Returns:
+            Événements de poussée (début/fin) déclenchés par l'entrée
+        """
+        moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        if moment.tzinfo is not None:
+            moment = moment.astimezone().replace(tzinfo=None)
+
+        with self._lock:
+            if not self._is_new("intensity", moment):
+                logger.debug(f"Entrée antérieure à l'état du détecteur ignorée: {timestamp}")
+                return []
+
+            events = []
+            previous = self.states["intensity"].last_timestamp
+            event = self._observe("intensity", float(intensity), moment)
+            if event:
+                events.append(event)
+            if previous is not None:
+                gap_hours = (moment - datetime.fromisoformat(previous)).total_seconds() / 3600
+                event = self._observe(
+                    "frequency", -math.log(max(gap_hours, 1 / 60)), moment
+                )
+                if event:
+                    events.append(event)
+
+            self._save(["intensity", "frequency"])
+            self._emit_alerts(events)
+            return events
+
+    def observe_stress(
+        self, readings: list[tuple[datetime, float]]
+    ) -> list[dict[str, Any]]:
+        """
+        Intègre des mesures de stress (0-100) issues d'une synchronisation.
+
+        Args:
+            readings: Paires (horodatage, niveau de stress), dans n'importe quel ordre
+
+        Returns:
+            Événements de poussée déclenchés
+        """
+        with self._lock:
+            events = []
+            observed = False
+            for moment, level in sorted(readings, key=lambda reading: reading[0]):
+                if moment.tzinfo is not None:
+                    moment = moment.astimezone().replace(tzinfo=None)
+                if not self._is_new("stress", moment):
+                    continue
+                observed = True
+                event = self._observe("stress", float(level), moment)
+                if event:
+                    events.append(event)
+            if observed:
+                self._save(["stress"])
+            self._emit_alerts(events)
+            return events
+
+    def last_observation(self, stream: str) -> datetime | None:
+        """Horodatage de la dernière observation intégrée d'un flux."""
+        last = self.states[stream].last_timestamp
+        return datetime.fromisoformat(last) if last else None
+
+    def _emit_alerts(self, events: list[dict[str, Any]]) -> None:
+        """Crée une alerte pour chaque début de poussée."""
+        for event in events:
+            if event["event"] != "started":
+                continue
+            active = [name for name, state in self.states.items() if state.in_flare]
+            label = STREAMS[event["stream"]].label
+            self.alerts.create_alert(
+                alert_type=AlertType.FLARE_DETECTED,
+                severity=(
+                    AlertSeverity.CRITICAL if len(active) > 1 else AlertSeverity.WARNING
+                ),
+                title=f"Poussée détectée : {label.lower()}",
+                message=(
+                    f"{label} en hausse anormale depuis {event['timestamp']} "
+                    f"(ligne de base {event['baseline']}). "
+                    f"Flux en poussée : {', '.join(active)}."
+                ),
+                data={**event, "active_streams": active},
+            )
+            logger.info(f"🚨 Poussée détectée sur le flux {event['stream']}")
+
+    def get_status(self) -> dict[str, Any]:
+        """État courant de chaque flux."""
+        return {
+            "streams": {
+                name: {
+                    "label": STREAMS[name].label,
+                    **asdict(state),
+                    "mean": round(state.mean, 4),
+                    "variance": round(state.variance, 4),
+                    "cusum": round(state.cusum, 4),
+                }
+                for name, state in self.states.items()
+            },
+            "active_flares": [
+                name for name, state in self.states.items() if state.in_flare
+            ],
+        }
+
+    def reset(self) -> None:
+        """Réinitialise l'état de tous les flux."""
+        with self._lock:
+            self.states = {name: StreamState() for name in STREAMS}
+            self._save(list(STREAMS))
+
+
+# Instance globale (singleton)
+_flare_detector: FlareDetector | None = None
+
+
+def get_flare_detector() -> FlareDetector:
+    """Récupère ou crée l'instance globale du détecteur de poussées."""
+    global _flare_detector
+    if _flare_detector is None:
+        _flare_detector = FlareDetector()
+    return _flare_detector
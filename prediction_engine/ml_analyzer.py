@@ -13,11 +13,57 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from core import DatabaseManager
+from core.config import Config
 from core.logging import get_logger
+from prediction_engine.risk_model import (
+    FEATURE_NAMES,
+    PainRiskModel,
+    RiskFeatureExtractor,
+    build_feature_vector,
+)
 
 logger = get_logger("ml_analyzer")
 
+# Nombre maximal de points d'une prédiction par lot
+MAX_BATCH_PREDICTIONS = 1000
+
+# Horizon des prédictions unitaires ("2-4 heures") : fin de fenêtre évaluée
+PREDICTION_HORIZON_HOURS = 4.0
+
+# Colonnes ajoutées à pain_predictions (suivi de précision)
+PREDICTION_COLUMNS: dict[str, str] = {
+    "horizon_hours": "REAL",
+    "risk_probability": "REAL",
+    "actual_intensity": "REAL",
+    "absolute_error": "REAL",
+    "evaluated_at": "TEXT",
+}
+
+
+def add_missing_columns(
+    db: DatabaseManager, table: str, columns: dict[str, str]
+) -> None:
+    """Ajoute les colonnes absentes d'une table existante"""
+    existing_columns = [row[1] for row in db.execute_query(f"PRAGMA table_info({table})")]
+    for col_name, col_type in columns.items():
+        if col_name not in existing_columns:
+            db.execute_update(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
+            logger.debug(f"✅ Colonne {table}.{col_name} ajoutée")
+
+
+def risk_level_from_intensity(intensity: float) -> str:
+    """Convertit une intensité prédite en niveau de risque"""
+    if intensity >= 8:
+        return "high"
+    if intensity >= 6:
+        return "medium"
+    if intensity >= 4:
+        return "low"
+    return "very_low"
+
 
 class PainEventType(Enum):
     """Types d'événements de douleur"""
@@ -50,7 +96,7 @@ class PainEvent:
 class ARIAMLAnalyzer:
     """Analyseur ML pour ARIA - adapté de Quest Analytics Engine"""
 
-    def __init__(self, db_path: str = "aria_pain.db"):
+    def __init__(self, db_path: str = "aria_pain.db", model_dir: str | None = None):
         # Exposer le chemin DB pour les tests et assurer la création du fichier
         self.db_path = str(db_path)
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -69,6 +115,7 @@ class ARIAMLAnalyzer:
 
         _sqlite3.connect(self.db_path).close()
         self.lock = threading.Lock()
+        self._pattern_snapshots: dict[int, dict[str, Any]] = {}
         self._init_database()
 
         # Métriques de performance
@@ -76,6 +123,19 @@ class ARIAMLAnalyzer:
         self.prediction_accuracy = 0.0
         self.pattern_detection_rate = 0.0
 
+        # Modèle de risque entraîné (chargé en mémoire mappée, jamais
+        # ré-entraîné à la requête)
+        self.model_dir = Path(
+            model_dir
+            or Config().get("model_dir")
+            or Path(self.db_path).parent / "models"
+        )
+        self.risk_model: PainRiskModel | None = PainRiskModel.load_latest(
+            self.model_dir
+        )
+        if self.risk_model is not None:
+            logger.info(f"📦 Modèle de risque v{self.risk_model.version} chargé")
+
         logger.info("🧠 ARIA ML Analyzer initialisé")
 
     def _init_database(self):
@@ -107,9 +167,29 @@ class ARIAMLAnalyzer:
                     description TEXT,
                     triggers TEXT,
                     recommendations TEXT,
-                    detected_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    detected_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    window_days INTEGER,
+                    data_version TEXT
+                )
+                """)
+            try:
+                self._migrate_pain_patterns()
+            except Exception as e:
+                logger.warning(f"⚠️ Migration pain_patterns impossible: {e}")
+
+            # Snapshot versionné de l'analyse de patterns (une ligne par fenêtre)
+            self.db.execute_update("""
+                CREATE TABLE IF NOT EXISTS pain_pattern_snapshots (
+                    window_days INTEGER PRIMARY KEY,
+                    data_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    computed_at TEXT NOT NULL
                 )
                 """)
+            self.db.execute_update(
+                "CREATE INDEX IF NOT EXISTS idx_pain_events_type_timestamp "
+                "ON pain_events(event_type, timestamp)"
+            )
 
             # Table des prédictions
             self.db.execute_update("""
@@ -121,12 +201,43 @@ class ARIAMLAnalyzer:
                     time_horizon TEXT,
                     actual_outcome TEXT,
                     accuracy REAL,
-                    predicted_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    predicted_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    horizon_hours REAL,
+                    risk_probability REAL,
+                    actual_intensity REAL,
+                    absolute_error REAL,
+                    evaluated_at TEXT
                 )
                 """)
+            try:
+                add_missing_columns(self.db, "pain_predictions", PREDICTION_COLUMNS)
+            except Exception as e:
+                logger.warning(f"⚠️ Migration pain_predictions impossible: {e}")
 
             logger.info("✅ Tables ML analytics initialisées")
 
+    def _migrate_pain_patterns(self) -> None:
+        """Ajoute les colonnes de version et déduplique pain_patterns"""
+        add_missing_columns(
+            self.db, "pain_patterns", {"window_days": "INTEGER", "data_version": "TEXT"}
+        )
+
+        # Les anciennes versions inséraient une ligne par prédiction : ne
+        # conserver que la plus récente par (pattern_type, fenêtre)
+        removed = self.db.execute_update("""
+            DELETE FROM pain_patterns
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM pain_patterns
+                GROUP BY pattern_type, IFNULL(window_days, -1)
+            )
+            """)
+        if removed:
+            logger.info(f"🧹 {removed} patterns dupliqués supprimés")
+        self.db.execute_update(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_pain_patterns_type_window "
+            "ON pain_patterns(pattern_type, window_days)"
+        )
+
     def track_pain_event(self, event: PainEvent) -> bool:
         """Enregistre un événement de douleur"""
         try:
@@ -159,10 +270,31 @@ class ARIAMLAnalyzer:
             logger.error(f"Erreur enregistrement événement: {e}")
             return False
 
+    def _pattern_data_version(self, days: int) -> str:
+        """Version des données de la fenêtre (change à chaque ajout/expiration)"""
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        rows = self.db.execute_query(
+            """
+            SELECT COUNT(*), MIN(id), MAX(id) FROM pain_events
+            WHERE event_type = 'pain_entry' AND timestamp > ?
+            """,
+            (cutoff_date,),
+        )
+        count, min_id, max_id = tuple(rows[0]) if rows else (0, None, None)
+        return f"{count}:{min_id}:{max_id}"
+
     def analyze_pain_patterns(self, days: int = 7) -> dict[str, Any]:
-        """Analyse les patterns de douleur sur une période"""
+        """
+        Analyse les patterns de douleur sur une période.
+
+        Les patterns sont enregistrés une seule fois par (type, fenêtre) et le
+        résultat est conservé comme snapshot versionné (voir
+        ``get_pattern_snapshot``).
+        """
         try:
             with self.lock:
+                data_version = self._pattern_data_version(days)
+
                 # Récupérer les événements récents
                 cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
                 rows = self.db.execute_query(
@@ -178,46 +310,108 @@ class ARIAMLAnalyzer:
                 events = [tuple(r) for r in rows]
 
                 if not events:
-                    return {
+                    result: dict[str, Any] = {
                         "total_events": 0,
                         "patterns": [],
                         "recommendations": ["Pas assez de données récentes"],
                         "confidence": 0.0,
                     }
+                else:
+                    # Analyse des patterns
+                    patterns = self._detect_patterns(events)
+                    result = {
+                        "total_events": len(events),
+                        "patterns": patterns,
+                        "recommendations": self._generate_recommendations(patterns),
+                        "confidence": self._calculate_confidence(patterns),
+                        "analysis_period": f"{days} derniers jours",
+                    }
 
-                # Analyse des patterns
-                patterns = self._detect_patterns(events)
-                recommendations = self._generate_recommendations(patterns)
-
-                # Sauvegarder les patterns détectés
-                for pattern in patterns:
-                    self.db.execute_update(
-                        """
-                        INSERT INTO pain_patterns
-                        (pattern_type, confidence, description, triggers, recommendations)
-                        VALUES (?, ?, ?, ?, ?)
-                        """,
-                        (
-                            pattern["type"],
-                            pattern["confidence"],
-                            pattern["description"],
-                            json.dumps(pattern["triggers"]),
-                            json.dumps(pattern["recommendations"]),
-                        ),
-                    )
-
-                return {
-                    "total_events": len(events),
-                    "patterns": patterns,
-                    "recommendations": recommendations,
-                    "confidence": self._calculate_confidence(patterns),
-                    "analysis_period": f"{days} derniers jours",
-                }
+                result["data_version"] = data_version
+                result["computed_at"] = datetime.now().isoformat()
+                self._store_pattern_snapshot(days, result)
+                return result
 
         except Exception as e:
             logger.error(f"Erreur analyse patterns: {e}")
             return {"error": str(e)}
 
+    def _store_pattern_snapshot(self, days: int, result: dict[str, Any]) -> None:
+        """Enregistre les patterns (upsert par type/fenêtre) et le snapshot"""
+        patterns = result["patterns"]
+        data_version = result["data_version"]
+        if patterns:
+            self.db.execute_many(
+                """
+                INSERT INTO pain_patterns
+                (pattern_type, confidence, description, triggers, recommendations,
+                 window_days, data_version, detected_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(pattern_type, window_days) DO UPDATE SET
+                    confidence = excluded.confidence,
+                    description = excluded.description,
+                    triggers = excluded.triggers,
+                    recommendations = excluded.recommendations,
+                    data_version = excluded.data_version,
+                    detected_at = excluded.detected_at
+                """,
+                [
+                    (
+                        pattern["type"],
+                        pattern["confidence"],
+                        pattern["description"],
+                        json.dumps(pattern["triggers"]),
+                        json.dumps(pattern["recommendations"]),
+                        days,
+                        data_version,
+                    )
+                    for pattern in patterns
+                ],
+            )
+
+        # Retirer les patterns de cette fenêtre qui ne sont plus détectés
+        self.db.execute_update(
+            "DELETE FROM pain_patterns WHERE window_days = ? AND data_version != ?",
+            (days, data_version),
+        )
+        self.db.execute_update(
+            """
+            INSERT OR REPLACE INTO pain_pattern_snapshots
+            (window_days, data_version, result, computed_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (days, data_version, json.dumps(result), result["computed_at"]),
+        )
+        self._pattern_snapshots[days] = result
+
+    def get_pattern_snapshot(self, days: int = 14) -> dict[str, Any]:
+        """
+        Retourne l'analyse de patterns de la fenêtre sans la recalculer.
+
+        Le snapshot n'est recalculé (et écrit) que si les données de la
+        fenêtre ont changé depuis le dernier calcul ; sinon la lecture coûte
+        une requête d'agrégat indexée.
+        """
+        try:
+            data_version = self._pattern_data_version(days)
+            cached = self._pattern_snapshots.get(days)
+            if cached is not None and cached.get("data_version") == data_version:
+                return cached
+
+            rows = self.db.execute_query(
+                "SELECT data_version, result FROM pain_pattern_snapshots "
+                "WHERE window_days = ?",
+                (days,),
+            )
+            if rows and rows[0]["data_version"] == data_version:
+                snapshot: dict[str, Any] = json.loads(rows[0]["result"])
+                self._pattern_snapshots[days] = snapshot
+                return snapshot
+        except Exception as e:
+            logger.debug(f"Snapshot de patterns indisponible: {e}")
+
+        return self.analyze_pain_patterns(days=days)
+
     def _detect_patterns(self, events: list[tuple]) -> list[dict[str, Any]]:
         """Détecte les patterns dans les événements"""
         patterns: list[dict[str, Any]] = []
@@ -334,25 +528,41 @@ class ARIAMLAnalyzer:
             fatigue_factor = context.get("fatigue_level", 0.5)
             activity_factor = context.get("activity_intensity", 0.5)
 
-            # Prédiction basée sur les patterns historiques
-            historical_patterns = self.analyze_pain_patterns(days=14)
+            # Prédiction basée sur les patterns historiques (snapshot, sans écriture)
+            historical_patterns = self.get_pattern_snapshot(days=14)
 
-            # Calcul de la prédiction
-            predicted_intensity = self._calculate_predicted_intensity(
-                stress_factor, fatigue_factor, activity_factor, historical_patterns
-            )
+            # Calcul de la prédiction (modèle entraîné, sinon heuristique)
+            model = self.risk_model
+            risk_probability = None
+            if model is not None:
+                intensity, risk_probability = model.predict(
+                    build_feature_vector(
+                        stress_factor, fatigue_factor, activity_factor, datetime.now()
+                    )
+                )
+                predicted_intensity = int(round(intensity))
+            else:
+                predicted_intensity = self._calculate_predicted_intensity(
+                    stress_factor, fatigue_factor, activity_factor, historical_patterns
+                )
 
             predicted_trigger = self._predict_trigger(context, historical_patterns)
             confidence = self._calculate_prediction_confidence(historical_patterns)
 
             # Sauvegarder la prédiction
-            self._save_prediction(predicted_intensity, predicted_trigger, confidence)
+            self._save_prediction(
+                predicted_intensity, predicted_trigger, confidence, risk_probability
+            )
 
             return {
                 "predicted_intensity": predicted_intensity,
                 "predicted_trigger": predicted_trigger,
                 "confidence": confidence,
                 "time_horizon": "2-4 heures",
+                "risk_probability": (
+                    round(risk_probability, 4) if risk_probability is not None else None
+                ),
+                "model_version": model.version if model is not None else None,
                 "recommendations": self._get_preventive_recommendations(
                     predicted_intensity
                 ),
@@ -369,6 +579,176 @@ class ARIAMLAnalyzer:
             logger.error(f"Erreur prédiction: {e}")
             return {"error": str(e)}
 
+    def predict_batch(
+        self,
+        contexts: list[dict[str, Any]] | None = None,
+        horizon_hours: int = 24,
+        base_context: dict[str, Any] | None = None,
+        start: datetime | None = None,
+    ) -> dict[str, Any]:
+        """
+        Prédit un lot de contextes en une seule passe vectorisée.
+
+        Sans ``contexts``, construit une courbe horaire sur ``horizon_hours``
+        heures à partir de ``start`` (heure pleine suivante par défaut) avec
+        le contexte de base. Le snapshot de patterns est lu une seule fois et
+        aucune prédiction n'est enregistrée (scénarios "what-if").
+
+        Args:
+            contexts: Contextes (stress_level, fatigue_level,
+                activity_intensity, timestamp ISO optionnel)
+            horizon_hours: Nombre de points horaires si contexts est absent
+            base_context: Contexte appliqué à chaque heure de l'horizon
+            start: Début de l'horizon
+
+        Returns:
+            Dict avec la courbe de risque et son résumé
+        """
+        if contexts is None:
+            if not 1 <= horizon_hours <= MAX_BATCH_PREDICTIONS:
+                raise ValueError(
+                    f"horizon_hours doit être entre 1 et {MAX_BATCH_PREDICTIONS}"
+                )
+            base = base_context or {}
+            origin = start or (
+                datetime.now().replace(minute=0, second=0, microsecond=0)
+                + timedelta(hours=1)
+            )
+            contexts = [
+                {**base, "timestamp": (origin + timedelta(hours=h)).isoformat()}
+                for h in range(horizon_hours)
+            ]
+        elif len(contexts) > MAX_BATCH_PREDICTIONS:
+            raise ValueError(
+                f"Au plus {MAX_BATCH_PREDICTIONS} contextes par lot "
+                f"({len(contexts)} reçus)"
+            )
+
+        now = datetime.now()
+        moments = [
+            datetime.fromisoformat(str(c["timestamp"])) if c.get("timestamp") else now
+            for c in contexts
+        ]
+        X = np.array(
+            [
+                build_feature_vector(
+                    float(c.get("stress_level", 0.5)),
+                    float(c.get("fatigue_level", 0.5)),
+                    float(c.get("activity_intensity", 0.5)),
+                    moment,
+                )
+                for c, moment in zip(contexts, moments, strict=True)
+            ],
+            dtype=np.float64,
+        ).reshape(-1, len(FEATURE_NAMES))
+
+        historical_patterns = self.get_pattern_snapshot(days=14)
+        model = self.risk_model
+        risk: np.ndarray | None = None
+        if model is not None:
+            intensity, risk = model.predict_many(X)
+            intensity = np.rint(intensity)
+        else:
+            # Même formule que _calculate_predicted_intensity, vectorisée
+            intensity = np.clip(
+                np.floor(
+                    3
+                    + X[:, 0] * 3
+                    + X[:, 1] * 2
+                    + X[:, 2] * 2
+                    + self._pattern_adjustment(historical_patterns)
+                ),
+                0,
+                10,
+            )
+
+        curve = [
+            {
+                "timestamp": moment.isoformat(),
+                "hour": moment.hour,
+                "predicted_intensity": int(intensity[i]),
+                "risk_probability": (
+                    round(float(risk[i]), 4) if risk is not None else None
+                ),
+                "risk_level": risk_level_from_intensity(float(intensity[i])),
+            }
+            for i, moment in enumerate(moments)
+        ]
+
+        summary: dict[str, Any] = {"points": len(curve)}
+        if curve:
+            peak_index = int(
+                np.argmax(risk if risk is not None else intensity)
+            )
+            summary.update(
+                {
+                    "peak": curve[peak_index],
+                    "max_intensity": int(intensity.max()),
+                    "mean_intensity": round(float(intensity.mean()), 2),
+                    "mean_risk_probability": (
+                        round(float(risk.mean()), 4) if risk is not None else None
+                    ),
+                    "high_risk_hours": sum(
+                        1 for point in curve if point["risk_level"] in ("high", "medium")
+                    ),
+                }
+            )
+
+        return {
+            "curve": curve,
+            "summary": summary,
+            "confidence": self._calculate_prediction_confidence(historical_patterns),
+            "model_version": model.version if model is not None else None,
+            "timestamp": now.isoformat(),
+        }
+
+    def train_risk_model(
+        self,
+        days_back: int | None = None,
+        alpha: float = 1.0,
+        health_data_dir: str = "dacc",
+    ) -> dict[str, Any]:
+        """
+        Entraîne et sauvegarde une nouvelle version du modèle de risque.
+
+        Args:
+            days_back: Limiter aux N derniers jours (None = tout l'historique)
+            alpha: Coefficient de régularisation L2
+            health_data_dir: Répertoire des métriques santé
+
+        Returns:
+            Résumé de l'entraînement
+        """
+        extractor = RiskFeatureExtractor(self.db_path, health_data_dir)
+        X, y, coverage = extractor.extract(days_back)
+        try:
+            model = PainRiskModel.fit(X, y, alpha=alpha)
+        except ValueError as e:
+            logger.warning(f"⚠️ Entraînement impossible: {e}")
+            return {
+                "model_updated": False,
+                "message": str(e),
+                "training_samples": int(X.shape[0]),
+                "model_version": self.risk_model.version if self.risk_model else None,
+            }
+
+        model.metadata.update(coverage)
+        model.save(self.model_dir)
+        # Recharger depuis le disque (poids en mémoire mappée)
+        self.risk_model = PainRiskModel.load(self.model_dir, model.version)
+        logger.info(
+            f"✅ Modèle de risque v{model.version} entraîné sur {X.shape[0]} épisodes"
+        )
+        return {
+            "model_updated": True,
+            "message": "Modèle de risque entraîné",
+            "training_samples": int(X.shape[0]),
+            "model_version": model.version,
+            "features": FEATURE_NAMES,
+            "metrics": model.metadata.get("metrics", {}),
+            **coverage,
+        }
+
     def _calculate_predicted_intensity(
         self, stress: float, fatigue: float, activity: float, patterns: dict
     ) -> int:
@@ -381,12 +761,7 @@ class ARIAMLAnalyzer:
         activity_impact = activity * 2
 
         # Ajustement basé sur les patterns
-        pattern_adjustment = 0
-        if patterns.get("patterns"):
-            avg_confidence = sum(
-                p.get("confidence", 0) for p in patterns["patterns"]
-            ) / len(patterns["patterns"])
-            pattern_adjustment = avg_confidence * 2
+        pattern_adjustment = self._pattern_adjustment(patterns)
 
         predicted = (
             base_intensity
@@ -397,6 +772,16 @@ class ARIAMLAnalyzer:
         )
         return min(10, max(0, int(predicted)))
 
+    @staticmethod
+    def _pattern_adjustment(patterns: dict) -> float:
+        """Ajustement d'intensité basé sur la confiance moyenne des patterns"""
+        if not patterns.get("patterns"):
+            return 0.0
+        avg_confidence = sum(
+            p.get("confidence", 0) for p in patterns["patterns"]
+        ) / len(patterns["patterns"])
+        return avg_confidence * 2
+
     def _predict_trigger(self, context: dict[str, Any], patterns: dict) -> str:
         """Prédit le déclencheur le plus probable"""
         # Déclencheurs basés sur le contexte
@@ -418,17 +803,32 @@ class ARIAMLAnalyzer:
         else:
             return 0.5  # Confiance modérée
 
-    def _save_prediction(self, intensity: int, trigger: str, confidence: float):
-        """Sauvegarde une prédiction"""
+    def _save_prediction(
+        self,
+        intensity: int,
+        trigger: str,
+        confidence: float,
+        risk_probability: float | None = None,
+    ):
+        """Sauvegarde une prédiction (heure locale, comme pain_entries)"""
         try:
             with self.lock:
                 self.db.execute_update(
                     """
                     INSERT INTO pain_predictions
-                    (predicted_intensity, predicted_trigger, confidence, time_horizon)
-                    VALUES (?, ?, ?, ?)
+                    (predicted_intensity, predicted_trigger, confidence, time_horizon,
+                     predicted_at, horizon_hours, risk_probability)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                     """,
-                    (intensity, trigger, confidence, "2-4 heures"),
+                    (
+                        intensity,
+                        trigger,
+                        confidence,
+                        "2-4 heures",
+                        datetime.now().isoformat(),
+                        PREDICTION_HORIZON_HOURS,
+                        risk_probability,
+                    ),
                 )
 
         except Exception as e:
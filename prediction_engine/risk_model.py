@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+
+"""
+ARIA Risk Model - Modèle de risque de douleur entraîné (NumPy)
+Extraction de features (pain_entries + métriques santé), régression ridge
+pour l'intensité, régression logistique L2 pour le risque de douleur forte,
+artefacts versionnés et chargés en mémoire mappée
+"""
+
+import json
+import math
+import os
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from core import DatabaseManager
+from core.logging import get_logger
+from pattern_analysis.emotion_lexicon import get_default_lexicon
+
+logger = get_logger("risk_model")
+
+# Ordre des features (identique à l'entraînement et à l'inférence)
+FEATURE_NAMES: list[str] = [
+    "stress_level",
+    "fatigue_level",
+    "activity_intensity",
+    "hour_sin",
+    "hour_cos",
+    "weekend",
+]
+
+# Intensité à partir de laquelle un épisode est considéré comme "fort"
+HIGH_PAIN_THRESHOLD = 6
+
+# Nombre minimal d'épisodes pour entraîner un modèle
+MIN_TRAINING_SAMPLES = 10
+
+MODEL_PREFIX = "pain_risk_v"
+
+HEALTH_SUBDIRS = ["samsung_health_data", "ios_health_data", "google_fit_data"]
+
+
+def time_features(moment: datetime) -> tuple[float, float, float]:
+    """Encode l'heure (cyclique) et le week-end."""
+    angle = 2 * math.pi * (moment.hour + moment.minute / 60) / 24
+    return math.sin(angle), math.cos(angle), 1.0 if moment.weekday() >= 5 else 0.0
+
+
+def build_feature_vector(
+    stress_level: float,
+    fatigue_level: float,
+    activity_intensity: float,
+    moment: datetime,
+) -> list[float]:
+    """Construit un vecteur de features dans l'ordre de ``FEATURE_NAMES``."""
+    hour_sin, hour_cos, weekend = time_features(moment)
+    return [
+        float(stress_level),
+        float(fatigue_level),
+        float(activity_intensity),
+        hour_sin,
+        hour_cos,
+        weekend,
+    ]
+
+
+class RiskFeatureExtractor:
+    """
+    Extrait les features d'entraînement à partir des entrées de douleur.
+
+    Les niveaux de stress, fatigue et activité proviennent des métriques
+    santé du jour (fichiers ``<type>_<YYYY-MM-DD>.json``) ; à défaut, stress
+    et fatigue sont estimés à partir des déclencheurs saisis (lexique
+    émotionnel), puis valent 0.5.
+    """
+
+    def __init__(self, db_path: str = "aria_pain.db", health_data_dir: str = "dacc"):
+        self.db = DatabaseManager(db_path)
+        self.health_data_dir = Path(health_data_dir)
+        self.lexicon = get_default_lexicon()
+
+    def _load_daily_health(self) -> dict[str, dict[str, float]]:
+        """Agrège les métriques santé par jour (moyenne des sources)."""
+        sums: dict[str, dict[str, list[float]]] = {}
+        for subdir in HEALTH_SUBDIRS:
+            data_dir = self.health_data_dir / subdir
+            if not data_dir.exists():
+                continue
+            for json_file in data_dir.glob("*_*.json"):
+                kind, _, day = json_file.stem.partition("_")
+                if kind not in ("stress", "sleep", "activity"):
+                    continue
+                try:
+                    with open(json_file, encoding="utf-8") as f:
+                        data = json.load(f)
+                except Exception as e:
+                    logger.debug(f"Erreur lecture {json_file}: {e}")
+                    continue
+
+                day_metrics = sums.setdefault(day, {})
+                if kind == "stress" and data.get("stress_level") is not None:
+                    day_metrics.setdefault("stress_level", []).append(
+                        min(1.0, float(data["stress_level"]) / 100)
+                    )
+                elif kind == "sleep" and data.get("quality_score") is not None:
+                    day_metrics.setdefault("fatigue_level", []).append(
+                        1.0 - min(1.0, float(data["quality_score"]))
+                    )
+                elif kind == "activity" and data.get("steps") is not None:
+                    day_metrics.setdefault("activity_intensity", []).append(
+                        min(1.0, float(data["steps"]) / 15000)
+                    )
+
+        return {
+            day: {name: sum(values) / len(values) for name, values in metrics.items()}
+            for day, metrics in sums.items()
+        }
+
+    def extract(
+        self, days_back: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, dict[str, Any]]:
+        """
+        Construit la matrice de features et le vecteur d'intensités.
+
+        Args:
+            days_back: Limiter aux N derniers jours (None = tout l'historique)
+
+        Returns:
+            (X, y, infos sur la couverture des métriques santé)
+        """
+        _, X, y, coverage = self.extract_series(days_back)
+        return X, y, coverage
+
+    def extract_series(
+        self, days_back: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """
+        Comme ``extract`` mais conserve l'horodatage (epoch) de chaque entrée.
+
+        Returns:
+            (epochs, X, y, infos sur la couverture des métriques santé)
+        """
+        query = """
+            SELECT timestamp, intensity, physical_trigger, mental_trigger, activity
+            FROM pain_entries
+            WHERE intensity IS NOT NULL
+        """
+        params: tuple[Any, ...] = ()
+        if days_back is not None:
+            query += " AND timestamp >= ?"
+            params = ((datetime.now() - timedelta(days=days_back)).isoformat(),)
+        rows = self.db.execute_query(query, params)
+
+        daily_health = self._load_daily_health()
+        epochs: list[float] = []
+        features: list[list[float]] = []
+        targets: list[float] = []
+        health_matches = 0
+
+        for row in rows:
+            try:
+                moment = datetime.fromisoformat(
+                    str(row["timestamp"]).replace("Z", "+00:00")
+                )
+            except ValueError:
+                continue
+
+            scores = self.lexicon.score(dict(row))
+            health = daily_health.get(moment.date().isoformat(), {})
+            if health:
+                health_matches += 1
+
+            stress = health.get("stress_level", scores.get("stressed", 0.5))
+            fatigue = health.get("fatigue_level", scores.get("fatigued", 0.5))
+            activity = health.get("activity_intensity", 0.5)
+            epochs.append(moment.timestamp())
+            features.append(build_feature_vector(stress, fatigue, activity, moment))
+            targets.append(float(row["intensity"]))
+
+        X = np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+        y = np.asarray(targets, dtype=np.float64)
+        return (
+            np.asarray(epochs, dtype=np.float64),
+            X,
+            y,
+            {"health_matched_samples": health_matches},
+        )
+
+
+def _fit_ridge(X: np.ndarray, y: np.ndarray, alpha: float) -> np.ndarray:
+    """Régression ridge en forme fermée (biais non régularisé, en dernier)."""
+    design = np.hstack([X, np.ones((X.shape[0], 1))])
+    penalty = alpha * np.eye(design.shape[1])
+    penalty[-1, -1] = 0.0
+    return np.linalg.solve(design.T @ design + penalty, design.T @ y)
+
+
+def _fit_logistic(
+    X: np.ndarray, y: np.ndarray, alpha: float, iterations: int = 50
+) -> np.ndarray:
+    """Régression logistique L2 par Newton-Raphson (IRLS)."""
+    design = np.hstack([X, np.ones((X.shape[0], 1))])
+    penalty = alpha * np.eye(design.shape[1])
+    penalty[-1, -1] = 0.0
+    weights = np.zeros(design.shape[1])
+    for _ in range(iterations):
+        probabilities = 1.0 / (1.0 + np.exp(-(design @ weights)))
+        gradient = design.T @ (probabilities - y) + penalty @ weights
+        curvature = probabilities * (1.0 - probabilities)
+        hessian = (design * curvature[:, None]).T @ design + penalty
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(weights)), gradient)
+        weights -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return weights
+
+
+class PainRiskModel:
+    """
+    Modèle de risque de douleur entraîné.
+
+    Les paramètres sont stockés dans l'espace des features brutes (la
+    standardisation est repliée dans les poids) : ligne 0 = ridge
+    (intensité), ligne 1 = logistique (probabilité de douleur forte), le
+    biais en dernière colonne.
+    """
+
+    def __init__(self, params: np.ndarray, metadata: dict[str, Any]) -> None:
+        self.params = params
+        self.metadata = metadata
+        self.version: int = int(metadata["version"])
+        self.feature_names: list[str] = list(metadata["feature_names"])
+        # Copie en floats Python pour une inférence unitaire sans surcoût NumPy
+        self._intensity_weights = tuple(float(w) for w in params[0])
+        self._risk_weights = tuple(float(w) for w in params[1])
+
+    @classmethod
+    def fit(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        alpha: float = 1.0,
+        threshold: int = HIGH_PAIN_THRESHOLD,
+    ) -> "PainRiskModel":
+        """
+        Entraîne le modèle.
+
+        Args:
+            X: Matrice de features (n_samples, n_features)
+            y: Intensités observées (0-10)
+            alpha: Coefficient de régularisation L2
+            threshold: Intensité définissant une douleur forte
+
+        Returns:
+            Modèle entraîné (version 0, attribuée lors de la sauvegarde)
+        """
+        if X.shape[0] < MIN_TRAINING_SAMPLES:
+            raise ValueError(
+                f"Pas assez d'épisodes pour entraîner ({X.shape[0]} < "
+                f"{MIN_TRAINING_SAMPLES})"
+            )
+
+        means = X.mean(axis=0)
+        stds = X.std(axis=0)
+        stds[stds < 1e-9] = 1.0
+        standardized = (X - means) / stds
+        labels = (y >= threshold).astype(np.float64)
+
+        params = np.empty((2, X.shape[1] + 1))
+        for row, weights in enumerate(
+            (_fit_ridge(standardized, y, alpha), _fit_logistic(standardized, labels, alpha))
+        ):
+            # Replier la standardisation dans les poids
+            params[row, :-1] = weights[:-1] / stds
+            params[row, -1] = weights[-1] - float(np.sum(weights[:-1] * means / stds))
+
+        model = cls(
+            params,
+            {
+                "version": 0,
+                "feature_names": FEATURE_NAMES,
+                "threshold": threshold,
+                "alpha": alpha,
+                "trained_at": datetime.now().isoformat(),
+                "n_samples": int(X.shape[0]),
+                "positive_rate": round(float(labels.mean()), 4),
+            },
+        )
+        intensity, risk = model.predict_many(X)
+        model.metadata["metrics"] = {
+            "mae": round(float(np.mean(np.abs(intensity - y))), 4),
+            "brier": round(float(np.mean((risk - labels) ** 2)), 4),
+        }
+        return model
+
+    def predict(self, features: Sequence[float]) -> tuple[float, float]:
+        """
+        Prédit l'intensité et la probabilité de douleur forte (un échantillon).
+
+        Returns:
+            (intensité 0-10, probabilité 0-1)
+        """
+        intensity = self._intensity_weights[-1]
+        logit = self._risk_weights[-1]
+        for value, w_intensity, w_risk in zip(
+            features, self._intensity_weights, self._risk_weights, strict=False
+        ):
+            intensity += value * w_intensity
+            logit += value * w_risk
+        logit = max(-30.0, min(30.0, logit))
+        return min(10.0, max(0.0, intensity)), 1.0 / (1.0 + math.exp(-logit))
+
+    def predict_many(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Prédiction vectorisée sur une matrice de features."""
+        scores = X @ self.params[:, :-1].T + self.params[:, -1]
+        intensity = np.clip(scores[:, 0], 0.0, 10.0)
+        risk = 1.0 / (1.0 + np.exp(-np.clip(scores[:, 1], -30.0, 30.0)))
+        return intensity, risk
+
+    def save(self, model_dir: str | Path) -> Path:
+        """
+        Sauvegarde le modèle sous une nouvelle version.
+
+        Les poids (``.npy``) sont écrits avant les métadonnées (``.json``) :
+        une version n'est visible qu'une fois complète.
+
+        Returns:
+            Chemin du fichier de poids
+        """
+        directory = Path(model_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.version = max(list_model_versions(directory), default=0) + 1
+        self.metadata["version"] = self.version
+
+        stem = directory / f"{MODEL_PREFIX}{self.version:04d}"
+        weights_path = stem.with_suffix(".npy")
+        tmp_weights = directory / f".{stem.name}.tmp.npy"
+        np.save(tmp_weights, np.ascontiguousarray(self.params, dtype=np.float64))
+        os.replace(tmp_weights, weights_path)
+
+        tmp_meta = directory / f".{stem.name}.tmp.json"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=2)
+        os.replace(tmp_meta, stem.with_suffix(".json"))
+
+        logger.info(f"💾 Modèle de risque v{self.version} sauvegardé: {weights_path}")
+        return weights_path
+
+    @classmethod
+    def load(cls, model_dir: str | Path, version: int) -> "PainRiskModel":
+        """Charge une version (poids en mémoire mappée)."""
+        stem = Path(model_dir) / f"{MODEL_PREFIX}{version:04d}"
+        with open(stem.with_suffix(".json"), encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata.get("feature_names") != FEATURE_NAMES:
+            raise ValueError(f"Features incompatibles pour le modèle v{version}")
+        params = np.load(stem.with_suffix(".npy"), mmap_mode="r")
+        return cls(params, metadata)
+
+    @classmethod
+    def load_latest(cls, model_dir: str | Path) -> "PainRiskModel | None":
+        """Charge la version la plus récente, None si aucun modèle valide."""
+        for version in sorted(list_model_versions(model_dir), reverse=True):
+            try:
+                return cls.load(model_dir, version)
+            except Exception as e:
+                logger.warning(f"⚠️ Modèle v{version} illisible: {e}")
+        return None
+
+
+def list_model_versions(model_dir: str | Path) -> list[int]:
+    """Liste les versions complètes présentes dans un répertoire."""
+    directory = Path(model_dir)
+    if not directory.exists():
+        return []
+    versions = []
+    for meta_path in directory.glob(f"{MODEL_PREFIX}*.json"):
+        suffix = meta_path.stem[len(MODEL_PREFIX) :]
+        if suffix.isdigit() and meta_path.with_suffix(".npy").exists():
+            versions.append(int(suffix))
+    return versions
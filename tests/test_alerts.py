@@ -25,6 +25,84 @@ class TestAlertsSystem:
         )
         assert alert_id > 0
 
+    def test_create_alert_dedup_key(self, tmp_path):
+        """Test le dédoublonnage par clé et le délai de carence."""
+        alerts_system = ARIA_AlertsSystem(str(tmp_path / "alerts.db"))
+        args = (AlertType.HEALTH_SYNC, AlertSeverity.WARNING, "Sommeil", "5h")
+
+        first = alerts_system.create_alert(*args, dedup_key="sleep_5")
+        assert first > 0
+        assert alerts_system.create_alert(*args, dedup_key="sleep_5") == 0
+        assert alerts_system.create_alert(*args, dedup_key="sleep_4") > first
+        # Même clé, autre type : alerte distincte
+        assert (
+            alerts_system.create_alert(
+                AlertType.MEDICAL_APPOINTMENT, AlertSeverity.INFO, "RDV", "Demain",
+                dedup_key="sleep_5",
+            )
+            > 0
+        )
+
+        # Délai de carence non écoulé, puis écoulé : l'alerte est réactivée
+        alerts_system.mark_as_read(first)
+        cooled = {"dedup_key": "sleep_5", "cooldown_hours": 1}
+        assert alerts_system.create_alert(*args, **cooled) == 0
+        alerts_system.db.execute_update(
+            "UPDATE alerts SET created_at = DATETIME('now', '-2 hours') WHERE id = ?",
+            (first,),
+        )
+        assert (
+            alerts_system.create_alert(
+                AlertType.HEALTH_SYNC, AlertSeverity.CRITICAL, "Sommeil", "4h",
+                dedup_key="sleep_5", cooldown_hours=1,
+            )
+            == first
+        )
+        alerts = alerts_system.get_alerts(alert_type=AlertType.HEALTH_SYNC)["alerts"]
+        assert len(alerts) == 2
+        refreshed = next(alert for alert in alerts if alert["id"] == first)
+        assert (refreshed["message"], refreshed["is_read"]) == ("4h", 0)
+
+    def test_dedup_key_migration(self, tmp_path):
+        """Test la migration d'une table d'alertes sans dedup_key."""
+        import json
+
+        from core import DatabaseManager
+
+        db_path = str(tmp_path / "legacy.db")
+        db = DatabaseManager(db_path)
+        db.execute_update("""
+            CREATE TABLE alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                alert_type TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                title TEXT NOT NULL,
+                message TEXT NOT NULL,
+                data TEXT,
+                is_read INTEGER DEFAULT 0,
+                created_at TEXT NOT NULL DEFAULT (DATETIME('now'))
+            )
+            """)
+        legacy = json.dumps({"alert_key": "stress_high_75"})
+        for _ in range(2):
+            db.execute_update(
+                "INSERT INTO alerts (alert_type, severity, title, message, data) "
+                "VALUES ('health_sync', 'warning', 'Stress', 'Élevé', ?)",
+                (legacy,),
+            )
+
+        alerts_system = ARIA_AlertsSystem(db_path)
+        rows = db.execute_query("SELECT id, dedup_key FROM alerts ORDER BY id")
+        assert [row["dedup_key"] for row in rows] == [None, "stress_high_75"]
+        assert (
+            alerts_system.create_alert(
+                AlertType.HEALTH_SYNC, AlertSeverity.WARNING, "Stress", "Élevé",
+                dedup_key="stress_high_75",
+            )
+            == 0
+        )
+        db.close()
+
     def test_get_alerts(self):
         """Test la récupération des alertes."""
         alerts_system = ARIA_AlertsSystem()
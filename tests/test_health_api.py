@@ -5,6 +5,8 @@ Tests unitaires pour l'API des connecteurs santé ARKALIA ARIA
 Tests complets pour tous les endpoints de l'API santé.
 """
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -81,6 +83,74 @@ class TestHealthSyncEndpoint:
         assert "google_fit" in data["sync_summary"]["connectors"]
         assert "ios_health" in data["sync_summary"]["connectors"]
 
+    def test_full_resync_and_watermarks(self, client):
+        """Test resynchronisation complète puis lecture des repères."""
+        response = client.post(
+            "/health/sync/all", json={"days_back": 2, "full_resync": True}
+        )
+        assert response.status_code == 200
+        assert response.json()["sync_summary"]["full_resync"] is True
+
+        response = client.get("/health/sync/watermarks")
+        assert response.status_code == 200
+        connectors = {row["connector"] for row in response.json()}
+        assert {"samsung_health", "google_fit", "ios_health"} <= connectors
+
+    def test_merge_provenance(self, client):
+        """Test provenance des enregistrements fusionnés."""
+        client.post("/health/sync/all", json={"days_back": 2})
+        response = client.get("/health/data/provenance?kind=sleep&days_back=3")
+        assert response.status_code == 200
+        for entry in response.json():
+            assert {"source", "timestamp", "merged_from"} <= set(entry)
+
+        response = client.get("/health/data/provenance?kind=stress")
+        assert response.status_code == 400
+
+    def test_import_job_progress(self, tmp_path, monkeypatch):
+        """Test import en tâche de fond et suivi de l'avancement."""
+        from datetime import datetime, timedelta
+
+        from fastapi import FastAPI
+
+        monkeypatch.setenv("IMPORT_ROOT", str(tmp_path))
+        (tmp_path / "takeout").mkdir()
+        app = FastAPI()
+        api = HealthConnectorsAPI()
+        api.integrate_with_app(app)
+        with TestClient(app) as client:
+            response = client.post("/health/import", json={"path": "takeout"})
+            assert response.status_code == 200
+            job_id = response.json()["job_id"]
+
+            for _ in range(50):
+                job = client.get(f"/health/import/{job_id}").json()
+                if job["status"] != "running":
+                    break
+                time.sleep(0.1)
+            assert job["status"] == "completed"
+            assert job["summary"]["files"] == 0
+            assert job["path"] == str((tmp_path / "takeout").resolve())
+
+            missing = client.post("/health/import", json={"path": "x"})
+            assert missing.status_code == 400
+            for outside in ("../", "/etc"):
+                response = client.post("/health/import", json={"path": outside})
+                assert response.status_code == 403
+            assert client.get("/health/import/unknown").status_code == 404
+
+            # Un seul import à la fois
+            job = api.import_jobs[job_id]
+            job["status"], job["finished_at"] = "running", None
+            busy = client.post("/health/import", json={"path": "takeout"})
+            assert busy.status_code == 409
+
+            # Les imports terminés sont oubliés après import_job_ttl_hours
+            job["status"] = "completed"
+            job["finished_at"] = (datetime.now() - timedelta(days=2)).isoformat()
+            assert client.get(f"/health/import/{job_id}").status_code == 404
+            assert api.import_jobs == {}
+
     @pytest.mark.asyncio
     async def test_sync_specific_connector(self, client):
         """Test synchronisation d'un connecteur spécifique."""
@@ -320,6 +390,23 @@ class TestStressDataEndpoint:
             assert 0 <= item["stress_level"] <= 100
             assert item["heart_rate_variability"] > 0
 
+    def test_get_stress_data_downsampled(self, client):
+        """Test lecture agrégée avec choix automatique du niveau."""
+        response = client.get("/health/data/stress?days_back=7&resolution=auto")
+
+        assert response.status_code == 200
+        assert response.headers["X-Resolution"] == "hour"
+        points = response.json()
+        assert len(points) <= 7 * 24 + 1
+        for point in points:
+            assert "timestamp" in point
+            if "stress_level" in point:
+                stats = point["stress_level"]
+                assert stats["min"] <= stats["mean"] <= stats["max"]
+
+        response = client.get("/health/data/stress?resolution=minute")
+        assert response.status_code == 422
+
 
 class TestHealthDataEndpoint:
     """Tests de l'endpoint des données de santé."""
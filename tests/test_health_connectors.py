@@ -5,13 +5,20 @@ Tests unitaires pour les connecteurs santé ARKALIA ARIA
 Tests complets pour tous les connecteurs santé et leurs fonctionnalités.
 """
 
+import asyncio
+import json
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Any
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from core import DatabaseManager, get_scheduler
 from health_connectors.base_connector import BaseHealthConnector
+from health_connectors.config import HealthConnectorConfig
 from health_connectors.data_models import (
     ActivityData,
     HealthData,
@@ -21,6 +28,7 @@ from health_connectors.data_models import (
 )
 from health_connectors.google_fit_connector import GoogleFitConnector
 from health_connectors.ios_health_connector import IOSHealthConnector
+from health_connectors.record_writer import DailyRecordWriter
 from health_connectors.samsung_health_connector import SamsungHealthConnector
 from health_connectors.sync_manager import HealthSyncManager
 
@@ -495,8 +503,8 @@ class TestHealthSyncManager:
         result = sync_manager.start_auto_sync()
         assert result is True
         assert sync_manager.is_running is True
-        assert sync_manager.sync_thread is not None
-        assert sync_manager.sync_thread.is_alive()
+        assert get_scheduler().get_job(sync_manager.AUTO_SYNC_JOB) is not None
+        assert get_scheduler().is_running
 
         # Nettoyer
         sync_manager.stop_auto_sync()
@@ -855,6 +863,289 @@ class TestErrorHandling:
             assert "ios_health" in result["connectors"]
 
 
+class TestDailyRecordWriter:
+    """Tests de l'écriture groupée des données connecteurs."""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_compact_file_per_day(self, tmp_path):
+        writer = DailyRecordWriter(tmp_path)
+        day = datetime(2025, 3, 1, 9)
+        for hour, level in [(9, 20.0), (13, 35.0), (21, 50.0)]:
+            writer.add(
+                "stress",
+                day.date(),
+                StressData(
+                    timestamp=day.replace(hour=hour),
+                    stress_level=level,
+                    source="test",
+                    raw_data={},
+                ),
+            )
+        assert not list(tmp_path.iterdir())
+
+        assert await writer.flush() == 1
+        assert len(writer) == 0
+        content = (tmp_path / "stress_2025-03-01.json").read_text(encoding="utf-8")
+        assert "\n" not in content and ": " not in content
+        # Comme l'ancienne écriture directe, la dernière mesure du jour est conservée
+        assert json.loads(content)["stress_level"] == 50.0
+        assert await writer.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flushes_of_same_day(self, tmp_path):
+        day = datetime(2025, 3, 1, 9)
+        writers = []
+        for level in range(20):
+            writer = DailyRecordWriter(tmp_path)
+            writer.add(
+                "stress",
+                day.date(),
+                StressData(timestamp=day, stress_level=level, source="test"),
+            )
+            writers.append(writer)
+
+        # Synchronisations simultanées : aucun fichier temporaire partagé
+        assert await asyncio.gather(*(w.flush() for w in writers)) == [1] * 20
+        assert [p.name for p in tmp_path.iterdir()] == ["stress_2025-03-01.json"]
+        content = (tmp_path / "stress_2025-03-01.json").read_text(encoding="utf-8")
+        assert json.loads(content)["stress_level"] in range(20)
+
+    @pytest.mark.asyncio
+    async def test_connector_writes_batch_after_fetch(self, tmp_path):
+        connector = SamsungHealthConnector()
+        connector.writer = DailyRecordWriter(tmp_path)
+        end_date = datetime.now()
+        writer_threads = []
+        real_replace = os.replace
+
+        def tracking_replace(*args, **kwargs):
+            writer_threads.append(threading.current_thread())
+            return real_replace(*args, **kwargs)
+
+        with patch("os.replace", side_effect=tracking_replace):
+            data = await connector.get_activity_data(
+                end_date - timedelta(days=9), end_date
+            )
+        assert len(data) == 10
+        assert len(list(tmp_path.glob("activity_*.json"))) == 10
+        assert not list(tmp_path.glob("*.tmp"))
+        # Écritures hors du thread de la boucle asyncio
+        assert len(writer_threads) == 10
+        assert threading.main_thread() not in writer_threads
+
+
+class _DelayedConnector(BaseHealthConnector):
+    """Connecteur factice dont chaque récupération prend ``delay`` secondes."""
+
+    def __init__(self, name: str, delay: float = 0.0, failing: str | None = None):
+        super().__init__(name)
+        self.delay = delay
+        self.failing = failing
+
+    async def connect(self):
+        self.is_connected = True
+        return True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+    async def _fetch(self, dataset: str) -> list[Any]:
+        await asyncio.sleep(self.delay)
+        if dataset == self.failing:
+            raise RuntimeError(f"{dataset} indisponible")
+        now = datetime.now().replace(microsecond=0)
+        common = {"source": self.connector_name, "raw_data": {}}
+        records = {
+            "activity": lambda: ActivityData(timestamp=now, steps=1000, **common),
+            "sleep": lambda: SleepData(
+                sleep_start=now - timedelta(hours=8),
+                sleep_end=now,
+                duration_minutes=480,
+                **common,
+            ),
+            "stress": lambda: StressData(timestamp=now, stress_level=40, **common),
+            "health": lambda: HealthData(timestamp=now, weight_kg=70.0, **common),
+        }
+        return [records[dataset]()]
+
+    async def get_activity_data(self, start_date: datetime, end_date: datetime):
+        return await self._fetch("activity")
+
+    async def get_sleep_data(self, start_date: datetime, end_date: datetime):
+        return await self._fetch("sleep")
+
+    async def get_stress_data(self, start_date: datetime, end_date: datetime):
+        return await self._fetch("stress")
+
+    async def get_health_data(self, start_date: datetime, end_date: datetime):
+        return await self._fetch("health")
+
+
+class _SyncManagerHelpers:
+    """Gestionnaire sur base temporaire et synchronisation sans effets annexes."""
+
+    @pytest.fixture(autouse=True)
+    def _db_path(self, tmp_path):
+        self.db_path = str(tmp_path / "sync.db")
+        yield
+        DatabaseManager(self.db_path).close()
+
+    def _manager(self, connectors: list[BaseHealthConnector], **config: Any):
+        manager = HealthSyncManager(HealthConnectorConfig(**config), self.db_path)
+        manager.connectors = {c.connector_name: c for c in connectors}
+        return manager
+
+    @staticmethod
+    async def _sync(
+        manager: HealthSyncManager, full_resync: bool = False
+    ) -> dict[str, Any]:
+        with (
+            patch.object(manager, "_generate_unified_metrics", AsyncMock(return_value={})),
+            patch.object(manager, "_refresh_feature_store"),
+            patch.object(manager, "_update_flare_detector", AsyncMock()),
+            patch.object(manager, "_save_sync_history", AsyncMock()),
+        ):
+            return await manager.sync_all_connectors(days_back=1, full_resync=full_resync)
+
+
+class TestConcurrentSync(_SyncManagerHelpers):
+    """Tests de la synchronisation parallèle des connecteurs."""
+
+    @pytest.mark.asyncio
+    async def test_total_time_is_slowest_connector(self):
+        """Les connecteurs et leurs jeux de données sont récupérés en parallèle."""
+        manager = self._manager(
+            [_DelayedConnector(f"c{i}", delay=0.2) for i in range(3)]
+        )
+        started = time.perf_counter()
+        result = await self._sync(manager)
+        elapsed = time.perf_counter() - started
+
+        # Séquentiel : 3 connecteurs x 4 jeux x 0.2 s = 2.4 s
+        assert elapsed < 1.0
+        assert result["status"] == "success"
+        assert set(result["timings"]["connectors"]) == {"c0", "c1", "c2"}
+        assert "total" in result["timings"]
+        assert result["connectors"]["c0"]["data_counts"]["activity"] == 1
+        assert set(result["connectors"]["c0"]["timings"]) == {
+            "activity",
+            "sleep",
+            "stress",
+            "health",
+        }
+
+    @pytest.mark.asyncio
+    async def test_slow_connector_times_out_without_blocking_others(self):
+        manager = self._manager(
+            [_DelayedConnector("fast"), _DelayedConnector("slow", delay=5.0)],
+            connector_timeout_seconds=0.3,
+        )
+        result = await self._sync(manager)
+
+        assert result["status"] == "partial_success"
+        assert result["connectors"]["fast"]["status"] == "success"
+        assert result["connectors"]["slow"]["status"] == "error"
+        assert any("slow" in error for error in result["errors"])
+        assert result["duration_seconds"] < 2.0
+
+    @pytest.mark.asyncio
+    async def test_dataset_failure_keeps_other_datasets(self):
+        manager = self._manager(
+            [_DelayedConnector("flaky", failing="sleep")],
+            dataset_timeout_seconds=1.0,
+        )
+        result = await self._sync(manager)
+
+        summary = result["connectors"]["flaky"]
+        assert summary["status"] == "partial_success"
+        assert summary["data_counts"]["activity"] == 1
+        assert "sleep" not in summary["data_counts"]
+        assert "sleep" in summary["errors"][0]
+        assert result["status"] == "partial_success"
+
+    @pytest.mark.asyncio
+    async def test_unified_data_is_read_from_store(self):
+        """Les lectures unifiées ne rappellent pas les connecteurs."""
+        manager = self._manager(
+            [
+                _DelayedConnector("ok"),
+                _DelayedConnector("broken", failing="stress"),
+            ]
+        )
+        await self._sync(manager)
+        version = manager.store.data_version()
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=1)
+        with patch.object(
+            _DelayedConnector, "get_stress_data", side_effect=AssertionError
+        ):
+            stress = await manager.get_unified_stress_data(start_date, end_date)
+            assert [d.source for d in stress] == ["ok"]
+            sleep = await manager.get_unified_sleep_data(
+                start_date, end_date, sources=["broken"]
+            )
+            assert [d.source for d in sleep] == ["broken"]
+            metrics = await manager.compute_unified_metrics(1)
+            assert metrics["stress"]["data_points"] == 1
+
+        assert manager.store.data_version() == version
+        assert manager.store.count("stress") == 1
+
+
+class TestIncrementalSync(_SyncManagerHelpers):
+    """Tests de la synchronisation incrémentale par repères."""
+
+    @pytest.mark.asyncio
+    async def test_second_sync_only_fetches_since_watermark(self):
+        manager = self._manager([_DelayedConnector("c0")], sync_overlap_hours=2)
+        first = await self._sync(manager)
+        first_window = datetime.fromisoformat(
+            first["connectors"]["c0"]["windows"]["activity"]
+        )
+        assert datetime.now() - first_window > timedelta(days=0.9)
+
+        watermarks = manager.watermarks.get("c0")
+        assert set(watermarks) == {"activity", "sleep", "stress", "health"}
+
+        second = await self._sync(manager)
+        window = datetime.fromisoformat(second["connectors"]["c0"]["windows"]["stress"])
+        assert window == watermarks["stress"] - timedelta(hours=2)
+        assert manager.watermarks.get("c0")["stress"] > watermarks["stress"]
+
+    @pytest.mark.asyncio
+    async def test_failed_dataset_keeps_its_watermark(self):
+        connector = _DelayedConnector("c0", failing="sleep")
+        manager = self._manager([connector])
+        await self._sync(manager)
+        assert "sleep" not in manager.watermarks.get("c0")
+
+        connector.failing = None
+        result = await self._sync(manager)
+        windows = result["connectors"]["c0"]["windows"]
+        # Le sommeil reprend la fenêtre complète, les autres jeux l'incrémental
+        assert windows["sleep"] < windows["activity"]
+
+    @pytest.mark.asyncio
+    async def test_full_resync_ignores_watermarks(self):
+        manager = self._manager([_DelayedConnector("c0")])
+        first = await self._sync(manager)
+        full = await self._sync(manager, full_resync=True)
+        assert full["full_resync"] is True
+        first_start = datetime.fromisoformat(first["connectors"]["c0"]["start_date"])
+        full_window = datetime.fromisoformat(full["connectors"]["c0"]["windows"]["health"])
+        assert full_window - first_start < timedelta(seconds=5)
+
+    def test_watermarks_never_move_backwards(self):
+        store = self._manager([]).watermarks
+        later = datetime(2025, 5, 2)
+        store.advance("c0", {"stress": later})
+        store.advance("c0", {"stress": datetime(2025, 5, 1)})
+        assert store.get("c0")["stress"] == later
+        assert store.reset("c0") == 1
+        assert store.get("c0") == {}
+
+
 class TestPerformance:
     """Tests de performance."""
 
@@ -0,0 +1,118 @@
+"""
+Tests unitaires pour PredictionAccuracyTracker
+"""
+
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from prediction_engine.accuracy_tracker import PredictionAccuracyTracker
+from prediction_engine.ml_analyzer import ARIAMLAnalyzer
+
+
+class TestPredictionAccuracyTracker:
+    """Tests pour le rattrapage de précision des prédictions."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "accuracy.db"
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE pain_entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    intensity INTEGER NOT NULL
+                )
+                """)
+        self.analyzer = ARIAMLAnalyzer(str(self.db_path))
+        self.tracker = PredictionAccuracyTracker(str(self.db_path))
+
+    def teardown_method(self):
+        self.tracker.db.close()
+        self.temp_dir.cleanup()
+
+    def _execute(self, query: str, params: tuple = ()) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(query, params)
+
+    def _add_prediction(
+        self, hours_ago: float, intensity: int, risk: float | None = None
+    ) -> None:
+        predicted_at = (datetime.now() - timedelta(hours=hours_ago)).isoformat()
+        self._execute(
+            """
+            INSERT INTO pain_predictions
+            (predicted_intensity, confidence, time_horizon, predicted_at,
+             horizon_hours, risk_probability)
+            VALUES (?, 0.5, '2-4 heures', ?, 4, ?)
+            """,
+            (intensity, predicted_at, risk),
+        )
+
+    def _add_entry(self, hours_ago: float, intensity: int) -> None:
+        timestamp = (datetime.now() - timedelta(hours=hours_ago)).isoformat()
+        self._execute(
+            "INSERT INTO pain_entries (timestamp, intensity) VALUES (?, ?)",
+            (timestamp, intensity),
+        )
+
+    def test_backfill_matches_entries_in_horizon(self):
+        self._add_prediction(10, 7, risk=0.8)  # épisode 8 dans la fenêtre
+        self._add_prediction(20, 4, risk=0.2)  # aucun épisode
+        self._add_prediction(1, 5)  # fenêtre non close
+        self._add_entry(8, 8)
+        self._add_entry(12, 9)  # avant la fenêtre de la première prédiction
+
+        result = self.tracker.backfill()
+        assert result == {"evaluated": 2, "watermark": 2}
+
+        rows = self.tracker.db.execute_query(
+            "SELECT actual_outcome, accuracy, actual_intensity FROM pain_predictions "
+            "ORDER BY id"
+        )
+        assert rows[0]["actual_outcome"] == "episode"
+        assert rows[0]["actual_intensity"] == 8
+        assert rows[0]["accuracy"] == pytest.approx(0.9)
+        assert rows[1]["actual_outcome"] == "no_episode"
+        assert rows[1]["accuracy"] == pytest.approx(0.6)
+        assert rows[2]["accuracy"] is None
+
+    def test_backfill_is_incremental(self):
+        self._add_prediction(10, 5)
+        assert self.tracker.backfill()["evaluated"] == 1
+        assert self.tracker.backfill()["evaluated"] == 0
+
+        self._add_prediction(6, 5)
+        result = self.tracker.backfill(batch_size=1)
+        assert result == {"evaluated": 1, "watermark": 2}
+
+    def test_legacy_utc_timestamps(self):
+        self._execute("""
+            INSERT INTO pain_predictions (predicted_intensity, confidence, predicted_at)
+            VALUES (6, 0.5, datetime('now', '-10 hours'))
+            """)
+        self._add_entry(8, 6)
+        assert self.tracker.backfill()["evaluated"] == 1
+        row = self.tracker.db.execute_query(
+            "SELECT actual_outcome, accuracy FROM pain_predictions"
+        )[0]
+        assert row["actual_outcome"] == "episode"
+        assert row["accuracy"] == 1.0
+
+    def test_calibration_and_analytics(self):
+        self._add_prediction(10, 7, risk=0.8)
+        self._add_prediction(20, 4, risk=0.2)
+        self._add_entry(8, 8)
+        self.tracker.backfill()
+
+        calibration = self.tracker.get_calibration(bins=5)
+        assert calibration["evaluated_predictions"] == 2
+        assert calibration["mae"] == pytest.approx(2.5)
+        assert calibration["brier_score"] == pytest.approx(0.04)
+        assert [b["bin_start"] for b in calibration["reliability"]] == [0.2, 0.8]
+
+        summary = self.analyzer.get_analytics_summary()
+        assert summary["prediction_accuracy"] == pytest.approx(0.75)
@@ -0,0 +1,189 @@
+"""
+Tests unitaires pour l'import d'un export Apple Santé
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from core import DatabaseManager
+from health_connectors.apple_health_import import AppleHealthImporter
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE HealthData [
+<!ELEMENT HealthData (ExportDate,Me,(Record|Correlation)*)>
+<!ATTLIST Record type CDATA #REQUIRED>
+]>
+<HealthData locale="fr_FR">
+ <ExportDate value="2025-03-05 10:00:00 +0100"/>
+ <Me HKCharacteristicTypeIdentifierBiologicalSex="HKBiologicalSexFemale"/>
+"""
+
+
+def _record(record_type: str, start: str, end: str, value: str, unit: str = "",
+            device: str = "iPhone") -> str:
+    unit_attr = f' unit="{unit}"' if unit else ""
+    return (
+        f' <Record type="{record_type}" sourceName="{device}"{unit_attr} '
+        f'startDate="{start} +0100" endDate="{end} +0100" value="{value}">\n'
+        '  <MetadataEntry key="HKWasUserEntered" value="0"/>\n </Record>\n'
+    )
+
+
+def _export() -> str:
+    steps = "HKQuantityTypeIdentifierStepCount"
+    sleep = "HKCategoryTypeIdentifierSleepAnalysis"
+    parts = [HEADER]
+    for hour in range(8, 18):
+        start = f"2025-03-01 {hour:02d}:00:00"
+        end = f"2025-03-01 {hour:02d}:30:00"
+        parts.append(_record(steps, start, end, "500", "count", "iPhone"))
+        parts.append(_record(steps, start, end, "450", "count", "Apple Watch"))
+    parts.append(
+        _record(
+            "HKQuantityTypeIdentifierDistanceWalkingRunning",
+            "2025-03-01 08:00:00",
+            "2025-03-01 09:00:00",
+            "2.5",
+            "km",
+        )
+    )
+    for bpm in ("60", "80"):
+        parts.append(
+            _record(
+                "HKQuantityTypeIdentifierHeartRate",
+                "2025-03-01 12:00:00",
+                "2025-03-01 12:00:00",
+                bpm,
+                "count/min",
+            )
+        )
+    parts.append(
+        _record(
+            "HKQuantityTypeIdentifierBodyMass",
+            "2025-03-01 07:30:00",
+            "2025-03-01 07:30:00",
+            "154",
+            "lb",
+        )
+    )
+    parts.append(
+        ' <Correlation type="HKCorrelationTypeIdentifierBloodPressure" '
+        'startDate="2025-03-01 08:00:00 +0100" endDate="2025-03-01 08:00:00 +0100">\n'
+    )
+    parts.append(
+        _record(
+            "HKQuantityTypeIdentifierBloodPressureSystolic",
+            "2025-03-01 08:00:00",
+            "2025-03-01 08:00:00",
+            "121",
+            "mmHg",
+        )
+    )
+    parts.append(
+        _record(
+            "HKQuantityTypeIdentifierBloodPressureDiastolic",
+            "2025-03-01 08:00:00",
+            "2025-03-01 08:00:00",
+            "79",
+            "mmHg",
+        )
+    )
+    parts.append(" </Correlation>\n")
+    stages = [
+        ("HKCategoryValueSleepAnalysisInBed", "2025-03-01 22:50:00", "2025-03-02 07:10:00"),
+        ("HKCategoryValueSleepAnalysisAsleepCore", "2025-03-01 23:00:00", "2025-03-02 02:00:00"),
+        ("HKCategoryValueSleepAnalysisAsleepDeep", "2025-03-02 02:00:00", "2025-03-02 03:30:00"),
+        ("HKCategoryValueSleepAnalysisAwake", "2025-03-02 03:30:00", "2025-03-02 03:40:00"),
+        ("HKCategoryValueSleepAnalysisAsleepREM", "2025-03-02 03:40:00", "2025-03-02 07:00:00"),
+    ]
+    for value, start, end in stages:
+        parts.append(_record(sleep, start, end, value, device="Apple Watch"))
+    parts.append(_record("HKQuantityTypeIdentifierFlightsClimbed", "2025-03-01 09:00:00",
+                         "2025-03-01 09:05:00", "3", "count"))
+    parts.append("</HealthData>\n")
+    return "".join(parts)
+
+
+class TestAppleHealthImporter:
+    """Tests pour AppleHealthImporter."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "import.db")
+        self.export = Path(self.temp_dir.name) / "export.xml"
+        self.export.write_text(_export(), encoding="utf-8")
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _stored(self, importer: AppleHealthImporter, kind: str):
+        return importer.store.query(kind, datetime(2025, 2, 28), datetime(2025, 3, 3))
+
+    def test_records_are_mapped_to_unified_models(self):
+        importer = AppleHealthImporter(self.db_path)
+        summary = importer.import_file(self.export)
+        assert summary["records"] == 32
+        assert summary["written"] == {"activity": 1, "health": 1, "sleep": 1}
+
+        activity = self._stored(importer, "activity")[0]
+        # iPhone et Apple Watch comptent les mêmes pas : un seul appareil retenu
+        assert activity.steps == 5000
+        assert activity.distance_meters == 2500
+        assert activity.heart_rate_bpm == 70
+
+        health = self._stored(importer, "health")[0]
+        assert health.weight_kg == pytest.approx(69.85, abs=0.01)
+        assert (health.blood_pressure_systolic, health.blood_pressure_diastolic) == (
+            121,
+            79,
+        )
+
+        sleep = self._stored(importer, "sleep")[0]
+        assert sleep.sleep_start == datetime(2025, 3, 1, 23, 0)
+        assert sleep.sleep_end == datetime(2025, 3, 2, 7, 0)
+        assert sleep.duration_minutes == 470
+        assert (sleep.light_sleep_minutes, sleep.deep_sleep_minutes) == (180, 90)
+        assert sleep.rem_sleep_minutes == 200
+        assert sleep.awakenings_count == 1
+
+    def test_interrupted_import_resumes_from_checkpoint(self):
+        reference = AppleHealthImporter(self.db_path).import_file(self.export)
+
+        def interrupt(progress):
+            if progress["records"] == 20:
+                raise KeyboardInterrupt
+
+        importer = AppleHealthImporter(self.db_path, checkpoint_every=10)
+        with pytest.raises(KeyboardInterrupt):
+            importer.import_file(self.export, progress=interrupt)
+
+        seen = []
+        summary = importer.import_file(self.export, progress=seen.append)
+        assert summary["resumed_from"] == 20
+        assert summary["written"] == reference["written"]
+        assert seen[-1]["bytes_read"] == seen[-1]["total_bytes"]
+        assert self._stored(importer, "activity")[0].steps == 5000
+
+        # Import terminé : le point de reprise est supprimé
+        assert importer.import_file(self.export)["resumed_from"] == 0
+
+    def test_invalid_sleep_records_are_skipped(self):
+        sleep = "HKCategoryTypeIdentifierSleepAnalysis"
+        core = "HKCategoryValueSleepAnalysisAsleepCore"
+        self.export.write_text(
+            HEADER
+            + _record(sleep, "", "2025-03-02 02:00:00", core)
+            + _record(sleep, "2025-03-02 05:00:00", "2025-03-02 04:00:00", core)
+            + _record(sleep, "2025-03-01 23:00:00", "2025-03-02 06:00:00", core)
+            + "</HealthData>\n",
+            encoding="utf-8",
+        )
+        importer = AppleHealthImporter(self.db_path)
+        summary = importer.import_file(self.export)
+        assert summary["records"] == 3
+        sleep_data = self._stored(importer, "sleep")
+        assert [s.duration_minutes for s in sleep_data] == [420]
@@ -0,0 +1,132 @@
+"""
+Tests unitaires pour TriggerAssociationMiner
+"""
+
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pattern_analysis.association_miner import TriggerAssociationMiner
+
+
+def _create_pain_entries(db_path: Path) -> None:
+    """Crée une table pain_entries minimale."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE pain_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                intensity INTEGER NOT NULL,
+                physical_trigger TEXT,
+                mental_trigger TEXT,
+                activity TEXT,
+                who_present TEXT
+            )
+            """)
+
+
+def _insert(db_path: Path, rows: list[tuple]) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT INTO pain_entries
+            (timestamp, intensity, physical_trigger, mental_trigger, activity, who_present)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+class TestTriggerAssociationMiner:
+    """Tests pour la fouille d'associations de déclencheurs."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "assoc.db"
+        _create_pain_entries(self.db_path)
+        self.miner = TriggerAssociationMiner(str(self.db_path))
+
+    def teardown_method(self):
+        self.miner.db.close()
+        self.temp_dir.cleanup()
+
+    def _seed(self, count: int = 10) -> None:
+        base = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        rows = []
+        for i in range(count):
+            ts = (base - timedelta(days=i)).isoformat()
+            # 8 épisodes sur 10 : "marche" + "stress" le matin au travail
+            if i < 8:
+                rows.append((ts, 6, "Marche", "stress", "travail", "Alice, Bob"))
+            else:
+                rows.append((ts, 3, "position", None, "repos", None))
+        _insert(self.db_path, rows)
+
+    def test_empty_database(self):
+        result = self.miner.mine()
+        assert result["total_episodes"] == 0
+        assert result["rules"] == []
+
+    def test_frequent_combination_detected(self):
+        self._seed()
+        result = self.miner.mine(min_support=0.5, min_confidence=0.8)
+
+        assert result["total_episodes"] == 10
+        itemset_values = [
+            {item["value"] for item in itemset["items"]}
+            for itemset in result["itemsets"]
+        ]
+        assert {"marche", "stress"} in itemset_values
+
+        rule = next(
+            r
+            for r in result["rules"]
+            if r["antecedent"] == [{"dimension": "mental", "value": "stress"}]
+            and r["consequent"] == [{"dimension": "physical", "value": "marche"}]
+        )
+        assert rule["support"] == 0.8
+        assert rule["confidence"] == 1.0
+        assert rule["lift"] == 1.25
+
+    def test_who_present_split_into_items(self):
+        self._seed()
+        result = self.miner.mine(min_support=0.5)
+        items = {
+            (item["dimension"], item["value"])
+            for itemset in result["itemsets"]
+            for item in itemset["items"]
+        }
+        assert ("who_present", "alice") in items
+        assert ("who_present", "bob") in items
+        assert ("hour_band", "matin") in items
+
+    def test_incremental_refresh(self):
+        self._seed(4)
+        first = self.miner.refresh()
+        assert first["mode"] == "full"
+        assert first["total_episodes"] == 4
+
+        _insert(
+            self.db_path,
+            [(datetime.now().isoformat(), 5, "effort", "fatigue", "sport", None)],
+        )
+        second = self.miner.refresh()
+        assert second["mode"] == "incremental"
+        assert second["new_episodes"] == 1
+        assert second["total_episodes"] == 5
+
+    def test_deletion_triggers_full_rebuild(self):
+        self._seed(4)
+        self.miner.refresh()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM pain_entries WHERE id = 1")
+
+        result = self.miner.refresh()
+        assert result["mode"] == "full"
+        assert result["total_episodes"] == 3
+
+    def test_days_back_window(self):
+        self._seed()
+        result = self.miner.mine(min_support=0.1, days_back=3)
+        assert result["total_episodes"] <= 4
@@ -2,11 +2,17 @@
 Tests unitaires pour l'export automatique
 """
 
+import csv
+import gzip
+import json
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from core import DatabaseManager, get_scheduler
 from health_connectors.auto_export import AutoExporter
+from health_connectors.data_models import ActivityData, SleepData, StressData
 
 
 class TestAutoExporter:
@@ -15,7 +21,7 @@ class TestAutoExporter:
     @pytest.fixture
     def auto_exporter(self, tmp_path):
         """Fixture pour AutoExporter."""
-        return AutoExporter(export_dir=tmp_path)
+        return AutoExporter(export_dir=tmp_path, db_path=str(tmp_path / "aria.db"))
 
     def test_auto_exporter_initialization(self, auto_exporter):
         """Test initialisation de l'exporteur."""
@@ -27,7 +33,7 @@ class TestAutoExporter:
         success = auto_exporter.start_weekly_export()
         assert success is True
         assert auto_exporter.is_running is True
-        assert auto_exporter.weekly_thread is not None
+        assert get_scheduler().get_job("auto_export_weekly") is not None
 
         # Arrêter
         auto_exporter.stop_weekly_export()
@@ -62,3 +68,81 @@ class TestAutoExporter:
             result = auto_exporter.export_weekly_data(format="json")
             # Peut être None si erreur, ou Path si succès
             assert result is None or result.exists() or True  # Accepte les deux cas
+
+    def test_exports_stream_from_store(self, tmp_path, monkeypatch):
+        """Test exports JSON/CSV/PDF compressés construits depuis le stockage."""
+        exporter = AutoExporter(
+            export_dir=tmp_path / "exports",
+            db_path=str(tmp_path / "store.db"),
+            compress=True,
+            batch_size=5,
+        )
+        now = datetime.now().replace(microsecond=0)
+        exporter.store.upsert(
+            "activity",
+            [
+                ActivityData(
+                    timestamp=now - timedelta(days=day),
+                    steps=1000 * (day + 1),
+                    heart_rate_bpm=60 + day,
+                    source="google_fit",
+                )
+                for day in range(10)
+            ],
+        )
+        exporter.store.upsert(
+            "stress",
+            [
+                StressData(
+                    timestamp=now - timedelta(minutes=minute), stress_level=40,
+                    source="samsung_health",
+                )
+                for minute in range(12)
+            ],
+        )
+        exporter.store.upsert(
+            "sleep",
+            [
+                SleepData(
+                    sleep_start=now - timedelta(hours=8), sleep_end=now,
+                    duration_minutes=480, quality_score=0.8, source="ios_health",
+                )
+            ],
+        )
+
+        # Les résumés quotidiens viennent du niveau d'agrégats « day »
+        monkeypatch.setattr(exporter.store, "daily_rollups", None)
+
+        path = exporter.export_weekly_data(format="json")
+        assert path.name.endswith(".json.gz")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        # Fenêtre de 7 jours : 8 jours d'activité au plus
+        assert 7 <= len(data["activity"]) <= 8
+        assert len(data["stress"]) == 12
+        assert data["sleep"][0]["duration_minutes"] == 480
+        assert sum(day["count"] for day in data["daily"]["stress"]) == 12
+        assert sum(
+            day["stress_level"]["sum"] for day in data["daily"]["stress"]
+        ) == 480
+
+        path = exporter.export_monthly_data(format="csv")
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == [
+            "timestamp", "steps", "heart_rate", "calories", "distance", "source"
+        ]
+        assert sum(1 for row in rows if row and row[-1] == "google_fit") == 10
+        summary = rows[rows.index(["--- RÉSUMÉ QUOTIDIEN ---"]) + 1 :]
+        assert summary[0] == [
+            "date", "type", "field", "count", "sum", "mean", "min", "max"
+        ]
+
+        path = exporter.export_monthly_data(format="pdf")
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            report = f.read()
+        assert "Total pas: 55,000" in report
+        assert "Durée moyenne: 8.0 heures" in report
+        assert not list((tmp_path / "exports").glob(".*.part"))
+        DatabaseManager(str(tmp_path / "store.db")).close()
+
@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from core import get_scheduler
 from health_connectors.report_generator import HealthReportGenerator
 
 
@@ -27,7 +28,7 @@ class TestHealthReportGenerator:
         success = report_generator.start_weekly_reports()
         assert success is True
         assert report_generator.is_running is True
-        assert report_generator.report_thread is not None
+        assert get_scheduler().get_job("weekly_report") is not None
 
         # Arrêter
         report_generator.stop_weekly_reports()
@@ -0,0 +1,112 @@
+"""
+Tests unitaires pour le backtest des prédicteurs
+"""
+
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core import DatabaseManager
+from prediction_engine import backtest
+from prediction_engine.backtest import (
+    generate_synthetic_history,
+    load_history,
+    main,
+    rolling_origin_splits,
+    run_backtest,
+)
+from tests.unit.test_risk_model import _seed_pain_entries
+
+
+def _median_predictor(X_train: np.ndarray, y_train: np.ndarray):
+    """Prédicteur enregistré hors de ``backtest`` (extension)."""
+    median = float(np.median(y_train))
+
+    def predict(X: np.ndarray):
+        return np.full(len(X), median), np.zeros(len(X))
+
+    return predict
+
+
+class TestBacktest:
+    """Tests pour la validation croisée à origine glissante."""
+
+    def test_rolling_origin_splits_expand_training_window(self):
+        epochs = np.arange(100, dtype=float)
+        splits = rolling_origin_splits(epochs, n_folds=4)
+        assert len(splits) == 4
+        assert splits[0][0] == 50
+        assert splits[-1][1] == 100
+        for (_, test_end), (next_train, _) in zip(splits, splits[1:], strict=False):
+            assert next_train == test_end
+
+        with pytest.raises(ValueError):
+            rolling_origin_splits(epochs, n_folds=0)
+
+    def test_backtest_ranks_trained_model_first(self):
+        epochs, X, y = generate_synthetic_history(days=200, seed=1)
+        report = run_backtest(epochs, X, y, n_folds=3, max_workers=1)
+
+        assert report["n_folds"] == 3
+        results = report["predictors"]
+        assert set(results) == {"heuristic", "risk_model", "baseline_mean"}
+        assert results["risk_model"]["mean_mae"] < results["baseline_mean"]["mean_mae"]
+        assert results["risk_model"]["mean_brier"] < results["heuristic"]["mean_brier"]
+
+        fold = results["risk_model"]["folds"][0]
+        assert fold["n_test"] > 0
+        assert fold["runtime_seconds"] >= 0
+        assert sum(b["count"] for b in fold["calibration"]) == fold["n_test"]
+
+    def test_process_pool_matches_sequential(self):
+        epochs, X, y = generate_synthetic_history(days=60, seed=2)
+        sequential = run_backtest(epochs, X, y, ["risk_model"], 2, max_workers=1)
+        parallel = run_backtest(epochs, X, y, ["risk_model"], 2, max_workers=2)
+        for a, b in zip(
+            sequential["predictors"]["risk_model"]["folds"],
+            parallel["predictors"]["risk_model"]["folds"],
+            strict=True,
+        ):
+            assert a["mae"] == b["mae"]
+            assert a["brier"] == b["brier"]
+
+    def test_external_predictor_with_spawn_pool(self, monkeypatch):
+        monkeypatch.setitem(backtest.PREDICTORS, "median", _median_predictor)
+        spawn = multiprocessing.get_context("spawn")
+        pool = partial(ProcessPoolExecutor, mp_context=spawn)
+        monkeypatch.setattr(backtest, "ProcessPoolExecutor", pool)
+        epochs, X, y = generate_synthetic_history(days=60, seed=3)
+        report = run_backtest(epochs, X, y, ["median"], 2, max_workers=2)
+        assert len(report["predictors"]["median"]["folds"]) == 2
+
+    def test_unknown_predictor(self):
+        epochs, X, y = generate_synthetic_history(days=30)
+        with pytest.raises(ValueError):
+            run_backtest(epochs, X, y, ["oracle"], max_workers=1)
+
+    def test_history_features_are_cached(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            db_path = root / "backtest.db"
+            _seed_pain_entries(db_path, count=20)
+            try:
+                epochs, X, y = load_history(
+                    str(db_path), str(root / "dacc"), str(root / "cache")
+                )
+                assert len(y) == 20
+                assert np.all(np.diff(epochs) >= 0)
+                assert len(list((root / "cache").glob("*.npz"))) == 1
+
+                cached = load_history(str(db_path), str(root / "dacc"), str(root / "cache"))
+                np.testing.assert_array_equal(cached[1], X)
+            finally:
+                DatabaseManager(str(db_path)).close()
+
+    def test_cli_synthetic(self, capsys):
+        assert main(["--synthetic-days", "60", "--folds", "2", "--workers", "1"]) == 0
+        assert "risk_model" in capsys.readouterr().out
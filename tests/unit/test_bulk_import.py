@@ -0,0 +1,179 @@
+"""
+Tests unitaires pour l'import en masse des exports Google Takeout et Samsung Health
+"""
+
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from core import DatabaseManager
+from health_connectors.bulk_import import (
+    BulkHealthImporter,
+    detect_format,
+    discover_files,
+    main,
+)
+
+
+def _write_takeout(root: Path) -> None:
+    fit = root / "Takeout" / "Fit"
+    daily = fit / "Daily activity metrics"
+    daily.mkdir(parents=True)
+    (daily / "2025-03-01.csv").write_text(
+        "Start time,End time,Move Minutes count,Calories (kcal),Distance (m),"
+        "Average heart rate (bpm),Step count\n"
+        "08:00:00.000+01:00,08:15:00.000+01:00,10,50.5,800,90,1200\n"
+        "08:15:00.000+01:00,08:30:00.000+01:00,5,20,300,70,800\n",
+        encoding="utf-8",
+    )
+    # Récapitulatif : mêmes pas que le fichier quotidien, à ne pas additionner
+    (daily / "Daily activity metrics.csv").write_text(
+        "Date,Move Minutes count,Calories (kcal),Distance (m),Step count\n"
+        "2025-03-01,15,70.5,1100,2000\n"
+        "2025-03-02,30,100,2500,4000\n",
+        encoding="utf-8",
+    )
+
+    all_data = fit / "All Data"
+    all_data.mkdir()
+    minute = 60 * 10**9
+    start = int(datetime(2025, 3, 3, 9, 0).timestamp()) * 10**9
+    points = [
+        {
+            "dataTypeName": "com.google.step_count.delta",
+            "startTimeNanos": start + i * minute,
+            "endTimeNanos": start + (i + 1) * minute,
+            "fitValue": [{"value": {"intVal": 100}}],
+        }
+        for i in range(30)
+    ]
+    (all_data / "derived_com.google.step_count.delta.json").write_text(
+        json.dumps({"Data Source": "derived", "Data Points": points}),
+        encoding="utf-8",
+    )
+
+    sessions = fit / "All Sessions"
+    sessions.mkdir()
+    (sessions / "2025-03-01T23_00_00Z_SLEEP.json").write_text(
+        json.dumps(
+            {
+                "fitnessActivity": "sleep",
+                "startTime": "2025-03-01T22:00:00.000Z",
+                "endTime": "2025-03-02T05:30:00.000Z",
+            }
+        ),
+        encoding="utf-8",
+    )
+    (sessions / "2025-03-02T10_00_00Z_WALKING.json").write_text(
+        json.dumps({"fitnessActivity": "walking"}), encoding="utf-8"
+    )
+
+
+def _write_samsung(root: Path) -> None:
+    export = root / "samsunghealth_user_20250305"
+    export.mkdir()
+    day_ms = int(datetime(2025, 3, 4, tzinfo=timezone.utc).timestamp() * 1000)
+    (export / "com.samsung.shealth.tracker.pedometer_day_summary.20250305.csv").write_text(
+        "com.samsung.shealth.tracker.pedometer_day_summary,6315005,3\n"
+        "step_count,distance,calorie,active_time,day_time,deviceuuid,\n"
+        f"6000,4500.0,250.0,3600000,{day_ms},phone,\n"
+        f"5800,4400.0,240.0,3000000,{day_ms},watch,\n",
+        encoding="utf-8",
+    )
+    (export / "com.samsung.health.sleep.20250305.csv").write_text(
+        "com.samsung.health.sleep,6315005,3\n"
+        "com.samsung.health.sleep.start_time,com.samsung.health.sleep.end_time,"
+        "efficiency,com.samsung.health.sleep.time_offset,\n"
+        "2025-03-01 22:30:00.000,2025-03-02 06:00:00.000,88.0,UTC+0100,\n",
+        encoding="utf-8",
+    )
+    (export / "com.samsung.shealth.stress.20250305.csv").write_text(
+        "com.samsung.shealth.stress,6315005,3\n"
+        "start_time,score,time_offset,\n"
+        "2025-03-01 08:00:00.000,42,UTC+0100,\n"
+        "2025-03-01 08:00:00.000,42,UTC+0100,\n"
+        "2025-03-01 12:00:00.000,55,UTC+0100,\n",
+        encoding="utf-8",
+    )
+    (export / "com.samsung.health.weight.20250305.csv").write_text(
+        "com.samsung.health.weight,6315005,3\n"
+        "start_time,weight,height,time_offset,\n"
+        "2025-03-01 06:00:00.000,70.2,172,UTC+0100,\n",
+        encoding="utf-8",
+    )
+    (export / "com.samsung.health.unknown.20250305.csv").write_text("x\n")
+
+
+class TestBulkHealthImporter:
+    """Tests pour BulkHealthImporter."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.db_path = str(self.root / "import.db")
+        _write_takeout(self.root)
+        _write_samsung(self.root)
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _query(self, importer: BulkHealthImporter, kind: str, sources: list[str] | None):
+        return importer.store.query(
+            kind, datetime(2025, 2, 28), datetime(2025, 3, 5), sources=sources
+        )
+
+    def test_discovers_supported_files(self):
+        formats = sorted(file_format for _, file_format in discover_files(self.root))
+        assert formats == [
+            "google_daily_csv",
+            "google_daily_csv",
+            "google_data_points",
+            "google_session",
+            "google_session",
+            "samsung_pedometer",
+            "samsung_sleep",
+            "samsung_stress",
+            "samsung_weight",
+        ]
+        assert detect_format(Path("notes.txt")) is None
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_import_normalizes_and_deduplicates(self, workers):
+        importer = BulkHealthImporter(self.db_path, max_workers=workers)
+        seen = []
+        summary = importer.import_directory(self.root, progress=seen.append)
+        assert summary["files"] == 9
+        assert summary["errors"] == []
+        assert seen[-1]["files_done"] == seen[-1]["files_total"] == 9
+
+        activity = {
+            a.timestamp.day: a for a in self._query(importer, "activity", None)
+        }
+        # Récapitulatif et fichier quotidien Google : le jour n'est compté qu'une fois
+        assert (activity[1].source, activity[1].steps) == ("google_fit", 2000)
+        assert activity[1].heart_rate_bpm == 80
+        assert activity[2].steps == 4000
+        assert activity[3].steps == 3000
+        # Une ligne par appareil Samsung : le plus grand total est retenu
+        assert (activity[4].source, activity[4].steps) == ("samsung_health", 6000)
+        assert activity[4].active_minutes == 60
+
+        stress = self._query(importer, "stress", ["samsung_health"])
+        assert [s.timestamp.hour for s in stress] == [9, 13]
+
+        sleep = self._query(importer, "sleep", ["samsung_health"])[0]
+        assert sleep.sleep_start == datetime(2025, 3, 1, 23, 30)
+        assert sleep.quality_score == 0.88
+
+        weight = self._query(importer, "health", ["samsung_health"])[0]
+        assert (weight.weight_kg, weight.height_cm) == (70.2, 172)
+
+    def test_cli_reports_summary(self, capsys):
+        assert main([str(self.root), "--db", self.db_path, "--workers", "1"]) == 0
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["records"] > 0
+        assert main([str(self.root / "missing"), "--db", self.db_path]) == 1
@@ -0,0 +1,124 @@
+"""
+Tests unitaires pour la représentation en colonnes des données santé
+"""
+
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from core import DatabaseManager
+from health_connectors.columnar import HealthSamples
+from health_connectors.data_models import SleepData, StressData
+from health_connectors.health_store import HealthDataStore
+
+
+def _stress_series(count: int, seed: int = 0) -> list[StressData]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [
+        StressData(
+            timestamp=start + timedelta(minutes=i),
+            stress_level=round(rng.uniform(10, 90), 1),
+            heart_rate_variability=None if i % 3 == 0 else round(rng.uniform(20, 60), 1),
+            resting_heart_rate=rng.randint(55, 75),
+            source=rng.choice(["samsung_health", "google_fit"]),
+            raw_data={"device": "watch", "confidence": 0.9},
+        )
+        for i in range(count)
+    ]
+
+
+class TestHealthSamples:
+    """Tests pour HealthSamples."""
+
+    def test_round_trip_preserves_values(self):
+        records = _stress_series(20)
+        samples = HealthSamples.from_models("stress", records)
+        assert len(samples) == 20
+        for original, restored in zip(records, samples.to_models(), strict=True):
+            assert restored.timestamp == original.timestamp
+            assert restored.stress_level == original.stress_level
+            assert restored.heart_rate_variability == original.heart_rate_variability
+            assert restored.resting_heart_rate == original.resting_heart_rate
+            assert isinstance(restored.resting_heart_rate, int)
+            assert restored.source == original.source
+
+    def test_sleep_keeps_end_time(self):
+        start = datetime(2025, 1, 1, 23, 30)
+        sleep = SleepData(
+            sleep_start=start,
+            sleep_end=start + timedelta(hours=8),
+            duration_minutes=480,
+            source="ios_health",
+        )
+        restored = HealthSamples.from_models("sleep", [sleep]).to_models()[0]
+        assert restored.sleep_end == sleep.sleep_end
+        assert restored.quality_score is None
+
+    def test_aggregates_match_python_reference(self):
+        records = _stress_series(500, seed=3)
+        samples = HealthSamples.from_models("stress", records)
+
+        hrv = [r.heart_rate_variability for r in records if r.heart_rate_variability]
+        assert samples.mean("heart_rate_variability", 1) == round(sum(hrv) / len(hrv), 1)
+        assert samples.total("stress_level") == pytest.approx(
+            sum(r.stress_level for r in records)
+        )
+
+        ordered = sorted(records, key=lambda r: r.timestamp)
+        mid = len(ordered) // 2
+        first = sum(r.stress_level for r in ordered[:mid]) / mid
+        second = sum(r.stress_level for r in ordered[mid:]) / (len(ordered) - mid)
+        expected = (
+            "increasing"
+            if second > first * 1.05
+            else "decreasing"
+            if second < first * 0.95
+            else "stable"
+        )
+        assert samples.trend("stress_level") == expected
+        assert samples.take(slice(0, 5)).trend("stress_level") is None
+
+    def test_filter_by_time_and_source(self):
+        samples = HealthSamples.from_models("stress", _stress_series(60))
+        start = datetime(2025, 1, 1, 0, 10)
+        end = datetime(2025, 1, 1, 0, 19)
+        window = samples.filter(start, end)
+        assert len(window) == 10
+
+        google = samples.filter(sources=["google_fit"])
+        assert google.sources == ["google_fit"]
+        assert len(google) + len(samples.filter(sources=["samsung_health"])) == 60
+
+    def test_memory_per_sample_is_compact(self):
+        records = _stress_series(1000)
+        samples = HealthSamples.from_models("stress", records)
+        model_bytes = sum(
+            sys.getsizeof(r) + sys.getsizeof(r.__dict__) + sys.getsizeof(r.raw_data)
+            for r in records
+        )
+        assert samples.nbytes / len(samples) < 40
+        assert samples.nbytes * 10 < model_bytes
+
+    def test_store_samples_match_models(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = str(Path(temp_dir) / "store.db")
+            try:
+                store = HealthDataStore(db_path)
+                records = _stress_series(50)
+                store.upsert("stress", records)
+                start, end = datetime(2025, 1, 1), datetime(2025, 1, 2)
+
+                samples = store.query_samples("stress", start, end)
+                models = store.query("stress", start, end)
+                assert len(samples) == len(models) == 50
+                assert samples.mean("stress_level") == pytest.approx(
+                    sum(m.stress_level for m in models) / 50
+                )
+                assert store.query_samples("stress", start, end) is samples
+            finally:
+                DatabaseManager(db_path).close()
@@ -0,0 +1,99 @@
+"""
+Tests unitaires pour EmotionHistory
+"""
+
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core import DatabaseManager
+from pattern_analysis.emotion_analyzer import ARIAREmotionAnalyzer
+from pattern_analysis.emotion_history import EmotionHistory
+
+EMOTIONS = ["neutral", "stressed", "relaxed"]
+
+
+class TestEmotionHistory:
+    """Tests pour l'historique émotionnel borné."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "emotions.db")
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_capacity_is_bounded(self):
+        history = EmotionHistory(EMOTIONS, capacity=3)
+        base = datetime.now()
+        for i, emotion in enumerate(["neutral", "stressed", "relaxed", "stressed"]):
+            history.append(emotion, 0.5, timestamp=base + timedelta(seconds=i))
+
+        assert len(history) == 3
+        entries = history.tail(0)
+        # La plus ancienne transition a été écrasée
+        assert [e["emotion"] for e in entries] == ["stressed", "relaxed", "stressed"]
+
+    def test_unknown_emotion_rejected(self):
+        history = EmotionHistory(EMOTIONS, capacity=5)
+        assert history.append("unknown", 0.5) is False
+        assert len(history) == 0
+
+    def test_window_after_wraparound(self):
+        history = EmotionHistory(EMOTIONS, capacity=4)
+        base = datetime.now() - timedelta(days=10)
+        for day in range(10):
+            history.append("stressed", 0.5, timestamp=base + timedelta(days=day))
+
+        window = history.window(base + timedelta(days=7))
+        assert len(window) == 3
+        assert history.emotion_counts(window) == {"stressed": 3}
+
+    def test_persistence_with_batched_flush(self):
+        history = EmotionHistory(
+            EMOTIONS, capacity=10, db_path=self.db_path, flush_batch_size=2
+        )
+        history.append("stressed", 0.8)
+        assert DatabaseManager(self.db_path).get_count("emotion_history") == 0
+        history.append("relaxed", 0.3, previous="stressed")
+        assert DatabaseManager(self.db_path).get_count("emotion_history") == 2
+        history.append("neutral", 0.5)
+        assert history.flush() == 1
+
+        reloaded = EmotionHistory(EMOTIONS, capacity=2, db_path=self.db_path)
+        entries = reloaded.tail(0)
+        assert [e["emotion"] for e in entries] == ["relaxed", "neutral"]
+        assert entries[0]["previous"] == "stressed"
+
+    def test_shutdown_flushes_pending_transitions(self, monkeypatch):
+        from core.config import config
+        from pattern_analysis import api
+
+        monkeypatch.setattr(api, "_emotion_analyzer", None)
+        monkeypatch.setitem(config._config, "db_path", self.db_path)
+        analyzer = api.get_emotion_analyzer()
+        analyzer.set_emotion("stressed", 0.8)
+        analyzer.set_emotion("relaxed", 0.3)
+        assert DatabaseManager(self.db_path).get_count("emotion_history") == 0
+
+        api.close_emotion_analyzer()
+        assert DatabaseManager(self.db_path).get_count("emotion_history") == 2
+        reloaded = ARIAREmotionAnalyzer(db_path=self.db_path)
+        assert [e["emotion"] for e in reloaded.get_emotion_history()] == [
+            "stressed",
+            "relaxed",
+        ]
+
+    def test_analyzer_patterns_use_window(self):
+        analyzer = ARIAREmotionAnalyzer(history_capacity=50)
+        old = (datetime.now() - timedelta(days=30)).isoformat()
+        analyzer.emotion_history = [
+            {"emotion": "relaxed", "intensity": 0.4, "timestamp": old}
+        ]
+        analyzer.set_emotion("stressed", 0.9)
+
+        patterns = analyzer.get_emotion_patterns(days=7)
+        assert patterns["total_entries"] == 1
+        assert patterns["dominant_emotion"] == "stressed"
+        assert analyzer.get_emotion_stats()["total_transitions"] == 2
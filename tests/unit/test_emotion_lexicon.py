@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour EmotionLexicon
+"""
+
+from pattern_analysis.emotion_analyzer import ARIAREmotionAnalyzer
+from pattern_analysis.emotion_lexicon import EmotionLexicon, normalize_text
+
+
+class TestEmotionLexicon:
+    """Tests pour le lexique émotionnel compilé."""
+
+    def setup_method(self):
+        self.lexicon = EmotionLexicon()
+
+    def test_normalize_text_strips_accents(self):
+        assert normalize_text("Anxiété ÉPUISÉ") == "anxiete epuise"
+
+    def test_accent_and_case_insensitive_match(self):
+        scores = self.lexicon.score({"mental_trigger": "ANXIETE au travail"})
+        assert scores["anxious"] == 0.9
+
+    def test_all_matches_combined_by_max(self):
+        scores = self.lexicon.score(
+            {
+                "physical_trigger": "marche puis effort",
+                "mental_trigger": "stress",
+                "activity": "travail",
+            }
+        )
+        # "effort" (0.8) l'emporte sur "marche" (0.6), "stress" sur "travail"
+        assert scores["fatigued"] == 0.8
+        assert scores["stressed"] == 0.9
+        assert scores["focused"] == 0.6
+
+    def test_english_synonyms(self):
+        scores = self.lexicon.score({"physical_trigger": "long walking session"})
+        assert scores == {"fatigued": 0.6, "stressed": 0.4}
+
+    def test_word_start_anchor(self):
+        # "remarche" ne doit pas déclencher "marche"
+        assert self.lexicon.score({"physical_trigger": "remarche"}) == {}
+
+    def test_custom_lexicon(self):
+        lexicon = EmotionLexicon(
+            {"notes": [{"terms": ["migraine"], "emotions": {"overwhelmed": 0.7}}]}
+        )
+        assert lexicon.fields == ["notes"]
+        assert lexicon.score({"notes": "Migraine le soir"}) == {"overwhelmed": 0.7}
+
+    def test_batch_classification_does_not_change_state(self):
+        analyzer = ARIAREmotionAnalyzer()
+        entries = [
+            {"id": i, "intensity": 9, "mental_trigger": "fatigue"} for i in range(500)
+        ] + [{"id": 500, "intensity": 9}]
+        results = analyzer.classify_entries(entries)
+
+        assert len(results) == 501
+        assert results[0]["detected_emotion"] == "fatigued"
+        assert results[-1]["detected_emotion"] == "overwhelmed"
+        assert analyzer.current_emotion == "neutral"
+        assert len(analyzer.history) == 0
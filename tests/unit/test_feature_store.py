@@ -0,0 +1,150 @@
+"""
+Tests unitaires pour le feature store horaire
+"""
+
+import json
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from core import DatabaseManager
+from prediction_engine.feature_store import MAX_REFRESH_DAYS, HourlyFeatureStore
+
+
+def _create_pain_entries(db_path: Path, entries: list[tuple[datetime, int]]) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pain_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                intensity INTEGER NOT NULL
+            )
+            """)
+        conn.executemany(
+            "INSERT INTO pain_entries (timestamp, intensity) VALUES (?, ?)",
+            [(moment.isoformat(), intensity) for moment, intensity in entries],
+        )
+
+
+class TestHourlyFeatureStore:
+    """Tests pour la matérialisation des features horaires."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.db_path = self.root / "features.db"
+        self.health_dir = self.root / "dacc" / "samsung_health_data"
+        self.health_dir.mkdir(parents=True)
+        self.now = datetime(2026, 3, 10, 15, 30)
+
+    def teardown_method(self):
+        DatabaseManager(str(self.db_path)).close()
+        self.temp_dir.cleanup()
+
+    def _write_health(self, kind: str, day: datetime, data: dict) -> None:
+        path = self.health_dir / f"{kind}_{day.date().isoformat()}.json"
+        path.write_text(json.dumps(data))
+
+    def _store(self) -> HourlyFeatureStore:
+        return HourlyFeatureStore(str(self.db_path), str(self.root / "dacc"))
+
+    def test_empty_store_defaults_to_neutral_context(self):
+        store = self._store()
+        store.refresh(until=self.now)
+        context = store.get_context(self.now)
+        assert context["stress_level"] == 0.5
+        assert context["fatigue_level"] == 0.5
+        assert context["activity_intensity"] == 0.5
+        assert context["pain_count_24h"] == 0
+        assert context["feature_hour"] == "2026-03-10T15:00:00"
+        # Mardi 15h -> 1 * 24 + 15
+        assert context["hour_of_week"] == 39
+
+    def test_rolling_pain_and_health_features(self):
+        _create_pain_entries(
+            self.db_path,
+            [
+                (self.now - timedelta(hours=2), 6),
+                (self.now - timedelta(hours=5), 4),
+                (self.now - timedelta(days=3), 2),
+            ],
+        )
+        self._write_health(
+            "sleep",
+            self.now,
+            {
+                "sleep_end": self.now.replace(hour=7).isoformat(),
+                "duration_minutes": 420,
+                "quality_score": 0.8,
+            },
+        )
+        self._write_health(
+            "activity",
+            self.now,
+            {"timestamp": self.now.replace(hour=9).isoformat(), "steps": 7500},
+        )
+        self._write_health(
+            "stress",
+            self.now,
+            {"timestamp": self.now.replace(hour=12).isoformat(), "stress_level": 70},
+        )
+
+        store = self._store()
+        store.refresh(until=self.now)
+        features = store.get_features(self.now)
+        assert features is not None
+        assert features["pain_count_24h"] == 2
+        assert features["pain_mean_24h"] == 5.0
+        assert features["pain_max_24h"] == 6
+        assert features["pain_mean_7d"] == 4.0
+        assert features["last_sleep_hours"] == 7.0
+
+        context = store.get_context(self.now)
+        assert context["fatigue_level"] == pytest.approx(0.2)
+        assert context["activity_intensity"] == pytest.approx(0.5)
+        assert context["stress_level"] == pytest.approx(0.7)
+
+    def test_incremental_refresh_continues_stress_ewma(self):
+        day1 = self.now - timedelta(days=1)
+        self._write_health(
+            "stress", day1, {"timestamp": day1.isoformat(), "stress_level": 20}
+        )
+        store = self._store()
+        first = store.refresh(until=self.now)
+        assert first["hours_refreshed"] == 30 * 24 + 1
+
+        self._write_health(
+            "stress", self.now, {"timestamp": self.now.isoformat(), "stress_level": 80}
+        )
+        later = self.now + timedelta(hours=2)
+        second = store.refresh(until=later)
+        # Seules l'heure partielle précédente et les nouvelles heures sont recalculées
+        assert second["hours_refreshed"] == 3
+
+        ewma = store.get_context(later)["stress_level"]
+        # 24h entre les mesures (demi-vie 12h) -> 3/4 du chemin vers 0.8
+        assert ewma == pytest.approx(0.2 + 0.75 * 0.6, abs=1e-3)
+
+    def test_backdated_entry_refreshes_affected_hours(self):
+        _create_pain_entries(self.db_path, [])
+        store = self._store()
+        store.refresh(until=self.now)
+
+        backdated = self.now - timedelta(hours=6)
+        _create_pain_entries(self.db_path, [(backdated, 8)])
+        summary = store.refresh(since=backdated, until=self.now)
+        assert summary["hours_refreshed"] == 7
+        assert store.get_features(backdated)["pain_count_24h"] == 1
+        assert store.get_context(self.now)["pain_mean_24h"] == 8.0
+
+    def test_backdated_refresh_is_bounded(self):
+        _create_pain_entries(self.db_path, [])
+        store = self._store()
+        store.refresh(until=self.now)
+
+        summary = store.refresh(since=datetime(2016, 1, 1), until=self.now)
+        # Une entrée datée de dix ans ne recalcule que la dernière année
+        assert summary["hours_refreshed"] == MAX_REFRESH_DAYS * 24 + 1
@@ -0,0 +1,95 @@
+"""
+Tests unitaires pour le détecteur de poussées en ligne
+"""
+
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from core import DatabaseManager
+from core.alerts import ARIA_AlertsSystem
+from prediction_engine.flare_detector import FlareDetector
+
+
+class TestFlareDetector:
+    """Tests pour la détection EWMA/CUSUM."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "flares.db")
+        self.start = datetime(2026, 2, 1, 8, 0)
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def _detector(self) -> FlareDetector:
+        return FlareDetector(self.db_path, ARIA_AlertsSystem(self.db_path))
+
+    def _feed(self, detector, intensities, start, gap_hours=12.0):
+        events = []
+        for i, intensity in enumerate(intensities):
+            moment = start + timedelta(hours=gap_hours * i)
+            events.extend(detector.observe_pain_entry(moment.isoformat(), intensity))
+        return events
+
+    def _flare_alerts(self, detector):
+        return detector.db.execute_query(
+            "SELECT * FROM alerts WHERE alert_type = 'flare_detected'"
+        )
+
+    def test_stable_history_raises_no_alert(self):
+        detector = self._detector()
+        events = self._feed(detector, [3, 4, 3, 4, 3, 4, 3, 4, 3, 4], self.start)
+        assert events == []
+        assert detector.get_status()["active_flares"] == []
+        assert self._flare_alerts(detector) == []
+
+    def test_intensity_flare_creates_alert_once(self):
+        detector = self._detector()
+        self._feed(detector, [3, 4, 3, 4, 3, 4, 3, 4], self.start)
+        flare_start = self.start + timedelta(days=4)
+        events = self._feed(detector, [8, 8, 9, 9], flare_start)
+
+        started = [e for e in events if e["stream"] == "intensity"]
+        assert [e["event"] for e in started] == ["started"]
+        assert detector.states["intensity"].in_flare is True
+        alerts = self._flare_alerts(detector)
+        assert len(alerts) == 1
+        assert alerts[0]["severity"] == "warning"
+
+        # La ligne de base n'absorbe pas la poussée
+        assert detector.states["intensity"].mean < 4.5
+
+    def test_frequency_flare(self):
+        detector = self._detector()
+        self._feed(detector, [4] * 8, self.start, gap_hours=24)
+        events = self._feed(
+            detector, [4] * 6, self.start + timedelta(days=8), gap_hours=0.5
+        )
+        assert any(
+            e["stream"] == "frequency" and e["event"] == "started" for e in events
+        )
+
+    def test_state_survives_restart_and_ignores_old_entries(self):
+        detector = self._detector()
+        self._feed(detector, [3, 4, 3, 4, 3, 4], self.start)
+        state = detector.states["intensity"]
+
+        reloaded = self._detector()
+        assert reloaded.states["intensity"] == state
+        # Une saisie a posteriori n'est pas rejouée
+        assert reloaded.observe_pain_entry(self.start.isoformat(), 10) == []
+        assert reloaded.states["intensity"].count == state.count
+
+    def test_stress_readings_are_deduplicated(self):
+        detector = self._detector()
+        readings = [(self.start + timedelta(hours=i), 30.0 + i % 2) for i in range(10)]
+        detector.observe_stress(readings)
+        detector.observe_stress(readings)
+        assert detector.states["stress"].count == 10
+
+        spike = [(self.start + timedelta(hours=10 + i), 90.0) for i in range(3)]
+        events = detector.observe_stress(spike)
+        assert [e["event"] for e in events] == ["started"]
+        assert detector.last_observation("stress") == spike[-1][0]
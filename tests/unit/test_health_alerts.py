@@ -131,43 +131,31 @@ class TestHealthAlerts:
             assert mock_instance.create_alert.called
 
     def test_create_health_alerts_no_duplicates(self, sync_manager):
-        """Test qu'aucune alerte dupliquée n'est créée."""
+        """Test que le dédoublonnage est délégué à la clé des alertes."""
         metrics = {
             "sleep": {"avg_duration_hours": 5.0},
             "stress": {"avg_stress_level": 75.0},
             "activity": {"avg_heart_rate": 70.0},
         }
 
-        import json
-
-        existing_alert = {
-            "id": 1,
-            "data": json.dumps(
-                {
-                    "alert_key": "sleep_insufficient_5",
-                    "sleep_duration_hours": 5.0,
-                }
-            ),
-        }
-
         with patch("core.alerts.ARIA_AlertsSystem") as mock_alerts:
             mock_instance = MagicMock()
-            mock_instance.get_alerts.return_value = {"alerts": [existing_alert]}
+            # Alerte sommeil déjà émise : create_alert renvoie 0
+            mock_instance.create_alert.side_effect = lambda *args, **kwargs: (
+                0 if kwargs["dedup_key"] == "sleep_insufficient_5" else 1
+            )
             mock_alerts.return_value = mock_instance
 
             sync_manager._create_health_alerts(metrics)
 
-            # Vérifier qu'aucune nouvelle alerte sommeil n'a été créée (doublon)
-            calls = mock_instance.create_alert.call_args_list
-            sleep_alert_found = False
-            for call in calls:
-                args = call[0] if call[0] else []
-                kwargs = call[1] if len(call) > 1 else {}
-                data = args[4] if len(args) > 4 else kwargs.get("data", {})
-                if (
-                    isinstance(data, dict)
-                    and data.get("alert_key") == "sleep_insufficient_5"
-                ):
-                    sleep_alert_found = True
-                    break
-            assert not sleep_alert_found, "Une alerte sommeil dupliquée a été créée"
+            keys = [
+                call.kwargs["dedup_key"]
+                for call in mock_instance.create_alert.call_args_list
+            ]
+            assert keys == ["sleep_insufficient_5", "stress_high_75"]
+            cooldowns = {
+                call.kwargs["cooldown_hours"]
+                for call in mock_instance.create_alert.call_args_list
+            }
+            assert cooldowns == {sync_manager.config.health_alert_cooldown_hours}
+            mock_instance.get_alerts.assert_not_called()
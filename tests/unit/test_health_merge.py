@@ -0,0 +1,126 @@
+"""
+Tests unitaires pour la fusion des enregistrements santé multi-sources
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from health_connectors.data_models import ActivityData, SleepData
+from health_connectors.merge import merge_records, source_ranks
+
+PRIORITY = ("ios_health", "samsung_health", "google_fit")
+
+
+def _sleep(start: datetime, hours: float, source: str, quality: float | None = None):
+    return SleepData(
+        sleep_start=start,
+        sleep_end=start + timedelta(hours=hours),
+        duration_minutes=int(hours * 60),
+        quality_score=quality,
+        source=source,
+    )
+
+
+def _activity(moment: datetime, steps: int, source: str):
+    return ActivityData(timestamp=moment, steps=steps, source=source)
+
+
+class TestMergeRecords:
+    """Tests pour merge_records."""
+
+    def setup_method(self):
+        self.night = datetime(2025, 3, 1, 23, 0)
+
+    def test_overlapping_sleep_keeps_priority_source(self):
+        records = [
+            _sleep(self.night, 7, "google_fit", quality=0.9),
+            _sleep(self.night + timedelta(minutes=20), 6.5, "ios_health", 0.6),
+            _sleep(self.night - timedelta(minutes=10), 8, "samsung_health", 0.7),
+            _sleep(self.night + timedelta(days=1), 7, "google_fit"),
+        ]
+        merged = merge_records("sleep", records, None, PRIORITY)
+        assert [r.source for r, _ in merged] == ["ios_health", "google_fit"]
+        assert len(merged[0][1]) == 3
+        assert len(merged[1][1]) == 1
+
+        by_quality = merge_records("sleep", records, None, PRIORITY, "quality")
+        assert by_quality[0][0].quality_score == 0.9
+
+    def test_chained_overlaps_form_one_group(self):
+        records = [
+            _sleep(self.night, 3, "google_fit"),
+            _sleep(self.night + timedelta(hours=2), 3, "samsung_health"),
+            _sleep(self.night + timedelta(hours=4), 3, "google_fit"),
+            # Commence exactement à la fin précédente : pas de chevauchement
+            _sleep(self.night + timedelta(hours=7), 1, "google_fit"),
+        ]
+        merged = merge_records("sleep", records, None, PRIORITY)
+        assert [r.source for r, _ in merged] == ["samsung_health", "google_fit"]
+
+    def test_same_day_activity_keeps_priority_source(self):
+        day = datetime(2025, 3, 2)
+        records = [
+            _activity(day + timedelta(hours=h), 1000, source)
+            for h in (8, 12)
+            for source in ("google_fit", "samsung_health")
+        ] + [_activity(day + timedelta(days=1, hours=9), 500, "google_fit")]
+        merged = merge_records("activity", records, None, PRIORITY)
+        assert sorted((r.timestamp.day, r.source) for r, _ in merged) == [
+            (2, "samsung_health"),
+            (2, "samsung_health"),
+            (3, "google_fit"),
+        ]
+        assert {p["source"] for p in merged[0][1]} == {"google_fit", "samsung_health"}
+
+    @pytest.mark.parametrize("kind", ["sleep", "activity"])
+    def test_incremental_merge_matches_one_shot(self, kind):
+        rng = random.Random(7)
+        sources = ["google_fit", "samsung_health", "ios_health", "fitbit"]
+        start = datetime(2025, 1, 1)
+        if kind == "sleep":
+            records = [
+                _sleep(
+                    start + timedelta(days=d, minutes=rng.randint(-60, 60)),
+                    rng.uniform(5, 9),
+                    rng.choice(sources),
+                    round(rng.random(), 2),
+                )
+                for d in range(20)
+                for _ in range(3)
+            ]
+        else:
+            records = [
+                _activity(
+                    start + timedelta(days=d, hours=rng.randint(0, 23)),
+                    rng.randint(0, 10000),
+                    rng.choice(sources),
+                )
+                for d in range(20)
+                for _ in range(3)
+            ]
+        for strategy in ("priority", "quality"):
+            one_shot = merge_records(kind, records, None, PRIORITY, strategy)
+
+            merged = merge_records(kind, records[::2], None, PRIORITY, strategy)
+            added = merge_records(kind, records[1::2], None, (), "none")
+            incremental = merge_records(
+                kind,
+                [r for r, _ in merged] + [r for r, _ in added],
+                [p for _, p in merged] + [p for _, p in added],
+                PRIORITY,
+                strategy,
+            )
+            key = lambda pair: (pair[0].model_dump_json(), str(pair[1]))  # noqa: E731
+            assert sorted(incremental, key=key) == sorted(one_shot, key=key)
+
+    def test_none_strategy_and_unmerged_kinds_are_unchanged(self):
+        records = [_sleep(self.night, 7, s) for s in ("google_fit", "ios_health")]
+        assert len(merge_records("sleep", records, None, PRIORITY, "none")) == 2
+        with pytest.raises(ValueError):
+            merge_records("sleep", records, None, PRIORITY, "average")
+
+    def test_unknown_sources_rank_after_configured(self):
+        ranks = source_ranks(["zeta", "ios_health", "alpha"], PRIORITY)
+        assert ranks.tolist() == [4, 0, 3]
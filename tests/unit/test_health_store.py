@@ -0,0 +1,267 @@
+"""
+Tests unitaires pour le stockage des données santé
+"""
+
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from core import DatabaseManager
+from core.exceptions import DatabaseError
+from health_connectors.data_models import ActivityData, SleepData, StressData
+from health_connectors.health_store import HealthDataStore
+
+
+def _stress(moment: datetime, level: float, source: str = "samsung_health"):
+    return StressData(timestamp=moment, stress_level=level, source=source, raw_data={})
+
+
+class TestHealthDataStore:
+    """Tests pour HealthDataStore."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "store.db")
+        self.store = HealthDataStore(self.db_path)
+        self.now = datetime(2025, 6, 10, 12, 0)
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_upsert_is_idempotent(self):
+        records = [_stress(self.now - timedelta(hours=h), 30 + h) for h in range(3)]
+        assert self.store.upsert("stress", records) == 3
+        self.store.upsert("stress", records)
+        assert self.store.count("stress") == 3
+
+        # Même clé (source, horodatage) : la nouvelle valeur remplace l'ancienne
+        self.store.upsert("stress", [_stress(self.now, 99)])
+        latest = self.store.query("stress", self.now, self.now)
+        assert [d.stress_level for d in latest] == [99]
+
+    def test_query_range_and_sources(self):
+        self.store.upsert(
+            "stress",
+            [
+                _stress(self.now - timedelta(days=3), 20),
+                _stress(self.now - timedelta(hours=1), 40),
+                _stress(self.now, 50, source="google_fit"),
+            ],
+        )
+        window = self.store.query("stress", self.now - timedelta(days=1), self.now)
+        assert [d.stress_level for d in window] == [40, 50]
+
+        google = self.store.query(
+            "stress", self.now - timedelta(days=7), self.now, sources=["google_fit"]
+        )
+        assert [d.source for d in google] == ["google_fit"]
+
+    def test_sleep_keyed_by_sleep_start(self):
+        start = self.now - timedelta(hours=9)
+        self.store.upsert(
+            "sleep",
+            [
+                SleepData(
+                    sleep_start=start,
+                    sleep_end=self.now,
+                    duration_minutes=540,
+                    source="ios_health",
+                    raw_data={},
+                )
+            ],
+        )
+        assert len(self.store.query("sleep", start, start)) == 1
+        assert self.store.query("sleep", self.now, self.now) == []
+
+    def test_cache_follows_data_version(self):
+        self.store.upsert("stress", [_stress(self.now, 40)])
+        version = self.store.data_version()
+        start = self.now - timedelta(days=1)
+        assert len(self.store.query("stress", start, self.now)) == 1
+        assert len(self.store.cache) == 1
+        # Lecture répétée servie par le cache, sans nouvelle requête
+        self.store.db.execute_update("DELETE FROM health_records")
+        assert len(self.store.query("stress", start, self.now)) == 1
+
+        # Une écriture change la version : la lecture suivante relit la base
+        self.store.upsert("stress", [_stress(self.now - timedelta(hours=2), 60)])
+        assert self.store.data_version() == version + 1
+        assert len(self.store.query("stress", start, self.now)) == 1
+
+    def test_overlapping_sessions_are_merged_on_write(self):
+        night = datetime(2025, 6, 9, 23, 0)
+        sessions = [
+            SleepData(
+                sleep_start=night + timedelta(minutes=offset),
+                sleep_end=night + timedelta(hours=7, minutes=offset),
+                duration_minutes=420,
+                source=source,
+            )
+            for offset, source in [(0, "google_fit"), (15, "ios_health")]
+        ]
+        self.store.upsert("sleep", sessions[:1])
+        self.store.upsert("sleep", sessions[1:])
+
+        assert self.store.count("sleep") == 1
+        stored = self.store.query("sleep", night - timedelta(days=1), self.now)
+        assert [s.source for s in stored] == ["ios_health"]
+        provenance = self.store.provenance("sleep", night - timedelta(days=1), self.now)
+        assert {p["source"] for p in provenance[0]["merged_from"]} == {
+            "google_fit",
+            "ios_health",
+        }
+
+    def test_single_source_records_have_no_provenance(self):
+        night = datetime(2025, 6, 9, 23, 0)
+        session = SleepData(
+            sleep_start=night,
+            sleep_end=night + timedelta(hours=7),
+            duration_minutes=420,
+            source="google_fit",
+        )
+        self.store.upsert("sleep", [session])
+        assert self.store.provenance("sleep", night, self.now) == []
+
+    def test_unknown_merge_strategy_rejected(self):
+        with pytest.raises(ValueError):
+            HealthDataStore(self.db_path, merge_strategy="priorty")
+
+    def test_failed_write_keeps_stored_records(self, monkeypatch):
+        night = datetime(2025, 6, 9, 23, 0)
+
+        def session(offset: int, source: str) -> SleepData:
+            return SleepData(
+                sleep_start=night + timedelta(minutes=offset),
+                sleep_end=night + timedelta(hours=7, minutes=offset),
+                duration_minutes=420,
+                source=source,
+            )
+
+        self.store.upsert("sleep", [session(0, "google_fit")])
+        self.store.upsert("sleep", [session(15, "ios_health")])
+        version = self.store.data_version()
+        execute_many = self.store.db.execute_many
+
+        def failing_insert(query, params_list):
+            if "INSERT" in query:
+                raise DatabaseError("disque plein")
+            return execute_many(query, params_list)
+
+        monkeypatch.setattr(self.store.db, "execute_many", failing_insert)
+        with pytest.raises(DatabaseError):
+            self.store.upsert("sleep", [session(30, "samsung_health")])
+        monkeypatch.undo()
+
+        # La suppression des sessions fusionnées est annulée avec l'insertion
+        assert self.store.count("sleep") == 1
+        assert self.store.data_version() == version
+        stored = self.store.query("sleep", night - timedelta(days=1), self.now)
+        assert [s.source for s in stored] == ["ios_health"]
+        _, days = self.store.rollups("sleep", night, night, "day")
+        assert days[0]["duration_minutes"]["count"] == 1
+
+    def test_same_day_activity_is_not_double_counted(self):
+        day = datetime(2025, 6, 9)
+        for source, steps in [("google_fit", 8000), ("samsung_health", 8200)]:
+            self.store.upsert(
+                "activity",
+                [
+                    ActivityData(
+                        timestamp=day + timedelta(hours=12),
+                        steps=steps,
+                        source=source,
+                    )
+                ],
+            )
+        samples = self.store.query_samples("activity", day, day + timedelta(days=1))
+        assert samples.total("steps") == 8200
+        assert self.store.count("activity") == 1
+
+    def test_streaming_reads_and_daily_rollups(self):
+        records = [
+            _stress(self.now - timedelta(hours=h), 10 + h, source=source)
+            for h in range(30)
+            for source in ("samsung_health", "google_fit")
+        ]
+        self.store.upsert("stress", records)
+        start = self.now - timedelta(days=3)
+
+        payloads = list(
+            self.store.iter_payloads("stress", start, self.now, batch_size=7)
+        )
+        assert len(payloads) == 60
+        fields = list(
+            self.store.iter_fields(
+                "stress", ["stress_level", "source"], start, self.now, batch_size=7
+            )
+        )
+        assert fields[0] == (39, "google_fit")
+        assert len(set(fields)) == 60
+
+        rollups = self.store.daily_rollups("stress", start, self.now)
+        assert [day["date"] for day in rollups] == ["2025-06-09", "2025-06-10"]
+        today = rollups[1]["stress_level"]
+        assert (today["count"], today["min"], today["max"]) == (26, 10, 22)
+        assert today["mean"] == 16.0
+        assert "heart_rate_variability" not in rollups[1]
+
+    def test_rollup_tiers_follow_writes(self):
+        records = [
+            _stress(self.now - timedelta(minutes=m), 10 + m % 7) for m in range(180)
+        ]
+        self.store.upsert("stress", records)
+        start = self.now - timedelta(hours=3)
+
+        tier, points = self.store.rollups("stress", start, self.now, "5min")
+        assert tier == "5min" and len(points) == 37
+        assert points[0]["timestamp"] == "2025-06-10T09:00:00"
+        tier, hours = self.store.rollups("stress", start, self.now, "hour")
+        assert [p["stress_level"]["count"] for p in hours] == [59, 60, 60, 1]
+
+        # Une valeur remplacée est recalculée dans tous les niveaux
+        self.store.upsert("stress", [_stress(self.now, 90)])
+        _, days = self.store.rollups("stress", start, self.now, "day")
+        stats = days[0]["stress_level"]
+        assert (stats["count"], stats["max"]) == (180, 90)
+        expected = (sum(r.stress_level for r in records[1:]) + 90) / 180
+        assert stats["mean"] == round(expected, 3)
+
+        # Résolution automatique : niveau le plus fin en au plus max_points,
+        # parmi ceux dont la rétention couvre l'intervalle
+        store = HealthDataStore(self.db_path, retention_days={"5min": None})
+        assert store.rollups("stress", start, self.now, max_points=50)[0] == "5min"
+        assert store.rollups("stress", start, self.now, max_points=10)[0] == "hour"
+        assert self.store.rollups("stress", start, self.now, max_points=50)[0] == "hour"
+
+    def test_rollups_rebuilt_for_existing_records(self):
+        self.store.upsert("stress", [_stress(self.now, 40), _stress(self.now, 60, "x")])
+        self.store.db.execute_update("DROP TABLE health_rollups")
+        store = HealthDataStore(self.db_path)
+        _, points = store.rollups("stress", self.now, self.now, "hour")
+        stats = points[0]["stress_level"]
+        assert (stats["count"], stats["mean"], stats["min"], stats["max"]) == (
+            2,
+            50.0,
+            40.0,
+            60.0,
+        )
+
+    def test_retention_per_tier(self):
+        now = datetime.now().replace(microsecond=0)
+        old, recent = now - timedelta(days=40), now - timedelta(days=2)
+        store = HealthDataStore(self.db_path, retention_days={"5min": 7, "hour": 30})
+        store.upsert("stress", [_stress(old, 20), _stress(recent, 30)])
+
+        assert store.apply_retention() == {"5min": 1, "hour": 1}
+        assert store.rollups("stress", old, old, "hour")[1] == []
+        assert len(store.rollups("stress", recent, recent, "5min")[1]) == 1
+
+        # Les agrégats journaliers gardent l'historique purgé des données brutes
+        store = HealthDataStore(self.db_path, retention_days={"raw": 30})
+        assert store.apply_retention()["raw"] == 1
+        assert store.count("stress") == 1
+        _, days = store.rollups("stress", old, old, "day")
+        assert days[0]["stress_level"]["count"] == 1
@@ -0,0 +1,142 @@
+"""
+Tests unitaires pour le client HTTP partagé des connecteurs (serveur local)
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from health_connectors import http_client
+from health_connectors.config import HealthConnectorConfig
+from health_connectors.http_client import HealthHTTPClient, TokenBucket
+from health_connectors.samsung_health_connector import SamsungHealthConnector
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """API fournisseur simulée : ETag, erreurs transitoires et quota."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.ports.add(self.client_address[1])
+        server.calls.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/data":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._reply(304, b"")
+            else:
+                self._reply(200, b'{"steps": 42}', {"ETag": '"v1"'})
+        elif self.path == "/flaky":
+            failures = sum(1 for path, _ in server.calls if path == "/flaky")
+            if failures <= 2:
+                self._reply(503, b"", {"Retry-After": "0"})
+            else:
+                self._reply(200, b"ok")
+        elif self.path == "/quota":
+            self._reply(429, b"", {"Retry-After": "0"})
+        else:
+            self._reply(200, b"ok")
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.ports, server.calls = set(), []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    config = HealthConnectorConfig(
+        http_max_retries=2,
+        http_backoff_seconds=0.01,
+        provider_rate_limits={"stub": 20.0},
+        provider_rate_burst=2,
+    )
+    return HealthHTTPClient(config)
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_and_conditional_get(stub_server, client):
+    server, base_url = stub_server
+    responses = [await client.get("other", f"{base_url}/data") for _ in range(3)]
+    await client.aclose()
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert all(r.json() == {"steps": 42} for r in responses)
+    # Revalidation par ETag : le contenu n'est renvoyé qu'une fois
+    assert [etag for _, etag in server.calls] == [None, '"v1"', '"v1"']
+    assert len(server.ports) == 1
+    assert client.get_status()["providers"]["other"]["not_modified"] == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors(stub_server, client):
+    server, base_url = stub_server
+    response = await client.get("other", f"{base_url}/flaky")
+    assert response.status_code == 200
+
+    # Quota toujours dépassé : dernière réponse rendue après tous les essais
+    response = await client.get("other", f"{base_url}/quota")
+    assert response.status_code == 429
+    await client.aclose()
+
+    assert [path for path, _ in server.calls].count("/quota") == 3
+    stats = client.get_status()["providers"]["other"]
+    assert (stats["requests"], stats["retries"]) == (6, 4)
+
+
+@pytest.mark.asyncio
+async def test_provider_quota_spaces_concurrent_requests(stub_server, client):
+    server, base_url = stub_server
+    started = time.monotonic()
+    responses = await asyncio.gather(
+        *(client.get("stub", f"{base_url}/ping", conditional=False) for _ in range(6))
+    )
+    elapsed = time.monotonic() - started
+    await client.aclose()
+
+    assert all(r.status_code == 200 for r in responses)
+    # Rafale de 2 puis 20 requêtes/s : 4 requêtes attendent leur jeton
+    assert elapsed >= 0.18
+    assert elapsed < 1.0
+
+
+def test_token_bucket_reservations():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+
+
+@pytest.mark.asyncio
+async def test_connectors_share_the_client(stub_server, client, monkeypatch):
+    server, base_url = stub_server
+    monkeypatch.setattr(http_client, "_http_client", client)
+    connector = SamsungHealthConnector()
+
+    response = await connector.http_request("GET", f"{base_url}/ping")
+    assert response.text == "ok"
+    assert "samsung_health" in client.get_status()["providers"]
+    await client.aclose()
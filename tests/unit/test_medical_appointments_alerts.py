@@ -119,7 +119,7 @@ class TestMedicalAppointmentsAlerts:
             assert reminder_found, "Aucune alerte de rappel 24h créée"
 
     def test_check_medical_appointments_no_duplicates(self, auto_sync):
-        """Test qu'aucune alerte dupliquée n'est créée."""
+        """Test que chaque RDV est dédoublonné par sa clé d'alerte."""
         tomorrow = datetime.now() + timedelta(days=1)
         appointments = [
             {
@@ -127,19 +127,11 @@ class TestMedicalAppointmentsAlerts:
                 "date": tomorrow.isoformat(),
                 "title": "Consultation",
                 "doctor": "Dr. Test",
-            }
+            },
+            # Sans identifiant : pas de clé de dédoublonnage
+            {"date": tomorrow.isoformat(), "title": "Bilan"},
         ]
 
-        # Simuler une alerte existante
-        existing_alert = {
-            "id": 1,
-            "data": (
-                '{"appointment_id": "appt_456", "appointment_date": "'
-                + tomorrow.isoformat()
-                + '", "alert_type": "general"}'
-            ),
-        }
-
         with (
             patch("requests.get") as mock_get,
             patch("core.alerts.ARIA_AlertsSystem") as mock_alerts,
@@ -152,19 +144,17 @@ class TestMedicalAppointmentsAlerts:
             mock_get.return_value = mock_response
 
             mock_instance = MagicMock()
-            mock_instance.get_alerts.return_value = {"alerts": [existing_alert]}
             mock_alerts.return_value = mock_instance
 
             auto_sync._check_medical_appointments()
 
-            # Vérifier qu'aucune nouvelle alerte générale n'a été créée
-            calls = mock_instance.create_alert.call_args_list
-            general_calls = [
-                call
-                for call in calls
-                if call[1].get("data", {}).get("alert_type") == "general"
+            general_keys = [
+                call.kwargs["dedup_key"]
+                for call in mock_instance.create_alert.call_args_list
+                if call.args[4]["alert_type"] == "general"
             ]
-            assert len(general_calls) == 0
+            assert general_keys == [f"appt_456:{tomorrow.isoformat()}", None]
+            mock_instance.get_alerts.assert_not_called()
 
     def test_check_medical_appointments_different_date_formats(self, auto_sync):
         """Test gestion de différents formats de dates."""
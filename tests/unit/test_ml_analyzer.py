@@ -6,6 +6,7 @@ Tests unitaires pour ARIAMLAnalyzer
 Tests complets pour le module d'analyse ML ARIA.
 """
 
+import sqlite3
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -441,3 +442,96 @@ class TestARIAMLAnalyzer:
         # Assert
         patterns = self.ml_analyzer.analyze_pain_patterns(days=7)
         assert patterns["total_events"] >= 1  # Au moins un événement enregistré
+
+
+class TestPatternSnapshot:
+    """Tests pour le snapshot versionné des patterns"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "snapshot.db"
+        self.ml_analyzer = ARIAMLAnalyzer(str(self.db_path))
+        for intensity in (5, 6, 7):
+            self.ml_analyzer.track_pain_event(
+                PainEvent(
+                    event_type=PainEventType.PAIN_ENTRY,
+                    timestamp=datetime.now(),
+                    intensity=intensity,
+                    trigger="stress",
+                )
+            )
+
+    def teardown_method(self):
+        self.ml_analyzer.db.close()
+        self.temp_dir.cleanup()
+
+    def test_predictions_do_not_write_patterns(self):
+        """Les prédictions répétées lisent le snapshot sans écrire"""
+        self.ml_analyzer.predict_pain_episode({"stress_level": 0.5})
+        patterns_after_first = self.ml_analyzer.db.get_count("pain_patterns")
+
+        with patch.object(self.ml_analyzer, "analyze_pain_patterns") as analyze:
+            for _ in range(5):
+                self.ml_analyzer.predict_pain_episode({"stress_level": 0.5})
+            analyze.assert_not_called()
+
+        assert patterns_after_first > 0
+        assert self.ml_analyzer.db.get_count("pain_patterns") == patterns_after_first
+
+    def test_snapshot_recomputed_on_data_change(self):
+        """Un nouvel événement change la version et déclenche un recalcul"""
+        first = self.ml_analyzer.get_pattern_snapshot(days=14)
+        self.ml_analyzer.track_pain_event(
+            PainEvent(
+                event_type=PainEventType.PAIN_ENTRY,
+                timestamp=datetime.now(),
+                intensity=8,
+                trigger="stress",
+            )
+        )
+        second = self.ml_analyzer.get_pattern_snapshot(days=14)
+        assert second["data_version"] != first["data_version"]
+        assert second["total_events"] == 4
+
+    def test_snapshot_persisted_across_instances(self):
+        """Un nouvel analyseur relit le snapshot persisté"""
+        snapshot = self.ml_analyzer.get_pattern_snapshot(days=14)
+        other = ARIAMLAnalyzer(str(self.db_path))
+        with patch.object(other, "analyze_pain_patterns") as analyze:
+            assert other.get_pattern_snapshot(days=14) == snapshot
+            analyze.assert_not_called()
+
+    def test_patterns_deduplicated_by_type_and_window(self):
+        """Les analyses répétées ne dupliquent pas pain_patterns"""
+        for _ in range(3):
+            self.ml_analyzer.analyze_pain_patterns(days=7)
+        rows = self.ml_analyzer.db.execute_query(
+            "SELECT pattern_type, COUNT(*) AS n FROM pain_patterns "
+            "GROUP BY pattern_type, window_days"
+        )
+        assert rows
+        assert all(row["n"] == 1 for row in rows)
+
+    def test_legacy_duplicates_migrated(self):
+        """Les doublons hérités sont supprimés à l'initialisation"""
+        legacy_path = Path(self.temp_dir.name) / "legacy.db"
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("""
+                CREATE TABLE pain_patterns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pattern_type TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    description TEXT,
+                    triggers TEXT,
+                    recommendations TEXT,
+                    detected_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+                """)
+            conn.executemany(
+                "INSERT INTO pain_patterns (pattern_type, confidence) VALUES (?, ?)",
+                [("common_trigger", 0.9)] * 5 + [("effective_action", 0.85)] * 3,
+            )
+
+        analyzer = ARIAMLAnalyzer(str(legacy_path))
+        assert analyzer.db.get_count("pain_patterns") == 2
+        analyzer.db.close()
@@ -130,3 +130,27 @@ class TestPainEntryEndpoints:
         # Supprimer l'entrée
         delete_response = client.delete(f"/api/pain/entries/{entry_id}")
         assert delete_response.status_code == 200
+
+    def test_similar_entries(self):
+        """Test GET /api/pain/entries/{id}/similar"""
+        created = [
+            client.post(
+                "/api/pain/quick-entry",
+                json={
+                    "intensity": intensity,
+                    "physical_trigger": "marche longue",
+                    "action_taken": "étirements",
+                },
+            ).json()["id"]
+            for intensity in (6, 7, 7)
+        ]
+        response = client.get(f"/api/pain/entries/{created[-1]}/similar?k=2")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["similar_entries"]) == 2
+        assert created[-1] not in [e["id"] for e in data["similar_entries"]]
+
+    def test_similar_entries_not_found(self):
+        """Test GET /api/pain/entries/{id}/similar avec ID inexistant"""
+        response = client.get("/api/pain/entries/99999999/similar")
+        assert response.status_code == 404
@@ -144,3 +144,47 @@ class TestPatternsEndpoints:
         cached = analyzer.cache.get(cache_key)
         assert cached is not None
         assert cached == result1
+
+    def test_post_classify_emotions_entries(self):
+        """Test POST /api/patterns/emotions/classify avec entrées fournies"""
+        data = {
+            "entries": [
+                {"id": 1, "intensity": 7, "mental_trigger": "Anxiété forte"},
+                {"id": 2, "intensity": 2, "activity": "repos"},
+            ]
+        }
+        response = client.post("/api/patterns/emotions/classify", json=data)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["total_entries"] == 2
+        assert result["results"][0]["detected_emotion"] == "anxious"
+        assert result["results"][1]["detected_emotion"] == "relaxed"
+
+    def test_post_classify_emotions_invalid_entries(self):
+        """Test POST /api/patterns/emotions/classify avec entries invalide"""
+        response = client.post(
+            "/api/patterns/emotions/classify", json={"entries": "stress"}
+        )
+        assert response.status_code == 400
+
+        response = client.post(
+            "/api/patterns/emotions/classify",
+            json={"entries": [{"intensity": 5}, "stress", 3]},
+        )
+        assert response.status_code == 400
+
+    def test_get_temporal_periodicity(self):
+        """Test GET /api/patterns/temporal/periodicity"""
+        response = client.get("/api/patterns/temporal/periodicity?days=90")
+        assert response.status_code == 200
+        assert "cycles" in response.json()
+
+    def test_get_temporal_change_points(self):
+        """Test GET /api/patterns/temporal/change-points"""
+        response = client.get(
+            "/api/patterns/temporal/change-points?days=90&min_segment_days=2"
+        )
+        assert response.status_code == 200
+        assert "change_points" in response.json()
+        response = client.get("/api/patterns/temporal/change-points?penalty_scale=0")
+        assert response.status_code == 422
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour les endpoints Prediction Engine API
+"""
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+
+class TestPredictionsEndpoints:
+    """Tests pour les endpoints de prédiction"""
+
+    def test_predict_batch_hourly_horizon(self):
+        """Test POST /api/predictions/predict/batch avec horizon horaire"""
+        data = {
+            "horizon_hours": 24,
+            "context": {"stress_level": 0.7},
+            "start": "2026-01-05T00:00:00",
+        }
+        response = client.post("/api/predictions/predict/batch", json=data)
+        assert response.status_code == 200
+        result = response.json()
+        assert len(result["curve"]) == 24
+        assert [point["hour"] for point in result["curve"]] == list(range(24))
+        assert result["summary"]["points"] == 24
+        assert "peak" in result["summary"]
+
+    def test_predict_batch_explicit_contexts(self):
+        """Test POST /api/predictions/predict/batch avec contextes explicites"""
+        data = {
+            "contexts": [
+                {"stress_level": 0.1, "fatigue_level": 0.1, "activity_intensity": 0.1},
+                {"stress_level": 1.0, "fatigue_level": 1.0, "activity_intensity": 1.0},
+            ]
+        }
+        response = client.post("/api/predictions/predict/batch", json=data)
+        assert response.status_code == 200
+        curve = response.json()["curve"]
+        assert len(curve) == 2
+        assert curve[1]["predicted_intensity"] >= curve[0]["predicted_intensity"]
+
+    def test_predict_batch_invalid_horizon(self):
+        """Test POST /api/predictions/predict/batch avec horizon invalide"""
+        response = client.post(
+            "/api/predictions/predict/batch", json={"horizon_hours": 0}
+        )
+        assert response.status_code == 400
+
+    def test_predict_batch_invalid_contexts(self):
+        """Test POST /api/predictions/predict/batch avec contexts invalide"""
+        response = client.post(
+            "/api/predictions/predict/batch", json={"contexts": "stress"}
+        )
+        assert response.status_code == 400
+
+    def test_get_accuracy(self):
+        """Test GET /api/predictions/accuracy"""
+        response = client.get("/api/predictions/accuracy?bins=5")
+        assert response.status_code == 200
+        assert "evaluated_predictions" in response.json()
+
+    def test_get_flares(self):
+        """Test GET /api/predictions/flares"""
+        response = client.get("/api/predictions/flares")
+        assert response.status_code == 200
+        result = response.json()
+        assert set(result["streams"]) == {"intensity", "frequency", "stress"}
+        assert isinstance(result["active_flares"], list)
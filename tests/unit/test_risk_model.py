@@ -0,0 +1,176 @@
+"""
+Tests unitaires pour le modèle de risque de douleur
+"""
+
+import json
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core import DatabaseManager
+from prediction_engine.ml_analyzer import ARIAMLAnalyzer
+from prediction_engine.risk_model import (
+    FEATURE_NAMES,
+    PainRiskModel,
+    RiskFeatureExtractor,
+    build_feature_vector,
+    list_model_versions,
+)
+
+
+def _seed_pain_entries(db_path: Path, count: int = 40) -> None:
+    """Crée des entrées où le stress explique l'intensité."""
+    base = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)
+    rows = []
+    for i in range(count):
+        stressed = i % 2 == 0
+        rows.append(
+            (
+                (base - timedelta(days=i)).isoformat(),
+                8 if stressed else 3,
+                "marche",
+                "stress" if stressed else None,
+                "repos",
+            )
+        )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE pain_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                intensity INTEGER NOT NULL,
+                physical_trigger TEXT,
+                mental_trigger TEXT,
+                activity TEXT
+            )
+            """)
+        conn.executemany(
+            """
+            INSERT INTO pain_entries
+            (timestamp, intensity, physical_trigger, mental_trigger, activity)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+class TestPainRiskModel:
+    """Tests pour l'entraînement et la persistance du modèle."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.db_path = self.root / "risk.db"
+        self.model_dir = self.root / "models"
+
+    def teardown_method(self):
+        DatabaseManager(str(self.db_path)).close()
+        self.temp_dir.cleanup()
+
+    def _training_data(self) -> tuple[np.ndarray, np.ndarray]:
+        rng = np.random.default_rng(42)
+        stress = rng.random(200)
+        moment = datetime(2026, 1, 5, 14)
+        X = np.array(
+            [build_feature_vector(s, 0.5, 0.5, moment) for s in stress], dtype=float
+        )
+        y = 2 + 6 * stress
+        return X, y
+
+    def test_fit_learns_weights(self):
+        X, y = self._training_data()
+        model = PainRiskModel.fit(X, y, alpha=0.01)
+
+        low, low_risk = model.predict(build_feature_vector(0.1, 0.5, 0.5, datetime.now()))
+        high, high_risk = model.predict(
+            build_feature_vector(0.9, 0.5, 0.5, datetime.now())
+        )
+        assert high - low == pytest.approx(4.8, abs=0.2)
+        assert high_risk > 0.9 > 0.1 > low_risk
+        assert model.metadata["metrics"]["mae"] < 0.1
+
+    def test_single_and_batch_predictions_match(self):
+        X, y = self._training_data()
+        model = PainRiskModel.fit(X, y)
+        intensity, risk = model.predict_many(X[:5])
+        for row, expected_intensity, expected_risk in zip(
+            X[:5], intensity, risk, strict=True
+        ):
+            single = model.predict(row.tolist())
+            assert single[0] == pytest.approx(expected_intensity)
+            assert single[1] == pytest.approx(expected_risk)
+
+    def test_not_enough_samples(self):
+        with pytest.raises(ValueError):
+            PainRiskModel.fit(np.zeros((3, len(FEATURE_NAMES))), np.zeros(3))
+
+    def test_versioned_save_and_mmap_load(self):
+        X, y = self._training_data()
+        PainRiskModel.fit(X, y).save(self.model_dir)
+        PainRiskModel.fit(X, y).save(self.model_dir)
+        # Version incomplète (poids sans métadonnées) ignorée
+        np.save(self.model_dir / "pain_risk_v0003.npy", np.zeros((2, 7)))
+
+        assert sorted(list_model_versions(self.model_dir)) == [1, 2]
+        model = PainRiskModel.load_latest(self.model_dir)
+        assert model is not None
+        assert model.version == 2
+        assert isinstance(model.params, np.memmap)
+
+    def test_extractor_uses_health_metrics(self):
+        _seed_pain_entries(self.db_path, count=2)
+        health_dir = self.root / "dacc" / "samsung_health_data"
+        health_dir.mkdir(parents=True)
+        day = datetime.now().date().isoformat()
+        (health_dir / f"stress_{day}.json").write_text(
+            json.dumps({"stress_level": 80.0})
+        )
+
+        extractor = RiskFeatureExtractor(str(self.db_path), str(self.root / "dacc"))
+        X, y, coverage = extractor.extract()
+        assert X.shape == (2, len(FEATURE_NAMES))
+        assert coverage["health_matched_samples"] == 1
+        assert X[0, 0] == pytest.approx(0.8)
+
+    def test_analyzer_trains_and_uses_model(self):
+        _seed_pain_entries(self.db_path)
+        analyzer = ARIAMLAnalyzer(str(self.db_path), model_dir=str(self.model_dir))
+        assert analyzer.risk_model is None
+
+        result = analyzer.train_risk_model(health_data_dir=str(self.root / "none"))
+        assert result["model_updated"] is True
+        assert result["model_version"] == 1
+
+        prediction = analyzer.predict_pain_episode({"stress_level": 0.9})
+        assert prediction["model_version"] == 1
+        assert prediction["predicted_intensity"] >= 7
+
+        # Un nouvel analyseur recharge le modèle sans ré-entraîner
+        reloaded = ARIAMLAnalyzer(str(self.db_path), model_dir=str(self.model_dir))
+        assert reloaded.risk_model is not None
+        assert reloaded.risk_model.version == 1
+
+    def test_batch_matches_single_predictions(self):
+        _seed_pain_entries(self.db_path)
+        analyzer = ARIAMLAnalyzer(str(self.db_path), model_dir=str(self.model_dir))
+        analyzer.train_risk_model(health_data_dir=str(self.root / "none"))
+
+        start = datetime(2026, 1, 5, 0, 0)
+        batch = analyzer.predict_batch(
+            horizon_hours=24, base_context={"stress_level": 0.9}, start=start
+        )
+        assert len(batch["curve"]) == 24
+        assert batch["model_version"] == 1
+
+        point = batch["curve"][14]
+        intensity, risk = analyzer.risk_model.predict(
+            build_feature_vector(0.9, 0.5, 0.5, start.replace(hour=14))
+        )
+        assert point["predicted_intensity"] == round(intensity)
+        assert point["risk_probability"] == pytest.approx(risk, abs=1e-4)
+        # Les prédictions par lot ne sont pas journalisées
+        assert analyzer.db.get_count("pain_predictions") == 0
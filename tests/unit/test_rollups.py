@@ -0,0 +1,46 @@
+"""
+Tests unitaires pour les niveaux d'agrégats des séries santé
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from health_connectors.rollups import bucket_start, bucket_starts, select_resolution
+
+
+def test_bucket_starts_from_stored_timestamps():
+    timestamps = ["2025-06-10T08:07:42", "2025-06-10T08:04:59.500000"]
+    assert bucket_starts(timestamps, "5min") == [
+        "2025-06-10T08:00:00",
+        "2025-06-10T08:05:00",
+    ]
+    assert bucket_starts(timestamps, "hour") == ["2025-06-10T08:00:00"]
+    assert bucket_starts(timestamps, "day") == ["2025-06-10T00:00:00"]
+    assert bucket_start(datetime(2025, 6, 10, 8, 7, 42), "5min") == datetime(
+        2025, 6, 10, 8, 5
+    )
+    with pytest.raises(ValueError):
+        bucket_starts(timestamps, "week")
+
+
+def test_select_resolution_bounds_points_and_respects_retention():
+    now = datetime(2025, 6, 10, 12, 0)
+    retention = {"raw": None, "5min": 90, "hour": 730, "day": None}
+
+    def pick(days: float) -> str:
+        return select_resolution(now - timedelta(days=days), now, retention, now=now)
+
+    assert pick(1) == "5min"
+    assert pick(7) == "hour"
+    assert pick(365) == "day"
+    # Niveau 5 minutes purgé au-delà de 90 jours : l'heure prend le relais
+    assert (
+        select_resolution(
+            now - timedelta(days=100),
+            now - timedelta(days=99),
+            retention,
+            now=now,
+        )
+        == "hour"
+    )
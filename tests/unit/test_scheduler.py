@@ -0,0 +1,161 @@
+"""
+Tests unitaires pour le planificateur de tâches de fond
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.scheduler import CronTrigger, IntervalTrigger, JobScheduler
+
+
+class TestTriggers:
+    """Tests pour les déclencheurs."""
+
+    def test_interval_trigger(self):
+        trigger = IntervalTrigger(90)
+        next_run = trigger.next_run(datetime(2025, 3, 1, 8, 0))
+        assert next_run == datetime(2025, 3, 1, 8, 1, 30)
+        with pytest.raises(ValueError):
+            IntervalTrigger(0)
+
+    def test_cron_trigger_next_run(self):
+        # Lundi 8h30
+        trigger = CronTrigger("30 8 * * 1")
+        monday = trigger.next_run(datetime(2025, 3, 1, 12, 0))
+        assert monday == datetime(2025, 3, 3, 8, 30)
+        assert trigger.next_run(monday) == datetime(2025, 3, 10, 8, 30)
+
+        every_quarter = CronTrigger("*/15 * * * *")
+        assert every_quarter.next_run(datetime(2025, 3, 1, 8, 7, 42)) == datetime(
+            2025, 3, 1, 8, 15
+        )
+
+    def test_cron_day_of_month_or_weekday(self):
+        # Le 1er du mois OU le dimanche, à minuit
+        trigger = CronTrigger("0 0 1 * 0")
+        assert trigger.next_run(datetime(2025, 3, 1, 12, 0)) == datetime(2025, 3, 2)
+        assert trigger.next_run(datetime(2025, 3, 30, 12, 0)) == datetime(2025, 4, 1)
+
+    def test_invalid_cron_expression(self):
+        with pytest.raises(ValueError):
+            CronTrigger("* * *")
+        with pytest.raises(ValueError):
+            CronTrigger("61 * * * *")
+
+
+class TestJobScheduler:
+    """Tests pour JobScheduler."""
+
+    @pytest.fixture
+    def scheduler(self):
+        scheduler = JobScheduler(max_concurrency=2, backoff_base_seconds=0.05)
+        yield scheduler
+        scheduler.stop()
+
+    @staticmethod
+    def _wait_for(condition, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "condition non atteinte"
+            time.sleep(0.01)
+
+    def test_interval_job_runs_on_background_thread(self, scheduler):
+        calls = []
+        scheduler.add_job("tick", lambda: calls.append(1), IntervalTrigger(0.05),
+                          run_immediately=True)
+        assert scheduler.start() is True
+        assert scheduler.start() is False
+        assert scheduler.mode == "thread"
+
+        self._wait_for(lambda: len(calls) >= 3)
+        job = scheduler.get_status()["jobs"][0]
+        assert job["name"] == "tick"
+        assert job["last_status"] == "success"
+        assert job["avg_duration_seconds"] is not None
+        assert job["recent_runs"]
+
+        assert scheduler.remove_job("tick") is True
+        assert scheduler.get_job("tick") is None
+
+    def test_failures_back_off_exponentially(self, scheduler):
+        attempts = []
+
+        def flaky():
+            attempts.append(datetime.now())
+            if len(attempts) < 3:
+                raise RuntimeError("CIA indisponible")
+
+        scheduler.add_job("flaky", flaky, IntervalTrigger(3600), run_immediately=True)
+        scheduler.start()
+        self._wait_for(lambda: scheduler.get_job("flaky").last_status == "success")
+
+        job = scheduler.get_job("flaky")
+        assert (job.runs, job.failures, job.consecutive_failures) == (3, 2, 0)
+        assert job.last_error is None
+        assert attempts[2] - attempts[1] > attempts[1] - attempts[0]
+        # Retour au rythme normal après un succès
+        assert job.next_run > datetime.now() + timedelta(minutes=59)
+
+    @pytest.mark.asyncio
+    async def test_runs_on_current_loop_and_prevents_overlap(self, scheduler):
+        release = asyncio.Event()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await release.wait()
+
+        scheduler.add_job("slow", slow, IntervalTrigger(3600))
+        scheduler.start(use_running_loop=True)
+        assert scheduler.mode == "loop"
+
+        first = asyncio.create_task(scheduler.run_now("slow"))
+        await asyncio.sleep(0)
+        status = await scheduler.run_now("slow")
+        assert status["skipped"] == 1
+
+        release.set()
+        status = await first
+        assert calls == [1]
+        assert status["runs"] == 1
+        with pytest.raises(KeyError):
+            await scheduler.run_now("unknown")
+
+        scheduler.stop()
+        await asyncio.sleep(0)
+
+    def test_max_concurrency(self, scheduler):
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+
+        for index in range(4):
+            scheduler.add_job(f"job{index}", work, IntervalTrigger(3600),
+                              run_immediately=True)
+        scheduler.start()
+        self._wait_for(
+            lambda: all(job["runs"] for job in scheduler.get_status()["jobs"])
+        )
+        assert peak[0] == 2
+
+    def test_application_shutdown_stops_scheduler(self, scheduler, monkeypatch):
+        from fastapi.testclient import TestClient
+
+        import main
+
+        monkeypatch.setattr(main, "get_scheduler", lambda: scheduler)
+        with TestClient(main.app):
+            scheduler.start()
+            assert scheduler.is_running
+        assert not scheduler.is_running
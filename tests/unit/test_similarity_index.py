@@ -0,0 +1,134 @@
+"""
+Tests unitaires pour l'index de similarité des épisodes
+"""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core import DatabaseManager
+from pain_tracking.similarity_index import (
+    VECTOR_SIZE,
+    EpisodeSimilarityIndex,
+    encode_entry,
+)
+
+
+def _create_entries(db_path: str, rows: list[tuple]) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pain_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                intensity INTEGER NOT NULL,
+                physical_trigger TEXT,
+                mental_trigger TEXT,
+                activity TEXT,
+                location TEXT,
+                action_taken TEXT,
+                effectiveness INTEGER
+            )
+            """)
+        conn.executemany(
+            """
+            INSERT INTO pain_entries (timestamp, intensity, physical_trigger,
+                mental_trigger, activity, location, action_taken, effectiveness)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+
+class TestEpisodeSimilarityIndex:
+    """Tests pour l'encodage et la recherche de voisins."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "similarity.db")
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_encoding_is_normalized_and_accent_insensitive(self):
+        entry = {
+            "timestamp": "2026-01-05T14:00:00",
+            "intensity": 7,
+            "mental_trigger": "Anxiété",
+        }
+        vector = encode_entry(entry)
+        assert vector.shape == (VECTOR_SIZE,)
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+        np.testing.assert_array_equal(
+            vector, encode_entry({**entry, "mental_trigger": "anxiete"})
+        )
+
+    def test_neighbors_share_context_and_actions_are_ranked(self):
+        _create_entries(
+            self.db_path,
+            [
+                ("2026-01-05T18:00:00", 8, "marche", "stress", "travail", "bureau", "chaleur", 8),
+                ("2026-01-06T18:10:00", 8, "marche", "stress", "travail", "bureau", "chaleur", 7),
+                ("2026-01-07T18:20:00", 7, "marche", "stress", "travail", "bureau", "repos", 2),
+                ("2026-01-08T08:00:00", 2, "assis", None, "lecture", "maison", "rien", None),
+                ("2026-01-09T18:00:00", 8, "marche", "stress", "travail", "bureau", None, None),
+            ],
+        )
+        index = EpisodeSimilarityIndex(self.db_path, initial_capacity=2)
+        result = index.find_similar(5, k=3)
+
+        assert result is not None
+        assert {e["id"] for e in result["similar_entries"]} == {1, 2, 3}
+        assert result["actions"][0]["action"] == "chaleur"
+        assert result["actions"][0]["mean_effectiveness"] == 7.5
+        assert [a["action"] for a in result["actions_that_worked"]] == ["chaleur"]
+        assert index.find_similar(999) is None
+
+    def test_incremental_refresh_and_rebuild_after_delete(self):
+        _create_entries(
+            self.db_path, [("2026-01-05T10:00:00", 5, "marche", None, None, None, None, None)]
+        )
+        index = EpisodeSimilarityIndex(self.db_path, initial_capacity=1)
+        assert index.refresh() == 1
+        _create_entries(
+            self.db_path,
+            [("2026-01-06T10:00:00", 6, "marche", None, None, None, None, None)] * 3,
+        )
+        assert index.refresh() == 3
+        assert index.refresh() == 0
+        assert len(index) == 4
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM pain_entries WHERE id = 2")
+        index.refresh()
+        assert len(index) == 3
+        assert 2 not in [entry_id for entry_id, _ in index.search(1, k=5)]
+
+    def test_search_is_fast_on_large_history(self):
+        rng = np.random.default_rng(0)
+        triggers = ["marche", "assis", "effort", "stress", "fatigue"]
+        rows = [
+            (
+                f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00",
+                int(rng.integers(0, 11)),
+                triggers[i % 5],
+                triggers[(i * 7) % 5],
+                None,
+                None,
+                "repos",
+                int(rng.integers(0, 11)),
+            )
+            for i in range(30000)
+        ]
+        _create_entries(self.db_path, rows)
+        index = EpisodeSimilarityIndex(self.db_path)
+        index.refresh()
+
+        started = time.perf_counter()
+        neighbors = index.search(123, k=10)
+        assert time.perf_counter() - started < 0.05
+        assert len(neighbors) == 10
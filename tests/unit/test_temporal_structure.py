@@ -0,0 +1,106 @@
+"""
+Tests unitaires pour la détection de périodicité et de ruptures
+"""
+
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from core import DatabaseManager
+from pattern_analysis.temporal_structure import TemporalStructureAnalyzer
+
+
+def _insert_entries(db_path: str, entries: list[tuple[datetime, int]]) -> None:
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pain_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                intensity INTEGER NOT NULL
+            )
+            """)
+        conn.executemany(
+            "INSERT INTO pain_entries (timestamp, intensity) VALUES (?, ?)",
+            [(moment.isoformat(), intensity) for moment, intensity in entries],
+        )
+
+
+class TestTemporalStructure:
+    """Tests pour l'analyse de structure temporelle."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.temp_dir.name) / "temporal.db")
+        self.start = datetime(2025, 1, 6, 0, 0)  # Lundi
+
+    def teardown_method(self):
+        DatabaseManager(self.db_path).close()
+        self.temp_dir.cleanup()
+
+    def test_daily_and_weekly_cycles(self):
+        entries = []
+        for day in range(70):
+            moment = self.start + timedelta(days=day)
+            entries.append((moment.replace(hour=18), 7))
+            if moment.weekday() == 5:
+                entries.append((moment.replace(hour=10), 9))
+        _insert_entries(self.db_path, entries)
+
+        result = TemporalStructureAnalyzer(self.db_path).detect_periodicity()
+        assert result["cycles"]["daily"]["period_hours"] == 24
+        assert result["cycles"]["daily"]["significant"] is True
+        assert result["cycles"]["weekly"]["period_hours"] == 168
+        assert result["cycles"]["weekly"]["significant"] is True
+        # Historique trop court pour un cycle menstruel
+        assert result["cycles"]["menstrual"] == {"analyzable": False}
+        assert result["autocorrelation_peaks"][0]["lag_hours"] in (24, 168)
+
+    def test_insufficient_data(self):
+        _insert_entries(self.db_path, [(self.start, 5)])
+        analyzer = TemporalStructureAnalyzer(self.db_path)
+        assert analyzer.detect_periodicity()["cycles"] == {}
+        assert analyzer.detect_change_points()["change_points"] == []
+
+    def test_change_point_between_regimes(self):
+        rng = np.random.default_rng(0)
+        entries = [
+            (self.start + timedelta(days=day, hours=12), int(level))
+            for day, level in enumerate(
+                np.concatenate(
+                    [
+                        np.clip(np.rint(rng.normal(3, 0.7, 40)), 0, 10),
+                        np.clip(np.rint(rng.normal(7, 0.7, 40)), 0, 10),
+                    ]
+                )
+            )
+        ]
+        _insert_entries(self.db_path, entries)
+
+        result = TemporalStructureAnalyzer(self.db_path).detect_change_points()
+        assert len(result["change_points"]) == 1
+        change = result["change_points"][0]
+        assert change["date"] == str((self.start + timedelta(days=40)).date())
+        assert change["delta"] > 3
+        assert [s["days_with_entries"] for s in result["segments"]] == [40, 40]
+
+    def test_pelt_matches_exhaustive_segmentation(self):
+        values = np.array([1.0] * 10 + [5.0] * 10 + [2.0] * 10)
+        assert TemporalStructureAnalyzer.pelt(values, penalty=1.0) == [10, 20]
+        assert TemporalStructureAnalyzer.pelt(np.ones(30), penalty=1.0) == []
+
+    def test_results_cached_per_data_version(self):
+        _insert_entries(
+            self.db_path,
+            [(self.start + timedelta(hours=12 * i), 4 + i % 2) for i in range(20)],
+        )
+        analyzer = TemporalStructureAnalyzer(self.db_path)
+        first = analyzer.detect_change_points(min_segment_days=2)
+        assert analyzer.detect_change_points(min_segment_days=2) is first
+
+        _insert_entries(self.db_path, [(self.start + timedelta(days=30), 9)])
+        refreshed = analyzer.detect_change_points(min_segment_days=2)
+        assert refreshed is not first
+        assert refreshed["data_version"] != first["data_version"]